@@ -4,13 +4,16 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_on_primary
 from app.models.attribute import MDMAttribute, MDMAttributeGroup, MDMAttributeValidation, MDMAttributeTransform
+from app.services.attribute_import import AttributeImportError, import_attributes
+from app.services.metadata_cache import metadata_cache
 from app.schemas.attribute import (
     AttributeCreate, AttributeUpdate, AttributeResponse,
     AttributeGroupCreate, AttributeGroupResponse,
     ValidationCreate, ValidationResponse,
-    TransformCreate, TransformResponse
+    TransformCreate, TransformResponse,
+    AttributeImportRequest, AttributeImportResponse
 )
 
 router = APIRouter()
@@ -33,7 +36,7 @@ async def create_attribute_group(
 @router.get("/groups", response_model=List[AttributeGroupResponse])
 async def list_attribute_groups(
     entity_id: UUID = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List attribute groups."""
     query = select(MDMAttributeGroup).where(MDMAttributeGroup.is_active == True)
@@ -70,9 +73,31 @@ async def create_attribute(
     db.add(attribute)
     await db.commit()
     await db.refresh(attribute)
+    await metadata_cache.invalidate(attribute.entity_id)
     return attribute
 
 
+@router.post("/import", response_model=AttributeImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_attribute_definitions(
+    document: AttributeImportRequest,
+    dry_run: bool = Query(False, description="Validate only, without writing"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import groups, attributes, validations and transforms for an entity in one transaction."""
+    try:
+        summary = await import_attributes(db, document, dry_run=dry_run)
+    except AttributeImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=e.errors
+        )
+
+    if not dry_run:
+        await db.commit()
+        await metadata_cache.invalidate(document.entity_id)
+    return summary
+
+
 @router.get("", response_model=List[AttributeResponse])
 async def list_attributes(
     entity_id: UUID = Query(None),
@@ -80,7 +105,7 @@ async def list_attributes(
     is_searchable: bool = Query(None),
     is_filterable: bool = Query(None),
     show_in_list: bool = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List attributes with optional filters."""
     query = select(MDMAttribute).where(MDMAttribute.is_active == True)
@@ -98,14 +123,25 @@ async def list_attributes(
 
     query = query.order_by(MDMAttribute.display_order)
 
-    result = await db.execute(query)
-    return result.scalars().all()
+    async def load(session: AsyncSession):
+        result = await session.execute(query)
+        return [
+            AttributeResponse.model_validate(attribute).model_dump(mode="json")
+            for attribute in result.scalars().all()
+        ]
+
+    # Only entity-scoped listings are cached; they are what form renders request
+    if not entity_id:
+        return await load(db)
+
+    kind = f"attributes:{group_id}:{is_searchable}:{is_filterable}:{show_in_list}"
+    return await metadata_cache.get_or_load(entity_id, kind, lambda: run_on_primary(load))
 
 
 @router.get("/{attribute_id}", response_model=AttributeResponse)
 async def get_attribute(
     attribute_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific attribute."""
     result = await db.execute(
@@ -146,6 +182,7 @@ async def update_attribute(
 
     await db.commit()
     await db.refresh(attribute)
+    await metadata_cache.invalidate(attribute.entity_id)
     return attribute
 
 
@@ -168,6 +205,7 @@ async def delete_attribute(
 
     attribute.is_active = False
     await db.commit()
+    await metadata_cache.invalidate(attribute.entity_id)
 
 
 # Validations
@@ -178,6 +216,14 @@ async def create_validation(
     db: AsyncSession = Depends(get_db)
 ):
     """Add a validation rule to an attribute."""
+    result = await db.execute(select(MDMAttribute.entity_id).where(MDMAttribute.id == attribute_id))
+    entity_id = result.scalar_one_or_none()
+    if entity_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attribute not found"
+        )
+
     validation = MDMAttributeValidation(
         attribute_id=attribute_id,
         **validation_data.model_dump(exclude={'attribute_id'})
@@ -185,13 +231,14 @@ async def create_validation(
     db.add(validation)
     await db.commit()
     await db.refresh(validation)
+    await metadata_cache.invalidate(entity_id)
     return validation
 
 
 @router.get("/{attribute_id}/validations", response_model=List[ValidationResponse])
 async def list_validations(
     attribute_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List validations for an attribute."""
     result = await db.execute(
@@ -213,6 +260,14 @@ async def create_transform(
     db: AsyncSession = Depends(get_db)
 ):
     """Add a transformation rule to an attribute."""
+    result = await db.execute(select(MDMAttribute.entity_id).where(MDMAttribute.id == attribute_id))
+    entity_id = result.scalar_one_or_none()
+    if entity_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attribute not found"
+        )
+
     transform = MDMAttributeTransform(
         attribute_id=attribute_id,
         **transform_data.model_dump(exclude={'attribute_id'})
@@ -220,13 +275,14 @@ async def create_transform(
     db.add(transform)
     await db.commit()
     await db.refresh(transform)
+    await metadata_cache.invalidate(entity_id)
     return transform
 
 
 @router.get("/{attribute_id}/transforms", response_model=List[TransformResponse])
 async def list_transforms(
     attribute_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List transformations for an attribute."""
     result = await db.execute(
@@ -1,8 +1,8 @@
 """Authentication endpoints."""
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -14,6 +14,7 @@ from app.schemas.auth import (
     Token, UserCreate, UserResponse, UserUpdate,
     RoleCreate, RoleResponse, LoginRequest
 )
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
@@ -46,6 +47,27 @@ async def get_current_user(
     return user
 
 
+async def _keyset_page(db: AsyncSession, query, columns, cursor: Optional[str], skip: int, limit: int):
+    """Fetch one page ordered by the key columns, after the cursor or at the offset."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, (str,) * len(columns))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    query = apply_keyset(query, columns, after).limit(limit)
+    if after is None:
+        query = query.offset(skip)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+def _set_next_cursor(response: Response, items, limit: int, key):
+    cursor = next_cursor(items, limit, key)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -120,8 +142,10 @@ async def get_current_user_info(
 
 @router.get("/users", response_model=List[UserResponse])
 async def list_users(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor; overrides skip"),
     db: AsyncSession = Depends(get_db),
     current_user: MDMUser = Depends(get_current_user)
 ):
@@ -132,10 +156,10 @@ async def list_users(
             detail="Not enough permissions"
         )
 
-    result = await db.execute(
-        select(MDMUser).where(MDMUser.is_active == True).offset(skip).limit(limit)
-    )
-    return result.scalars().all()
+    query = select(MDMUser).where(MDMUser.is_active == True)
+    users = await _keyset_page(db, query, (MDMUser.username,), cursor, skip, limit)
+    _set_next_cursor(response, users, limit, lambda user: (user.username,))
+    return users
 
 
 # Role endpoints
@@ -161,12 +185,15 @@ async def create_role(
 
 @router.get("/roles", response_model=List[RoleResponse])
 async def list_roles(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor; overrides skip"),
     db: AsyncSession = Depends(get_db)
 ):
     """List all roles."""
-    result = await db.execute(
-        select(MDMRole).where(MDMRole.is_active == True).offset(skip).limit(limit)
-    )
-    return result.scalars().all()
+    query = select(MDMRole).where(MDMRole.is_active == True)
+    roles = await _keyset_page(db, query, (MDMRole.role_code,), cursor, skip, limit)
+    _set_next_cursor(response, roles, limit, lambda role: (role.role_code,))
+    return roles
+
@@ -1,15 +1,22 @@
 """Catalog endpoints."""
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
 from app.models.catalog import MDMCatalog, MDMCatalogValue
+from app.services.catalog_bulk import bulk_load_catalog_values
+from app.services.catalog_cache import VALUE_ORDER, catalog_cache
+from app.utils.bulk import read_bulk_rows
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from app.utils.search import escape_like, set_word_similarity_threshold
 from app.schemas.catalog import (
     CatalogCreate, CatalogUpdate, CatalogResponse,
-    CatalogValueCreate, CatalogValueUpdate, CatalogValueResponse
+    CatalogValueCreate, CatalogValueUpdate, CatalogValueResponse,
+    CatalogValueBulkResponse
 )
 
 router = APIRouter()
@@ -43,7 +50,7 @@ async def create_catalog(
 @router.get("", response_model=List[CatalogResponse])
 async def list_catalogs(
     is_system: bool = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all catalogs."""
     query = select(MDMCatalog).where(MDMCatalog.is_active == True)
@@ -60,15 +67,19 @@ async def list_catalogs(
 @router.get("/{catalog_id}", response_model=CatalogResponse)
 async def get_catalog(
     catalog_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific catalog."""
-    result = await db.execute(
-        select(MDMCatalog)
-        .options(selectinload(MDMCatalog.values))
-        .where(MDMCatalog.id == catalog_id)
-    )
-    catalog = result.scalar_one_or_none()
+    async def load(session: AsyncSession):
+        result = await session.execute(
+            select(MDMCatalog)
+            .options(selectinload(MDMCatalog.values))
+            .where(MDMCatalog.id == catalog_id)
+        )
+        catalog = result.scalar_one_or_none()
+        return CatalogResponse.model_validate(catalog).model_dump(mode="json") if catalog else None
+
+    catalog = await catalog_cache.get_or_load(db, catalog_id, "catalog", load)
 
     if not catalog:
         raise HTTPException(
@@ -82,15 +93,19 @@ async def get_catalog(
 @router.get("/code/{catalog_code}", response_model=CatalogResponse)
 async def get_catalog_by_code(
     catalog_code: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a catalog by code."""
-    result = await db.execute(
-        select(MDMCatalog)
-        .options(selectinload(MDMCatalog.values))
-        .where(MDMCatalog.catalog_code == catalog_code)
-    )
-    catalog = result.scalar_one_or_none()
+    async def load(session: AsyncSession):
+        result = await session.execute(
+            select(MDMCatalog)
+            .options(selectinload(MDMCatalog.values))
+            .where(MDMCatalog.catalog_code == catalog_code)
+        )
+        catalog = result.scalar_one_or_none()
+        return CatalogResponse.model_validate(catalog).model_dump(mode="json") if catalog else None
+
+    catalog = await catalog_cache.get_by_code(db, catalog_code, load)
 
     if not catalog:
         raise HTTPException(
@@ -131,6 +146,7 @@ async def update_catalog(
 
     await db.commit()
     await db.refresh(catalog)
+    await catalog_cache.invalidate(catalog.id, catalog.catalog_code)
     return catalog
 
 
@@ -159,6 +175,7 @@ async def delete_catalog(
 
     catalog.is_active = False
     await db.commit()
+    await catalog_cache.invalidate(catalog.id, catalog.catalog_code)
 
 
 # Catalog Values
@@ -201,15 +218,48 @@ async def create_catalog_value(
     db.add(value)
     await db.commit()
     await db.refresh(value)
+    await catalog_cache.invalidate(catalog_id)
     return value
 
 
+@router.post("/{catalog_id}/values/bulk", response_model=CatalogValueBulkResponse)
+async def bulk_create_catalog_values(
+    catalog_id: UUID,
+    request: Request,
+    upsert: bool = Query(False, description="Update values whose code already exists instead of skipping them"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Bulk create catalog values from a JSON array or an NDJSON stream.
+
+    Rows may reference their parent by ``parent_value_code``, resolved within
+    the batch or against existing values. Returns a per-row result summary.
+    """
+    result = await db.execute(
+        select(MDMCatalog.id).where(MDMCatalog.id == catalog_id)
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Catalog not found"
+        )
+
+    rows = await read_bulk_rows(request)
+    summary = await bulk_load_catalog_values(db, catalog_id, rows, upsert=upsert)
+    await db.commit()
+    if summary.created or summary.updated:
+        await catalog_cache.invalidate(catalog_id)
+    return summary
+
+
 @router.get("/{catalog_id}/values", response_model=List[CatalogValueResponse])
 async def list_catalog_values(
     catalog_id: UUID,
+    response: Response,
     parent_value_id: UUID = Query(None),
     include_inactive: bool = Query(False),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(None, ge=1, le=1000, description="Page size; omit to return all values"),
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List values for a catalog."""
     query = select(MDMCatalogValue).where(MDMCatalogValue.catalog_id == catalog_id)
@@ -220,9 +270,61 @@ async def list_catalog_values(
     if parent_value_id:
         query = query.where(MDMCatalogValue.parent_value_id == parent_value_id)
 
-    query = query.order_by(MDMCatalogValue.sort_order, MDMCatalogValue.value_name)
+    # Keyset page over (sort_order, value_name, id); pages are not cached
+    if limit or cursor:
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, (int, str, UUID))
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        limit = limit or settings.DEFAULT_PAGE_SIZE
+        result = await db.execute(apply_keyset(query, VALUE_ORDER, after).limit(limit))
+        values = result.scalars().all()
+        cursor = next_cursor(values, limit, lambda value: (value.sort_order or 0, value.value_name, value.id))
+        if cursor:
+            response.headers[NEXT_CURSOR_HEADER] = cursor
+        return values
+
+    query = query.order_by(*VALUE_ORDER)
+
+    async def load(session: AsyncSession):
+        result = await session.execute(query)
+        return [
+            CatalogValueResponse.model_validate(value).model_dump(mode="json")
+            for value in result.scalars().all()
+        ]
+
+    return await catalog_cache.get_or_load(db, catalog_id, f"values:{parent_value_id}:{include_inactive}", load)
+
+
+@router.get("/{catalog_id}/values/search", response_model=List[CatalogValueResponse])
+async def search_catalog_values(
+    catalog_id: UUID,
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    min_similarity: float = Query(None, ge=0, le=1),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Type-ahead search over catalog value codes and names, best matches first."""
+    await set_word_similarity_threshold(db, min_similarity)
 
-    result = await db.execute(query)
+    # Code prefix matches and fuzzy name matches are both trigram-index lookups
+    score = func.greatest(
+        func.word_similarity(q, MDMCatalogValue.value_name),
+        func.similarity(q, MDMCatalogValue.value_code)
+    )
+    result = await db.execute(
+        select(MDMCatalogValue)
+        .where(
+            MDMCatalogValue.catalog_id == catalog_id,
+            MDMCatalogValue.is_active == True,
+            MDMCatalogValue.value_code.ilike(f"{escape_like(q)}%", escape="\\") |
+            MDMCatalogValue.value_name.op("%>")(q)
+        )
+        .order_by(score.desc(), MDMCatalogValue.sort_order, MDMCatalogValue.value_name)
+        .limit(limit)
+    )
     return result.scalars().all()
 
 
@@ -230,16 +332,20 @@ async def list_catalog_values(
 async def get_catalog_value(
     catalog_id: UUID,
     value_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific catalog value."""
-    result = await db.execute(
-        select(MDMCatalogValue).where(
-            MDMCatalogValue.id == value_id,
-            MDMCatalogValue.catalog_id == catalog_id
+    async def load(session: AsyncSession):
+        result = await session.execute(
+            select(MDMCatalogValue).where(
+                MDMCatalogValue.id == value_id,
+                MDMCatalogValue.catalog_id == catalog_id
+            )
         )
-    )
-    value = result.scalar_one_or_none()
+        value = result.scalar_one_or_none()
+        return CatalogValueResponse.model_validate(value).model_dump(mode="json") if value else None
+
+    value = await catalog_cache.get_or_load(db, catalog_id, f"value:{value_id}", load)
 
     if not value:
         raise HTTPException(
@@ -278,6 +384,7 @@ async def update_catalog_value(
 
     await db.commit()
     await db.refresh(value)
+    await catalog_cache.invalidate(catalog_id)
     return value
 
 
@@ -304,3 +411,4 @@ async def delete_catalog_value(
 
     value.is_active = False
     await db.commit()
+    await catalog_cache.invalidate(catalog_id)
@@ -1,15 +1,24 @@
 """Entity endpoints."""
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, run_on_primary
+from app.models.attribute import ApplyOn
 from app.models.entity import MDMEntity
+from app.services.metadata_cache import metadata_cache
+from app.services.transform_engine import transform_engine
+from app.services.validation_engine import validation_engine
+from app.utils.bulk import read_bulk_rows
+from app.utils.pagination import CountMode, apply_keyset, count_rows, decode_cursor, next_cursor
+from app.utils.search import SearchMode, escape_like, set_word_similarity_threshold
 from app.schemas.entity import (
     EntityCreate, EntityUpdate, EntityResponse, EntityListResponse
 )
+from app.schemas.attribute import TransformBatchResponse
+from app.schemas.validation import ValidationReportResponse
 
 router = APIRouter()
 
@@ -44,56 +53,95 @@ async def list_entities(
     page_size: int = Query(20, ge=1, le=100),
     search: str = Query(None),
     is_active: bool = Query(True),
-    db: AsyncSession = Depends(get_db)
+    search_mode: SearchMode = Query(SearchMode.CONTAINS),
+    min_similarity: float = Query(None, ge=0, le=1),
+    cursor: str = Query(None, description="Opaque cursor from a previous page; overrides page"),
+    count: CountMode = Query(CountMode.EXACT),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """List all master data entities with pagination."""
+    """List all master data entities with offset or keyset pagination."""
+    ranked = bool(search) and search_mode == SearchMode.SIMILAR
+    if ranked and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor pagination is not supported with search_mode=similar"
+        )
+
     # Base query
     query = select(MDMEntity).where(MDMEntity.is_active == is_active)
 
-    # Add search filter
-    if search:
+    # Add search filter (both modes are served by the trigram indexes)
+    if ranked:
+        await set_word_similarity_threshold(db, min_similarity)
+        query = query.where(
+            MDMEntity.entity_code.op("%>")(search) |
+            MDMEntity.entity_name.op("%>")(search)
+        )
+    elif search:
+        pattern = f"%{escape_like(search)}%"
         query = query.where(
-            (MDMEntity.entity_code.ilike(f"%{search}%")) |
-            (MDMEntity.entity_name.ilike(f"%{search}%"))
+            (MDMEntity.entity_code.ilike(pattern, escape="\\")) |
+            (MDMEntity.entity_name.ilike(pattern, escape="\\"))
         )
 
     # Get total count
-    count_result = await db.execute(
-        select(func.count()).select_from(query.subquery())
-    )
-    total = count_result.scalar()
+    total = await count_rows(db, query, count)
 
     # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size).order_by(MDMEntity.entity_name)
+    if ranked:
+        score = func.greatest(
+            func.word_similarity(search, MDMEntity.entity_code),
+            func.word_similarity(search, MDMEntity.entity_name)
+        )
+        page_query = (
+            query.order_by(score.desc(), MDMEntity.entity_name, MDMEntity.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+    else:
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, (str, UUID))
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        page_query = apply_keyset(query, (MDMEntity.entity_name, MDMEntity.id), after).limit(page_size)
+        if after is None:
+            page_query = page_query.offset((page - 1) * page_size)
 
-    result = await db.execute(query)
+    result = await db.execute(page_query)
     entities = result.scalars().all()
 
     return EntityListResponse(
         items=entities,
         total=total,
+        total_is_estimate=count == CountMode.ESTIMATE,
         page=page,
         page_size=page_size,
-        pages=(total + page_size - 1) // page_size if total > 0 else 0
+        pages=(total + page_size - 1) // page_size if total is not None else None,
+        next_cursor=None if ranked else next_cursor(entities, page_size, lambda entity: (entity.entity_name, entity.id))
     )
 
 
 @router.get("/{entity_id}", response_model=EntityResponse)
 async def get_entity(
     entity_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific entity by ID."""
-    result = await db.execute(
-        select(MDMEntity)
-        .options(
-            selectinload(MDMEntity.attributes),
-            selectinload(MDMEntity.attribute_groups)
+    async def load(session: AsyncSession):
+        result = await session.execute(
+            select(MDMEntity)
+            .options(
+                selectinload(MDMEntity.attributes),
+                selectinload(MDMEntity.attribute_groups)
+            )
+            .where(MDMEntity.id == entity_id)
         )
-        .where(MDMEntity.id == entity_id)
-    )
-    entity = result.scalar_one_or_none()
+        entity = result.scalar_one_or_none()
+        return EntityResponse.model_validate(entity).model_dump(mode="json") if entity else None
+
+    entity = await metadata_cache.get_or_load(entity_id, "entity", lambda: run_on_primary(load))
 
     if not entity:
         raise HTTPException(
@@ -107,18 +155,28 @@ async def get_entity(
 @router.get("/code/{entity_code}", response_model=EntityResponse)
 async def get_entity_by_code(
     entity_code: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific entity by code."""
-    result = await db.execute(
-        select(MDMEntity)
-        .options(
-            selectinload(MDMEntity.attributes),
-            selectinload(MDMEntity.attribute_groups)
+    async def load(session: AsyncSession):
+        result = await session.execute(
+            select(MDMEntity)
+            .options(
+                selectinload(MDMEntity.attributes),
+                selectinload(MDMEntity.attribute_groups)
+            )
+            .where(MDMEntity.entity_code == entity_code)
         )
-        .where(MDMEntity.entity_code == entity_code)
-    )
-    entity = result.scalar_one_or_none()
+        entity = result.scalar_one_or_none()
+        return EntityResponse.model_validate(entity).model_dump(mode="json") if entity else None
+
+    entity_id = await metadata_cache.resolve_code(entity_code)
+    if entity_id:
+        entity = await metadata_cache.get_or_load(entity_id, "entity", lambda: run_on_primary(load))
+    else:
+        entity = await load(db)
+        if entity:
+            await metadata_cache.remember_code(entity_code, entity["id"])
 
     if not entity:
         raise HTTPException(
@@ -154,6 +212,7 @@ async def update_entity(
 
     await db.commit()
     await db.refresh(entity)
+    await metadata_cache.invalidate(entity.id, entity.entity_code)
     return entity
 
 
@@ -181,3 +240,66 @@ async def delete_entity(
         entity.is_active = False
 
     await db.commit()
+    await metadata_cache.invalidate(entity_id, entity.entity_code)
+
+
+@router.post("/{entity_id}/validate", response_model=ValidationReportResponse)
+async def validate_records(
+    entity_id: UUID,
+    request: Request,
+    fail_fast: bool = Query(False, description="Stop validating a record after its first error"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Validate records (JSON array or NDJSON) against the entity's attribute rules."""
+    plan = await validation_engine.get_plan(db, entity_id)
+    if not plan.attributes:
+        result = await db.execute(select(MDMEntity.id).where(MDMEntity.id == entity_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Entity not found"
+            )
+
+    records = await read_bulk_rows(request)
+    if not all(isinstance(record, dict) for record in records):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each record must be a JSON object"
+        )
+
+    report = await plan.validate_batch_async(records, fail_fast=fail_fast)
+    return ValidationReportResponse(
+        **report.summary(),
+        invalid_rows=report.invalid_rows,
+        issues=[issue._asdict() for issue in report.issues],
+        plan_errors=report.plan_errors,
+    )
+
+
+@router.post("/{entity_id}/transform", response_model=TransformBatchResponse)
+async def transform_records(
+    entity_id: UUID,
+    request: Request,
+    phase: ApplyOn = Query(ApplyOn.INPUT, description="INPUT or OUTPUT; BOTH transforms run in either phase"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Apply the entity's attribute transforms to records (JSON array or NDJSON)."""
+    if phase == ApplyOn.BOTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="phase must be INPUT or OUTPUT"
+        )
+
+    records = await read_bulk_rows(request)
+    if not all(isinstance(record, dict) for record in records):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each record must be a JSON object"
+        )
+
+    plan = await transform_engine.get_plan(db, entity_id)
+    return TransformBatchResponse(
+        phase=phase,
+        records=plan.transform_batch(records, phase),
+        plan_errors=plan.compile_errors,
+    )
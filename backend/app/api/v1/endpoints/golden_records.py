@@ -0,0 +1,104 @@
+"""Golden record (merge) endpoints."""
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.models.entity import MDMEntity
+from app.models.record import MDMGoldenRecord, MDMGoldenRecordMember
+from app.services.merge_engine import merge_clusters
+from app.utils.bulk import read_bulk_rows
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from app.schemas.record import GoldenRecordResponse, MergeResponse
+
+router = APIRouter()
+
+
+def _parse_cluster(row) -> List[UUID]:
+    if isinstance(row, dict):
+        row = row.get("record_ids")
+    if not isinstance(row, list):
+        raise ValueError("expected a list of record ids")
+    return [UUID(str(record_id)) for record_id in row]
+
+
+@router.post("/{entity_id}/golden-records/merge", response_model=MergeResponse)
+async def merge_entity_clusters(
+    entity_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Build golden records from clusters (JSON array or NDJSON of record id lists)."""
+    result = await db.execute(select(MDMEntity.id).where(MDMEntity.id == entity_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Entity not found"
+        )
+
+    clusters = []
+    for i, row in enumerate(await read_bulk_rows(request)):
+        try:
+            clusters.append(_parse_cluster(row))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cluster {i}: {e}")
+
+    stats = await merge_clusters(db, entity_id, clusters)
+    return MergeResponse(clusters=len(clusters), **stats)
+
+
+@router.get("/{entity_id}/golden-records", response_model=List[GoldenRecordResponse])
+async def list_golden_records(
+    entity_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    is_active: bool = Query(True),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List golden records of an entity in id order."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, (UUID,))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    query = select(MDMGoldenRecord).where(
+        MDMGoldenRecord.entity_id == entity_id, MDMGoldenRecord.is_active == is_active
+    )
+    result = await db.execute(apply_keyset(query, (MDMGoldenRecord.id,), after).limit(limit))
+    golden_records = result.scalars().all()
+
+    cursor = next_cursor(golden_records, limit, lambda golden: (golden.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return golden_records
+
+
+@router.get("/{entity_id}/golden-records/{golden_record_id}", response_model=GoldenRecordResponse)
+async def get_golden_record(
+    entity_id: UUID,
+    golden_record_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a golden record with its lineage and member record ids."""
+    result = await db.execute(
+        select(MDMGoldenRecord).where(
+            MDMGoldenRecord.id == golden_record_id, MDMGoldenRecord.entity_id == entity_id
+        )
+    )
+    golden = result.scalar_one_or_none()
+    if not golden:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Golden record not found"
+        )
+
+    result = await db.execute(
+        select(MDMGoldenRecordMember.record_id).where(MDMGoldenRecordMember.golden_record_id == golden_record_id)
+    )
+    item = GoldenRecordResponse.model_validate(golden)
+    item.member_ids = result.scalars().all()
+    return item
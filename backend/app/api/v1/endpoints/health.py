@@ -1,10 +1,15 @@
 """Health check endpoints."""
+from typing import List
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.core.database import get_db
+from app.core.database import get_db, engine, get_pool_stats, replica_router
 from app.core.config import settings
-from app.schemas.common import HealthResponse
+from app.core.redis import redis_client
+from app.schemas.common import HealthResponse, PoolStatsResponse, ReplicaStatusResponse
+from app.services.audit_writer import audit_writer
+from app.services.metadata_cache import metadata_cache
+from app.services.catalog_cache import catalog_cache
 
 router = APIRouter()
 
@@ -20,14 +25,45 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     except Exception:
         db_status = "error"
 
+    # Check Redis connection
+    try:
+        await redis_client.ping()
+        redis_status = "connected"
+    except Exception:
+        redis_status = "error"
+
     return HealthResponse(
         status="healthy" if db_status == "connected" else "unhealthy",
         version=settings.APP_VERSION,
         database=db_status,
-        redis=None  # TODO: Add Redis health check
+        redis=redis_status
     )
 
 
+@router.get("/pool", response_model=PoolStatsResponse)
+async def pool_stats():
+    """Database connection pool statistics."""
+    return PoolStatsResponse(**get_pool_stats(engine))
+
+
+@router.get("/replicas", response_model=List[ReplicaStatusResponse])
+async def replica_status():
+    """Read replica availability and lag."""
+    return [ReplicaStatusResponse(**replica.status()) for replica in replica_router.replicas]
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Cache hit/miss statistics."""
+    return {"metadata": metadata_cache.stats(), "catalogs": catalog_cache.stats()}
+
+
+@router.get("/audit")
+async def audit_writer_stats():
+    """Audit log writer queue and spill statistics."""
+    return audit_writer.stats()
+
+
 @router.get("/ready")
 async def readiness_check():
     """Kubernetes readiness probe."""
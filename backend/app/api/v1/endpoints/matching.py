@@ -0,0 +1,304 @@
+"""Match rule execution endpoints."""
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.models.match_merge import CandidateStatus, MDMMatchCandidate, MDMMatchRun
+from app.models.record import MDMRecord
+from app.services.match_clusters import MatchClusterer, cluster_rule_candidates
+from app.services.match_delta import MatchRunConflict, run_match_in_background, start_match_run
+from app.services.match_engine import MatchIndex, MatchRun, match_engine, score_against
+from app.services.match_keys import find_candidate_ids, load_comparison_keys, run_backfill
+from app.services.match_parallel import MatchProgress, log_progress, run_parallel, run_workers
+from app.services.merge_engine import merge_clusters
+from app.utils.bulk import NDJSON_CONTENT_TYPES, read_bulk_rows
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from app.schemas.match import (
+    MatchCandidateResponse, MatchClusterResponse, MatchClustersResponse, MatchMergeResponse,
+    MatchPairResponse, MatchProgressResponse, MatchRunResponse, MatchRunStatusResponse
+)
+
+router = APIRouter()
+
+
+async def _get_scorer(db: AsyncSession, rule_id: UUID):
+    try:
+        scorer = await match_engine.get_scorer(db, rule_id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if scorer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match rule not found"
+        )
+    return scorer
+
+
+def _pair_response(pair, codes: List[str]) -> MatchPairResponse:
+    return MatchPairResponse(
+        left_id=str(pair.left_id), right_id=str(pair.right_id), score=pair.score,
+        auto_merge=pair.auto_merge, field_scores=dict(zip(codes, pair.field_scores))
+    )
+
+
+def _cluster_response(cluster) -> MatchClusterResponse:
+    return MatchClusterResponse(
+        record_ids=[str(record_id) for record_id in cluster.record_ids],
+        auto_merge=cluster.auto_merge, review_reason=cluster.review_reason
+    )
+
+
+def _run_index(index: MatchIndex, workers: int, progress) -> MatchRun:
+    if workers > 1:
+        return run_parallel(index, workers, None, progress)
+    return index.run()
+
+
+async def _run_response(run: MatchRun, codes: List[str], cluster: bool) -> MatchRunResponse:
+    clusters = None
+    if cluster:
+        clusterer = MatchClusterer()
+        clusterer.add_pairs((pair.left_id, pair.right_id, pair.auto_merge) for pair in run.pairs)
+        clusters = [_cluster_response(c) for c in await run_in_threadpool(clusterer.clusters)]
+    return MatchRunResponse(
+        rule_id=run.rule_id,
+        records=run.records,
+        candidate_pairs=run.candidate_pairs,
+        matches=len(run.pairs),
+        auto_merges=run.auto_merges,
+        blocking=run.blocking.as_dict(),
+        elapsed_ms=run.elapsed_ms,
+        pairs=[_pair_response(pair, codes) for pair in run.pairs],
+        clusters=clusters,
+    )
+
+
+async def _stream_run(index: MatchIndex, workers: int, codes: List[str], cluster: bool) -> AsyncIterator[str]:
+    """NDJSON lines: {"progress": ...} as chunks complete, then {"result": ...}."""
+    loop = asyncio.get_running_loop()
+    updates: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    def report(update: MatchProgress):
+        loop.call_soon_threadsafe(updates.put_nowait, update)
+
+    async def run() -> MatchRun:
+        try:
+            return await run_in_threadpool(_run_index, index, workers, report)
+        finally:
+            updates.put_nowait(finished)
+
+    task = asyncio.ensure_future(run())
+    while (update := await updates.get()) is not finished:
+        yield json.dumps({"progress": MatchProgressResponse(**update._asdict()).model_dump(mode="json")}) + "\n"
+    response = await _run_response(await task, codes, cluster)
+    yield json.dumps({"result": response.model_dump(mode="json")}) + "\n"
+
+
+@router.post("/rules/{rule_id}/run", response_model=MatchRunResponse)
+async def run_match_rule(
+    rule_id: UUID,
+    request: Request,
+    workers: int = Query(1, ge=1, description="Processes of the shared match pool to use, at most MATCH_WORKERS"),
+    cluster: bool = Query(False, description="Also resolve matches into transitive clusters"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Find duplicates among records (JSON array or NDJSON, each with an "id").
+
+    With ``Accept: application/x-ndjson`` the response streams a progress
+    line per completed chunk of a parallel run, then ``{"result": ...}``.
+    """
+    scorer = await _get_scorer(db, rule_id)
+    records = await read_bulk_rows(request)
+    if not all(isinstance(record, dict) and record.get("id") is not None for record in records):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each record must be a JSON object with an id"
+        )
+
+    try:
+        index = MatchIndex(scorer)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    index.add_many((str(record["id"]), record) for record in records)
+    workers = run_workers(workers)
+    codes = scorer.field_codes
+
+    accept = request.headers.get("accept", "").lower()
+    if any(content_type in accept for content_type in NDJSON_CONTENT_TYPES):
+        return StreamingResponse(_stream_run(index, workers, codes, cluster), media_type="application/x-ndjson")
+
+    # Scoring is CPU-bound; keep it off the event loop
+    run = await run_in_threadpool(_run_index, index, workers, log_progress(str(rule_id)))
+    return await _run_response(run, codes, cluster)
+
+
+@router.get("/rules/{rule_id}/records/{record_id}/matches", response_model=List[MatchPairResponse])
+async def find_record_matches(
+    rule_id: UUID,
+    record_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Match one stored record using the precomputed blocking keys."""
+    scorer = await _get_scorer(db, rule_id)
+    result = await db.execute(
+        select(MDMRecord.data).where(MDMRecord.id == record_id, MDMRecord.entity_id == UUID(scorer.entity_id))
+    )
+    data = result.scalar_one_or_none()
+    if data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+
+    candidate_ids = await find_candidate_ids(db, scorer, data, exclude=record_id)
+    candidates = []
+    if candidate_ids:
+        result = await db.execute(
+            select(MDMRecord.id, MDMRecord.data).where(MDMRecord.id.in_(candidate_ids), MDMRecord.is_active == True)
+        )
+        candidates = result.tuples().all()
+    keys = await load_comparison_keys(db, scorer, [record_id] + [candidate_id for candidate_id, _ in candidates])
+    pairs = score_against(scorer, record_id, data, candidates, keys)
+    pairs.sort(key=lambda pair: pair.score, reverse=True)
+    return [_pair_response(pair, scorer.field_codes) for pair in pairs]
+
+
+@router.post("/rules/{rule_id}/keys/backfill", status_code=status.HTTP_202_ACCEPTED)
+async def backfill_rule_keys(
+    rule_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Recompute missing or outdated match keys for a rule in the background."""
+    await _get_scorer(db, rule_id)
+    background_tasks.add_task(run_backfill, rule_id)
+    return {"status": "scheduled", "rule_id": str(rule_id)}
+
+
+@router.post("/rules/{rule_id}/runs", response_model=MatchRunStatusResponse, status_code=status.HTTP_202_ACCEPTED)
+async def start_rule_run(
+    rule_id: UUID,
+    background_tasks: BackgroundTasks,
+    full: bool = Query(False, description="Rematch all records instead of those changed since the last run"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Match stored records changed since the rule's watermark in the background."""
+    await _get_scorer(db, rule_id)
+    try:
+        run = await start_match_run(db, rule_id, full=full)
+    except MatchRunConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    background_tasks.add_task(run_match_in_background, run.id)
+    return run
+
+
+@router.get("/rules/{rule_id}/runs", response_model=List[MatchRunStatusResponse])
+async def list_rule_runs(
+    rule_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List the most recent runs of a rule."""
+    result = await db.execute(
+        select(MDMMatchRun)
+        .where(MDMMatchRun.match_rule_id == rule_id)
+        .order_by(MDMMatchRun.started_at.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+@router.get("/runs/{run_id}", response_model=MatchRunStatusResponse)
+async def get_run(
+    run_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the progress of a run."""
+    run = await db.get(MDMMatchRun, run_id)
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Match run not found"
+        )
+    return run
+
+
+@router.get("/rules/{rule_id}/candidates", response_model=List[MatchCandidateResponse])
+async def list_rule_candidates(
+    rule_id: UUID,
+    response: Response,
+    candidate_status: Optional[CandidateStatus] = Query(None, alias="status"),
+    record_id: Optional[UUID] = Query(None, description="Only candidates involving this record"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List persisted match candidates of a rule in id order."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, (UUID,))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    query = select(MDMMatchCandidate).where(MDMMatchCandidate.match_rule_id == rule_id)
+    if candidate_status:
+        query = query.where(MDMMatchCandidate.status == candidate_status)
+    if record_id:
+        query = query.where(
+            (MDMMatchCandidate.left_record_id == record_id) | (MDMMatchCandidate.right_record_id == record_id)
+        )
+    result = await db.execute(apply_keyset(query, (MDMMatchCandidate.id,), after).limit(limit))
+    candidates = result.scalars().all()
+
+    cursor = next_cursor(candidates, limit, lambda candidate: (candidate.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return candidates
+
+
+@router.get("/rules/{rule_id}/clusters", response_model=MatchClustersResponse)
+async def list_rule_clusters(
+    rule_id: UUID,
+    limit: int = Query(100, ge=0, le=10000, description="Clusters to return; counts cover all"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Resolve a rule's persisted candidates into clusters, auto-merge clusters first."""
+    await _get_scorer(db, rule_id)
+    clusterer = await cluster_rule_candidates(db, rule_id)
+    clusters = await run_in_threadpool(clusterer.clusters)
+    auto_merge = sum(1 for c in clusters if c.auto_merge)
+    return MatchClustersResponse(
+        rule_id=str(rule_id),
+        edges=clusterer.edges,
+        records=len(clusterer.linked),
+        auto_merge_clusters=auto_merge,
+        review_clusters=len(clusters) - auto_merge,
+        clusters=[_cluster_response(c) for c in clusters[:limit]],
+    )
+
+
+@router.post("/rules/{rule_id}/merge", response_model=MatchMergeResponse)
+async def merge_rule_clusters(
+    rule_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Merge the rule's auto-merge clusters into golden records; review clusters are left alone."""
+    scorer = await _get_scorer(db, rule_id)
+    clusterer = await cluster_rule_candidates(db, rule_id)
+    clusters = await run_in_threadpool(clusterer.clusters)
+    auto_merge = [c.record_ids for c in clusters if c.auto_merge]
+    stats = await merge_clusters(db, scorer.entity_id, auto_merge)
+    return MatchMergeResponse(
+        rule_id=str(rule_id),
+        clusters=len(auto_merge),
+        review_clusters=len(clusters) - len(auto_merge),
+        **stats
+    )
@@ -0,0 +1,130 @@
+"""Data quality rule execution endpoints."""
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.models.entity import MDMEntity
+from app.models.quality import MDMQualityCounter, MDMQualityResult, MDMQualityRule
+from app.services.quality_counters import reconcile_quality_counters
+from app.services.quality_engine import percent, run_quality_rules
+from app.schemas.quality import (
+    QualityDimensionScore, QualityReconcileResponse, QualityResultResponse, QualityRuleResult,
+    QualityRuleScore, QualityRunResponse, QualityScoresResponse
+)
+
+router = APIRouter()
+
+
+async def _require_entity(db: AsyncSession, entity_id: UUID):
+    result = await db.execute(select(MDMEntity.id).where(MDMEntity.id == entity_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Entity not found"
+        )
+
+
+@router.post("/entities/{entity_id}/run", response_model=QualityRunResponse)
+async def run_entity_quality(
+    entity_id: UUID,
+    rule_ids: Optional[List[UUID]] = Query(None, description="Only these rules; all active rules by default"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Execute an entity's BUILTIN quality rules in one scan and store the results."""
+    await _require_entity(db, entity_id)
+    report = await run_quality_rules(db, entity_id, rule_ids)
+    await db.commit()
+    return QualityRunResponse(
+        entity_id=report.entity_id,
+        executed_at=report.executed_at,
+        records=report.records,
+        results=[
+            QualityRuleResult(
+                rule_id=outcome.rule.id,
+                rule_code=outcome.rule.rule_code,
+                dimension=outcome.rule.dimension.value,
+                severity=outcome.rule.severity.value if outcome.rule.severity else None,
+                records_evaluated=outcome.evaluated,
+                records_passed=outcome.passed,
+                pass_percent=outcome.pass_percent,
+                threshold_percent=outcome.rule.threshold_percent,
+                passed=outcome.meets_threshold,
+            )
+            for outcome in report.outcomes
+        ],
+        errors=report.errors,
+        skipped=report.skipped,
+    )
+
+
+@router.get("/rules/{rule_id}/results", response_model=List[QualityResultResponse])
+async def list_rule_results(
+    rule_id: UUID,
+    since: Optional[datetime] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stored results of a rule, newest first."""
+    query = select(MDMQualityResult).where(MDMQualityResult.rule_id == rule_id)
+    if since:
+        query = query.where(MDMQualityResult.executed_at >= since)
+    result = await db.execute(query.order_by(MDMQualityResult.executed_at.desc()).limit(limit))
+    return result.scalars().all()
+
+
+@router.get("/entities/{entity_id}/scores", response_model=QualityScoresResponse)
+async def get_entity_scores(
+    entity_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Quality scores per rule and dimension, read from the counters maintained on write."""
+    result = await db.execute(
+        select(MDMQualityCounter, MDMQualityRule.rule_code, MDMQualityRule.threshold_percent)
+        .join(MDMQualityRule, MDMQualityRule.id == MDMQualityCounter.rule_id)
+        .where(MDMQualityCounter.entity_id == entity_id)
+        .order_by(MDMQualityCounter.dimension, MDMQualityRule.rule_code)
+    )
+    rules, dimensions = [], {}
+    for counter, rule_code, threshold in result.tuples().all():
+        rules.append(QualityRuleScore(
+            rule_id=counter.rule_id,
+            rule_code=rule_code,
+            dimension=counter.dimension.value,
+            records_evaluated=counter.records_evaluated,
+            records_passed=counter.records_passed,
+            pass_percent=percent(counter.records_passed, counter.records_evaluated),
+            threshold_percent=threshold,
+            reconciled_at=counter.reconciled_at,
+            updated_at=counter.updated_at,
+        ))
+        totals = dimensions.setdefault(counter.dimension.value, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += counter.records_evaluated
+        totals[2] += counter.records_passed
+
+    return QualityScoresResponse(
+        entity_id=str(entity_id),
+        dimensions=[
+            QualityDimensionScore(
+                dimension=dimension, rules=count, records_evaluated=evaluated, records_passed=passed,
+                pass_percent=percent(passed, evaluated)
+            )
+            for dimension, (count, evaluated, passed) in dimensions.items()
+        ],
+        rules=rules,
+    )
+
+
+@router.post("/entities/{entity_id}/reconcile", response_model=QualityReconcileResponse)
+async def reconcile_entity_scores(
+    entity_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Recompute the entity's quality counters from a full scan."""
+    await _require_entity(db, entity_id)
+    stats = await reconcile_quality_counters(db, entity_id)
+    await db.commit()
+    return QualityReconcileResponse(**stats)
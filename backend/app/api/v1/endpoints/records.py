@@ -0,0 +1,147 @@
+"""Master data record endpoints."""
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.models.attribute import ApplyOn
+from app.models.entity import MDMEntity
+from app.models.record import MDMRecord
+from app.services.record_service import (
+    RecordValidationError, create_record, delete_record, get_record, update_record
+)
+from app.services.transform_engine import transform_engine
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from app.schemas.record import RecordCreate, RecordUpdate, RecordResponse
+
+router = APIRouter()
+
+
+def _validation_failed(e: RecordValidationError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=[issue._asdict() for issue in e.issues]
+    )
+
+
+async def _output(db: AsyncSession, entity_id: UUID, records: List[MDMRecord]) -> List[RecordResponse]:
+    """Serialize records with OUTPUT transforms applied column-wise."""
+    plan = await transform_engine.get_plan(db, entity_id)
+    items = [RecordResponse.model_validate(record) for record in records]
+    for item, data in zip(items, plan.transform_batch([item.data for item in items], ApplyOn.OUTPUT)):
+        item.data = data
+    return items
+
+
+@router.post("/{entity_id}/records", response_model=RecordResponse, status_code=status.HTTP_201_CREATED)
+async def create_entity_record(
+    entity_id: UUID,
+    record_data: RecordCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a record; INPUT transforms and validations are applied first."""
+    result = await db.execute(select(MDMEntity.id).where(MDMEntity.id == entity_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Entity not found"
+        )
+
+    try:
+        record = await create_record(
+            db, entity_id, record_data.data,
+            source_system=record_data.source_system,
+            source_record_id=record_data.source_record_id,
+        )
+    except RecordValidationError as e:
+        raise _validation_failed(e)
+    await db.commit()
+    await db.refresh(record)
+    return (await _output(db, entity_id, [record]))[0]
+
+
+@router.get("/{entity_id}/records", response_model=List[RecordResponse])
+async def list_entity_records(
+    entity_id: UUID,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    is_active: bool = Query(True),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List records of an entity in id order."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, (UUID,))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    query = select(MDMRecord).where(MDMRecord.entity_id == entity_id, MDMRecord.is_active == is_active)
+    result = await db.execute(apply_keyset(query, (MDMRecord.id,), after).limit(limit))
+    records = result.scalars().all()
+
+    cursor = next_cursor(records, limit, lambda record: (record.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return await _output(db, entity_id, records)
+
+
+@router.get("/{entity_id}/records/{record_id}", response_model=RecordResponse)
+async def get_entity_record(
+    entity_id: UUID,
+    record_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a specific record."""
+    record = await get_record(db, entity_id, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+    return (await _output(db, entity_id, [record]))[0]
+
+
+@router.put("/{entity_id}/records/{record_id}", response_model=RecordResponse)
+async def update_entity_record(
+    entity_id: UUID,
+    record_id: UUID,
+    record_data: RecordUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a record; provided values are merged into the stored data."""
+    record = await get_record(db, entity_id, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+
+    try:
+        await update_record(db, record, data=record_data.data, is_active=record_data.is_active)
+    except RecordValidationError as e:
+        raise _validation_failed(e)
+    await db.commit()
+    await db.refresh(record)
+    return (await _output(db, entity_id, [record]))[0]
+
+
+@router.delete("/{entity_id}/records/{record_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_entity_record(
+    entity_id: UUID,
+    record_id: UUID,
+    hard_delete: bool = Query(False),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a record (soft delete by default)."""
+    record = await get_record(db, entity_id, record_id)
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+
+    await delete_record(db, record, hard_delete=hard_delete)
+    await db.commit()
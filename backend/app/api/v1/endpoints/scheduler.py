@@ -0,0 +1,52 @@
+"""Scheduler endpoints."""
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_db
+from app.models.scheduler import MDMScheduledRun, ScheduledJobKind, ScheduledRunStatus
+from app.services.scheduler import scheduler
+from app.schemas.scheduler import ScheduledJobResponse, ScheduledJobsResponse, ScheduledRunResponse
+
+router = APIRouter()
+
+
+@router.get("/jobs", response_model=ScheduledJobsResponse)
+async def list_scheduled_jobs(db: AsyncSession = Depends(get_read_db)):
+    """Jobs built from quality rule and integration mapping schedules, with their next run."""
+    jobs = await scheduler.load_jobs(db)
+    now = datetime.utcnow()
+    items = []
+    for job in jobs:
+        try:
+            next_run = job.schedule.next_after(now)
+        except ValueError:
+            next_run = None
+        items.append(ScheduledJobResponse(
+            kind=job.kind, key=job.key, schedule=job.schedule_text, entity_id=job.entity_id,
+            connection_id=job.connection_id, rule_ids=list(job.rule_ids), mapping_id=job.mapping_id,
+            next_run=next_run,
+        ))
+    return ScheduledJobsResponse(jobs=items, errors=scheduler.errors)
+
+
+@router.get("/runs", response_model=List[ScheduledRunResponse])
+async def list_scheduled_runs(
+    job_kind: Optional[ScheduledJobKind] = Query(None),
+    run_status: Optional[ScheduledRunStatus] = Query(None, alias="status"),
+    entity_id: Optional[UUID] = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Recorded runs (including missed ones), newest first."""
+    query = select(MDMScheduledRun)
+    if job_kind:
+        query = query.where(MDMScheduledRun.job_kind == job_kind)
+    if run_status:
+        query = query.where(MDMScheduledRun.status == run_status)
+    if entity_id:
+        query = query.where(MDMScheduledRun.entity_id == entity_id)
+    result = await db.execute(query.order_by(MDMScheduledRun.scheduled_for.desc()).limit(limit))
+    return result.scalars().all()
@@ -0,0 +1,248 @@
+"""Workflow execution endpoints."""
+from typing import Dict, List, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_read_db
+from app.models.record import MDMRecord
+from app.models.workflow import InstanceStatus, MDMWorkflowHistory, MDMWorkflowInstance, MDMWorkflowTask, TaskStatus
+from app.services.workflow_approval import decide_task
+from app.services.workflow_engine import (
+    CompiledTransition, WorkflowError, apply_transition, available_transitions, start_workflow
+)
+from app.utils.pagination import NEXT_CURSOR_HEADER, apply_keyset, decode_cursor, next_cursor
+from app.schemas.workflow import (
+    AvailableTransition, AvailableTransitionsRequest, TaskDecisionRequest, TaskDecisionResponse,
+    WorkflowHistoryResponse, WorkflowInstanceResponse, WorkflowStartRequest, WorkflowTaskResponse,
+    WorkflowTransitionRequest
+)
+
+router = APIRouter()
+
+
+def _transition_response(transition: CompiledTransition) -> AvailableTransition:
+    return AvailableTransition(
+        transition_id=transition.id,
+        transition_name=transition.name,
+        to_state_id=transition.to_state_id,
+        to_state_code=transition.to_state_code,
+        require_comment=transition.require_comment,
+    )
+
+
+def _instance_response(
+    instance: MDMWorkflowInstance, transitions: Optional[List[CompiledTransition]] = None
+) -> WorkflowInstanceResponse:
+    response = WorkflowInstanceResponse.model_validate(instance)
+    if transitions is not None:
+        response.available_transitions = [_transition_response(transition) for transition in transitions]
+    return response
+
+
+async def _get_instance(db: AsyncSession, instance_id: UUID, for_update: bool = False) -> MDMWorkflowInstance:
+    query = select(MDMWorkflowInstance).where(MDMWorkflowInstance.id == instance_id)
+    if for_update:
+        query = query.with_for_update()
+    instance = (await db.execute(query)).scalar_one_or_none()
+    if instance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workflow instance not found"
+        )
+    return instance
+
+
+@router.post("/{workflow_id}/instances", response_model=WorkflowInstanceResponse, status_code=status.HTTP_201_CREATED)
+async def start_workflow_instance(
+    workflow_id: UUID,
+    request: WorkflowStartRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Start a workflow for a record at the workflow's START state."""
+    result = await db.execute(
+        select(MDMRecord).where(MDMRecord.id == request.record_id, MDMRecord.is_active == True)
+    )
+    record = result.scalar_one_or_none()
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Record not found"
+        )
+
+    try:
+        instance = await start_workflow(db, workflow_id, record, request.user_id)
+    except WorkflowError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    await db.commit()
+    await db.refresh(instance)
+    transitions = await available_transitions(db, [instance])
+    return _instance_response(instance, transitions[instance.id])
+
+
+@router.get("/{workflow_id}/instances", response_model=List[WorkflowInstanceResponse])
+async def list_workflow_instances(
+    workflow_id: UUID,
+    response: Response,
+    state_id: Optional[UUID] = Query(None, description="Only instances in this state"),
+    instance_status: InstanceStatus = Query(InstanceStatus.ACTIVE, alias="status"),
+    include_transitions: bool = Query(True, description="Add the transitions available to each instance"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List a workflow's instances in id order, with their available transitions."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, (UUID,))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    query = select(MDMWorkflowInstance).where(
+        MDMWorkflowInstance.workflow_id == workflow_id, MDMWorkflowInstance.status == instance_status
+    )
+    if state_id:
+        query = query.where(MDMWorkflowInstance.current_state_id == state_id)
+    result = await db.execute(apply_keyset(query, (MDMWorkflowInstance.id,), after).limit(limit))
+    instances = result.scalars().all()
+
+    cursor = next_cursor(instances, limit, lambda instance: (instance.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    if not include_transitions:
+        return [_instance_response(instance) for instance in instances]
+    transitions = await available_transitions(db, instances)
+    return [_instance_response(instance, transitions[instance.id]) for instance in instances]
+
+
+@router.post("/instances/available-transitions", response_model=Dict[str, List[AvailableTransition]])
+async def list_available_transitions(
+    request: AvailableTransitionsRequest,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Transitions available to each of the given instances, keyed by instance id."""
+    result = await db.execute(
+        select(MDMWorkflowInstance).where(MDMWorkflowInstance.id.in_(request.instance_ids))
+    )
+    transitions = await available_transitions(db, result.scalars().all())
+    return {
+        str(instance_id): [_transition_response(transition) for transition in available]
+        for instance_id, available in transitions.items()
+    }
+
+
+@router.get("/instances/{instance_id}", response_model=WorkflowInstanceResponse)
+async def get_workflow_instance(
+    instance_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get a workflow instance with its available transitions."""
+    instance = await _get_instance(db, instance_id)
+    transitions = await available_transitions(db, [instance])
+    return _instance_response(instance, transitions[instance.id])
+
+
+@router.post("/instances/{instance_id}/transitions", response_model=WorkflowInstanceResponse)
+async def transition_workflow_instance(
+    instance_id: UUID,
+    request: WorkflowTransitionRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Move an instance along one of its available transitions."""
+    instance = await _get_instance(db, instance_id, for_update=True)
+    try:
+        await apply_transition(db, instance, request.transition_id, request.user_id, request.comment)
+    except WorkflowError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    await db.commit()
+    await db.refresh(instance)
+    transitions = await available_transitions(db, [instance])
+    return _instance_response(instance, transitions[instance.id])
+
+
+@router.get("/instances/{instance_id}/history", response_model=List[WorkflowHistoryResponse])
+async def get_workflow_history(
+    instance_id: UUID,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Transitions taken by an instance, oldest first."""
+    await _get_instance(db, instance_id)
+    result = await db.execute(
+        select(MDMWorkflowHistory)
+        .where(MDMWorkflowHistory.instance_id == instance_id)
+        .order_by(MDMWorkflowHistory.created_at, MDMWorkflowHistory.id)
+    )
+    return result.scalars().all()
+
+
+@router.get("/instances/{instance_id}/tasks", response_model=List[WorkflowTaskResponse])
+async def list_instance_tasks(
+    instance_id: UUID,
+    approval_round: Optional[int] = Query(None, description="Defaults to the current round"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Approval tasks of an instance's round."""
+    instance = await _get_instance(db, instance_id)
+    result = await db.execute(
+        select(MDMWorkflowTask)
+        .where(
+            MDMWorkflowTask.instance_id == instance_id,
+            MDMWorkflowTask.approval_round == (approval_round if approval_round is not None else instance.approval_round)
+        )
+        .order_by(MDMWorkflowTask.created_at, MDMWorkflowTask.id)
+    )
+    return result.scalars().all()
+
+
+@router.get("/tasks", response_model=List[WorkflowTaskResponse])
+async def list_tasks(
+    response: Response,
+    assignee_id: UUID = Query(..., description="Approver whose tasks to list"),
+    task_status: TaskStatus = Query(TaskStatus.PENDING, alias="status"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str = Query(None, description="Opaque cursor from X-Next-Cursor"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List an approver's tasks in id order."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, (UUID,))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    query = select(MDMWorkflowTask).where(
+        MDMWorkflowTask.assignee_id == assignee_id, MDMWorkflowTask.status == task_status
+    )
+    result = await db.execute(apply_keyset(query, (MDMWorkflowTask.id,), after).limit(limit))
+    tasks = result.scalars().all()
+
+    cursor = next_cursor(tasks, limit, lambda task: (task.id,))
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+    return tasks
+
+
+@router.post("/tasks/{task_id}/decision", response_model=TaskDecisionResponse)
+async def decide_workflow_task(
+    task_id: UUID,
+    request: TaskDecisionRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Approve or reject a task; the deciding approval or first rejection moves the instance."""
+    try:
+        decision = await decide_task(db, task_id, request.user_id, request.approve, request.comment)
+    except WorkflowError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    await db.commit()
+    return TaskDecisionResponse(
+        task_id=decision.task_id,
+        instance_id=decision.instance_id,
+        status=decision.status,
+        approvals_received=decision.approvals_received,
+        approvals_required=decision.approvals_required,
+        rejections_received=decision.rejections_received,
+        outcome=decision.outcome,
+        transition=_transition_response(decision.transition) if decision.transition else None,
+    )
@@ -1,11 +1,17 @@
 """API v1 router configuration."""
 from fastapi import APIRouter
-from app.api.v1.endpoints import entities, attributes, catalogs, auth, health
+from app.api.v1.endpoints import entities, attributes, catalogs, auth, health, matching, records, golden_records, quality, scheduler, workflows
 
 api_router = APIRouter()
 
 api_router.include_router(health.router, prefix="/health", tags=["Health"])
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(entities.router, prefix="/entities", tags=["Entities"])
+api_router.include_router(records.router, prefix="/entities", tags=["Records"])
+api_router.include_router(golden_records.router, prefix="/entities", tags=["Golden Records"])
 api_router.include_router(attributes.router, prefix="/attributes", tags=["Attributes"])
 api_router.include_router(catalogs.router, prefix="/catalogs", tags=["Catalogs"])
+api_router.include_router(matching.router, prefix="/matching", tags=["Matching"])
+api_router.include_router(quality.router, prefix="/quality", tags=["Quality"])
+api_router.include_router(scheduler.router, prefix="/scheduler", tags=["Scheduler"])
+api_router.include_router(workflows.router, prefix="/workflows", tags=["Workflows"])
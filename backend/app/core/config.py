@@ -1,5 +1,5 @@
 """Application configuration settings."""
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -22,10 +22,30 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "postgresql+asyncpg://mdm:mdm123@db:5432/mdm_db"
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_MODE: str = "queue"  # "queue" or "null" (e.g. behind pgbouncer)
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+
+    # Read replicas
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_MAX_LAG_SECONDS: int = 30
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: int = 10
+    DATABASE_REPLICA_RETRY_SECONDS: int = 30
 
     # Redis
     REDIS_URL: str = "redis://redis:6379/0"
 
+    # Metadata cache
+    METADATA_CACHE_ENABLED: bool = True
+    METADATA_CACHE_LOCAL_MAXSIZE: int = 1024
+    METADATA_CACHE_LOCAL_TTL_SECONDS: int = 30
+    METADATA_CACHE_REDIS_TTL_SECONDS: int = 3600
+
+    # Catalog cache (per-catalog TTL comes from MDMCatalog.cache_ttl_seconds)
+    CATALOG_CACHE_ENABLED: bool = True
+    CATALOG_CACHE_PRELOAD_SYSTEM: bool = True
+
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
 
@@ -33,6 +53,86 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
 
+    # Bulk operations
+    BULK_MAX_ROWS: int = 100000
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+
+    # Search (pg_trgm word similarity, 0..1)
+    SEARCH_SIMILARITY_THRESHOLD: float = 0.4
+
+    # Validation engine
+    VALIDATION_PLAN_CACHE_SIZE: int = 256
+    VALIDATION_PLAN_TTL_SECONDS: int = 300
+    VALIDATION_API_TIMEOUT_SECONDS: float = 10.0
+
+    # Transform engine
+    TRANSFORM_PLAN_CACHE_SIZE: int = 256
+    TRANSFORM_PLAN_TTL_SECONDS: int = 300
+    TRANSFORM_PIPELINE_CACHE_SIZE: int = 4096
+    TRANSFORM_PIPELINE_TTL_SECONDS: int = 3600
+    TRANSFORM_ENCRYPTION_KEY: Optional[str] = None  # Fernet key; derived from SECRET_KEY when unset
+    TRANSFORM_ENCRYPTION_KEYS: Dict[str, str] = {}  # named Fernet keys for ENCRYPT transforms' key_name (JSON)
+
+    # Matching
+    MATCH_MAX_BLOCK_SIZE: int = 1000
+    MATCH_SCORE_CHUNK_SIZE: int = 100000
+    MATCH_RULE_CACHE_TTL_SECONDS: int = 300
+    MATCH_WORKERS: int = 0  # processes in the shared match pool, which also caps per-run workers; 0 = one per CPU
+    MATCH_PARALLEL_CHUNK_SIZE: int = 50000
+    MATCH_START_METHOD: str = "spawn"
+    MATCH_KEY_BATCH_SIZE: int = 5000
+    MATCH_DELTA_BATCH_SIZE: int = 2000
+    MATCH_DELTA_LAG_SECONDS: int = 5  # clock skew allowance below the in-flight transaction cutoff
+    MATCH_RUN_STALE_SECONDS: int = 3600
+    MATCH_RUN_PROGRESS_SECONDS: float = 5.0  # how often a stored-record run writes progress mid-batch
+    MATCH_MAX_CLUSTER_SIZE: int = 50  # larger clusters go to manual review
+    MATCH_CLUSTER_FETCH_SIZE: int = 50000
+
+    # Merge engine
+    MERGE_PLAN_CACHE_SIZE: int = 256
+    MERGE_PLAN_TTL_SECONDS: int = 300
+    MERGE_BATCH_SIZE: int = 1000  # clusters per merge transaction
+
+    # Quality counters
+    QUALITY_PLAN_CACHE_SIZE: int = 256
+    QUALITY_PLAN_TTL_SECONDS: int = 300
+    QUALITY_RECONCILE_SCHEDULE: str = "@daily"  # empty disables scheduled reconciliation
+
+    # Workflow runtime
+    WORKFLOW_CACHE_SIZE: int = 256
+    WORKFLOW_CACHE_TTL_SECONDS: int = 3600  # compiled workflows are keyed by version
+    WORKFLOW_SLA_ENABLED: bool = True
+    WORKFLOW_SLA_BATCH_SIZE: int = 500
+    WORKFLOW_SLA_MAX_SLEEP_SECONDS: int = 60
+    WORKFLOW_SLA_REPEAT_HOURS: int = 0  # re-escalate overdue instances this often; 0 escalates once
+
+    # Audit log writer
+    AUDIT_ENABLED: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_RETRY_SECONDS: int = 5  # after a failed write, batches spill to disk this long
+    AUDIT_SPILL_DIR: str = "audit_spill"
+    AUDIT_POLICY_TTL_SECONDS: int = 60
+
+    # Audit log partitions and retention. Whole monthly partitions are retired
+    # once past the LONGEST retention_days of any entity (or the default below),
+    # so a shorter per-entity retention_days does not purge earlier.
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
+    AUDIT_PARTITION_SCHEDULE: str = "@daily"  # empty disables scheduled maintenance
+    AUDIT_PARTITION_DETACH: bool = False  # detach expired partitions instead of dropping them
+    AUDIT_DEFAULT_RETENTION_DAYS: int = 365  # for entities without an audit configuration
+    AUDIT_ARCHIVE_FETCH_SIZE: int = 5000  # rows per archive fetch and per DEFAULT partition delete batch
+
+    # Scheduler (quality rule schedule_cron, integration sync_frequency)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TICK_SECONDS: int = 30
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = 300  # later than this, an occurrence is recorded as missed
+    SCHEDULER_MAX_MISSED_RECORDED: int = 100
+    SCHEDULER_MAX_RUNS_PER_ENTITY: int = 1
+    SCHEDULER_MAX_RUNS_PER_CONNECTION: int = 2
+    SCHEDULER_JOB_TIMEOUT_SECONDS: int = 3600
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
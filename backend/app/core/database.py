@@ -1,15 +1,89 @@
 """Database configuration and session management."""
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+from sqlalchemy import exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeout_count = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeout_count += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def build_engine(url: str) -> AsyncEngine:
+    """Create an async engine using the configured pool strategy."""
+    if settings.DATABASE_POOL_MODE == "null":
+        return create_async_engine(
+            url,
+            echo=settings.DEBUG,
+            poolclass=NullPool,
+        )
+
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    )
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    """Return connection pool statistics for an engine."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"mode": "null"}
+
+    return {
+        "mode": "queue",
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        "wait_count": pool.wait_count,
+        "wait_seconds_total": round(pool.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool.wait_seconds_max, 6),
+        "wait_seconds_avg": round(pool.wait_seconds_total / pool.wait_count, 6) if pool.wait_count else 0.0,
+        "timeouts": pool.timeout_count,
+    }
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    poolclass=NullPool,
-)
+engine = build_engine(settings.DATABASE_URL)
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -23,6 +97,136 @@ async_session_maker = async_sessionmaker(
 # Base class for models
 Base = declarative_base()
 
+# Seconds the replica's replay position trails the primary (0 when fully replayed)
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReadSession(AsyncSession):
+    """Read-only session that moves to the primary when its replica fails.
+
+    A statement that fails with a connection error on the replica is run
+    again on the primary, and the replica is taken out of rotation. Read
+    sessions never write, so re-running a statement is safe.
+    """
+
+    replica: Optional["ReplicaNode"] = None
+
+    async def _fail_over(self):
+        replica, self.replica = self.replica, None
+        replica.mark_failed()
+        try:
+            await self.rollback()
+        except (exc.OperationalError, exc.InterfaceError):
+            pass
+        self.sync_session.bind = engine.sync_engine
+
+    async def _run(self, method, *args, **kwargs):
+        try:
+            return await method(*args, **kwargs)
+        except (exc.OperationalError, exc.InterfaceError):
+            if self.replica is None:
+                raise
+            await self._fail_over()
+            return await method(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await self._run(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._run(super().scalar, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._run(super().get, *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        return await self._run(super().stream, *args, **kwargs)
+
+
+class ReplicaNode:
+    """A read replica with cached health and lag information."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.engine = build_engine(url)
+        self.session_maker = async_sessionmaker(
+            self.engine,
+            class_=ReadSession,
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+        self.lag_seconds: Optional[float] = None
+        self.last_checked = 0.0
+        self.unavailable_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def display_url(self) -> str:
+        return make_url(self.url).render_as_string(hide_password=True)
+
+    def mark_failed(self):
+        """Take the replica out of rotation for the retry window."""
+        self.unavailable_until = time.monotonic() + settings.DATABASE_REPLICA_RETRY_SECONDS
+        self.last_checked = 0.0
+
+    async def is_usable(self) -> bool:
+        """Check availability and lag, re-probing at most once per interval."""
+        now = time.monotonic()
+        if now < self.unavailable_until:
+            return False
+
+        if now - self.last_checked >= settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS:
+            async with self._lock:
+                if now - self.last_checked >= settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS:
+                    try:
+                        async with self.engine.connect() as conn:
+                            self.lag_seconds = float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0)
+                        self.last_checked = time.monotonic()
+                    except Exception:
+                        self.mark_failed()
+                        return False
+
+        return self.lag_seconds is not None and self.lag_seconds <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "url": self.display_url,
+            "available": now >= self.unavailable_until,
+            "lag_seconds": self.lag_seconds,
+            "pool": get_pool_stats(self.engine),
+        }
+
+
+class ReplicaRouter:
+    """Round-robin selection over healthy read replicas."""
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [ReplicaNode(url) for url in urls]
+        self._counter = itertools.count()
+
+    async def select(self) -> Optional[ReplicaNode]:
+        """Return the next usable replica, or None to fall back to the primary."""
+        count = len(self.replicas)
+        if not count:
+            return None
+        start = next(self._counter)
+        for offset in range(count):
+            replica = self.replicas[(start + offset) % count]
+            if await replica.is_usable():
+                return replica
+        return None
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.DATABASE_REPLICA_URLS)
+
 
 async def get_db() -> AsyncSession:
     """Dependency to get database session."""
@@ -37,7 +241,82 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db() -> AsyncSession:
+    """Dependency to get a read-only session, routed to a replica when possible.
+
+    Statements fall back to the primary when the replica fails mid-request.
+    """
+    replica = await replica_router.select()
+    session_maker = replica.session_maker if replica else async_session_maker
+    async with session_maker() as session:
+        if replica:
+            session.replica = replica
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def run_on_primary(load: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """Run a read on a short-lived primary session, e.g. to fill a shared cache."""
+    async with async_session_maker() as session:
+        return await load(session)
+
+
+async def read_from_primary(db: AsyncSession, load: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """Run a read on ``db``, or on the primary when ``db`` is bound to a replica."""
+    if getattr(db, "replica", None) is not None:
+        return await run_on_primary(load)
+    return await load(db)
+
+
+# Changes to tables that existing databases already have; create_all only
+# creates missing tables. Each is (name, query finding it applied, DDL).
+SCHEMA_UPGRADES = (
+    (
+        "uq_mdm_catalog_value_code",
+        "SELECT 1 FROM pg_constraint WHERE conname = 'uq_mdm_catalog_value_code'",
+        "ALTER TABLE mdm_catalog_value ADD CONSTRAINT uq_mdm_catalog_value_code UNIQUE (catalog_id, value_code)",
+    ),
+    (
+        "mdm_quality_counter.reconciled_at nullable",
+        "SELECT 1 FROM information_schema.columns WHERE table_name = 'mdm_quality_counter' "
+        "AND column_name = 'reconciled_at' AND is_nullable = 'YES'",
+        "ALTER TABLE mdm_quality_counter ALTER COLUMN reconciled_at DROP NOT NULL",
+    ),
+    (
+        "approvaloutcome type",
+        "SELECT 1 FROM pg_type WHERE typname = 'approvaloutcome'",
+        "CREATE TYPE approvaloutcome AS ENUM ('APPROVED', 'REJECTED')",
+    ),
+    (
+        "mdm_workflow_transition.approval_outcome",
+        "SELECT 1 FROM information_schema.columns WHERE table_name = 'mdm_workflow_transition' "
+        "AND column_name = 'approval_outcome'",
+        "ALTER TABLE mdm_workflow_transition ADD COLUMN approval_outcome approvaloutcome NULL",
+    ),
+)
+
+
 async def init_db():
     """Initialize database tables."""
     async with engine.begin() as conn:
+        # Trigram indexes depend on pg_trgm (also created by init-db.sql)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
+        for name, applied, ddl in SCHEMA_UPGRADES:
+            if (await conn.execute(text(applied))).scalar() is not None:
+                continue
+            try:
+                async with conn.begin_nested():
+                    await conn.execute(text(ddl))
+                logger.info("Applied schema upgrade %s", name)
+            except exc.DBAPIError as e:
+                # Typically duplicate rows; they must be cleaned up before a constraint can be added
+                logger.error("Could not apply schema upgrade %s: %s", name, e)
+
+
+async def close_db():
+    """Dispose of engine connection pools."""
+    await engine.dispose()
+    await replica_router.dispose()
@@ -0,0 +1,11 @@
+"""Redis client management."""
+from redis import asyncio as aioredis
+from app.core.config import settings
+
+# Shared async Redis client (connection pool is created lazily)
+redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+
+
+async def close_redis():
+    """Close the Redis connection pool."""
+    await redis_client.aclose()
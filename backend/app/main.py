@@ -3,8 +3,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, close_db, async_session_maker
+from app.core.redis import close_redis
+from app.services.audit_partitions import ensure_audit_partitions
+from app.services.audit_writer import audit_writer
+from app.services.metadata_cache import metadata_cache
+from app.services.catalog_cache import catalog_cache
+from app.services.match_parallel import shutdown_match_pool
+from app.services.scheduler import scheduler
+from app.services.workflow_sla import sla_tracker
 from app.api.v1.router import api_router
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 @asynccontextmanager
@@ -12,9 +21,27 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     await init_db()
+    async with async_session_maker() as db:
+        await ensure_audit_partitions(db)
+        await db.commit()
+    await audit_writer.start()
+    await metadata_cache.start()
+    await catalog_cache.start()
+    if settings.CATALOG_CACHE_PRELOAD_SYSTEM:
+        async with async_session_maker() as db:
+            await catalog_cache.preload_system_catalogs(db)
+    await scheduler.start()
+    await sla_tracker.start()
     yield
     # Shutdown
-    pass
+    await sla_tracker.stop()
+    await scheduler.stop()
+    await catalog_cache.stop()
+    await metadata_cache.stop()
+    await audit_writer.stop()
+    shutdown_match_pool()
+    await close_redis()
+    await close_db()
 
 
 app = FastAPI(
@@ -34,6 +61,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include API router
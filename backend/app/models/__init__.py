@@ -4,15 +4,22 @@ from app.models.entity import MDMEntity
 from app.models.attribute import MDMAttribute, MDMAttributeValidation, MDMAttributeTransform, MDMAttributeGroup
 from app.models.catalog import MDMCatalog, MDMCatalogValue
 from app.models.relationship import MDMRelationship
-from app.models.quality import MDMQualityRule
-from app.models.match_merge import MDMMatchRule, MDMMatchField, MDMMergeStrategy
-from app.models.workflow import MDMWorkflow, MDMWorkflowState, MDMWorkflowTransition
+from app.models.quality import MDMQualityRule, MDMQualityResult, MDMQualityCounter, MDMQualityKeyCount
+from app.models.match_merge import (
+    MDMMatchRule, MDMMatchField, MDMMergeStrategy, MDMMatchRun, MDMMatchCandidate
+)
+from app.models.workflow import (
+    MDMWorkflow, MDMWorkflowState, MDMWorkflowTransition, MDMWorkflowInstance, MDMWorkflowHistory,
+    MDMWorkflowTask
+)
 from app.models.security import MDMRole, MDMUser, MDMEntityPermission, MDMFieldPermission
 from app.models.integration import MDMConnection, MDMIntegrationMapping, MDMFieldMapping
 from app.models.audit import MDMAuditConfig, MDMAuditLog
 from app.models.notification import MDMNotificationTemplate, MDMNotificationRule
 from app.models.ui import MDMFormLayout
 from app.models.translation import MDMTranslation
+from app.models.scheduler import MDMScheduledRun
+from app.models.record import MDMRecord, MDMRecordMatchKey, MDMGoldenRecord, MDMGoldenRecordMember
 
 __all__ = [
     "BaseModel",
@@ -27,12 +34,20 @@ __all__ = [
     "MDMCatalogValue",
     "MDMRelationship",
     "MDMQualityRule",
+    "MDMQualityResult",
+    "MDMQualityCounter",
+    "MDMQualityKeyCount",
     "MDMMatchRule",
     "MDMMatchField",
     "MDMMergeStrategy",
+    "MDMMatchRun",
+    "MDMMatchCandidate",
     "MDMWorkflow",
     "MDMWorkflowState",
     "MDMWorkflowTransition",
+    "MDMWorkflowInstance",
+    "MDMWorkflowHistory",
+    "MDMWorkflowTask",
     "MDMRole",
     "MDMUser",
     "MDMEntityPermission",
@@ -46,4 +61,9 @@ __all__ = [
     "MDMNotificationRule",
     "MDMFormLayout",
     "MDMTranslation",
+    "MDMRecord",
+    "MDMRecordMatchKey",
+    "MDMGoldenRecord",
+    "MDMGoldenRecordMember",
+    "MDMScheduledRun",
 ]
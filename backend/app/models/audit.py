@@ -1,6 +1,6 @@
 """Audit models for MDM system."""
 import enum
-from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
@@ -20,7 +20,7 @@ class MDMAuditConfig(BaseModel):
     track_export = Column(Boolean, default=False)
     store_old_values = Column(Boolean, default=True)
     store_new_values = Column(Boolean, default=True)
-    retention_days = Column(Integer, default=365)
+    retention_days = Column(Integer, default=365)  # the audit log keeps rows for the longest of these
     archive_enabled = Column(Boolean, default=False)
     archive_location = Column(String(500), nullable=True)
 
@@ -42,8 +42,16 @@ class AuditAction(str, enum.Enum):
 
 
 class MDMAuditLog(BaseModel):
-    """Audit log entries."""
+    """Audit log entries, range-partitioned by month on action_timestamp.
+
+    Partitions are created and retired by ``app.services.audit_partitions``;
+    the partition key has to be part of the primary key.
+    """
     __tablename__ = "mdm_audit_log"
+    __table_args__ = (
+        Index("ix_mdm_audit_log_record", "entity_id", "record_id", "action_timestamp"),
+        {"postgresql_partition_by": "RANGE (action_timestamp)"},
+    )
 
     entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
     record_id = Column(UUID(as_uuid=True), nullable=False)
@@ -54,7 +62,7 @@ class MDMAuditLog(BaseModel):
     changed_fields = Column(JSON, nullable=True)
     ip_address = Column(String(50), nullable=True)
     user_agent = Column(String(500), nullable=True)
-    action_timestamp = Column(DateTime, nullable=False)
+    action_timestamp = Column(DateTime, primary_key=True, nullable=False)
     additional_info = Column(JSON, nullable=True)
 
     # Relationships
@@ -1,6 +1,6 @@
 """Catalog models for MDM system."""
 import enum
-from sqlalchemy import Column, String, Boolean, Integer, Enum, ForeignKey, Date
+from sqlalchemy import Column, String, Boolean, Integer, Enum, ForeignKey, Date, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
@@ -35,6 +35,16 @@ class MDMCatalog(BaseModel):
 class MDMCatalogValue(BaseModel):
     """Catalog value entries."""
     __tablename__ = "mdm_catalog_value"
+    __table_args__ = (
+        UniqueConstraint("catalog_id", "value_code", name="uq_mdm_catalog_value_code"),
+        # Keyset pagination over (sort_order, value_name, id) within a catalog
+        Index("ix_mdm_catalog_value_keyset", "catalog_id", text("coalesce(sort_order, 0)"), "value_name", "id"),
+        # Trigram indexes for type-ahead search
+        Index("ix_mdm_catalog_value_name_trgm", "value_name",
+              postgresql_using="gin", postgresql_ops={"value_name": "gin_trgm_ops"}),
+        Index("ix_mdm_catalog_value_code_trgm", "value_code",
+              postgresql_using="gin", postgresql_ops={"value_code": "gin_trgm_ops"}),
+    )
 
     catalog_id = Column(UUID(as_uuid=True), ForeignKey("mdm_catalog.id"), nullable=False)
     value_code = Column(String(100), nullable=False)
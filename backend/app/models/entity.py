@@ -1,6 +1,6 @@
 """Entity model for MDM system."""
 import enum
-from sqlalchemy import Column, String, Text, Boolean, Integer, Enum, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel, AuditMixin
@@ -17,6 +17,15 @@ class AuditLevel(str, enum.Enum):
 class MDMEntity(BaseModel, AuditMixin):
     """Master Data Entity configuration."""
     __tablename__ = "mdm_entity"
+    __table_args__ = (
+        # Keyset pagination over (entity_name, id)
+        Index("ix_mdm_entity_name_id", "entity_name", "id"),
+        # Trigram indexes for ILIKE and similarity search
+        Index("ix_mdm_entity_code_trgm", "entity_code",
+              postgresql_using="gin", postgresql_ops={"entity_code": "gin_trgm_ops"}),
+        Index("ix_mdm_entity_name_trgm", "entity_name",
+              postgresql_using="gin", postgresql_ops={"entity_name": "gin_trgm_ops"}),
+    )
 
     entity_code = Column(String(50), unique=True, nullable=False, index=True)
     entity_name = Column(String(200), nullable=False)
@@ -1,6 +1,6 @@
 """Match and Merge models for MDM system."""
 import enum
-from sqlalchemy import Column, String, Boolean, Enum, ForeignKey, Numeric
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Enum, ForeignKey, Numeric, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID, JSON
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
@@ -43,6 +43,28 @@ class StrategyType(str, enum.Enum):
     CUSTOM = "CUSTOM"
 
 
+class MatchRunMode(str, enum.Enum):
+    """Match run mode enumeration."""
+    FULL = "FULL"
+    DELTA = "DELTA"
+
+
+class MatchRunStatus(str, enum.Enum):
+    """Match run status enumeration."""
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class CandidateStatus(str, enum.Enum):
+    """Match candidate status enumeration."""
+    PENDING = "PENDING"
+    AUTO_MERGE = "AUTO_MERGE"
+    CONFIRMED = "CONFIRMED"
+    REJECTED = "REJECTED"
+    MERGED = "MERGED"
+
+
 class MDMMatchRule(BaseModel):
     """Match rules for deduplication."""
     __tablename__ = "mdm_match_rule"
@@ -91,3 +113,54 @@ class MDMMergeStrategy(BaseModel):
     # Relationships
     entity = relationship("MDMEntity")
     attribute = relationship("MDMAttribute")
+
+
+class MDMMatchRun(BaseModel):
+    """Match run history; the last completed run holds the rule's watermark."""
+    __tablename__ = "mdm_match_run"
+    __table_args__ = (
+        Index("ix_mdm_match_run_rule_started", "match_rule_id", "started_at"),
+        # At most one run in progress per rule
+        Index(
+            "uq_mdm_match_run_running", "match_rule_id", unique=True,
+            postgresql_where=text("status = 'RUNNING'")
+        ),
+    )
+
+    match_rule_id = Column(UUID(as_uuid=True), ForeignKey("mdm_match_rule.id", ondelete="CASCADE"), nullable=False)
+    mode = Column(Enum(MatchRunMode), nullable=False)
+    status = Column(Enum(MatchRunStatus), default=MatchRunStatus.RUNNING, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    watermark_from = Column(DateTime, nullable=True)
+    watermark_to = Column(DateTime, nullable=True)
+    watermark_record_id = Column(UUID(as_uuid=True), nullable=True)
+    records_processed = Column(Integer, default=0)
+    candidate_pairs = Column(Integer, default=0)
+    matches = Column(Integer, default=0)
+    error_message = Column(String(1000), nullable=True)
+
+    # Relationships
+    match_rule = relationship("MDMMatchRule")
+
+
+class MDMMatchCandidate(BaseModel):
+    """A persisted pair of records scoring above a rule's match threshold."""
+    __tablename__ = "mdm_match_candidate"
+    __table_args__ = (
+        UniqueConstraint("match_rule_id", "left_record_id", "right_record_id", name="uq_mdm_match_candidate_pair"),
+        Index("ix_mdm_match_candidate_right", "match_rule_id", "right_record_id"),
+        Index("ix_mdm_match_candidate_status_score", "match_rule_id", "status", "score"),
+    )
+
+    match_rule_id = Column(UUID(as_uuid=True), ForeignKey("mdm_match_rule.id", ondelete="CASCADE"), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    left_record_id = Column(UUID(as_uuid=True), ForeignKey("mdm_record.id", ondelete="CASCADE"), nullable=False)
+    right_record_id = Column(UUID(as_uuid=True), ForeignKey("mdm_record.id", ondelete="CASCADE"), nullable=False)
+    score = Column(Numeric(5, 4), nullable=False)
+    field_scores = Column(JSON, nullable=True)
+    status = Column(Enum(CandidateStatus), default=CandidateStatus.PENDING, nullable=False)
+    match_run_id = Column(UUID(as_uuid=True), ForeignKey("mdm_match_run.id", ondelete="SET NULL"), nullable=True)
+
+    # Relationships
+    match_rule = relationship("MDMMatchRule")
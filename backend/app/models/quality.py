@@ -1,8 +1,10 @@
 """Quality rule models for MDM system."""
 import enum
-from sqlalchemy import Column, String, Text, Boolean, Enum, ForeignKey, Numeric
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Boolean, Integer, BigInteger, DateTime, Enum, ForeignKey, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from app.core.database import Base
 from app.models.base import BaseModel
 
 
@@ -51,3 +53,54 @@ class MDMQualityRule(BaseModel):
 
     # Relationships
     entity = relationship("MDMEntity", back_populates="quality_rules")
+
+
+class MDMQualityResult(BaseModel):
+    """Outcome of one execution of a quality rule, kept for trend reporting."""
+    __tablename__ = "mdm_quality_result"
+    __table_args__ = (
+        Index("ix_mdm_quality_result_rule_executed", "rule_id", "executed_at"),
+        Index("ix_mdm_quality_result_entity_executed", "entity_id", "executed_at"),
+    )
+
+    rule_id = Column(UUID(as_uuid=True), ForeignKey("mdm_quality_rule.id", ondelete="CASCADE"), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    executed_at = Column(DateTime, nullable=False)
+    records_total = Column(Integer, nullable=False)
+    records_evaluated = Column(Integer, nullable=False)
+    records_passed = Column(Integer, nullable=False)
+    pass_percent = Column(Numeric(5, 2), nullable=False)
+    threshold_percent = Column(Numeric(5, 2), nullable=True)
+    passed = Column(Boolean, nullable=False)
+
+    # Relationships
+    rule = relationship("MDMQualityRule")
+
+
+class MDMQualityCounter(Base):
+    """Running pass counts of a quality rule, kept current by record writes.
+
+    A rule's first record write creates its row with reconciled_at NULL; until
+    reconciliation the counts cover only the writes since then.
+    """
+    __tablename__ = "mdm_quality_counter"
+    __table_args__ = (
+        Index("ix_mdm_quality_counter_entity", "entity_id", "dimension"),
+    )
+
+    rule_id = Column(UUID(as_uuid=True), ForeignKey("mdm_quality_rule.id", ondelete="CASCADE"), primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    dimension = Column(Enum(QualityDimension), nullable=False)
+    records_evaluated = Column(BigInteger, default=0, nullable=False)
+    records_passed = Column(BigInteger, default=0, nullable=False)
+    reconciled_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class MDMQualityKeyCount(Base):
+    """Records per key value of a uniqueness rule; keys counted once are the passing ones."""
+    __tablename__ = "mdm_quality_key_count"
+
+    rule_id = Column(UUID(as_uuid=True), ForeignKey("mdm_quality_rule.id", ondelete="CASCADE"), primary_key=True)
+    key_hash = Column(String(32), primary_key=True)
+    record_count = Column(Integer, nullable=False)
@@ -0,0 +1,83 @@
+"""Master data record models for MDM system."""
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+from app.models.base import BaseModel, AuditMixin
+
+
+class MDMRecord(BaseModel, AuditMixin):
+    """A master data record; attribute values are stored by attribute_code in ``data``."""
+    __tablename__ = "mdm_record"
+    __table_args__ = (
+        UniqueConstraint("entity_id", "source_system", "source_record_id", name="uq_mdm_record_source"),
+        # Watermark scans over changed records of an entity
+        Index("ix_mdm_record_entity_updated", "entity_id", "updated_at", "id"),
+    )
+
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    source_system = Column(String(100), nullable=True)
+    source_record_id = Column(String(200), nullable=True)
+    data = Column(JSONB, nullable=False, default=dict)
+    version = Column(Integer, default=1, nullable=False)
+
+    # Relationships
+    entity = relationship("MDMEntity")
+
+
+class MDMRecordMatchKey(Base):
+    """Precomputed blocking and comparison keys of a record for one match rule.
+
+    ``key_version`` fingerprints the definition that produced the key, so a
+    changed blocking key or field transform only recomputes its own rows.
+    A NULL ``key_value`` records that the key was computed but is blank.
+    """
+    __tablename__ = "mdm_record_match_key"
+    __table_args__ = (
+        Index("ix_mdm_record_match_key_lookup", "match_rule_id", "key_name", "key_value"),
+    )
+
+    record_id = Column(UUID(as_uuid=True), ForeignKey("mdm_record.id", ondelete="CASCADE"), primary_key=True)
+    match_rule_id = Column(UUID(as_uuid=True), ForeignKey("mdm_match_rule.id", ondelete="CASCADE"), primary_key=True)
+    key_name = Column(String(200), primary_key=True)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    key_value = Column(String(500), nullable=True)
+    key_version = Column(String(32), nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class MDMGoldenRecord(BaseModel, AuditMixin):
+    """A golden (surviving) record built from a cluster of matched records.
+
+    ``lineage`` holds, per attribute code, the strategy that decided the value
+    and the records it came from.
+    """
+    __tablename__ = "mdm_golden_record"
+    __table_args__ = (
+        Index("ix_mdm_golden_record_entity_updated", "entity_id", "updated_at", "id"),
+    )
+
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    data = Column(JSONB, nullable=False, default=dict)
+    lineage = Column(JSONB, nullable=False, default=dict)
+    member_count = Column(Integer, default=0, nullable=False)
+    version = Column(Integer, default=1, nullable=False)
+
+    # Relationships
+    entity = relationship("MDMEntity")
+
+
+class MDMGoldenRecordMember(Base):
+    """Membership of a source record in a golden record; a record belongs to at most one."""
+    __tablename__ = "mdm_golden_record_member"
+    __table_args__ = (
+        Index("ix_mdm_golden_record_member_golden", "golden_record_id"),
+    )
+
+    record_id = Column(UUID(as_uuid=True), ForeignKey("mdm_record.id", ondelete="CASCADE"), primary_key=True)
+    golden_record_id = Column(
+        UUID(as_uuid=True), ForeignKey("mdm_golden_record.id", ondelete="CASCADE"), nullable=False
+    )
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=False)
+    merged_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,48 @@
+"""Scheduled job run models for MDM system."""
+import enum
+from sqlalchemy import Column, String, Integer, DateTime, Enum, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSON
+from app.models.base import BaseModel
+
+
+class ScheduledJobKind(str, enum.Enum):
+    """Scheduled job kind enumeration."""
+    QUALITY = "QUALITY"
+    QUALITY_RECONCILE = "QUALITY_RECONCILE"
+    INTEGRATION_SYNC = "INTEGRATION_SYNC"
+    AUDIT_PARTITIONS = "AUDIT_PARTITIONS"
+
+
+class ScheduledRunStatus(str, enum.Enum):
+    """Scheduled run status enumeration."""
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+    MISSED = "MISSED"
+    SKIPPED = "SKIPPED"
+
+
+class MDMScheduledRun(BaseModel):
+    """One occurrence of a scheduled job.
+
+    The unique (job_key, scheduled_for) pair is how a replica claims an
+    occurrence, so each one runs at most once across replicas.
+    """
+    __tablename__ = "mdm_scheduled_run"
+    __table_args__ = (
+        UniqueConstraint("job_key", "scheduled_for", name="uq_mdm_scheduled_run_occurrence"),
+        Index("ix_mdm_scheduled_run_status", "status", "started_at"),
+    )
+
+    job_kind = Column(Enum(ScheduledJobKind), nullable=False)
+    job_key = Column(String(200), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=True)
+    connection_id = Column(UUID(as_uuid=True), ForeignKey("mdm_connection.id"), nullable=True)
+    schedule = Column(String(100), nullable=False)
+    scheduled_for = Column(DateTime, nullable=False)
+    status = Column(Enum(ScheduledRunStatus), nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    missed_count = Column(Integer, default=0, nullable=False)
+    detail = Column(JSON, nullable=True)
+    error_message = Column(String(1000), nullable=True)
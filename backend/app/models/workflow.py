@@ -1,6 +1,6 @@
 """Workflow models for MDM system."""
 import enum
-from sqlalchemy import Column, String, Text, Boolean, Integer, Enum, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, Enum, ForeignKey, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.models.base import BaseModel
@@ -31,6 +31,28 @@ class AssigneeType(str, enum.Enum):
     AUTO = "AUTO"
 
 
+class InstanceStatus(str, enum.Enum):
+    """Workflow instance status enumeration."""
+    ACTIVE = "ACTIVE"
+    COMPLETED = "COMPLETED"
+    ERROR = "ERROR"
+    CANCELLED = "CANCELLED"
+
+
+class ApprovalOutcome(str, enum.Enum):
+    """Outcome of a parallel approval round."""
+    APPROVED = "APPROVED"
+    REJECTED = "REJECTED"
+
+
+class TaskStatus(str, enum.Enum):
+    """Approval task status enumeration."""
+    PENDING = "PENDING"
+    APPROVED = "APPROVED"
+    REJECTED = "REJECTED"
+    CANCELLED = "CANCELLED"
+
+
 class MDMWorkflow(BaseModel):
     """Workflow definition."""
     __tablename__ = "mdm_workflow"
@@ -80,8 +102,75 @@ class MDMWorkflowTransition(BaseModel):
     condition_expression = Column(Text, nullable=True)
     action_script = Column(Text, nullable=True)
     require_comment = Column(Boolean, default=False)
+    # In parallel approval workflows, taken when all approvers approve or any rejects
+    approval_outcome = Column(Enum(ApprovalOutcome), nullable=True)
 
     # Relationships
     workflow = relationship("MDMWorkflow", back_populates="transitions")
     from_state = relationship("MDMWorkflowState", foreign_keys=[from_state_id])
     to_state = relationship("MDMWorkflowState", foreign_keys=[to_state_id])
+
+
+class MDMWorkflowInstance(BaseModel):
+    """A record moving through a workflow."""
+    __tablename__ = "mdm_workflow_instance"
+    __table_args__ = (
+        Index("ix_mdm_workflow_instance_record", "record_id", "status"),
+        Index("ix_mdm_workflow_instance_state", "workflow_id", "status", "current_state_id"),
+        # Only instances with a pending SLA deadline are indexed
+        Index("ix_mdm_workflow_instance_due", "due_at", postgresql_where=text("due_at IS NOT NULL")),
+    )
+
+    workflow_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow.id"), nullable=False)
+    workflow_version = Column(Integer, nullable=False)
+    entity_id = Column(UUID(as_uuid=True), ForeignKey("mdm_entity.id"), nullable=True)
+    record_id = Column(UUID(as_uuid=True), ForeignKey("mdm_record.id", ondelete="CASCADE"), nullable=False)
+    current_state_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_state.id"), nullable=False)
+    status = Column(Enum(InstanceStatus), default=InstanceStatus.ACTIVE, nullable=False)
+    state_entered_at = Column(DateTime, nullable=False)
+    started_by = Column(UUID(as_uuid=True), nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    due_at = Column(DateTime, nullable=True)  # next SLA deadline; NULL when none is pending
+    escalation_level = Column(Integer, default=0, nullable=False)
+    escalated_at = Column(DateTime, nullable=True)
+    # Parallel approval counters of the current round, updated atomically
+    approval_round = Column(Integer, default=0, nullable=False)
+    approvals_required = Column(Integer, default=0, nullable=False)
+    approvals_received = Column(Integer, default=0, nullable=False)
+    rejections_received = Column(Integer, default=0, nullable=False)
+
+    # Relationships
+    workflow = relationship("MDMWorkflow")
+    current_state = relationship("MDMWorkflowState")
+
+
+class MDMWorkflowHistory(BaseModel):
+    """A transition taken by a workflow instance."""
+    __tablename__ = "mdm_workflow_history"
+    __table_args__ = (
+        Index("ix_mdm_workflow_history_instance", "instance_id", "created_at"),
+    )
+
+    instance_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_instance.id", ondelete="CASCADE"), nullable=False)
+    transition_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_transition.id"), nullable=True)
+    from_state_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_state.id"), nullable=True)
+    to_state_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_state.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), nullable=True)
+    comment = Column(Text, nullable=True)
+
+
+class MDMWorkflowTask(BaseModel):
+    """An approver's task in a parallel approval round."""
+    __tablename__ = "mdm_workflow_task"
+    __table_args__ = (
+        UniqueConstraint("instance_id", "approval_round", "assignee_id", name="uq_mdm_workflow_task_assignee"),
+        Index("ix_mdm_workflow_task_assignee", "assignee_id", "status"),
+    )
+
+    instance_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_instance.id", ondelete="CASCADE"), nullable=False)
+    approval_round = Column(Integer, nullable=False)
+    state_id = Column(UUID(as_uuid=True), ForeignKey("mdm_workflow_state.id"), nullable=False)
+    assignee_id = Column(UUID(as_uuid=True), ForeignKey("mdm_user.id"), nullable=False)
+    status = Column(Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False)
+    decided_at = Column(DateTime, nullable=True)
+    comment = Column(Text, nullable=True)
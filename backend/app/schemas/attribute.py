@@ -1,8 +1,8 @@
 """Pydantic schemas for attributes."""
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from app.models.attribute import (
     DataType, UIComponent, ValidationType, Severity,
     TransformType, ApplyOn, DisplayType
@@ -150,6 +150,14 @@ class TransformBase(BaseModel):
     execution_order: int = 0
     condition_expression: Optional[str] = None
 
+    @field_validator("transform_config")
+    @classmethod
+    def no_inline_keys(cls, config: Optional[dict]) -> Optional[dict]:
+        # Encryption keys come from settings; transform_config only names one
+        if config and "key" in config:
+            raise ValueError("encryption keys may not be stored in transform_config; use key_name")
+        return config
+
 
 class TransformCreate(TransformBase):
     """Schema for creating a transform."""
@@ -166,3 +174,35 @@ class TransformResponse(TransformBase):
 
     class Config:
         from_attributes = True
+
+
+class AttributeImportItem(AttributeBase):
+    """Attribute definition within an import document."""
+    attribute_group_code: Optional[str] = None
+    validations: List[ValidationBase] = []
+    transforms: List[TransformBase] = []
+
+
+class AttributeImportRequest(BaseModel):
+    """Import document with groups, attributes, validations and transforms for one entity."""
+    entity_id: UUID
+    groups: List[AttributeGroupBase] = []
+    attributes: List[AttributeImportItem] = []
+
+
+class AttributeImportResponse(BaseModel):
+    """Schema for attribute import results."""
+    entity_id: UUID
+    dry_run: bool = False
+    groups_created: int = 0
+    attributes_created: int = 0
+    validations_created: int = 0
+    transforms_created: int = 0
+    timings_ms: dict
+
+
+class TransformBatchResponse(BaseModel):
+    """Records after applying an entity's transforms."""
+    phase: ApplyOn
+    records: List[Dict[str, Any]]
+    plan_errors: List[str] = []
@@ -4,6 +4,7 @@ from uuid import UUID
 from datetime import datetime, date
 from pydantic import BaseModel, Field
 from app.models.catalog import CatalogType
+from app.schemas.common import BulkRowResult
 
 
 class CatalogBase(BaseModel):
@@ -90,3 +91,23 @@ class CatalogValueResponse(CatalogValueBase):
 
     class Config:
         from_attributes = True
+
+
+class CatalogValueBulkItem(CatalogValueBase):
+    """Schema for one value in a bulk load; parents may be referenced by code.
+
+    ``is_active`` defaults to true for new values and to the current state
+    for upserted ones.
+    """
+    parent_value_code: Optional[str] = None
+    is_active: Optional[bool] = None
+
+
+class CatalogValueBulkResponse(BaseModel):
+    """Schema for bulk load results."""
+    total: int
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    results: List[BulkRowResult]
@@ -1,5 +1,6 @@
 """Common Pydantic schemas."""
 from typing import Generic, TypeVar, List, Optional
+from uuid import UUID
 from pydantic import BaseModel
 
 T = TypeVar('T')
@@ -22,6 +23,38 @@ class HealthResponse(BaseModel):
     redis: Optional[str] = None
 
 
+class PoolStatsResponse(BaseModel):
+    """Database connection pool statistics schema."""
+    mode: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    wait_count: Optional[int] = None
+    wait_seconds_total: Optional[float] = None
+    wait_seconds_max: Optional[float] = None
+    wait_seconds_avg: Optional[float] = None
+    timeouts: Optional[int] = None
+
+
+class ReplicaStatusResponse(BaseModel):
+    """Read replica status schema."""
+    url: str
+    available: bool
+    lag_seconds: Optional[float] = None
+    pool: PoolStatsResponse
+
+
+class BulkRowResult(BaseModel):
+    """Outcome of a single row in a bulk operation."""
+    index: int
+    code: Optional[str] = None
+    status: str  # created, updated, skipped or error
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
 class MessageResponse(BaseModel):
     """Generic message response schema."""
     message: str
@@ -57,7 +57,9 @@ class EntityResponse(EntityBase):
 class EntityListResponse(BaseModel):
     """Schema for paginated entity list."""
     items: List[EntityResponse]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
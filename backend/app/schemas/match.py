@@ -0,0 +1,101 @@
+"""Match run schemas."""
+from typing import Dict, List, Optional
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel
+from app.models.match_merge import CandidateStatus, MatchRunMode, MatchRunStatus
+
+
+class MatchPairResponse(BaseModel):
+    """A pair of records scoring at or above the match threshold."""
+    left_id: str
+    right_id: str
+    score: float
+    auto_merge: bool
+    field_scores: Dict[str, float]
+
+
+class MatchClusterResponse(BaseModel):
+    """Records linked transitively by matches."""
+    record_ids: List[str]
+    auto_merge: bool
+    review_reason: Optional[str] = None
+
+
+class MatchRunResponse(BaseModel):
+    """Result of a batch match run."""
+    rule_id: str
+    records: int
+    candidate_pairs: int
+    matches: int
+    auto_merges: int
+    blocking: dict
+    elapsed_ms: float
+    pairs: List[MatchPairResponse]
+    clusters: Optional[List[MatchClusterResponse]] = None
+
+
+class MatchProgressResponse(BaseModel):
+    """Progress of a parallel batch match run, streamed per completed chunk."""
+    chunks_done: int
+    pairs_scored: int
+    matches: int
+    elapsed_seconds: float
+
+
+class MatchClustersResponse(BaseModel):
+    """Clusters of a rule's persisted candidates."""
+    rule_id: str
+    edges: int
+    records: int
+    auto_merge_clusters: int
+    review_clusters: int
+    clusters: List[MatchClusterResponse]
+
+
+class MatchMergeResponse(BaseModel):
+    """Outcome of merging a rule's auto-merge clusters."""
+    rule_id: str
+    clusters: int
+    clusters_skipped: int
+    golden_created: int
+    golden_updated: int
+    golden_deactivated: int
+    records_merged: int
+    review_clusters: int
+    compile_errors: List[str]
+
+
+class MatchRunStatusResponse(BaseModel):
+    """Progress and watermark of a stored-record match run."""
+    id: UUID
+    match_rule_id: UUID
+    mode: MatchRunMode
+    status: MatchRunStatus
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    watermark_from: Optional[datetime] = None
+    watermark_to: Optional[datetime] = None
+    records_processed: int
+    candidate_pairs: int
+    matches: int
+    error_message: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class MatchCandidateResponse(BaseModel):
+    """A persisted match candidate."""
+    id: UUID
+    match_rule_id: UUID
+    left_record_id: UUID
+    right_record_id: UUID
+    score: float
+    field_scores: Optional[Dict[str, float]] = None
+    status: CandidateStatus
+    match_run_id: Optional[UUID] = None
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
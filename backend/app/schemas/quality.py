@@ -0,0 +1,82 @@
+"""Quality rule execution schemas."""
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+class QualityRuleResult(BaseModel):
+    """Outcome of one rule in a quality run."""
+    rule_id: UUID
+    rule_code: str
+    dimension: str
+    severity: Optional[str] = None
+    records_evaluated: int
+    records_passed: int
+    pass_percent: Decimal
+    threshold_percent: Optional[Decimal] = None
+    passed: bool
+
+
+class QualityRunResponse(BaseModel):
+    """Result of executing an entity's quality rules."""
+    entity_id: str
+    executed_at: datetime
+    records: int
+    results: List[QualityRuleResult]
+    errors: List[str]
+    skipped: List[str]
+
+
+class QualityResultResponse(BaseModel):
+    """A stored quality rule result."""
+    id: UUID
+    rule_id: UUID
+    entity_id: UUID
+    executed_at: datetime
+    records_total: int
+    records_evaluated: int
+    records_passed: int
+    pass_percent: Decimal
+    threshold_percent: Optional[Decimal] = None
+    passed: bool
+
+    class Config:
+        from_attributes = True
+
+
+class QualityRuleScore(BaseModel):
+    """Running counts of one rule."""
+    rule_id: UUID
+    rule_code: str
+    dimension: str
+    records_evaluated: int
+    records_passed: int
+    pass_percent: Decimal
+    threshold_percent: Optional[Decimal] = None
+    reconciled_at: Optional[datetime] = None  # None until the first reconciliation
+    updated_at: datetime
+
+
+class QualityDimensionScore(BaseModel):
+    """Counts of all rules of one dimension."""
+    dimension: str
+    rules: int
+    records_evaluated: int
+    records_passed: int
+    pass_percent: Decimal
+
+
+class QualityScoresResponse(BaseModel):
+    """Precomputed quality scores of an entity."""
+    entity_id: str
+    dimensions: List[QualityDimensionScore]
+    rules: List[QualityRuleScore]
+
+
+class QualityReconcileResponse(BaseModel):
+    """Outcome of recomputing an entity's quality counters."""
+    rules: int
+    records: int
+    errors: List[str]
@@ -0,0 +1,64 @@
+"""Pydantic schemas for master data records."""
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class RecordBase(BaseModel):
+    """Base record schema."""
+    data: Dict[str, Any] = Field(default_factory=dict)
+    source_system: Optional[str] = Field(None, max_length=100)
+    source_record_id: Optional[str] = Field(None, max_length=200)
+
+
+class RecordCreate(RecordBase):
+    """Schema for creating a record."""
+    pass
+
+
+class RecordUpdate(BaseModel):
+    """Schema for updating a record; ``data`` is merged into the stored values."""
+    data: Optional[Dict[str, Any]] = None
+    is_active: Optional[bool] = None
+
+
+class RecordResponse(RecordBase):
+    """Schema for record response."""
+    id: UUID
+    entity_id: UUID
+    version: int
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class GoldenRecordResponse(BaseModel):
+    """Schema for golden record response; ``lineage`` maps attribute codes to their surviving source."""
+    id: UUID
+    entity_id: UUID
+    data: Dict[str, Any]
+    lineage: Dict[str, Any]
+    member_count: int
+    version: int
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+    member_ids: Optional[List[UUID]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class MergeResponse(BaseModel):
+    """Outcome of merging clusters into golden records."""
+    clusters: int
+    clusters_skipped: int
+    golden_created: int
+    golden_updated: int
+    golden_deactivated: int
+    records_merged: int
+    compile_errors: List[str]
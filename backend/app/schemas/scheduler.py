@@ -0,0 +1,44 @@
+"""Scheduler schemas."""
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel
+from app.models.scheduler import ScheduledJobKind, ScheduledRunStatus
+
+
+class ScheduledJobResponse(BaseModel):
+    """A job derived from stored schedules."""
+    kind: ScheduledJobKind
+    key: str
+    schedule: str
+    entity_id: Optional[UUID] = None
+    connection_id: Optional[UUID] = None
+    rule_ids: List[UUID] = []
+    mapping_id: Optional[UUID] = None
+    next_run: Optional[datetime] = None
+
+
+class ScheduledJobsResponse(BaseModel):
+    """Current jobs and schedules that could not be parsed."""
+    jobs: List[ScheduledJobResponse]
+    errors: List[str]
+
+
+class ScheduledRunResponse(BaseModel):
+    """A recorded occurrence of a scheduled job."""
+    id: UUID
+    job_kind: ScheduledJobKind
+    job_key: str
+    entity_id: Optional[UUID] = None
+    connection_id: Optional[UUID] = None
+    schedule: str
+    scheduled_for: datetime
+    status: ScheduledRunStatus
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    missed_count: int
+    detail: Optional[dict] = None
+    error_message: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,26 @@
+"""Validation run schemas."""
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ValidationIssueResponse(BaseModel):
+    """A failed validation rule for one record."""
+    row: int
+    attribute_code: str
+    validation_id: Optional[str] = None
+    validation_type: str
+    severity: str
+    error_code: Optional[str] = None
+    message: str
+
+
+class ValidationReportResponse(BaseModel):
+    """Result of validating a batch of records against an entity."""
+    total: int
+    valid: int
+    invalid: int
+    errors: int
+    warnings: int
+    invalid_rows: List[int]
+    issues: List[ValidationIssueResponse]
+    plan_errors: List[str] = []
@@ -0,0 +1,109 @@
+"""Workflow execution schemas."""
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from pydantic import BaseModel, Field
+from app.models.workflow import ApprovalOutcome, InstanceStatus, TaskStatus
+
+
+class WorkflowStartRequest(BaseModel):
+    """Start a workflow for a record."""
+    record_id: UUID
+    user_id: Optional[UUID] = None
+
+
+class WorkflowTransitionRequest(BaseModel):
+    """Take a transition from an instance's current state."""
+    transition_id: UUID
+    user_id: Optional[UUID] = None
+    comment: Optional[str] = None
+
+
+class AvailableTransitionsRequest(BaseModel):
+    """Instances to list available transitions for."""
+    instance_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class AvailableTransition(BaseModel):
+    """A transition an instance may take now."""
+    transition_id: UUID
+    transition_name: str
+    to_state_id: UUID
+    to_state_code: str
+    require_comment: bool
+
+
+class WorkflowInstanceResponse(BaseModel):
+    """A record's progress through a workflow."""
+    id: UUID
+    workflow_id: UUID
+    workflow_version: int
+    entity_id: Optional[UUID] = None
+    record_id: UUID
+    current_state_id: UUID
+    status: InstanceStatus
+    state_entered_at: datetime
+    started_by: Optional[UUID] = None
+    completed_at: Optional[datetime] = None
+    due_at: Optional[datetime] = None
+    escalation_level: int = 0
+    escalated_at: Optional[datetime] = None
+    approval_round: int = 0
+    approvals_required: int = 0
+    approvals_received: int = 0
+    rejections_received: int = 0
+    created_at: datetime
+    updated_at: datetime
+    available_transitions: Optional[List[AvailableTransition]] = None
+
+    class Config:
+        from_attributes = True
+
+
+class WorkflowHistoryResponse(BaseModel):
+    """A transition taken by an instance."""
+    id: UUID
+    transition_id: Optional[UUID] = None
+    from_state_id: Optional[UUID] = None
+    to_state_id: UUID
+    user_id: Optional[UUID] = None
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WorkflowTaskResponse(BaseModel):
+    """An approver's task in a parallel approval round."""
+    id: UUID
+    instance_id: UUID
+    approval_round: int
+    state_id: UUID
+    assignee_id: UUID
+    status: TaskStatus
+    decided_at: Optional[datetime] = None
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TaskDecisionRequest(BaseModel):
+    """An approver's decision on their task."""
+    user_id: UUID
+    approve: bool
+    comment: Optional[str] = None
+
+
+class TaskDecisionResponse(BaseModel):
+    """Effect of a decision on the approval round."""
+    task_id: UUID
+    instance_id: UUID
+    status: TaskStatus
+    approvals_received: int
+    approvals_required: int
+    rejections_received: int
+    outcome: Optional[ApprovalOutcome] = None
+    transition: Optional[AvailableTransition] = None
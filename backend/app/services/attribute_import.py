@@ -0,0 +1,147 @@
+"""Bulk import of attribute definitions for an entity."""
+import re
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+from sqlalchemy import String, cast, insert, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.attribute import (
+    MDMAttribute, MDMAttributeGroup, MDMAttributeValidation, MDMAttributeTransform, ValidationType
+)
+from app.models.catalog import MDMCatalog
+from app.models.entity import MDMEntity
+from app.schemas.attribute import AttributeImportRequest, AttributeImportResponse
+from app.utils.bulk import chunked
+
+
+class AttributeImportError(ValueError):
+    """Raised when an import document fails validation; nothing is written."""
+
+    def __init__(self, errors: List[str]):
+        super().__init__(f"{len(errors)} validation error(s)")
+        self.errors = errors
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def import_attributes(
+    db: AsyncSession,
+    document: AttributeImportRequest,
+    dry_run: bool = False,
+) -> AttributeImportResponse:
+    """Validate a whole import document in memory, then insert it in batches.
+
+    Existing attribute codes, group codes and referenced catalogs are fetched
+    in a single query. Any error aborts the import before writing. The caller
+    commits, so the import is one transaction.
+    """
+    started = time.perf_counter()
+    timings = {}
+    entity_id = document.entity_id
+
+    # Single prefetch: existing attribute/group codes and referenced catalogs
+    step = time.perf_counter()
+    catalog_ids = {item.catalog_id for item in document.attributes if item.catalog_id}
+    parts = [
+        select(literal("entity").label("kind"), cast(MDMEntity.id, String).label("code"), MDMEntity.id)
+        .where(MDMEntity.id == entity_id),
+        select(literal("attribute"), MDMAttribute.attribute_code, MDMAttribute.id)
+        .where(MDMAttribute.entity_id == entity_id),
+        select(literal("group"), MDMAttributeGroup.group_code, MDMAttributeGroup.id)
+        .where(MDMAttributeGroup.entity_id == entity_id),
+    ]
+    if catalog_ids:
+        parts.append(
+            select(literal("catalog"), cast(MDMCatalog.id, String), MDMCatalog.id)
+            .where(MDMCatalog.id.in_(catalog_ids))
+        )
+    existing: Dict[str, Dict[str, uuid.UUID]] = {"entity": {}, "attribute": {}, "group": {}, "catalog": {}}
+    for kind, code, row_id in (await db.execute(union_all(*parts))).all():
+        existing[kind][code] = row_id
+    timings["prefetch"] = _elapsed_ms(step)
+
+    # Validate everything in memory
+    step = time.perf_counter()
+    errors: List[str] = []
+    if not existing["entity"]:
+        raise AttributeImportError([f"Entity '{entity_id}' not found"])
+
+    group_ids: Dict[str, uuid.UUID] = dict(existing["group"])
+    new_groups = []
+    for index, group in enumerate(document.groups):
+        if group.group_code in group_ids:
+            errors.append(f"groups[{index}]: group_code '{group.group_code}' already exists")
+            continue
+        group_ids[group.group_code] = uuid.uuid4()
+        new_groups.append(group)
+
+    seen_attributes = set(existing["attribute"])
+    for index, item in enumerate(document.attributes):
+        where = f"attributes[{index}] ({item.attribute_code})"
+        if item.attribute_code in seen_attributes:
+            errors.append(f"{where}: attribute_code already exists")
+        seen_attributes.add(item.attribute_code)
+        if item.attribute_group_code and item.attribute_group_code not in group_ids:
+            errors.append(f"{where}: unknown attribute_group_code '{item.attribute_group_code}'")
+        if item.catalog_id and str(item.catalog_id) not in existing["catalog"]:
+            errors.append(f"{where}: catalog '{item.catalog_id}' not found")
+        for v_index, validation in enumerate(item.validations):
+            if validation.validation_type == ValidationType.REGEX:
+                try:
+                    re.compile(validation.regex_pattern or "")
+                except re.error as e:
+                    errors.append(f"{where}.validations[{v_index}]: invalid regex_pattern: {e}")
+    timings["validate"] = _elapsed_ms(step)
+
+    if errors:
+        raise AttributeImportError(errors)
+
+    # Build rows with client-side ids so children can reference parents
+    now = datetime.utcnow()
+    stamps = {"is_active": True, "created_at": now, "updated_at": now}
+    group_rows = [
+        {**group.model_dump(), "id": group_ids[group.group_code], "entity_id": entity_id, **stamps}
+        for group in new_groups
+    ]
+    attribute_rows, validation_rows, transform_rows = [], [], []
+    for item in document.attributes:
+        attribute_id = uuid.uuid4()
+        data = item.model_dump(exclude={"attribute_group_code", "validations", "transforms"})
+        if item.attribute_group_code:
+            data["attribute_group_id"] = group_ids[item.attribute_group_code]
+        attribute_rows.append({**data, "id": attribute_id, "entity_id": entity_id, **stamps})
+        validation_rows.extend(
+            {**validation.model_dump(), "id": uuid.uuid4(), "attribute_id": attribute_id, **stamps}
+            for validation in item.validations
+        )
+        transform_rows.extend(
+            {**transform.model_dump(), "id": uuid.uuid4(), "attribute_id": attribute_id, **stamps}
+            for transform in item.transforms
+        )
+
+    step = time.perf_counter()
+    if not dry_run:
+        for model, rows in (
+            (MDMAttributeGroup, group_rows),
+            (MDMAttribute, attribute_rows),
+            (MDMAttributeValidation, validation_rows),
+            (MDMAttributeTransform, transform_rows),
+        ):
+            for chunk in chunked(rows, settings.BULK_INSERT_CHUNK_SIZE):
+                await db.execute(insert(model).values(list(chunk)))
+    timings["insert"] = _elapsed_ms(step)
+    timings["total"] = _elapsed_ms(started)
+
+    return AttributeImportResponse(
+        entity_id=entity_id,
+        dry_run=dry_run,
+        groups_created=len(group_rows),
+        attributes_created=len(attribute_rows),
+        validations_created=len(validation_rows),
+        transforms_created=len(transform_rows),
+        timings_ms=timings,
+    )
@@ -0,0 +1,333 @@
+"""Monthly partitions of the audit log and retention by whole partitions.
+
+``mdm_audit_log`` is range-partitioned by month on ``action_timestamp``.
+Partitions are created AUDIT_PARTITION_MONTHS_AHEAD months in advance, and a
+DEFAULT partition takes rows outside them so audit writes never fail.
+
+Retention never deletes row by row. A monthly partition is dropped (or
+detached) once it is entirely older than the longest ``retention_days`` of
+any entity, because each partition holds the rows of every entity. Shorter
+retentions are therefore not enforced on their own: an entity's rows stay
+until every entity's retention has passed.
+
+Before a partition is retired, the rows of entities with ``archive_enabled``
+are written to their ``archive_location`` as gzip-compressed JSON lines; a
+partition whose archive fails is kept for the next run. Archiving runs in
+its own transaction, and the DETACH or DROP is committed on its own right
+after, so the ACCESS EXCLUSIVE lock on the audit log is held only for the
+DDL. Rows in the DEFAULT partition past retention are deleted in batches;
+those of archive-enabled entities are appended to their archive first.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import column, delete, exists, func, select, table, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.audit import MDMAuditConfig, MDMAuditLog
+from app.models.entity import MDMEntity
+
+logger = logging.getLogger(__name__)
+
+TABLE = MDMAuditLog.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+_LOCK_KEY = "audit-partitions"
+
+# The DEFAULT partition as a table of its own, so statements skip the parent
+_DEFAULT = table(DEFAULT_PARTITION, *(column(c.name, c.type) for c in MDMAuditLog.__table__.c))
+
+
+class AuditPartition(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+class DefaultPurge(NamedTuple):
+    deleted: int
+    archived_files: List[str]
+    kept_entities: List[UUID]
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(moment: datetime, months: int) -> datetime:
+    years, month = divmod(moment.month - 1 + months, 12)
+    return datetime(moment.year + years, month + 1, 1)
+
+
+def partition_for(month: datetime) -> AuditPartition:
+    start = month_start(month)
+    return AuditPartition(f"{TABLE}_p{start:%Y%m}", start, add_months(start, 1))
+
+
+async def _lock(db: AsyncSession):
+    # Replicas run maintenance too; DDL on the partitions is serialized
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY})
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    result = await db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": TABLE}
+    )
+    return result.scalar_one_or_none() == "p"
+
+
+async def list_partitions(db: AsyncSession) -> List[AuditPartition]:
+    """Monthly partitions attached to the audit log, oldest first."""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": TABLE},
+    )
+    partitions = []
+    for name in result.scalars().all():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions.append(partition_for(datetime(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+async def ensure_audit_partitions(db: AsyncSession, now: Optional[datetime] = None) -> List[str]:
+    """Create the current and upcoming monthly partitions and the DEFAULT one. The caller commits.
+
+    Returns the names of the partitions created.
+    """
+    if not await is_partitioned(db):
+        logger.warning("%s is not partitioned; partition maintenance is skipped", TABLE)
+        return []
+    await _lock(db)
+    existing = {partition.name for partition in await list_partitions(db)}
+    current = month_start(now or datetime.utcnow())
+
+    created = []
+    for offset in range(settings.AUDIT_PARTITION_MONTHS_AHEAD + 1):
+        partition = partition_for(add_months(current, offset))
+        if partition.name in existing:
+            continue
+        try:
+            async with db.begin_nested():
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition.name} PARTITION OF {TABLE} "
+                    f"FOR VALUES FROM ('{partition.start:%Y-%m-%d}') TO ('{partition.end:%Y-%m-%d}')"
+                ))
+            created.append(partition.name)
+        except Exception as e:
+            # Typically rows for that month already sit in the DEFAULT partition
+            logger.error("Could not create audit partition %s: %s", partition.name, e)
+    await db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+    if created:
+        logger.info("Created audit log partitions: %s", ", ".join(created))
+    return created
+
+
+async def retention_cutoff(db: AsyncSession, now: Optional[datetime] = None) -> datetime:
+    """Audit rows older than this are past the retention of every entity."""
+    result = await db.execute(
+        select(func.max(func.coalesce(MDMAuditConfig.retention_days, settings.AUDIT_DEFAULT_RETENTION_DAYS)))
+        .where(MDMAuditConfig.is_active == True)
+    )
+    days = result.scalar_one_or_none() or 0
+    unconfigured = await db.execute(select(exists().where(
+        ~MDMEntity.id.in_(select(MDMAuditConfig.entity_id).where(MDMAuditConfig.is_active == True))
+    )))
+    if unconfigured.scalar() or not days:
+        days = max(days, settings.AUDIT_DEFAULT_RETENTION_DAYS)
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+def _write_lines(path: str, lines: List[str]):
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def _append_synced(path: str, lines: List[str]):
+    """Append lines as a new gzip member and fsync, so the file holds them before rows are deleted."""
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as f:
+            f.write("".join(lines).encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+async def _archive_targets(db: AsyncSession) -> Dict[UUID, str]:
+    """Archive location per archive-enabled entity; raises on unusable locations."""
+    result = await db.execute(
+        select(MDMAuditConfig.entity_id, MDMAuditConfig.archive_location)
+        .where(MDMAuditConfig.is_active == True, MDMAuditConfig.archive_enabled == True)
+    )
+    targets = {}
+    for entity_id, location in result.tuples().all():
+        if not location:
+            raise ValueError(f"Entity {entity_id} has archiving enabled but no archive_location")
+        if "://" in location:
+            raise ValueError(f"Unsupported archive location '{location}'; use a filesystem path")
+        await asyncio.to_thread(os.makedirs, location, exist_ok=True)
+        targets[entity_id] = location
+    return targets
+
+
+async def archive_partition(db: AsyncSession, partition: AuditPartition) -> List[str]:
+    """Write the partition's rows of archive-enabled entities to their archive locations.
+
+    One file per entity and month; raises when an archive cannot be written.
+    """
+    columns = MDMAuditLog.__table__.c
+    files = []
+    for entity_id, location in (await _archive_targets(db)).items():
+        path = os.path.join(location, f"{partition.name}_{entity_id}.jsonl.gz")
+        partial = f"{path}.partial"
+        if await asyncio.to_thread(os.path.exists, partial):
+            await asyncio.to_thread(os.unlink, partial)
+
+        rows = await db.stream(
+            select(MDMAuditLog.__table__)
+            .where(
+                columns.entity_id == entity_id,
+                columns.action_timestamp >= partition.start,
+                columns.action_timestamp < partition.end
+            )
+            .execution_options(yield_per=settings.AUDIT_ARCHIVE_FETCH_SIZE)
+        )
+        count = 0
+        async for chunk in rows.mappings().partitions():
+            lines = [json.dumps(dict(row), default=str) + "\n" for row in chunk]
+            await asyncio.to_thread(_write_lines, partial, lines)
+            count += len(lines)
+        if count:
+            await asyncio.to_thread(os.replace, partial, path)
+            files.append(path)
+    return files
+
+
+async def _archive_default_rows(db: AsyncSession, entity_id: UUID, path: str, cutoff: datetime) -> int:
+    """Move one entity's expired DEFAULT partition rows into ``path``, one committed batch at a time."""
+    batch = settings.AUDIT_ARCHIVE_FETCH_SIZE
+    moved = 0
+    while True:
+        expired = (
+            select(_DEFAULT.c.id)
+            .where(_DEFAULT.c.entity_id == entity_id, _DEFAULT.c.action_timestamp < cutoff)
+            .limit(batch)
+        )
+        result = await db.execute(delete(_DEFAULT).where(_DEFAULT.c.id.in_(expired)).returning(*_DEFAULT.c))
+        lines = [json.dumps(dict(row), default=str) + "\n" for row in result.mappings().all()]
+        if lines:
+            # The batch is only deleted once the archive holds it
+            await asyncio.to_thread(_append_synced, path, lines)
+        await db.commit()
+        moved += len(lines)
+        if len(lines) < batch:
+            return moved
+
+
+async def purge_default_partition(
+    db: AsyncSession, cutoff: datetime, now: Optional[datetime] = None
+) -> DefaultPurge:
+    """Delete DEFAULT partition rows older than ``cutoff``, committing per batch.
+
+    Rows of archive-enabled entities are appended to one file per entity and
+    run before their batch commits; when that fails the entity's remaining
+    rows are kept for the next run.
+    """
+    targets = await _archive_targets(db)
+    await db.commit()
+    run = f"{(now or datetime.utcnow()):%Y%m%d%H%M%S}"
+    deleted, files, kept = 0, [], []
+
+    for entity_id, location in targets.items():
+        path = os.path.join(location, f"{DEFAULT_PARTITION}_{entity_id}_{run}.jsonl.gz")
+        try:
+            moved = await _archive_default_rows(db, entity_id, path, cutoff)
+        except Exception as e:
+            await db.rollback()
+            logger.error("Archiving DEFAULT audit rows of entity %s failed; keeping them: %s", entity_id, e)
+            kept.append(entity_id)
+            continue
+        if moved:
+            deleted += moved
+            files.append(path)
+
+    batch = settings.AUDIT_ARCHIVE_FETCH_SIZE
+    while True:
+        expired = select(_DEFAULT.c.id).where(_DEFAULT.c.action_timestamp < cutoff).limit(batch)
+        if targets:
+            expired = expired.where(_DEFAULT.c.entity_id.notin_(list(targets)))
+        result = await db.execute(delete(_DEFAULT).where(_DEFAULT.c.id.in_(expired)))
+        await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch:
+            return DefaultPurge(deleted, files, kept)
+
+
+async def enforce_audit_retention(db: AsyncSession, now: Optional[datetime] = None) -> dict:
+    """Archive and retire monthly partitions past retention, committing after each partition.
+
+    Pending changes on ``db`` are committed first.
+    """
+    if not await is_partitioned(db):
+        return {"partitioned": False}
+    cutoff = await retention_cutoff(db, now)
+    partitions = await list_partitions(db)
+    await db.commit()
+
+    retired, kept, archived = [], [], []
+    for partition in partitions:
+        if partition.end > cutoff:
+            break
+        try:
+            archived.extend(await archive_partition(db, partition))
+        except Exception as e:
+            await db.rollback()
+            logger.error("Archiving audit partition %s failed; keeping it: %s", partition.name, e)
+            kept.append(partition.name)
+            continue
+        await db.commit()
+
+        # A short transaction of its own: DETACH and DROP lock the whole audit log
+        await _lock(db)
+        if settings.AUDIT_PARTITION_DETACH:
+            await db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition.name}"))
+        else:
+            await db.execute(text(f"DROP TABLE {partition.name}"))
+        await db.commit()
+        retired.append(partition.name)
+
+    try:
+        purge = await purge_default_partition(db, cutoff, now)
+    except Exception as e:
+        await db.rollback()
+        logger.error("Purging the DEFAULT audit partition failed: %s", e)
+        purge = DefaultPurge(0, [], [])
+    archived.extend(purge.archived_files)
+    if retired:
+        logger.info(
+            "%s audit log partitions: %s", "Detached" if settings.AUDIT_PARTITION_DETACH else "Dropped",
+            ", ".join(retired)
+        )
+    return {
+        "cutoff": cutoff.isoformat(),
+        "retired": retired,
+        "kept": kept,
+        "archived_files": archived,
+        "default_rows_deleted": purge.deleted,
+        "default_rows_kept_for": [str(entity_id) for entity_id in purge.kept_entities],
+    }
+
+
+async def maintain_audit_partitions(db: AsyncSession, now: Optional[datetime] = None) -> dict:
+    """Create upcoming partitions and enforce retention, committing as it goes."""
+    created = await ensure_audit_partitions(db, now)
+    await db.commit()
+    return {"created": created, **await enforce_audit_retention(db, now)}
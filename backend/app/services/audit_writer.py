@@ -0,0 +1,419 @@
+"""Asynchronous, batched audit logging of record changes.
+
+Changes are captured from ORM session events, so every code path that
+writes records through a session is audited:
+
+* ``after_flush`` collects creates, updates and deletes of audited models
+  with their old and new values (attribute history is still available then);
+* ``after_commit`` hands the collected events to the writer's bounded queue;
+* events of a transaction that rolls back are discarded.
+
+A background task drains the queue in multi-row INSERT batches once a batch
+is full or the flush interval passes, applying each entity's audit
+configuration. Requests never wait on the audit table: when the queue is
+full, or a batch cannot be written, events are appended to a spill file
+(fsynced) and replayed once the database accepts writes again, including
+after a restart. Replay is at-least-once. Spill file I/O runs in worker
+threads, so a slow disk does not stall the event loop.
+
+Core statements (``update()``/``insert()``) bypass the ORM and are not
+captured.
+"""
+import asyncio
+import fcntl
+import glob
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+from uuid import UUID, uuid4
+from sqlalchemy import event, inspect, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.audit import AuditAction, MDMAuditConfig, MDMAuditLog
+from app.models.entity import AuditLevel, MDMEntity
+from app.models.record import MDMRecord
+from app.services.metadata_cache import metadata_cache
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Models audited on flush; each needs entity_id, data, created_by, updated_by and is_active
+AUDITED_MODELS = (MDMRecord,)
+
+_PENDING = "audit_pending"
+
+_TRACKED_BY = {
+    AuditAction.CREATE: "track_create",
+    AuditAction.UPDATE: "track_update",
+    AuditAction.DELETE: "track_delete",
+}
+
+
+class AuditPolicy(NamedTuple):
+    """What to log for an entity, from its MDMAuditConfig (or its audit_level)."""
+    level: AuditLevel
+    actions: frozenset
+    store_old_values: bool
+    store_new_values: bool
+
+
+def _changed_fields(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> List[str]:
+    old, new = old or {}, new or {}
+    return sorted(code for code in old.keys() | new.keys() if old.get(code) != new.get(code))
+
+
+def _event(obj, action: AuditAction, old: Optional[dict], new: Optional[dict], user_id, changed: List[str]) -> dict:
+    return {
+        "entity_id": obj.entity_id,
+        "record_id": obj.id,
+        "action": action,
+        "user_id": user_id,
+        "old_values": old,
+        "new_values": new,
+        "changed_fields": changed,
+        "action_timestamp": datetime.utcnow(),
+    }
+
+
+def _capture(session: Session, flush_context):
+    """Collect audit events of the flush on the session (``after_flush``)."""
+    events = session.info.setdefault(_PENDING, [])
+    for obj in session.new:
+        if isinstance(obj, AUDITED_MODELS):
+            events.append(_event(obj, AuditAction.CREATE, None, obj.data, obj.created_by, sorted(obj.data or {})))
+
+    for obj in session.dirty:
+        if not isinstance(obj, AUDITED_MODELS) or not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        data = state.attrs.data.history
+        active = state.attrs.is_active.history
+        old = data.deleted[0] if data.deleted else obj.data
+        was_active = active.deleted[0] if active.deleted else obj.is_active
+        if was_active and not obj.is_active:
+            events.append(_event(obj, AuditAction.DELETE, old, None, obj.updated_by, sorted(old or {})))
+            continue
+        changed = _changed_fields(old, obj.data)
+        if not was_active and obj.is_active:
+            changed.append("is_active")
+        if changed:
+            events.append(_event(obj, AuditAction.UPDATE, old, obj.data, obj.updated_by, changed))
+
+    for obj in session.deleted:
+        if isinstance(obj, AUDITED_MODELS) and obj.is_active:
+            events.append(_event(obj, AuditAction.DELETE, obj.data, None, obj.updated_by, sorted(obj.data or {})))
+
+
+def _publish(session: Session):
+    """Queue the events of a committed transaction (``after_commit``)."""
+    events = session.info.pop(_PENDING, None)
+    if events:
+        audit_writer.submit(events)
+
+
+def _discard(session: Session, transaction):
+    """Drop events of a transaction that ended without committing (``after_transaction_end``)."""
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _to_json(event_: dict) -> str:
+    return json.dumps({**event_, "action": event_["action"].value}, default=str)
+
+
+def _from_json(line: str) -> dict:
+    event_ = json.loads(line)
+    for key in ("entity_id", "record_id", "user_id"):
+        if event_.get(key):
+            event_[key] = UUID(event_[key])
+    event_["action"] = AuditAction(event_["action"])
+    event_["action_timestamp"] = datetime.fromisoformat(event_["action_timestamp"])
+    return event_
+
+
+def _spill_files(spill_dir: str) -> List[str]:
+    return sorted(
+        glob.glob(os.path.join(spill_dir, "audit-*.jsonl")) + glob.glob(os.path.join(spill_dir, "audit-*.replay"))
+    )
+
+
+def _read_spill(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)  # wait for an append in progress
+        return [_from_json(line) for line in f if line.strip()]
+
+
+class AuditWriter:
+    """Bounded in-process queue of audit events with a batching background writer."""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = settings.AUDIT_ENABLED if enabled is None else enabled
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+        self.policies = TTLCache(maxsize=1024, ttl=settings.AUDIT_POLICY_TTL_SECONDS)
+        self.spill_dir = settings.AUDIT_SPILL_DIR
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.lost = 0
+        self.last_error: Optional[str] = None
+        self._installed = False
+        self._spill_pending = True  # files may be left from a previous run
+        self._retry_at = 0.0
+        self._loop_task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self._spills: Set[asyncio.Task] = set()
+        metadata_cache.on_invalidate(self.evict)
+
+    def evict(self, entity_id: Optional[str]):
+        if entity_id is None:
+            self.policies.clear()
+        else:
+            self.policies.delete(str(entity_id))
+
+    # Capture
+    def install(self):
+        """Register the session event listeners."""
+        if not self._installed:
+            event.listen(Session, "after_flush", _capture)
+            event.listen(Session, "after_commit", _publish)
+            event.listen(Session, "after_transaction_end", _discard)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            event.remove(Session, "after_flush", _capture)
+            event.remove(Session, "after_commit", _publish)
+            event.remove(Session, "after_transaction_end", _discard)
+            self._installed = False
+
+    def submit(self, events: Iterable[dict]):
+        """Queue events without waiting; what does not fit is spilled to disk in the background."""
+        overflow = []
+        for event_ in events:
+            try:
+                self.queue.put_nowait(event_)
+            except asyncio.QueueFull:
+                overflow.append(event_)
+        if not overflow:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on the event loop (a synchronous session); blocking here is fine
+            self._write_spill(overflow)
+            return
+        task = loop.create_task(self.spill(overflow))
+        self._spills.add(task)
+        task.add_done_callback(self._spills.discard)
+
+    # Spill files
+    def _spill_path(self) -> str:
+        return os.path.join(self.spill_dir, f"audit-{os.getpid()}.jsonl")
+
+    def _write_spill(self, events: List[dict]):
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(), "a", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.write("".join(_to_json(event_) + "\n" for event_ in events))
+                f.flush()
+                os.fsync(f.fileno())
+            self.spilled += len(events)
+            self._spill_pending = True
+        except OSError as e:
+            self.lost += len(events)
+            logger.error("Could not spill %d audit events: %s", len(events), e)
+
+    async def spill(self, events: List[dict]):
+        """Append events to this process's spill file from a worker thread."""
+        await asyncio.to_thread(self._write_spill, events)
+
+    async def replay_spilled(self) -> int:
+        """Write spilled events to the database, file by file."""
+        replayed = 0
+        # Cleared first, so events spilled while replaying are picked up next time
+        self._spill_pending = False
+        try:
+            for path in await asyncio.to_thread(_spill_files, self.spill_dir):
+                if path.endswith(".jsonl"):
+                    # Claim the file; writers reopen by name and start a new one
+                    claimed = f"{path[:-len('.jsonl')]}.{uuid4().hex}.replay"
+                    try:
+                        await asyncio.to_thread(os.rename, path, claimed)
+                    except FileNotFoundError:
+                        continue
+                    path = claimed
+                events = await asyncio.to_thread(_read_spill, path)
+                for start in range(0, len(events), settings.AUDIT_BATCH_SIZE):
+                    await self.write(events[start:start + settings.AUDIT_BATCH_SIZE])
+                await asyncio.to_thread(os.unlink, path)
+                replayed += len(events)
+        except BaseException:
+            self._spill_pending = True
+            raise
+        self.replayed += replayed
+        if replayed:
+            logger.info("Replayed %d spilled audit events", replayed)
+        return replayed
+
+    # Writing
+    async def _load_policies(self, db, entity_ids: List[UUID]) -> Dict[UUID, Optional[AuditPolicy]]:
+        policies, missing = {}, []
+        for entity_id in entity_ids:
+            policy = self.policies.get(str(entity_id), default=False)
+            if policy is False:
+                missing.append(entity_id)
+            else:
+                policies[entity_id] = policy
+        if missing:
+            result = await db.execute(
+                select(MDMEntity.id, MDMEntity.audit_level, MDMAuditConfig)
+                .select_from(MDMEntity)
+                .outerjoin(
+                    MDMAuditConfig,
+                    (MDMAuditConfig.entity_id == MDMEntity.id) & (MDMAuditConfig.is_active == True)
+                )
+                .where(MDMEntity.id.in_(missing))
+            )
+            for entity_id, entity_level, config in result.tuples().all():
+                if config is None:
+                    policy = AuditPolicy(entity_level or AuditLevel.BASIC, frozenset(_TRACKED_BY), True, True)
+                else:
+                    policy = AuditPolicy(
+                        config.audit_level or entity_level or AuditLevel.BASIC,
+                        frozenset(action for action, flag in _TRACKED_BY.items() if getattr(config, flag)),
+                        bool(config.store_old_values),
+                        bool(config.store_new_values),
+                    )
+                policies[entity_id] = policy
+                self.policies.set(str(entity_id), policy)
+        return policies
+
+    async def write(self, events: List[dict]) -> int:
+        """Insert events allowed by their entity's audit configuration; raises on database errors.
+
+        BASIC audit level logs changed fields only; FULL and FORENSIC add the
+        old and new values the configuration asks to store.
+        """
+        now = datetime.utcnow()
+        async with async_session_maker() as db:
+            policies = await self._load_policies(db, list({event_["entity_id"] for event_ in events}))
+            rows = []
+            for event_ in events:
+                policy = policies.get(event_["entity_id"])
+                if policy is None or policy.level == AuditLevel.NONE or event_["action"] not in policy.actions:
+                    continue
+                with_values = policy.level != AuditLevel.BASIC
+                rows.append({
+                    "id": uuid4(),
+                    "entity_id": event_["entity_id"],
+                    "record_id": event_["record_id"],
+                    "action": event_["action"],
+                    "user_id": event_["user_id"],
+                    "old_values": event_["old_values"] if with_values and policy.store_old_values else None,
+                    "new_values": event_["new_values"] if with_values and policy.store_new_values else None,
+                    "changed_fields": event_["changed_fields"],
+                    "action_timestamp": event_["action_timestamp"],
+                    "is_active": True,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            if rows:
+                await db.execute(insert(MDMAuditLog), rows)
+                await db.commit()
+        self.written += len(rows)
+        return len(rows)
+
+    async def _next_batch(self) -> List[dict]:
+        """Wait for events, then collect until the batch is full or the flush interval ends."""
+        try:
+            batch = [await asyncio.wait_for(self.queue.get(), settings.AUDIT_RETRY_SECONDS)]
+        except asyncio.TimeoutError:
+            return []
+        deadline = time.monotonic() + settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        while len(batch) < settings.AUDIT_BATCH_SIZE:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush(self, batch: List[dict]):
+        if time.monotonic() < self._retry_at:
+            # The database failed recently; keep the queue moving
+            await self.spill(batch)
+            return
+        try:
+            await self.write(batch)
+        except Exception as e:
+            self.last_error = str(e)
+            self._retry_at = time.monotonic() + settings.AUDIT_RETRY_SECONDS
+            logger.warning("Audit batch of %d events spilled to disk: %s", len(batch), e)
+            await self.spill(batch)
+
+    async def _loop(self):
+        while True:
+            try:
+                batch = await self._next_batch()
+                if batch:
+                    # Shielded so stopping does not lose a batch being written
+                    self._flushing = asyncio.ensure_future(self._flush(batch))
+                    await asyncio.shield(self._flushing)
+                if self._spill_pending and time.monotonic() >= self._retry_at:
+                    try:
+                        await self.replay_spilled()
+                    except Exception as e:
+                        self.last_error = str(e)
+                        self._retry_at = time.monotonic() + settings.AUDIT_RETRY_SECONDS
+                        logger.warning("Replaying spilled audit events failed: %s", e)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Audit writer iteration failed")
+
+    async def start(self):
+        """Install the capture listeners and start the writer."""
+        if self.enabled and self._loop_task is None:
+            self.install()
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop capturing and write (or spill) what is still queued."""
+        self.uninstall()
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._flushing is not None:
+            await asyncio.gather(self._flushing, return_exceptions=True)
+        await asyncio.gather(*self._spills, return_exceptions=True)
+        remaining = []
+        while not self.queue.empty():
+            remaining.append(self.queue.get_nowait())
+        for start in range(0, len(remaining), settings.AUDIT_BATCH_SIZE):
+            await self._flush(remaining[start:start + settings.AUDIT_BATCH_SIZE])
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "lost": self.lost,
+            "last_error": self.last_error,
+        }
+
+
+audit_writer = AuditWriter()
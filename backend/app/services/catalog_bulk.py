@@ -0,0 +1,204 @@
+"""Set-based bulk loading of catalog values."""
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List
+from pydantic import ValidationError
+from sqlalchemy import select, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.catalog import MDMCatalogValue
+from app.schemas.catalog import CatalogValueBulkItem, CatalogValueBulkResponse
+from app.schemas.common import BulkRowResult
+from app.utils.bulk import chunked
+
+# Codes per prefetch query (each code is one bind parameter)
+LOOKUP_CHUNK_SIZE = 10000
+
+# Columns overwritten when upserting an existing value
+UPSERT_COLUMNS = (
+    "value_name", "parent_value_id", "dependent_value_id", "sort_order", "icon_class",
+    "color_hex", "extra_metadata", "valid_from", "valid_to", "is_default", "is_active", "updated_at",
+)
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+async def bulk_load_catalog_values(
+    db: AsyncSession,
+    catalog_id: uuid.UUID,
+    rows: List[Any],
+    upsert: bool = False,
+) -> CatalogValueBulkResponse:
+    """Insert (or upsert) many catalog values with set-based checks.
+
+    Existing codes are fetched in one pass, parent codes resolve against the
+    batch and the catalog, and rows are written one hierarchy level at a time
+    in multi-row ``INSERT ... ON CONFLICT`` statements, so children reference
+    the ids their parents were actually written with. Upserts keep an
+    existing value's ``is_active`` unless the row sets it. The caller commits.
+    """
+    results: Dict[int, BulkRowResult] = {}
+    items: Dict[int, CatalogValueBulkItem] = {}
+    first_row_for_code: Dict[str, int] = {}
+
+    # Validate rows and reject duplicates within the batch
+    for index, row in enumerate(rows):
+        code = row.get("value_code") if isinstance(row, dict) else None
+        try:
+            item = CatalogValueBulkItem.model_validate(row)
+        except ValidationError as e:
+            results[index] = BulkRowResult(index=index, code=code, status="error", error=_validation_message(e))
+            continue
+        if item.value_code in first_row_for_code:
+            results[index] = BulkRowResult(
+                index=index, code=item.value_code, status="error",
+                error=f"Duplicate value_code in batch (first at row {first_row_for_code[item.value_code]})"
+            )
+            continue
+        first_row_for_code[item.value_code] = index
+        items[index] = item
+
+    # One set-based lookup for the batch codes and referenced parent codes
+    lookup_codes = set(first_row_for_code)
+    lookup_codes.update(item.parent_value_code for item in items.values() if item.parent_value_code)
+    existing: Dict[str, uuid.UUID] = {}
+    active: Dict[str, bool] = {}
+    for codes in chunked(list(lookup_codes), LOOKUP_CHUNK_SIZE):
+        result = await db.execute(
+            select(MDMCatalogValue.value_code, MDMCatalogValue.id, MDMCatalogValue.is_active).where(
+                MDMCatalogValue.catalog_id == catalog_id,
+                MDMCatalogValue.value_code.in_(codes)
+            )
+        )
+        for code, value_id, is_active in result.tuples().all():
+            existing[code] = value_id
+            active[code] = is_active
+
+    ids: Dict[str, uuid.UUID] = {}
+    for index, item in list(items.items()):
+        if item.value_code in existing:
+            if not upsert:
+                results[index] = BulkRowResult(
+                    index=index, code=item.value_code, status="skipped",
+                    id=existing[item.value_code], error="Value already exists"
+                )
+                del items[index]
+                continue
+            ids[item.value_code] = existing[item.value_code]
+        else:
+            ids[item.value_code] = uuid.uuid4()
+
+    # Resolve parent codes and order rows so parents are written first
+    code_index = {item.value_code: index for index, item in items.items()}
+    depth: Dict[int, int] = {}
+    failed: Dict[int, str] = {}
+    for start in items:
+        path, on_path, current = [], set(), start
+        reason = None
+        while True:
+            if current in depth:
+                base = depth[current]
+                break
+            if current in failed:
+                base, reason = None, "Parent row failed"
+                break
+            if current in on_path:
+                base, reason = None, "Cycle in parent_value_code"
+                break
+            on_path.add(current)
+            path.append(current)
+            parent_code = items[current].parent_value_code
+            if parent_code and parent_code in code_index:
+                current = code_index[parent_code]
+                continue
+            path.pop()
+            if parent_code and parent_code not in existing:
+                failed[current] = f"Unknown parent_value_code '{parent_code}'"
+                base, reason = None, "Parent row failed"
+            else:
+                depth[current] = base = 0
+            break
+        for node in reversed(path):
+            if base is None:
+                failed[node] = reason
+            else:
+                base += 1
+                depth[node] = base
+
+    for index, error in failed.items():
+        results[index] = BulkRowResult(index=index, code=items[index].value_code, status="error", error=error)
+        del items[index]
+
+    levels: Dict[int, List[int]] = defaultdict(list)
+    for index in items:
+        levels[depth[index]].append(index)
+
+    # Multi-row INSERT ... ON CONFLICT per level and chunk; xmax = 0 marks freshly inserted rows
+    now = datetime.utcnow()
+    written = set()
+    for level in sorted(levels):
+        values = []
+        for index in levels[level]:
+            item = items[index]
+            data = item.model_dump(exclude={"parent_value_code", "is_active"})
+            parent_code = item.parent_value_code
+            if parent_code:
+                if parent_code in code_index and code_index[parent_code] not in written:
+                    # The parent lost an insert race; its id was never written
+                    results[index] = BulkRowResult(
+                        index=index, code=item.value_code, status="error", error="Parent row was not written"
+                    )
+                    continue
+                data["parent_value_id"] = ids.get(parent_code) or existing[parent_code]
+            is_active = item.is_active if item.is_active is not None else active.get(item.value_code, True)
+            data.update(
+                id=ids[item.value_code], catalog_id=catalog_id, is_active=is_active, created_at=now, updated_at=now
+            )
+            values.append(data)
+
+        for chunk in chunked(values, settings.BULK_INSERT_CHUNK_SIZE):
+            stmt = insert(MDMCatalogValue).values(list(chunk))
+            if upsert:
+                stmt = stmt.on_conflict_do_update(
+                    constraint="uq_mdm_catalog_value_code",
+                    set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS}
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(constraint="uq_mdm_catalog_value_code")
+            stmt = stmt.returning(
+                MDMCatalogValue.id, MDMCatalogValue.value_code, literal_column("xmax = 0").label("inserted")
+            )
+            for row in (await db.execute(stmt)).all():
+                index = code_index[row.value_code]
+                written.add(index)
+                # A concurrently inserted row keeps its own id
+                ids[row.value_code] = row.id
+                results[index] = BulkRowResult(
+                    index=index, code=row.value_code, status="created" if row.inserted else "updated", id=row.id
+                )
+
+    # Rows that lost an insert race against a concurrent writer
+    for index in set(items) - written - set(results):
+        results[index] = BulkRowResult(
+            index=index, code=items[index].value_code, status="skipped", error="Value already exists"
+        )
+
+    ordered = [results[index] for index in sorted(results)]
+    counts = {"created": 0, "updated": 0, "skipped": 0, "error": 0}
+    for result in ordered:
+        counts[result.status] += 1
+
+    return CatalogValueBulkResponse(
+        total=len(rows),
+        created=counts["created"],
+        updated=counts["updated"],
+        skipped=counts["skipped"],
+        failed=counts["error"],
+        results=ordered,
+    )
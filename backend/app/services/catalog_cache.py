@@ -0,0 +1,162 @@
+"""Catalog value cache honoring per-catalog cache settings."""
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import run_on_primary
+from app.models.catalog import MDMCatalog, MDMCatalogValue
+from app.schemas.catalog import CatalogResponse, CatalogValueResponse
+from app.services.metadata_cache import MetadataCache
+
+# Kind used for the default value listing (no parent filter, active only)
+DEFAULT_VALUES_KIND = "values:None:False"
+
+# Order of catalog values in listings and pages; matches ix_mdm_catalog_value_keyset
+VALUE_ORDER = (func.coalesce(MDMCatalogValue.sort_order, 0), MDMCatalogValue.value_name, MDMCatalogValue.id)
+
+Loader = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class CatalogCache:
+    """Cache for catalogs and their values, keyed by catalog id and code.
+
+    Each catalog's ``cache_enabled`` and ``cache_ttl_seconds`` decide whether
+    and for how long its payloads are cached. Writes invalidate only the
+    affected catalog.
+
+    Loaders take the session to read from. Payloads that get cached are
+    loaded on the primary, so a lagging replica cannot cache pre-write data;
+    uncached payloads are read on the request's session.
+    """
+
+    def __init__(self):
+        self.store = MetadataCache(prefix="mdm:catalog:v1", enabled=settings.CATALOG_CACHE_ENABLED)
+        self.requests = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def _policy(cache_enabled: Optional[bool], cache_ttl_seconds: Optional[int]) -> dict:
+        return {
+            "enabled": bool(cache_enabled) and cache_ttl_seconds != 0,
+            "ttl": cache_ttl_seconds,
+        }
+
+    async def policy(self, db: AsyncSession, catalog_id) -> Optional[dict]:
+        """Return the catalog's cache policy, or None if the catalog does not exist."""
+        async def load(session: AsyncSession):
+            result = await session.execute(
+                select(MDMCatalog.cache_enabled, MDMCatalog.cache_ttl_seconds)
+                .where(MDMCatalog.id == catalog_id)
+            )
+            row = result.first()
+            return self._policy(row.cache_enabled, row.cache_ttl_seconds) if row else None
+
+        return await self.store.get_or_load(catalog_id, "policy", lambda: run_on_primary(load))
+
+    def _counted(self, loader: Loader) -> Callable[[], Awaitable[Any]]:
+        async def load():
+            self.misses += 1
+            return await run_on_primary(loader)
+        return load
+
+    async def get_or_load(
+        self,
+        db: AsyncSession,
+        catalog_id,
+        kind: str,
+        loader: Loader,
+    ) -> Any:
+        """Return a cached catalog payload, loading it when missing or not cacheable."""
+        self.requests += 1
+        policy = await self.policy(db, catalog_id)
+        if not policy or not policy["enabled"]:
+            self.bypassed += 1
+            return await loader(db)
+        return await self.store.get_or_load(catalog_id, kind, self._counted(loader), ttl=policy["ttl"])
+
+    async def get_by_code(
+        self,
+        db: AsyncSession,
+        catalog_code: str,
+        loader: Loader,
+    ) -> Optional[dict]:
+        """Return a catalog payload by code; ``loader`` returns a CatalogResponse dict."""
+        catalog_id = await self.store.resolve_code(catalog_code)
+        if catalog_id:
+            return await self.get_or_load(db, catalog_id, "catalog", loader)
+
+        self.requests += 1
+        catalog = await self._counted(loader)()
+        if catalog:
+            await self._remember(catalog)
+        return catalog
+
+    async def _remember(self, catalog: dict):
+        policy = self._policy(catalog["cache_enabled"], catalog["cache_ttl_seconds"])
+        await self.store.put(catalog["id"], "policy", policy, ttl=policy["ttl"])
+        if policy["enabled"]:
+            await self.store.remember_code(catalog["catalog_code"], catalog["id"])
+            await self.store.put(catalog["id"], "catalog", catalog, ttl=policy["ttl"])
+
+    async def invalidate(self, catalog_id, catalog_code: Optional[str] = None):
+        """Drop everything cached for one catalog on every worker."""
+        await self.store.invalidate(catalog_id, catalog_code)
+
+    async def preload_system_catalogs(self, db: AsyncSession) -> int:
+        """Warm the cache with all active, cacheable system catalogs."""
+        if not self.store.enabled:
+            return 0
+
+        result = await db.execute(
+            select(MDMCatalog).where(
+                MDMCatalog.is_system == True,
+                MDMCatalog.is_active == True,
+                MDMCatalog.cache_enabled == True
+            )
+        )
+        catalogs = result.scalars().all()
+        if not catalogs:
+            return 0
+
+        result = await db.execute(
+            select(MDMCatalogValue)
+            .where(
+                MDMCatalogValue.catalog_id.in_([catalog.id for catalog in catalogs]),
+                MDMCatalogValue.is_active == True
+            )
+            .order_by(MDMCatalogValue.catalog_id, *VALUE_ORDER)
+        )
+        values_by_catalog = defaultdict(list)
+        for value in result.scalars().all():
+            values_by_catalog[value.catalog_id].append(
+                CatalogValueResponse.model_validate(value).model_dump(mode="json")
+            )
+
+        for catalog in catalogs:
+            payload = CatalogResponse.model_validate(catalog).model_dump(mode="json")
+            await self._remember(payload)
+            await self.store.put(
+                catalog.id, DEFAULT_VALUES_KIND, values_by_catalog[catalog.id], ttl=catalog.cache_ttl_seconds
+            )
+        return len(catalogs)
+
+    async def start(self):
+        await self.store.start()
+
+    async def stop(self):
+        await self.store.stop()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.store.enabled,
+            "requests": self.requests,
+            "hits": self.requests - self.misses - self.bypassed,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "local": self.store.local.stats(),
+        }
+
+
+catalog_cache = CatalogCache()
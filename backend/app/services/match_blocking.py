@@ -0,0 +1,237 @@
+"""Blocking keys and inverted index for match candidate generation."""
+import re
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import jellyfish
+from app.core.config import settings
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_key_value(value: Any) -> Optional[str]:
+    """Lowercase, trim and collapse whitespace; None for blank values."""
+    if value is None:
+        return None
+    value = _WHITESPACE.sub(" ", str(value)).strip().lower()
+    return value or None
+
+
+# Key methods applied to a normalized value
+KEY_METHODS = {
+    "EXACT": lambda value, length: value,
+    "PREFIX": lambda value, length: value[:length or 3],
+    "SOUNDEX": lambda value, length: jellyfish.soundex(value),
+    "METAPHONE": lambda value, length: jellyfish.metaphone(value),
+    "NYSIIS": lambda value, length: jellyfish.nysiis(value),
+}
+
+
+class BlockingKey:
+    """One blocking pass: a (possibly composite) key built from attribute values.
+
+    ``blocking_fields`` entries may be an attribute code, a list of codes
+    (composite key) or ``{"fields": [...], "method": "SOUNDEX", "length": 3}``.
+    """
+    __slots__ = ("fields", "method", "length", "name", "_key")
+
+    def __init__(self, fields: Sequence[str], method: str = "EXACT", length: Optional[int] = None):
+        method = method.upper()
+        if method not in KEY_METHODS:
+            raise ValueError(f"Unknown blocking method '{method}'")
+        if not fields:
+            raise ValueError("Blocking key without fields")
+        self.fields = tuple(fields)
+        self.method = method
+        self.length = length
+        self.name = f"{method}({'+'.join(self.fields)})"
+        self._key = KEY_METHODS[method]
+
+    @classmethod
+    def parse(cls, spec: Any) -> "BlockingKey":
+        if isinstance(spec, str):
+            return cls([spec])
+        if isinstance(spec, (list, tuple)):
+            return cls(list(spec))
+        if isinstance(spec, dict):
+            fields = spec.get("fields") or ([spec["field"]] if spec.get("field") else [])
+            return cls(fields, spec.get("method", "EXACT"), spec.get("length"))
+        raise ValueError(f"Invalid blocking field definition: {spec!r}")
+
+    def key(self, record: Dict[str, Any]) -> Optional[str]:
+        """Blocking key for a record, or None when any component is blank."""
+        parts = []
+        for field in self.fields:
+            value = normalize_key_value(record.get(field))
+            if value is None:
+                return None
+            part = self._key(value, self.length)
+            if not part:
+                return None
+            parts.append(part)
+        return "|".join(parts)
+
+
+def parse_blocking_fields(blocking_fields: Any) -> List[BlockingKey]:
+    """Parse MDMMatchRule.blocking_fields into blocking passes."""
+    if not blocking_fields:
+        return []
+    if not isinstance(blocking_fields, list):
+        blocking_fields = [blocking_fields]
+    return [BlockingKey.parse(spec) for spec in blocking_fields]
+
+
+class BlockingStats(NamedTuple):
+    """Candidate generation statistics."""
+    records: int
+    blocks: int
+    oversized_blocks: int
+    candidate_pairs: int
+    naive_pairs: int
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Share of the naive n*(n-1)/2 comparisons avoided by blocking."""
+        if not self.naive_pairs:
+            return 0.0
+        return 1 - self.candidate_pairs / self.naive_pairs
+
+    def as_dict(self) -> dict:
+        return {**self._asdict(), "reduction_ratio": round(self.reduction_ratio, 6)}
+
+
+class BlockingIndex:
+    """Inverted index from blocking keys to records.
+
+    Records are stored as dense integer slots; each blocking pass keeps its own
+    key -> slots map. Blocks larger than ``max_block_size`` are skipped when
+    generating candidates (they rarely identify duplicates and dominate cost).
+    """
+
+    def __init__(self, keys: Sequence[BlockingKey], max_block_size: Optional[int] = None):
+        if not keys:
+            raise ValueError("At least one blocking key is required")
+        self.keys = list(keys)
+        self.max_block_size = max_block_size or settings.MATCH_MAX_BLOCK_SIZE
+        self.blocks: List[Dict[str, List[int]]] = [{} for _ in self.keys]
+        self.record_ids: List[Optional[Hashable]] = []
+        self.record_keys: List[Optional[Tuple[Optional[str], ...]]] = []
+        self.slots: Dict[Hashable, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def record_key_tuple(self, record: Dict[str, Any]) -> Tuple[Optional[str], ...]:
+        return tuple(key.key(record) for key in self.keys)
+
+    # Maintenance
+    def add(self, record_id: Hashable, record: Dict[str, Any]):
+        """Index a record, replacing any previous version with the same id."""
+        if record_id in self.slots:
+            self.remove(record_id)
+        keys = self.record_key_tuple(record)
+        if self._free:
+            slot = self._free.pop()
+            self.record_ids[slot] = record_id
+            self.record_keys[slot] = keys
+        else:
+            slot = len(self.record_ids)
+            self.record_ids.append(record_id)
+            self.record_keys.append(keys)
+        self.slots[record_id] = slot
+        for blocks, key in zip(self.blocks, keys):
+            if key is not None:
+                blocks.setdefault(key, []).append(slot)
+
+    def add_many(self, records: Iterable[Tuple[Hashable, Dict[str, Any]]]):
+        for record_id, record in records:
+            self.add(record_id, record)
+
+    def remove(self, record_id: Hashable):
+        slot = self.slots.pop(record_id, None)
+        if slot is None:
+            return
+        for blocks, key in zip(self.blocks, self.record_keys[slot]):
+            if key is None:
+                continue
+            members = blocks[key]
+            members.remove(slot)
+            if not members:
+                del blocks[key]
+        self.record_ids[slot] = None
+        self.record_keys[slot] = None
+        self._free.append(slot)
+
+    # Candidate generation
+    def _usable(self, members: List[int]) -> bool:
+        return 1 < len(members) <= self.max_block_size
+
+    def _seen_in_earlier_pass(self, a: int, b: int, current: int) -> bool:
+        """True when a and b already shared a usable block in an earlier pass."""
+        keys_a, keys_b = self.record_keys[a], self.record_keys[b]
+        for p in range(current):
+            key = keys_a[p]
+            if key is not None and key == keys_b[p] and self._usable(self.blocks[p][key]):
+                return True
+        return False
+
+    def iter_blocks(self) -> Iterator[Tuple[int, str, List[int]]]:
+        """Yield (pass, key, slots) for every block that produces candidates."""
+        for p, blocks in enumerate(self.blocks):
+            for key, members in blocks.items():
+                if self._usable(members):
+                    yield p, key, members
+
+    def candidate_slot_pairs(self) -> Iterator[Tuple[int, int]]:
+        """Yield each candidate pair of slots once across all passes."""
+        for p, _, members in self.iter_blocks():
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if p and self._seen_in_earlier_pass(a, b, p):
+                        continue
+                    yield a, b
+
+    def candidate_pairs(self) -> Iterator[Tuple[Hashable, Hashable]]:
+        """Yield each candidate pair of record ids once across all passes."""
+        record_ids = self.record_ids
+        for a, b in self.candidate_slot_pairs():
+            yield record_ids[a], record_ids[b]
+
+    def candidates_for(self, record: Dict[str, Any], exclude: Optional[Hashable] = None) -> List[Hashable]:
+        """Incremental lookup: ids of indexed records sharing a block with ``record``."""
+        found = set()
+        for blocks, key in zip(self.blocks, self.record_key_tuple(record)):
+            if key is None:
+                continue
+            members = blocks.get(key)
+            if members and len(members) <= self.max_block_size:
+                found.update(members)
+        exclude_slot = self.slots.get(exclude) if exclude is not None else None
+        found.discard(exclude_slot)
+        return [self.record_ids[slot] for slot in found]
+
+    def stats(self) -> BlockingStats:
+        """Count blocks and distinct candidate pairs without materializing them."""
+        n = len(self.slots)
+        blocks = sum(len(b) for b in self.blocks)
+        oversized = sum(1 for b in self.blocks for members in b.values() if len(members) > self.max_block_size)
+        pairs = 0
+        for p, _, members in self.iter_blocks():
+            if p == 0:
+                pairs += len(members) * (len(members) - 1) // 2
+                continue
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    if not self._seen_in_earlier_pass(a, b, p):
+                        pairs += 1
+        return BlockingStats(n, blocks, oversized, pairs, n * (n - 1) // 2)
+
+
+def build_blocking_index(
+    blocking_fields: Any,
+    records: Iterable[Tuple[Hashable, Dict[str, Any]]],
+    max_block_size: Optional[int] = None,
+) -> BlockingIndex:
+    """Build an index for a match rule's blocking_fields over (id, record) pairs."""
+    index = BlockingIndex(parse_blocking_fields(blocking_fields), max_block_size)
+    index.add_many(records)
+    return index
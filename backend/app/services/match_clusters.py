@@ -0,0 +1,160 @@
+"""Transitive clustering of pairwise match results."""
+import logging
+from array import array
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.match_merge import CandidateStatus, MDMMatchCandidate
+
+logger = logging.getLogger(__name__)
+
+# Candidate statuses that link records without review
+AUTO_STATUSES = (CandidateStatus.AUTO_MERGE, CandidateStatus.CONFIRMED, CandidateStatus.MERGED)
+
+
+class UnionFind:
+    """Disjoint sets over hashable ids, backed by int64 arrays.
+
+    Unions are by size; finds halve paths as they walk. Ids can be added at
+    any time, so edges may arrive incrementally.
+    """
+
+    def __init__(self):
+        self.ids: List[Hashable] = []
+        self.index: Dict[Hashable, int] = {}
+        self.parent = array("q")
+        self.size = array("q")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, item: Hashable) -> int:
+        """Return the slot of an id, adding it as a singleton when new."""
+        slot = self.index.get(item)
+        if slot is None:
+            slot = len(self.ids)
+            self.index[item] = slot
+            self.ids.append(item)
+            self.parent.append(slot)
+            self.size.append(1)
+        return slot
+
+    def find(self, slot: int) -> int:
+        parent = self.parent
+        while parent[slot] != slot:
+            parent[slot] = parent[parent[slot]]
+            slot = parent[slot]
+        return slot
+
+    def union(self, left: Hashable, right: Hashable) -> int:
+        """Join the sets of two ids, returning the root slot."""
+        a, b = self.find(self.add(left)), self.find(self.add(right))
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+    def add_edges(self, edges: Iterable[Tuple[Hashable, Hashable]]):
+        for left, right in edges:
+            self.union(left, right)
+
+    def component_size(self, item: Hashable) -> int:
+        slot = self.index.get(item)
+        return 1 if slot is None else self.size[self.find(slot)]
+
+    def roots(self) -> np.ndarray:
+        """Root slot of every id, compressing all paths at once."""
+        roots = np.frombuffer(self.parent, dtype=np.int64).copy() if len(self.parent) else np.empty(0, np.int64)
+        while True:
+            hop = roots[roots]
+            if np.array_equal(hop, roots):
+                return roots
+            roots = hop
+
+    def components(self, min_size: int = 2) -> List[List[Hashable]]:
+        """Sets with at least ``min_size`` ids, largest first."""
+        roots = self.roots()
+        if not len(roots):
+            return []
+        order = np.argsort(roots, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(roots[order]) != 0])
+        sizes = np.diff(np.r_[starts, len(order)])
+        keep = np.flatnonzero(sizes >= min_size)
+        keep = keep[np.argsort(-sizes[keep], kind="stable")]
+        ids = self.ids
+        return [[ids[slot] for slot in order[starts[i]:starts[i] + sizes[i]]] for i in keep]
+
+
+class MatchCluster(NamedTuple):
+    """A set of transitively matched records."""
+    record_ids: List[Hashable]
+    auto_merge: bool
+    review_reason: Optional[str]  # "oversized" or "below_auto_merge" when not auto-merged
+
+
+class MatchClusterer:
+    """Clusters match pairs, separating auto-merge clusters from ones needing review.
+
+    Pairs at or above the rule's auto_merge_threshold link records in the
+    auto-merge sets; every pair at or above match_threshold links them in the
+    review sets. An auto-merge set larger than the size limit (usually a
+    chain of pairwise matches) goes to review instead. So does a review set
+    that is more than one auto-merge set.
+    """
+
+    def __init__(self, max_cluster_size: Optional[int] = None):
+        self.max_cluster_size = max_cluster_size or settings.MATCH_MAX_CLUSTER_SIZE
+        self.auto = UnionFind()
+        self.linked = UnionFind()
+        self.edges = 0
+
+    def add_pair(self, left: Hashable, right: Hashable, auto_merge: bool):
+        self.edges += 1
+        self.linked.union(left, right)
+        if auto_merge:
+            self.auto.union(left, right)
+
+    def add_pairs(self, pairs: Iterable[Tuple[Hashable, Hashable, bool]]):
+        for left, right, auto_merge in pairs:
+            self.add_pair(left, right, auto_merge)
+
+    def clusters(self) -> List[MatchCluster]:
+        """Auto-merge clusters, then clusters needing review."""
+        limit = self.max_cluster_size
+        auto, review = [], []
+        for members in self.auto.components():
+            if len(members) <= limit:
+                auto.append(MatchCluster(members, True, None))
+            else:
+                review.append(MatchCluster(members, False, "oversized"))
+        for members in self.linked.components():
+            if self.auto.component_size(members[0]) == len(members):
+                continue
+            reason = "oversized" if len(members) > limit else "below_auto_merge"
+            review.append(MatchCluster(members, False, reason))
+        return auto + review
+
+
+async def cluster_rule_candidates(db: AsyncSession, rule_id) -> MatchClusterer:
+    """Cluster the persisted candidates of a rule; rejected candidates link nothing."""
+    clusterer = MatchClusterer()
+    result = await db.stream(
+        select(MDMMatchCandidate.left_record_id, MDMMatchCandidate.right_record_id, MDMMatchCandidate.status)
+        .where(
+            MDMMatchCandidate.match_rule_id == UUID(str(rule_id)),
+            MDMMatchCandidate.status != CandidateStatus.REJECTED
+        )
+        .execution_options(yield_per=settings.MATCH_CLUSTER_FETCH_SIZE)
+    )
+    async for partition in result.partitions():
+        clusterer.add_pairs((left, right, status in AUTO_STATUSES) for left, right, status in partition)
+    logger.info(
+        "Clustered %d candidates of rule %s over %d records", clusterer.edges, rule_id, len(clusterer.linked)
+    )
+    return clusterer
@@ -0,0 +1,327 @@
+"""Incremental (delta) match runs driven by record ``updated_at`` watermarks.
+
+A run walks the entity's records changed since the rule's watermark in
+``(updated_at, id)`` order. Each batch refreshes the changed records' match
+keys, finds their candidates through the stored key index, scores them on
+their stored comparison keys and
+replaces the changed records' unreviewed candidates, so the cost of a run is
+proportional to the number of changed records. A full run is the same walk
+started without a watermark. Scoring runs in the shared match process pool;
+while a batch is scored, its progress is written to the run from a session
+of its own.
+
+``updated_at`` is stamped when a row is written, not when it commits, so a
+run only walks up to a cutoff before the start of the oldest transaction
+that was still writing when the run began. A slow transaction therefore
+holds the watermark back instead of having its records skipped.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import and_, delete, func, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.match_merge import (
+    CandidateStatus, MDMMatchCandidate, MDMMatchRun, MatchRunMode, MatchRunStatus
+)
+from app.models.record import MDMRecord, MDMRecordMatchKey
+from app.services.match_engine import match_engine
+from app.services.match_keys import (
+    comparison_keys, compute_key_rows, load_comparison_keys, match_key_specs, upsert_key_rows
+)
+from app.services.match_parallel import MatchProgress, score_pairs_parallel
+from app.services.match_scoring import MatchScorer
+from app.utils.bulk import chunked
+
+logger = logging.getLogger(__name__)
+
+# Candidates a run may replace; reviewed ones keep their status
+OPEN_STATUSES = (CandidateStatus.PENDING, CandidateStatus.AUTO_MERGE)
+
+
+# Start (UTC) of the oldest other open transaction that has written something
+OLDEST_WRITER_SQL = text(
+    "SELECT min(xact_start) AT TIME ZONE 'UTC' FROM pg_stat_activity "
+    "WHERE backend_xid IS NOT NULL AND pid <> pg_backend_pid()"
+)
+
+
+class MatchRunConflict(ValueError):
+    """Raised when a run is already in progress for the rule."""
+
+
+def delta_cutoff(started_at: datetime, oldest_writer: Optional[datetime]) -> datetime:
+    """Newest ``updated_at`` a run may process.
+
+    Records stamped after the oldest in-flight writer started may belong to
+    a transaction that has not committed yet. MATCH_DELTA_LAG_SECONDS covers
+    clock skew between application servers and the database.
+    """
+    cutoff = started_at if oldest_writer is None else min(started_at, oldest_writer)
+    return cutoff - timedelta(seconds=settings.MATCH_DELTA_LAG_SECONDS)
+
+
+class RunProgress:
+    """Writes a run's counters while its current batch is still uncommitted.
+
+    Updates go through a short transaction of their own, at most every
+    MATCH_RUN_PROGRESS_SECONDS, and also keep a long batch from looking
+    abandoned to start_match_run.
+    """
+
+    def __init__(self, db: AsyncSession, run: MDMMatchRun):
+        self.bind = db.bind
+        self.run = run
+        self.written_at = time.monotonic()
+
+    async def __call__(self, progress: MatchProgress):
+        if time.monotonic() - self.written_at < settings.MATCH_RUN_PROGRESS_SECONDS:
+            return
+        self.written_at = time.monotonic()
+        async with AsyncSession(self.bind) as session:
+            await session.execute(
+                update(MDMMatchRun)
+                .where(MDMMatchRun.id == self.run.id)
+                .values(
+                    candidate_pairs=self.run.candidate_pairs + progress.pairs_scored,
+                    matches=self.run.matches + progress.matches,
+                    updated_at=datetime.utcnow()
+                )
+            )
+            await session.commit()
+
+
+async def last_watermark(db: AsyncSession, rule_id) -> Optional[Tuple[datetime, UUID]]:
+    """(updated_at, id) of the last record processed by any run of the rule."""
+    result = await db.execute(
+        select(MDMMatchRun.watermark_to, MDMMatchRun.watermark_record_id)
+        .where(MDMMatchRun.match_rule_id == rule_id, MDMMatchRun.watermark_to.isnot(None))
+        .order_by(MDMMatchRun.started_at.desc())
+        .limit(1)
+    )
+    row = result.first()
+    return tuple(row) if row else None
+
+
+async def start_match_run(db: AsyncSession, rule_id, full: bool = False) -> MDMMatchRun:
+    """Register a run for the rule and commit it; raises MatchRunConflict if one is in progress.
+
+    A delta run resumes from the last watermark, including that of a failed
+    run (its batches were committed). Runs that stopped reporting progress
+    are marked failed first.
+    """
+    now = datetime.utcnow()
+    await db.execute(
+        update(MDMMatchRun)
+        .where(
+            MDMMatchRun.match_rule_id == rule_id,
+            MDMMatchRun.status == MatchRunStatus.RUNNING,
+            MDMMatchRun.updated_at < now - timedelta(seconds=settings.MATCH_RUN_STALE_SECONDS)
+        )
+        .values(status=MatchRunStatus.FAILED, finished_at=now, error_message="Abandoned")
+    )
+
+    watermark = None if full else await last_watermark(db, rule_id)
+    run = MDMMatchRun(
+        match_rule_id=rule_id,
+        mode=MatchRunMode.FULL if watermark is None else MatchRunMode.DELTA,
+        status=MatchRunStatus.RUNNING,
+        started_at=now,
+        watermark_from=watermark[0] if watermark else None,
+        watermark_to=watermark[0] if watermark else None,
+        watermark_record_id=watermark[1] if watermark else None,
+    )
+    db.add(run)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise MatchRunConflict("A match run is already in progress for this rule")
+    await db.refresh(run)
+    return run
+
+
+async def _candidate_pairs(db: AsyncSession, rule_id: UUID, record_ids: List[UUID]) -> Set[Tuple[UUID, UUID]]:
+    """Pairs sharing a blocking key with the given records, skipping oversized blocks."""
+    changed, other, key = aliased(MDMRecordMatchKey), aliased(MDMRecordMatchKey), aliased(MDMRecordMatchKey)
+    batch_keys = select(changed.key_name, changed.key_value).where(
+        changed.match_rule_id == rule_id,
+        changed.record_id.in_(record_ids),
+        changed.key_name.like("block:%"),
+        changed.key_value.isnot(None)
+    )
+    blocks = (
+        select(key.key_name, key.key_value)
+        .where(key.match_rule_id == rule_id, tuple_(key.key_name, key.key_value).in_(batch_keys))
+        .group_by(key.key_name, key.key_value)
+        .having(func.count() <= settings.MATCH_MAX_BLOCK_SIZE)
+        .subquery()
+    )
+    query = (
+        select(changed.record_id, other.record_id)
+        .join(blocks, and_(blocks.c.key_name == changed.key_name, blocks.c.key_value == changed.key_value))
+        .join(other, and_(
+            other.match_rule_id == changed.match_rule_id,
+            other.key_name == changed.key_name,
+            other.key_value == changed.key_value,
+            other.record_id != changed.record_id
+        ))
+        .where(changed.match_rule_id == rule_id, changed.record_id.in_(record_ids))
+        .distinct()
+    )
+    return {(a, b) if a < b else (b, a) for a, b in (await db.execute(query)).all()}
+
+
+async def _process_batch(
+    db: AsyncSession, scorer: MatchScorer, specs, run: MDMMatchRun, batch, progress: Optional[RunProgress] = None
+) -> Tuple[int, int]:
+    """Rematch one batch of changed records; returns (candidate pairs, matches)."""
+    rule_id, entity_id = UUID(scorer.rule_id), UUID(scorer.entity_id)
+    changed_ids = [row.id for row in batch]
+    active = {row.id: row.data or {} for row in batch if row.is_active}
+    inactive = [row.id for row in batch if not row.is_active]
+
+    # Unreviewed candidates of changed records are rebuilt from scratch
+    await db.execute(
+        delete(MDMMatchCandidate).where(
+            MDMMatchCandidate.match_rule_id == rule_id,
+            MDMMatchCandidate.status.in_(OPEN_STATUSES),
+            or_(MDMMatchCandidate.left_record_id.in_(changed_ids), MDMMatchCandidate.right_record_id.in_(changed_ids))
+        )
+    )
+    if inactive:
+        await db.execute(
+            delete(MDMRecordMatchKey).where(
+                MDMRecordMatchKey.match_rule_id == rule_id, MDMRecordMatchKey.record_id.in_(inactive)
+            )
+        )
+    if not active:
+        return 0, 0
+
+    # Records written outside the record service may carry stale keys
+    key_rows = compute_key_rows(scorer, specs, list(active.items()))
+    await upsert_key_rows(db, key_rows)
+    pairs = await _candidate_pairs(db, rule_id, list(active))
+    if not pairs:
+        return 0, 0
+
+    records = dict(active)
+    missing = {record_id for pair in pairs for record_id in pair} - records.keys()
+    for ids in chunked(list(missing), settings.BULK_INSERT_CHUNK_SIZE):
+        result = await db.execute(select(MDMRecord.id, MDMRecord.data).where(MDMRecord.id.in_(list(ids))))
+        records.update((record_id, data or {}) for record_id, data in result.all())
+    # Comparison inputs: just computed for the batch, stored for the other records
+    keys = comparison_keys(specs, (
+        (row["record_id"], row["key_name"], row["key_value"], row["key_version"]) for row in key_rows
+    ))
+    keys.update(await load_comparison_keys(db, scorer, list(missing)))
+
+    items = list(records.items())
+    positions = {record_id: i for i, (record_id, _) in enumerate(items)}
+    pair_positions = [
+        (positions[left], positions[right]) for left, right in pairs if left in positions and right in positions
+    ]
+    matches = await score_pairs_parallel(scorer, items, pair_positions, progress, keys=keys)
+
+    now = datetime.utcnow()
+    codes = scorer.field_codes
+    rows = [
+        {
+            "id": uuid4(),
+            "match_rule_id": rule_id,
+            "entity_id": entity_id,
+            "left_record_id": pair.left_id,
+            "right_record_id": pair.right_id,
+            "score": pair.score,
+            "field_scores": dict(zip(codes, pair.field_scores)),
+            "status": CandidateStatus.AUTO_MERGE if pair.auto_merge else CandidateStatus.PENDING,
+            "match_run_id": run.id,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for pair in matches
+    ]
+    for chunk in chunked(rows, settings.BULK_INSERT_CHUNK_SIZE):
+        stmt = insert(MDMMatchCandidate).values(list(chunk))
+        # Only reviewed candidates survive the delete above; refresh their scores, keep the decision
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["match_rule_id", "left_record_id", "right_record_id"],
+            set_={column: stmt.excluded[column] for column in ("score", "field_scores", "match_run_id", "updated_at")}
+        )
+        await db.execute(stmt)
+    return len(pair_positions), len(matches)
+
+
+async def execute_match_run(db: AsyncSession, run_id, batch_size: Optional[int] = None) -> MDMMatchRun:
+    """Process a registered run, committing the watermark after every batch.
+
+    Records updated after ``delta_cutoff`` are left for the next run, so rows
+    of transactions still in flight, however long they run, are not skipped.
+    """
+    batch_size = batch_size or settings.MATCH_DELTA_BATCH_SIZE
+    run = await db.get(MDMMatchRun, run_id)
+    if run is None:
+        raise ValueError("Match run not found")
+
+    try:
+        scorer = await match_engine.get_scorer(db, run.match_rule_id)
+        if scorer is None:
+            raise ValueError("Match rule not found")
+        specs = match_key_specs(scorer)
+        entity_id = UUID(scorer.entity_id)
+        cutoff = delta_cutoff(run.started_at, (await db.execute(OLDEST_WRITER_SQL)).scalar())
+        after = (run.watermark_to, run.watermark_record_id) if run.watermark_to else None
+        progress = RunProgress(db, run)
+
+        while True:
+            query = select(MDMRecord.id, MDMRecord.updated_at, MDMRecord.is_active, MDMRecord.data).where(
+                MDMRecord.entity_id == entity_id, MDMRecord.updated_at <= cutoff
+            )
+            if after is not None:
+                query = query.where(tuple_(MDMRecord.updated_at, MDMRecord.id) > tuple_(*after))
+            batch = (await db.execute(
+                query.order_by(MDMRecord.updated_at, MDMRecord.id).limit(batch_size)
+            )).all()
+            if not batch:
+                break
+
+            candidate_pairs, matches = await _process_batch(db, scorer, specs, run, batch, progress)
+            after = (batch[-1].updated_at, batch[-1].id)
+            run.watermark_to, run.watermark_record_id = after
+            run.records_processed += len(batch)
+            run.candidate_pairs += candidate_pairs
+            run.matches += matches
+            await db.commit()
+
+        run.status = MatchRunStatus.COMPLETED
+        run.finished_at = datetime.utcnow()
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        run.status = MatchRunStatus.FAILED
+        run.finished_at = datetime.utcnow()
+        run.error_message = str(e)[:1000]
+        await db.commit()
+        raise
+
+    logger.info(
+        "%s match run %s for rule %s: %d records, %d pairs, %d matches",
+        run.mode.value, run.id, run.match_rule_id, run.records_processed, run.candidate_pairs, run.matches
+    )
+    return run
+
+
+async def run_match_in_background(run_id):
+    """Background entry point with its own session."""
+    async with async_session_maker() as session:
+        try:
+            await execute_match_run(session, run_id)
+        except Exception:
+            logger.exception("Match run %s failed", run_id)
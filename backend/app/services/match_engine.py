@@ -0,0 +1,218 @@
+"""Match rule execution: blocking, vectorized scoring and thresholds."""
+import itertools
+import logging
+import time
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.models.attribute import MDMAttribute
+from app.models.match_merge import MDMMatchRule
+from app.services.match_blocking import BlockingIndex, BlockingStats, parse_blocking_fields
+from app.services.match_scoring import ComparisonKeys, MatchScorer, ScoredPairs
+from app.services.metadata_cache import metadata_cache
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MatchPair(NamedTuple):
+    """A scored pair at or above the rule's match threshold."""
+    left_id: Hashable
+    right_id: Hashable
+    score: float
+    auto_merge: bool
+    field_scores: Tuple[float, ...]
+
+
+class MatchRun(NamedTuple):
+    """Outcome of a batch match run."""
+    rule_id: str
+    records: int
+    candidate_pairs: int
+    pairs: List[MatchPair]
+    blocking: BlockingStats
+    elapsed_ms: float
+
+    @property
+    def auto_merges(self) -> int:
+        return sum(1 for pair in self.pairs if pair.auto_merge)
+
+
+def collect_matches(scored: ScoredPairs, record_ids: List[Hashable]) -> List[MatchPair]:
+    """Turn the match mask of a scored batch into MatchPair tuples."""
+    selected = np.flatnonzero(scored.is_match)
+    return [
+        MatchPair(
+            record_ids[scored.left[i]], record_ids[scored.right[i]], round(float(scored.scores[i]), 6),
+            bool(scored.is_auto_merge[i]), tuple(round(float(s), 6) for s in scored.field_scores[i]),
+        )
+        for i in selected
+    ]
+
+
+def iter_pair_chunks(pairs: Iterable[Tuple[int, int]], size: int) -> Iterable[np.ndarray]:
+    """Group (left, right) position pairs into (n, 2) int arrays."""
+    iterator = iter(pairs)
+    while True:
+        chunk = np.fromiter(
+            itertools.chain.from_iterable(itertools.islice(iterator, size)), dtype=np.int64
+        ).reshape(-1, 2)
+        if not chunk.size:
+            return
+        yield chunk
+
+
+def score_against(
+    scorer: MatchScorer,
+    record_id: Optional[Hashable],
+    record: Dict[str, Any],
+    candidates: List[Tuple[Hashable, Dict[str, Any]]],
+    keys: Optional[Dict[Hashable, ComparisonKeys]] = None,
+) -> List[MatchPair]:
+    """Score one record against candidate records, returning the matches.
+
+    ``keys`` are stored comparison inputs by record id (see match_keys).
+    """
+    if not candidates:
+        return []
+    ids = [record_id] + [cid for cid, _ in candidates]
+    columns = scorer.prepare(
+        [record] + [data for _, data in candidates], [keys.get(rid) for rid in ids] if keys is not None else None
+    )
+    right = np.arange(1, len(candidates) + 1, dtype=np.int64)
+    scored = scorer.score(columns, np.zeros_like(right), right)
+    return collect_matches(scored, ids)
+
+
+class MatchIndex:
+    """Blocking index plus record data for one match rule.
+
+    Supports a batch run over all indexed records and an incremental lookup
+    for a single (new or changed) record.
+    """
+
+    def __init__(self, scorer: MatchScorer, max_block_size: Optional[int] = None):
+        keys = parse_blocking_fields(scorer.blocking_fields)
+        if not keys:
+            raise ValueError("Match rule has no blocking_fields")
+        self.scorer = scorer
+        self.blocking = BlockingIndex(keys, max_block_size)
+        self.records: Dict[Hashable, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, record_id: Hashable, record: Dict[str, Any]):
+        self.records[record_id] = record
+        self.blocking.add(record_id, record)
+
+    def add_many(self, records: Iterable[Tuple[Hashable, Dict[str, Any]]]):
+        for record_id, record in records:
+            self.add(record_id, record)
+
+    def remove(self, record_id: Hashable):
+        self.records.pop(record_id, None)
+        self.blocking.remove(record_id)
+
+    def slot_records(self) -> List[Dict[str, Any]]:
+        """Records aligned with blocking slots (freed slots are empty)."""
+        return [self.records[rid] if rid is not None else {} for rid in self.blocking.record_ids]
+
+    def run(self, chunk_size: Optional[int] = None) -> MatchRun:
+        """Score every candidate pair produced by the blocking index."""
+        started = time.perf_counter()
+        chunk_size = chunk_size or settings.MATCH_SCORE_CHUNK_SIZE
+        columns = self.scorer.prepare(self.slot_records())
+        record_ids = self.blocking.record_ids
+
+        pairs: List[MatchPair] = []
+        candidates = 0
+        for chunk in iter_pair_chunks(self.blocking.candidate_slot_pairs(), chunk_size):
+            candidates += len(chunk)
+            pairs.extend(collect_matches(self.scorer.score(columns, chunk[:, 0], chunk[:, 1]), record_ids))
+
+        return MatchRun(
+            self.scorer.rule_id, len(self.records), candidates, pairs, self.blocking.stats(),
+            round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    def match(self, record: Dict[str, Any], record_id: Optional[Hashable] = None) -> List[MatchPair]:
+        """Find indexed records matching a single record."""
+        candidate_ids = self.blocking.candidates_for(record, exclude=record_id)
+        return score_against(self.scorer, record_id, record, [(cid, self.records[cid]) for cid in candidate_ids])
+
+
+class MatchEngine:
+    """Caches compiled match rules."""
+
+    def __init__(self):
+        self.scorers = TTLCache(maxsize=256, ttl=settings.MATCH_RULE_CACHE_TTL_SECONDS)
+        self.entity_rules = TTLCache(maxsize=256, ttl=settings.MATCH_RULE_CACHE_TTL_SECONDS)
+        self._rule_entities: Dict[str, str] = {}
+        metadata_cache.on_invalidate(self.evict)
+
+    def evict(self, entity_id: Optional[str]):
+        """Drop compiled rules of an entity (all rules when entity_id is None)."""
+        if entity_id is None:
+            self.scorers.clear()
+            self.entity_rules.clear()
+            self._rule_entities.clear()
+            return
+        self.entity_rules.delete(str(entity_id))
+        for rule_id, owner in list(self._rule_entities.items()):
+            if owner == str(entity_id):
+                self.scorers.delete(rule_id)
+                del self._rule_entities[rule_id]
+
+    async def get_scorer(self, db: AsyncSession, rule_id) -> Optional[MatchScorer]:
+        """Return the compiled scorer for a match rule, or None when it does not exist."""
+        key = str(rule_id)
+        scorer = self.scorers.get(key)
+        if scorer is not None:
+            return scorer
+
+        result = await db.execute(
+            select(MDMMatchRule)
+            .options(selectinload(MDMMatchRule.match_fields))
+            .where(MDMMatchRule.id == rule_id, MDMMatchRule.is_active == True)
+        )
+        rule = result.scalar_one_or_none()
+        if rule is None:
+            return None
+
+        attribute_ids = [field.attribute_id for field in rule.match_fields]
+        result = await db.execute(
+            select(MDMAttribute.id, MDMAttribute.attribute_code).where(MDMAttribute.id.in_(attribute_ids))
+        )
+        scorer = MatchScorer(rule, dict(result.tuples().all()))
+        self.scorers.set(key, scorer)
+        self._rule_entities[key] = scorer.entity_id
+        return scorer
+
+    async def get_entity_scorers(self, db: AsyncSession, entity_id) -> List[MatchScorer]:
+        """Compiled scorers for all active match rules of an entity; invalid rules are skipped."""
+        key = str(entity_id)
+        rule_ids = self.entity_rules.get(key)
+        if rule_ids is None:
+            result = await db.execute(
+                select(MDMMatchRule.id).where(MDMMatchRule.entity_id == entity_id, MDMMatchRule.is_active == True)
+            )
+            rule_ids = result.scalars().all()
+            self.entity_rules.set(key, rule_ids)
+
+        scorers = []
+        for rule_id in rule_ids:
+            try:
+                scorer = await self.get_scorer(db, rule_id)
+            except ValueError as e:
+                logger.warning("Skipping match rule %s: %s", rule_id, e)
+                continue
+            if scorer is not None:
+                scorers.append(scorer)
+        return scorers
+
+
+match_engine = MatchEngine()
@@ -0,0 +1,268 @@
+"""Precomputed match keys stored alongside records.
+
+Two kinds of keys are stored per record and rule:
+
+* ``block:`` keys, which candidate lookups join on;
+* ``phonetic:`` and ``normalized:`` keys, the comparison inputs of PHONETIC,
+  EXACT and FUZZY fields after ``transform_before``. Stored-record matching
+  reads them with the candidates, so SOUNDEX/METAPHONE and the transforms
+  are not recomputed per comparison.
+
+A key's version fingerprints its definition, so changing a blocking key or
+a field's comparison or transform makes only that key stale; stale keys are
+ignored by lookups and recomputed by the backfill. Keys under names the rule
+no longer defines are removed by the backfill.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+from uuid import UUID
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from sqlalchemy import and_, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.record import MDMRecord, MDMRecordMatchKey
+from app.services.match_blocking import parse_blocking_fields
+from app.services.match_engine import match_engine
+from app.services.match_scoring import CompiledField, ComparisonKeys, MatchScorer
+from app.utils.bulk import chunked
+
+logger = logging.getLogger(__name__)
+
+# Longest stored key value (column size)
+MAX_KEY_LENGTH = 500
+
+
+class MatchKeySpec(NamedTuple):
+    """A key computed per record: its name, definition fingerprint and function."""
+    name: str
+    version: str
+    compute: Callable[[Dict[str, Any]], Optional[str]]
+
+
+def _fingerprint(definition: Any) -> str:
+    raw = json.dumps(definition, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def _field_key(field: CompiledField) -> Callable[[Dict[str, Any]], Optional[str]]:
+    code, comparison_key = field.attribute_code, field.comparison_key
+    return lambda data: comparison_key(data.get(code))
+
+
+def match_key_specs(scorer: MatchScorer) -> List[MatchKeySpec]:
+    """Blocking keys plus phonetic/normalized comparison keys of a match rule."""
+    specs = [
+        MatchKeySpec(
+            f"block:{key.name}", _fingerprint(["block", key.fields, key.method, key.length]), key.key
+        )
+        for key in parse_blocking_fields(scorer.blocking_fields)
+    ]
+    for name, field in scorer.key_fields.items():
+        version = _fingerprint([name, field.comparison, field.transform_before, field.algorithm])
+        specs.append(MatchKeySpec(name, version, _field_key(field)))
+    return specs
+
+
+def comparison_keys(
+    specs: Sequence[MatchKeySpec], rows: Iterable[Tuple[Hashable, str, Optional[str], str]]
+) -> Dict[Hashable, ComparisonKeys]:
+    """Current comparison inputs by record from (record_id, key_name, key_value, key_version) rows.
+
+    Blocking keys, stale versions and values that may have been cut at
+    MAX_KEY_LENGTH are left out, so the scorer computes those itself.
+    """
+    current = {spec.name: spec.version for spec in specs if not spec.name.startswith("block:")}
+    keys: Dict[Hashable, ComparisonKeys] = {}
+    for record_id, name, value, version in rows:
+        if current.get(name) == version and (value is None or len(value) < MAX_KEY_LENGTH):
+            keys.setdefault(record_id, {})[name] = value
+    return keys
+
+
+async def load_comparison_keys(
+    db: AsyncSession, scorer: MatchScorer, record_ids: Sequence[Hashable]
+) -> Dict[Hashable, ComparisonKeys]:
+    """Stored comparison inputs of records for a rule, by record id."""
+    specs = match_key_specs(scorer)
+    names = [spec.name for spec in specs if not spec.name.startswith("block:")]
+    if not names or not record_ids:
+        return {}
+    rows = []
+    for ids in chunked(list(record_ids), settings.BULK_INSERT_CHUNK_SIZE):
+        result = await db.execute(
+            select(
+                MDMRecordMatchKey.record_id, MDMRecordMatchKey.key_name,
+                MDMRecordMatchKey.key_value, MDMRecordMatchKey.key_version
+            )
+            .where(
+                MDMRecordMatchKey.match_rule_id == UUID(scorer.rule_id),
+                MDMRecordMatchKey.record_id.in_(list(ids)),
+                MDMRecordMatchKey.key_name.in_(names)
+            )
+        )
+        rows.extend(result.tuples().all())
+    return comparison_keys(specs, rows)
+
+
+def compute_key_rows(
+    scorer: MatchScorer,
+    specs: Sequence[MatchKeySpec],
+    records: Sequence[Tuple[Hashable, Dict[str, Any]]],
+) -> List[dict]:
+    """Rows for mdm_record_match_key; a failing key function stores NULL."""
+    now = datetime.utcnow()
+    rule_id, entity_id = UUID(scorer.rule_id), UUID(scorer.entity_id)
+    rows = []
+    for record_id, data in records:
+        for spec in specs:
+            try:
+                value = spec.compute(data)
+            except Exception:
+                value = None
+            rows.append({
+                "record_id": record_id,
+                "match_rule_id": rule_id,
+                "key_name": spec.name,
+                "entity_id": entity_id,
+                "key_value": value[:MAX_KEY_LENGTH] if value else None,
+                "key_version": spec.version,
+                "computed_at": now,
+            })
+    return rows
+
+
+async def upsert_key_rows(db: AsyncSession, rows: List[dict]):
+    for chunk in chunked(rows, settings.BULK_INSERT_CHUNK_SIZE):
+        stmt = insert(MDMRecordMatchKey).values(list(chunk))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["record_id", "match_rule_id", "key_name"],
+            set_={column: stmt.excluded[column] for column in ("key_value", "key_version", "computed_at")}
+        )
+        await db.execute(stmt)
+
+
+async def write_record_keys(db: AsyncSession, entity_id, records: Sequence[Tuple[Hashable, Dict[str, Any]]]):
+    """Compute and store match keys for records being written (the caller commits)."""
+    if not records:
+        return
+    rows = []
+    for scorer in await match_engine.get_entity_scorers(db, entity_id):
+        rows.extend(compute_key_rows(scorer, match_key_specs(scorer), records))
+    await upsert_key_rows(db, rows)
+
+
+async def find_candidate_ids(
+    db: AsyncSession,
+    scorer: MatchScorer,
+    data: Dict[str, Any],
+    exclude: Optional[Hashable] = None,
+) -> List[Hashable]:
+    """Ids of records sharing any blocking key with ``data``, via the key index.
+
+    Blocks larger than MATCH_MAX_BLOCK_SIZE are skipped, as in BlockingIndex.
+    """
+    pairs = []
+    for spec in match_key_specs(scorer):
+        if not spec.name.startswith("block:"):
+            continue
+        value = spec.compute(data)
+        if value:
+            pairs.append((spec.name, value[:MAX_KEY_LENGTH]))
+    if not pairs:
+        return []
+
+    rule_id = UUID(scorer.rule_id)
+    blocks = (
+        select(MDMRecordMatchKey.key_name, MDMRecordMatchKey.key_value)
+        .where(
+            MDMRecordMatchKey.match_rule_id == rule_id,
+            tuple_(MDMRecordMatchKey.key_name, MDMRecordMatchKey.key_value).in_(pairs)
+        )
+        .group_by(MDMRecordMatchKey.key_name, MDMRecordMatchKey.key_value)
+        .having(func.count() <= settings.MATCH_MAX_BLOCK_SIZE)
+        .subquery()
+    )
+    query = (
+        select(MDMRecordMatchKey.record_id)
+        .join(blocks, and_(
+            blocks.c.key_name == MDMRecordMatchKey.key_name,
+            blocks.c.key_value == MDMRecordMatchKey.key_value
+        ))
+        .where(MDMRecordMatchKey.match_rule_id == rule_id)
+        .distinct()
+    )
+    if exclude is not None:
+        query = query.where(MDMRecordMatchKey.record_id != exclude)
+    return (await db.execute(query)).scalars().all()
+
+
+async def backfill_match_keys(db: AsyncSession, rule_id, batch_size: Optional[int] = None) -> dict:
+    """Bring a rule's stored keys up to date, committing per batch.
+
+    Records are scanned by id; only keys that are missing or were produced
+    by an older definition are recomputed, and keys no longer defined by the
+    rule are deleted.
+    """
+    batch_size = batch_size or settings.MATCH_KEY_BATCH_SIZE
+    scorer = await match_engine.get_scorer(db, rule_id)
+    if scorer is None:
+        raise ValueError("Match rule not found")
+    specs = match_key_specs(scorer)
+    current = {spec.name: spec.version for spec in specs}
+    rule_uuid, entity_uuid = UUID(scorer.rule_id), UUID(scorer.entity_id)
+
+    result = await db.execute(
+        delete(MDMRecordMatchKey).where(
+            MDMRecordMatchKey.match_rule_id == rule_uuid,
+            MDMRecordMatchKey.key_name.notin_(list(current))
+        )
+    )
+    stats = {"records_scanned": 0, "records_updated": 0, "keys_written": 0, "keys_deleted": result.rowcount}
+    await db.commit()
+
+    last_id = None
+    while True:
+        query = select(MDMRecord.id, MDMRecord.data).where(
+            MDMRecord.entity_id == entity_uuid, MDMRecord.is_active == True
+        )
+        if last_id is not None:
+            query = query.where(MDMRecord.id > last_id)
+        batch = (await db.execute(query.order_by(MDMRecord.id).limit(batch_size))).all()
+        if not batch:
+            break
+        last_id = batch[-1].id
+        stats["records_scanned"] += len(batch)
+
+        existing = await db.execute(
+            select(MDMRecordMatchKey.record_id, MDMRecordMatchKey.key_name, MDMRecordMatchKey.key_version).where(
+                MDMRecordMatchKey.match_rule_id == rule_uuid,
+                MDMRecordMatchKey.record_id.in_([row.id for row in batch])
+            )
+        )
+        fresh = {(record_id, name) for record_id, name, version in existing.all() if current.get(name) == version}
+
+        rows = []
+        for record_id, data in batch:
+            stale = [spec for spec in specs if (record_id, spec.name) not in fresh]
+            if stale:
+                stats["records_updated"] += 1
+                rows.extend(compute_key_rows(scorer, stale, [(record_id, data or {})]))
+        await upsert_key_rows(db, rows)
+        await db.commit()
+        stats["keys_written"] += len(rows)
+
+    logger.info("Match key backfill for rule %s: %s", rule_id, stats)
+    return stats
+
+
+async def run_backfill(rule_id):
+    """Background entry point with its own session."""
+    async with async_session_maker() as session:
+        try:
+            await backfill_match_keys(session, rule_id)
+        except Exception:
+            logger.exception("Match key backfill for rule %s failed", rule_id)
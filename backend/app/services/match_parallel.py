@@ -0,0 +1,365 @@
+"""Multi-process match runs over shared-memory record columns.
+
+All runs share one process pool of MATCH_WORKERS processes (one per CPU
+when 0), created on first use, so concurrent runs queue for the same
+workers instead of each starting processes of their own. A run places its
+prepared record columns in shared memory; tasks carry the run's token, the
+pickled scorer and segment names, and a chunk of (left, right) positions.
+Workers attach a run's segments on its first chunk and keep the last few
+runs attached.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from app.core.config import settings
+from app.services.match_engine import MatchIndex, MatchPair, MatchRun, iter_pair_chunks
+from app.services.match_scoring import ComparisonKeys, FieldColumn, MatchScorer
+
+logger = logging.getLogger(__name__)
+
+# (shared memory name, dtype, shape)
+ArrayRef = Tuple[str, str, Tuple[int, ...]]
+
+# Runs a worker keeps attached; older ones are detached when a new run arrives
+_WORKER_RUNS = 4
+
+
+class MatchProgress(NamedTuple):
+    """Progress of a parallel match run, reported after each completed chunk."""
+    chunks_done: int
+    pairs_scored: int
+    matches: int
+    elapsed_seconds: float
+
+
+class SharedStrings:
+    """Strings stored as one UTF-8 buffer plus offsets, indexable by position arrays."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @staticmethod
+    def encode(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode() if value else b"" for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded) or b"\0", dtype=np.uint8), offsets
+
+    def __getitem__(self, positions: np.ndarray) -> List[str]:
+        data, offsets = self.data, self.offsets
+        return [data[offsets[i]:offsets[i + 1]].tobytes().decode() for i in positions]
+
+
+class SharedColumns:
+    """Copies prepared field columns into shared memory segments owned by the parent."""
+
+    def __init__(self, columns: List[FieldColumn]):
+        self._segments: List[SharedMemory] = []
+        self.layout = []
+        try:
+            for column in columns:
+                strings = None
+                if column.values is not None:
+                    strings = tuple(self._share(array) for array in SharedStrings.encode(column.values))
+                self.layout.append((
+                    self._share(column.codes),
+                    self._share(column.numbers) if column.numbers is not None else None,
+                    strings,
+                ))
+        except BaseException:
+            self.close()
+            raise
+
+    def _share(self, array: np.ndarray) -> ArrayRef:
+        segment = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segments.append(segment)
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        return segment.name, array.dtype.str, array.shape
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+
+class SharedRun:
+    """A run's shared columns plus what a task needs to find them."""
+
+    def __init__(
+        self, scorer: MatchScorer, records: List[Dict[str, Any]], keys: Optional[List[Optional[ComparisonKeys]]] = None
+    ):
+        self.columns = SharedColumns(scorer.prepare(records, keys))
+        self.token = uuid.uuid4().hex
+        # Pickled once; each task sends the same bytes
+        self.payload = pickle.dumps((scorer, self.columns.layout))
+
+    def close(self):
+        self.columns.close()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    return settings.MATCH_WORKERS or os.cpu_count() or 1
+
+
+def get_match_pool() -> ProcessPoolExecutor:
+    """The process pool shared by all match runs."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=multiprocessing.get_context(settings.MATCH_START_METHOD),
+            )
+        return _pool
+
+
+def shutdown_match_pool(pool: Optional[ProcessPoolExecutor] = None):
+    """Shut the shared pool down (or only ``pool``, if it is still the shared one)."""
+    global _pool
+    with _pool_lock:
+        if pool is not None and pool is not _pool:
+            return
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_workers(workers: Optional[int] = None) -> int:
+    """Workers a run may keep busy: ``workers``, capped at the pool size."""
+    return min(workers or pool_size(), pool_size())
+
+
+# Worker process state: token -> (scorer, columns, segments), most recent last
+_worker_runs: "OrderedDict[str, Tuple[MatchScorer, List[FieldColumn], List[SharedMemory]]]" = OrderedDict()
+
+
+def _attach(ref: ArrayRef, segments: List[SharedMemory]) -> np.ndarray:
+    name, dtype, shape = ref
+    # Workers share the parent's resource tracker, so the parent's unlink() is the only cleanup
+    segment = SharedMemory(name=name)
+    segments.append(segment)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _worker_run(token: str, payload: bytes):
+    if token in _worker_runs:
+        _worker_runs.move_to_end(token)
+        return _worker_runs[token]
+    scorer, layout = pickle.loads(payload)
+    segments: List[SharedMemory] = []
+    columns = []
+    for codes, numbers, strings in layout:
+        columns.append(FieldColumn(
+            _attach(codes, segments),
+            SharedStrings(*(_attach(ref, segments) for ref in strings)) if strings else None,
+            _attach(numbers, segments) if numbers else None,
+        ))
+    _worker_runs[token] = (scorer, columns, segments)
+    while len(_worker_runs) > _WORKER_RUNS:
+        _, (_, _, old) = _worker_runs.popitem(last=False)
+        for segment in old:
+            segment.close()
+    return _worker_runs[token]
+
+
+def _score_chunk(token: str, payload: bytes, pairs: np.ndarray):
+    """Score one chunk in a worker; only matching pairs are sent back."""
+    scorer, columns, _ = _worker_run(token, payload)
+    scored = scorer.score(columns, pairs[:, 0], pairs[:, 1])
+    selected = np.flatnonzero(scored.is_match)
+    return (
+        len(pairs), scored.left[selected], scored.right[selected], scored.scores[selected],
+        scored.is_auto_merge[selected], scored.field_scores[selected],
+    )
+
+
+def _submit(pool: ProcessPoolExecutor, run: SharedRun, chunk: np.ndarray) -> Future:
+    try:
+        return pool.submit(_score_chunk, run.token, run.payload, chunk)
+    except BrokenProcessPool:
+        shutdown_match_pool(pool)
+        raise
+
+
+def _chunk_matches(pool: ProcessPoolExecutor, future, record_ids: Sequence[Hashable]):
+    """(pairs scored, matches) of a completed chunk."""
+    try:
+        count, left, right, scores, auto_merge, field_scores = future.result()
+    except BrokenProcessPool:
+        # A worker died; the next run starts a fresh pool
+        shutdown_match_pool(pool)
+        raise
+    return count, [
+        MatchPair(
+            record_ids[left[i]], record_ids[right[i]], round(float(scores[i]), 6),
+            bool(auto_merge[i]), tuple(round(float(s), 6) for s in field_scores[i]),
+        )
+        for i in range(len(left))
+    ]
+
+
+def iter_parallel_scores(
+    scorer: MatchScorer,
+    records: List[Dict[str, Any]],
+    record_ids: Sequence[Hashable],
+    pairs: Iterable[Tuple[int, int]],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[MatchProgress], None]] = None,
+) -> Iterator[List[MatchPair]]:
+    """Score (left, right) positions into ``records`` in the shared pool, yielding matches as chunks complete.
+
+    At most two chunks per worker are in flight, so pair generation never
+    runs far ahead of scoring.
+    """
+    in_flight = run_workers(workers) * 2
+    chunk_size = chunk_size or settings.MATCH_PARALLEL_CHUNK_SIZE
+    started = time.perf_counter()
+    run = SharedRun(scorer, records)
+    pool = get_match_pool()
+    chunks = iter_pair_chunks(pairs, chunk_size)
+    pending = set()
+    chunks_done = pairs_scored = matches = 0
+
+    def submit_next() -> bool:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        pending.add(_submit(pool, run, chunk))
+        return True
+
+    try:
+        while len(pending) < in_flight and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                count, batch = _chunk_matches(pool, future, record_ids)
+                chunks_done += 1
+                pairs_scored += count
+                matches += len(batch)
+                if progress:
+                    progress(MatchProgress(chunks_done, pairs_scored, matches, time.perf_counter() - started))
+                submit_next()
+                yield batch
+    finally:
+        for future in pending:
+            future.cancel()
+        run.close()
+
+
+async def score_pairs_parallel(
+    scorer: MatchScorer,
+    records: Sequence[Tuple[Hashable, Dict[str, Any]]],
+    pairs: Sequence[Tuple[int, int]],
+    progress: Optional[Callable[[MatchProgress], Awaitable[None]]] = None,
+    chunk_size: Optional[int] = None,
+    keys: Optional[Dict[Hashable, ComparisonKeys]] = None,
+) -> List[MatchPair]:
+    """Score (left, right) positions into ``records`` in the shared pool without blocking the event loop.
+
+    ``keys`` are stored comparison inputs by record id (see match_keys).
+    """
+    started = time.perf_counter()
+    record_ids = [record_id for record_id, _ in records]
+    aligned = [keys.get(record_id) for record_id in record_ids] if keys is not None else None
+    run = await asyncio.to_thread(SharedRun, scorer, [data for _, data in records], aligned)
+    pool = get_match_pool()
+    in_flight = run_workers() * 2
+    chunks = iter_pair_chunks(pairs, chunk_size or settings.MATCH_PARALLEL_CHUNK_SIZE)
+    pending = set()
+    matches: List[MatchPair] = []
+    chunks_done = pairs_scored = 0
+
+    try:
+        while True:
+            while len(pending) < in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending.add(asyncio.wrap_future(_submit(pool, run, chunk)))
+            if not pending:
+                return matches
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                count, batch = _chunk_matches(pool, future, record_ids)
+                chunks_done += 1
+                pairs_scored += count
+                matches.extend(batch)
+                if progress:
+                    await progress(MatchProgress(chunks_done, pairs_scored, len(matches), time.perf_counter() - started))
+    finally:
+        for future in pending:
+            future.cancel()
+        run.close()
+
+
+def iter_parallel_matches(
+    index: MatchIndex,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[MatchProgress], None]] = None,
+) -> Iterator[List[MatchPair]]:
+    """Score an index's candidate pairs in the shared pool, yielding matches as chunks complete."""
+    yield from iter_parallel_scores(
+        index.scorer, index.slot_records(), index.blocking.record_ids, index.blocking.candidate_slot_pairs(),
+        workers, chunk_size, progress
+    )
+
+
+def run_parallel(
+    index: MatchIndex,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[MatchProgress], None]] = None,
+) -> MatchRun:
+    """Parallel equivalent of MatchIndex.run()."""
+    started = time.perf_counter()
+    pairs: List[MatchPair] = []
+    last: List[MatchProgress] = []
+
+    def track(update: MatchProgress):
+        last[:] = [update]
+        if progress:
+            progress(update)
+
+    for batch in iter_parallel_matches(index, workers, chunk_size, track):
+        pairs.extend(batch)
+
+    return MatchRun(
+        index.scorer.rule_id, len(index), last[0].pairs_scored if last else 0, pairs,
+        index.blocking.stats(), round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+def log_progress(rule_id: str) -> Callable[[MatchProgress], None]:
+    """Progress callback that logs every few seconds."""
+    state = {"logged_at": 0.0}
+
+    def report(update: MatchProgress):
+        if update.elapsed_seconds - state["logged_at"] >= 5:
+            state["logged_at"] = update.elapsed_seconds
+            logger.info(
+                "Match rule %s: %d chunks, %d pairs scored, %d matches (%.1fs)",
+                rule_id, update.chunks_done, update.pairs_scored, update.matches, update.elapsed_seconds
+            )
+    return report
@@ -0,0 +1,290 @@
+"""Vectorized similarity scoring of candidate pairs for a match rule."""
+import re
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import jellyfish
+import Levenshtein
+import numpy as np
+from fuzzywuzzy import fuzz
+from app.models.attribute import TransformType
+from app.models.match_merge import ComparisonType, MatchAlgorithm, MDMMatchField, MDMMatchRule, NullHandling
+from app.services.match_blocking import normalize_key_value
+from app.services.transform_engine import scalar_transform
+
+# String similarity (0..1) per rule algorithm for FUZZY fields
+FUZZY_FUNCTIONS: Dict[MatchAlgorithm, Callable[[str, str], float]] = {
+    MatchAlgorithm.FUZZY: lambda a, b: fuzz.token_sort_ratio(a, b) / 100.0,
+    MatchAlgorithm.LEVENSHTEIN: Levenshtein.ratio,
+    MatchAlgorithm.JARO_WINKLER: jellyfish.jaro_winkler_similarity,
+}
+
+PHONETIC_FUNCTIONS: Dict[MatchAlgorithm, Callable[[str], str]] = {
+    MatchAlgorithm.SOUNDEX: jellyfish.soundex,
+    MatchAlgorithm.METAPHONE: jellyfish.metaphone,
+}
+
+# Attributes captured so a compiled scorer can be rebuilt in worker processes
+_RULE_ATTRS = ("id", "entity_id", "algorithm", "match_threshold", "auto_merge_threshold", "blocking_fields")
+_FIELD_ATTRS = (
+    "id", "attribute_id", "comparison_type", "weight", "null_handling", "transform_before", "tolerance", "is_active",
+)
+
+_TOLERANCE = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*(%|d|days?)?\s*$", re.IGNORECASE)
+
+
+def parse_tolerance(tolerance: Optional[str]) -> Optional[tuple]:
+    """Parse MDMMatchField.tolerance: "5" (absolute), "10%" (relative) or "30d" (days)."""
+    if not tolerance:
+        return None
+    match = _TOLERANCE.match(tolerance)
+    if not match:
+        raise ValueError(f"Invalid tolerance '{tolerance}'")
+    amount, unit = float(match.group(1)), (match.group(2) or "").lower()
+    return amount, "relative" if unit == "%" else "absolute"
+
+
+def build_normalizer(transform_before: Any) -> Callable[[Any], Optional[str]]:
+    """Normalization applied to a field before comparison.
+
+    ``transform_before`` is a list of transform type names or
+    ``{"type": ..., "config": {...}}`` entries, applied after trimming and
+    lowercasing.
+    """
+    steps = []
+    for spec in transform_before or []:
+        if isinstance(spec, str):
+            spec = {"type": spec}
+        func = scalar_transform(TransformType(spec["type"]), spec.get("config") or {})
+        if func is None:
+            raise ValueError(f"Transform '{spec['type']}' cannot be used in transform_before")
+        steps.append(func)
+
+    def normalize(value: Any) -> Optional[str]:
+        value = normalize_key_value(value)
+        if value is None:
+            return None
+        for step in steps:
+            value = step(value)
+        return value or None
+    return normalize
+
+
+def _to_number(value: Any) -> float:
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_day(value: Any) -> float:
+    """Days since epoch as float (NaN when missing or unparseable)."""
+    if value is None or value == "":
+        return np.nan
+    if isinstance(value, datetime):
+        return value.timestamp() / 86400.0
+    if isinstance(value, date):
+        return float(value.toordinal() - 719163)
+    try:
+        return datetime.fromisoformat(str(value)).timestamp() / 86400.0
+    except ValueError:
+        return np.nan
+
+
+def factorize(values: Sequence[Optional[str]]) -> np.ndarray:
+    """Map values to dense integer codes (-1 for None) so equality is an array compare."""
+    lookup: Dict[str, int] = {}
+    return np.fromiter(
+        (-1 if value is None else lookup.setdefault(value, len(lookup)) for value in values),
+        dtype=np.int64, count=len(values)
+    )
+
+
+# Precomputed comparison inputs of one record by key name (see CompiledField.key_name)
+ComparisonKeys = Dict[str, Optional[str]]
+
+
+class FieldColumn(NamedTuple):
+    """Per-record features for one match field."""
+    codes: np.ndarray            # factorized comparison values, -1 when null
+    values: Optional[np.ndarray]  # normalized strings (FUZZY only)
+    numbers: Optional[np.ndarray]  # floats (NUMERIC/DATE only), NaN when null
+
+
+class CompiledField:
+    """A match field with its comparison prepared for column-wise scoring."""
+
+    def __init__(self, field: MDMMatchField, attribute_code: str, algorithm: MatchAlgorithm):
+        self.field_id = str(field.id)
+        self.attribute_code = attribute_code
+        self.comparison = ComparisonType(field.comparison_type or ComparisonType.FUZZY)
+        self.weight = float(field.weight if field.weight is not None else 0.5)
+        self.null_handling = NullHandling(field.null_handling or NullHandling.IGNORE)
+        self.tolerance = parse_tolerance(field.tolerance)
+        self.transform_before = field.transform_before
+        self.algorithm = algorithm
+        self.normalize = build_normalizer(field.transform_before)
+        self.similarity = FUZZY_FUNCTIONS.get(algorithm, Levenshtein.ratio)
+        self.phonetic = PHONETIC_FUNCTIONS.get(algorithm, jellyfish.metaphone)
+        # Name of the stored key holding this field's comparison input, if it has one
+        if self.comparison == ComparisonType.PHONETIC:
+            self.key_name = f"phonetic:{attribute_code}"
+        elif self.comparison in (ComparisonType.EXACT, ComparisonType.FUZZY):
+            self.key_name = f"normalized:{attribute_code}"
+        else:
+            self.key_name = None
+
+    def comparison_key(self, value: Any) -> Optional[str]:
+        """The normalized (PHONETIC: phonetic code of the normalized) value pairs are compared on."""
+        value = self.normalize(value)
+        if value and self.comparison == ComparisonType.PHONETIC:
+            return self.phonetic(value) or None
+        return value
+
+    def prepare(
+        self, records: Sequence[Dict[str, Any]], keys: Optional[Sequence[Optional[ComparisonKeys]]] = None
+    ) -> FieldColumn:
+        """Compute per-record features once; pairs then index into them.
+
+        ``keys`` holds stored comparison inputs aligned with ``records``;
+        records without this field's key are computed here.
+        """
+        code = self.attribute_code
+        if self.comparison in (ComparisonType.NUMERIC, ComparisonType.DATE):
+            convert = _to_number if self.comparison == ComparisonType.NUMERIC else _to_day
+            numbers = np.fromiter((convert(record.get(code)) for record in records), dtype=np.float64, count=len(records))
+            codes = np.where(np.isnan(numbers), -1, 0)
+            return FieldColumn(codes, None, numbers)
+
+        if keys is None:
+            inputs = [self.comparison_key(record.get(code)) for record in records]
+        else:
+            name = self.key_name
+            inputs = [
+                stored[name] if stored is not None and name in stored else self.comparison_key(record.get(code))
+                for record, stored in zip(records, keys)
+            ]
+        values = np.array(inputs, dtype=object) if self.comparison == ComparisonType.FUZZY else None
+        return FieldColumn(factorize(inputs), values, None)
+
+    def score(self, column: FieldColumn, left: np.ndarray, right: np.ndarray):
+        """Return (similarity, null mask) arrays for the pairs."""
+        left_codes, right_codes = column.codes[left], column.codes[right]
+        nulls = (left_codes < 0) | (right_codes < 0)
+
+        if self.comparison in (ComparisonType.NUMERIC, ComparisonType.DATE):
+            a, b = column.numbers[left], column.numbers[right]
+            diff = np.abs(a - b)
+            if self.tolerance is None:
+                similarity = (diff == 0).astype(np.float64)
+            else:
+                amount, kind = self.tolerance
+                if kind == "relative":
+                    scale = np.maximum(np.abs(a), np.abs(b)) * (amount / 100.0)
+                else:
+                    scale = np.full_like(diff, amount)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    similarity = np.where(scale > 0, np.clip(1.0 - diff / scale, 0.0, 1.0), (diff == 0) * 1.0)
+        elif self.comparison == ComparisonType.FUZZY:
+            similarity = (left_codes == right_codes).astype(np.float64)
+            todo = np.flatnonzero((similarity == 0) & ~nulls)
+            if todo.size:
+                values = column.values
+                similarity[todo] = np.fromiter(
+                    map(self.similarity, values[left[todo]], values[right[todo]]),
+                    dtype=np.float64, count=todo.size
+                )
+        else:
+            similarity = (left_codes == right_codes).astype(np.float64)
+
+        similarity[nulls] = 0.0
+        return similarity, nulls
+
+
+class ScoredPairs(NamedTuple):
+    """Scores for a batch of candidate pairs (positions into the prepared records)."""
+    left: np.ndarray
+    right: np.ndarray
+    scores: np.ndarray
+    field_scores: np.ndarray  # shape (pairs, fields)
+    is_match: np.ndarray
+    is_auto_merge: np.ndarray
+
+
+class MatchScorer:
+    """A match rule compiled into weighted, column-wise field comparisons."""
+
+    def __init__(self, rule: MDMMatchRule, attribute_codes: Dict[Any, str]):
+        algorithm = MatchAlgorithm(rule.algorithm or MatchAlgorithm.FUZZY)
+        self.rule_id = str(rule.id)
+        self.entity_id = str(rule.entity_id)
+        self.blocking_fields = rule.blocking_fields
+        self.match_threshold = float(rule.match_threshold if rule.match_threshold is not None else 0.80)
+        self.auto_merge_threshold = float(rule.auto_merge_threshold if rule.auto_merge_threshold is not None else 0.95)
+        self.fields = [
+            CompiledField(field, attribute_codes[field.attribute_id], algorithm)
+            for field in rule.match_fields if field.is_active
+        ]
+        if not self.fields:
+            raise ValueError("Match rule has no active match fields")
+        self.weights = np.array([field.weight for field in self.fields], dtype=np.float64)
+        # Stored comparison keys by name; the first field owning a name reads it
+        self.key_fields: Dict[str, CompiledField] = {}
+        for field in self.fields:
+            if field.key_name:
+                self.key_fields.setdefault(field.key_name, field)
+        self._spec = (
+            {name: getattr(rule, name) for name in _RULE_ATTRS},
+            [{name: getattr(field, name) for name in _FIELD_ATTRS} for field in rule.match_fields],
+            {field.attribute_id: attribute_codes[field.attribute_id] for field in rule.match_fields},
+        )
+
+    def __reduce__(self):
+        # Compiled comparisons hold closures; pickle the definition and recompile
+        return _rebuild_scorer, self._spec
+
+    @property
+    def field_codes(self) -> List[str]:
+        return [field.attribute_code for field in self.fields]
+
+    def prepare(
+        self, records: Sequence[Dict[str, Any]], keys: Optional[Sequence[Optional[ComparisonKeys]]] = None
+    ) -> List[FieldColumn]:
+        """Per-field columns; ``keys`` are stored comparison inputs aligned with ``records``."""
+        return [
+            field.prepare(records, keys if self.key_fields.get(field.key_name) is field else None)
+            for field in self.fields
+        ]
+
+    def score(self, columns: List[FieldColumn], left: np.ndarray, right: np.ndarray) -> ScoredPairs:
+        """Score pairs of record positions.
+
+        Null handling: MATCH counts a null side as similarity 1, NO_MATCH as 0,
+        IGNORE drops the field's weight for that pair.
+        """
+        count = left.size
+        field_scores = np.empty((count, len(self.fields)), dtype=np.float64)
+        weights = np.broadcast_to(self.weights, field_scores.shape).copy()
+        for position, (field, column) in enumerate(zip(self.fields, columns)):
+            similarity, nulls = field.score(column, left, right)
+            if field.null_handling == NullHandling.MATCH:
+                similarity[nulls] = 1.0
+            elif field.null_handling == NullHandling.IGNORE:
+                weights[nulls, position] = 0.0
+            field_scores[:, position] = similarity
+
+        total_weight = weights.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(total_weight > 0, (field_scores * weights).sum(axis=1) / total_weight, 0.0)
+        return ScoredPairs(
+            left, right, scores, field_scores,
+            scores >= self.match_threshold,
+            scores >= self.auto_merge_threshold,
+        )
+
+
+def _rebuild_scorer(rule: dict, fields: List[dict], attribute_codes: Dict[Any, str]) -> MatchScorer:
+    rule = SimpleNamespace(**rule, match_fields=[SimpleNamespace(**field) for field in fields])
+    return MatchScorer(rule, attribute_codes)
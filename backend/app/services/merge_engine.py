@@ -0,0 +1,545 @@
+"""Survivorship: building golden records from clusters of matched records."""
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import and_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.core.config import settings
+from app.models.attribute import MDMAttribute
+from app.models.match_merge import CandidateStatus, MDMMatchCandidate, MDMMergeStrategy, StrategyType
+from app.models.record import MDMGoldenRecord, MDMGoldenRecordMember, MDMRecord
+from app.services.metadata_cache import metadata_cache
+from app.utils.bulk import chunked
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MergeSource(NamedTuple):
+    """A cluster member as seen by survivorship functions."""
+    record_id: Hashable
+    source_system: Optional[str]
+    updated_at: datetime
+    data: Dict[str, Any]
+
+
+class Survivor(NamedTuple):
+    """The surviving value of one attribute and the records it came from."""
+    value: Any
+    record_ids: Tuple[Hashable, ...]
+    source_system: Optional[str]
+
+
+# A survivorship function receives the non-blank (value, source) candidates of
+# one attribute in a cluster, most recent first, and returns the survivor
+SurvivorFunc = Callable[[List[Tuple[Any, MergeSource]]], Optional[Survivor]]
+
+# Functions referenced by a CUSTOM strategy's custom_function
+CUSTOM_MERGE_FUNCTIONS: Dict[str, SurvivorFunc] = {}
+
+
+def register_merge_function(name: str):
+    """Register a survivorship function usable by CUSTOM merge strategies."""
+    def decorator(func: SurvivorFunc):
+        CUSTOM_MERGE_FUNCTIONS[name] = func
+        return func
+    return decorator
+
+
+def is_blank(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, (list, dict)):
+        return not value
+    return False
+
+
+def _completeness(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.strip())
+    if isinstance(value, (list, dict)):
+        return len(value)
+    return 1
+
+
+def _pick(candidate: Tuple[Any, MergeSource]) -> Survivor:
+    value, source = candidate
+    return Survivor(value, (source.record_id,), source.source_system)
+
+
+def most_recent(candidates: List[Tuple[Any, MergeSource]]) -> Optional[Survivor]:
+    return _pick(candidates[0]) if candidates else None
+
+
+def most_complete(candidates: List[Tuple[Any, MergeSource]]) -> Optional[Survivor]:
+    if not candidates:
+        return None
+    # max() keeps the first (most recent) of equally complete values
+    return _pick(max(candidates, key=lambda candidate: _completeness(candidate[0])))
+
+
+def most_trusted(trust_order: Sequence[str]) -> SurvivorFunc:
+    """Prefer sources earlier in the trust order; unlisted sources rank last, then by recency."""
+    ranks = {source: rank for rank, source in enumerate(trust_order)}
+    unlisted = len(ranks)
+
+    def survive(candidates: List[Tuple[Any, MergeSource]]) -> Optional[Survivor]:
+        if not candidates:
+            return None
+        return _pick(min(candidates, key=lambda candidate: ranks.get(candidate[1].source_system, unlisted)))
+    return survive
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _aggregate_values(function: str, values: List[Any]) -> Any:
+    if function == "COUNT":
+        return len(values)
+    if function == "UNION":
+        seen, union = set(), []
+        for value in values:
+            for item in value if isinstance(value, list) else [value]:
+                key = repr(item)
+                if key not in seen:
+                    seen.add(key)
+                    union.append(item)
+        return union
+    if function == "CONCAT":
+        return ", ".join(dict.fromkeys(str(value) for value in values))
+
+    numbers = [_number(value) for value in values]
+    if function in ("MIN", "MAX") and any(number is None for number in numbers):
+        # Non-numeric values (e.g. ISO dates) compare as strings
+        return (min if function == "MIN" else max)(values, key=str)
+    numbers = [number for number in numbers if number is not None]
+    if not numbers:
+        return None
+    if function == "SUM":
+        return sum(numbers)
+    if function == "AVG":
+        return sum(numbers) / len(numbers)
+    return min(numbers) if function == "MIN" else max(numbers)
+
+
+AGGREGATE_FUNCTIONS = frozenset({"SUM", "AVG", "MIN", "MAX", "COUNT", "UNION", "CONCAT"})
+
+
+def aggregate(function: str) -> SurvivorFunc:
+    """Combine the values of all members; every contributing record is in the lineage."""
+    function = (function or "").upper()
+    if function not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"Unknown aggregate function '{function}'")
+
+    def survive(candidates: List[Tuple[Any, MergeSource]]) -> Optional[Survivor]:
+        if not candidates:
+            return None
+        value = _aggregate_values(function, [value for value, _ in candidates])
+        return Survivor(value, tuple(source.record_id for _, source in candidates), None)
+    return survive
+
+
+class AttributeSurvivorship:
+    """Compiled merge strategy of one attribute."""
+    __slots__ = ("attribute_code", "strategy", "survive")
+
+    def __init__(self, attribute_code: str, strategy: StrategyType, survive: SurvivorFunc):
+        self.attribute_code = attribute_code
+        self.strategy = strategy
+        self.survive = survive
+
+
+def compile_strategy(attribute_code: str, strategy: MDMMergeStrategy) -> AttributeSurvivorship:
+    """Compile a merge strategy row; raises ValueError on invalid configuration."""
+    strategy_type = StrategyType(strategy.strategy_type or StrategyType.MOST_RECENT)
+    if strategy_type == StrategyType.MOST_TRUSTED:
+        order = strategy.trust_source_order or []
+        if not isinstance(order, list):
+            raise ValueError("trust_source_order must be a list of source systems")
+        survive = most_trusted(order)
+    elif strategy_type == StrategyType.MOST_COMPLETE:
+        survive = most_complete
+    elif strategy_type == StrategyType.AGGREGATE:
+        survive = aggregate(strategy.aggregate_function)
+    elif strategy_type == StrategyType.CUSTOM:
+        name = strategy.custom_function or ""
+        if name not in CUSTOM_MERGE_FUNCTIONS:
+            raise ValueError(f"Unknown custom merge function '{name}'")
+        survive = CUSTOM_MERGE_FUNCTIONS[name]
+    else:
+        # MANUAL values are kept from the existing golden record in merge_batch
+        survive = most_recent
+    return AttributeSurvivorship(attribute_code, strategy_type, survive)
+
+
+class MergeResult(NamedTuple):
+    """Golden data and per-attribute lineage for one cluster."""
+    data: Dict[str, Any]
+    lineage: Dict[str, dict]
+
+
+class EntityMergePlan:
+    """Survivorship for all attributes of an entity; unconfigured attributes use MOST_RECENT."""
+
+    def __init__(self, entity_id: str, attributes: List[AttributeSurvivorship], compile_errors: List[str]):
+        self.entity_id = entity_id
+        self.attributes = attributes
+        self.compile_errors = compile_errors
+        self._configured = {attribute.attribute_code for attribute in attributes}
+
+    def merge_batch(
+        self,
+        clusters: Sequence[Sequence[MergeSource]],
+        previous: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+    ) -> List[MergeResult]:
+        """Merge clusters attribute by attribute.
+
+        ``previous`` holds the current golden data per cluster (or None); MANUAL
+        attributes keep their value from it.
+        """
+        previous = previous or [None] * len(clusters)
+        # Most recent first, so ties resolve to the latest value
+        ordered = [
+            sorted(members, key=lambda source: (source.updated_at, str(source.record_id)), reverse=True)
+            for members in clusters
+        ]
+        results = [MergeResult({}, {}) for _ in clusters]
+
+        columns = list(self.attributes)
+        extra = dict.fromkeys(
+            code for members in ordered for source in members for code in source.data
+            if code not in self._configured
+        )
+        columns.extend(AttributeSurvivorship(code, StrategyType.MOST_RECENT, most_recent) for code in extra)
+
+        for attribute in columns:
+            code = attribute.attribute_code
+            for members, prior, result in zip(ordered, previous, results):
+                if attribute.strategy == StrategyType.MANUAL and prior and code in prior:
+                    result.data[code] = prior[code]
+                    result.lineage[code] = {"strategy": attribute.strategy.value, "records": [], "source": None}
+                    continue
+
+                candidates = [
+                    (source.data[code], source) for source in members if not is_blank(source.data.get(code))
+                ]
+                survivor = attribute.survive(candidates)
+                if survivor is None:
+                    continue
+                result.data[code] = survivor.value
+                result.lineage[code] = {
+                    "strategy": attribute.strategy.value,
+                    "records": [str(record_id) for record_id in survivor.record_ids],
+                    "source": survivor.source_system,
+                }
+        return results
+
+
+class MergeEngine:
+    """Caches compiled merge plans per entity."""
+
+    def __init__(self):
+        self.plans = TTLCache(maxsize=settings.MERGE_PLAN_CACHE_SIZE, ttl=settings.MERGE_PLAN_TTL_SECONDS)
+        metadata_cache.on_invalidate(self.evict)
+
+    def evict(self, entity_id: Optional[str]):
+        """Drop a cached entity plan (all plans when entity_id is None)."""
+        if entity_id is None:
+            self.plans.clear()
+        else:
+            self.plans.delete(str(entity_id))
+
+    def compile_plan(self, entity_id, strategies: Sequence[Tuple[str, MDMMergeStrategy]]) -> EntityMergePlan:
+        attributes, errors = [], []
+        for code, strategy in strategies:
+            try:
+                attributes.append(compile_strategy(code, strategy))
+            except ValueError as e:
+                errors.append(f"{code} [{strategy.id}]: {e}")
+        return EntityMergePlan(str(entity_id), attributes, errors)
+
+    async def get_plan(self, db: AsyncSession, entity_id) -> EntityMergePlan:
+        """Return the merge plan for an entity, compiling it on first use."""
+        key = str(entity_id)
+        plan = self.plans.get(key)
+        if plan is not None:
+            return plan
+
+        result = await db.execute(
+            select(MDMAttribute.attribute_code, MDMMergeStrategy)
+            .select_from(MDMMergeStrategy)
+            .join(MDMAttribute, MDMAttribute.id == MDMMergeStrategy.attribute_id)
+            .where(
+                MDMMergeStrategy.entity_id == entity_id,
+                MDMMergeStrategy.is_active == True,
+                MDMAttribute.is_active == True
+            )
+            .order_by(MDMAttribute.display_order, MDMMergeStrategy.updated_at.desc())
+        )
+        # The most recently updated strategy wins when an attribute has several
+        strategies = {}
+        for code, strategy in result.tuples().all():
+            strategies.setdefault(code, strategy)
+        plan = self.compile_plan(key, list(strategies.items()))
+        self.plans.set(key, plan)
+        return plan
+
+
+merge_engine = MergeEngine()
+
+
+def _golden_ids(clusters: Sequence[Sequence[Hashable]], memberships: Dict[Hashable, Hashable]) -> List[Optional[Hashable]]:
+    """Reuse, per cluster, the golden record holding most of its members (each at most once)."""
+    used, golden_ids = set(), []
+    for members in clusters:
+        counts = Counter(memberships[record_id] for record_id in members if record_id in memberships)
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+        golden_id = next((golden_id for golden_id, _ in ranked if golden_id not in used), None)
+        if golden_id is not None:
+            used.add(golden_id)
+        golden_ids.append(golden_id)
+    return golden_ids
+
+
+async def _member_sources(db: AsyncSession, golden_ids: Sequence[Hashable]) -> Dict[Hashable, List[MergeSource]]:
+    """Active member records of each golden record."""
+    members: Dict[Hashable, List[MergeSource]] = defaultdict(list)
+    for ids in chunked(golden_ids, settings.BULK_INSERT_CHUNK_SIZE):
+        result = await db.execute(
+            select(
+                MDMGoldenRecordMember.golden_record_id, MDMRecord.id, MDMRecord.source_system,
+                MDMRecord.updated_at, MDMRecord.data
+            )
+            .join(MDMRecord, MDMRecord.id == MDMGoldenRecordMember.record_id)
+            .where(MDMGoldenRecordMember.golden_record_id.in_(list(ids)), MDMRecord.is_active == True)
+        )
+        for row in result.all():
+            members[row.golden_record_id].append(MergeSource(row.id, row.source_system, row.updated_at, row.data or {}))
+    return members
+
+
+async def _upsert_golden_rows(db: AsyncSession, rows: List[dict]):
+    """Insert golden records, or update them in place when the id exists."""
+    for chunk in chunked(rows, settings.BULK_INSERT_CHUNK_SIZE):
+        stmt = insert(MDMGoldenRecord).values(list(chunk))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("data", "lineage", "member_count", "version", "is_active", "updated_at", "updated_by")
+            }
+        )
+        await db.execute(stmt)
+
+
+async def _refresh_golden(
+    db: AsyncSession,
+    plan: EntityMergePlan,
+    golden_ids: Sequence[UUID],
+    user_id: Optional[UUID],
+    now: datetime,
+    stats: Dict[str, int],
+):
+    """Recompute golden records from their remaining active members; deactivate those left with none."""
+    remaining = await _member_sources(db, golden_ids)
+    existing = {}
+    for ids in chunked(golden_ids, settings.BULK_INSERT_CHUNK_SIZE):
+        result = await db.execute(
+            select(MDMGoldenRecord.id, MDMGoldenRecord.entity_id, MDMGoldenRecord.data, MDMGoldenRecord.version)
+            .where(MDMGoldenRecord.id.in_(list(ids)), MDMGoldenRecord.is_active == True)
+        )
+        existing.update((row.id, row) for row in result.all())
+
+    kept = [golden_id for golden_id in existing if remaining[golden_id]]
+    merged = plan.merge_batch([remaining[golden_id] for golden_id in kept], [existing[golden_id].data for golden_id in kept])
+    await _upsert_golden_rows(db, [
+        {
+            "id": golden_id,
+            "entity_id": existing[golden_id].entity_id,
+            "data": result.data,
+            "lineage": result.lineage,
+            "member_count": len(remaining[golden_id]),
+            "version": existing[golden_id].version + 1,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+            "created_by": user_id,
+            "updated_by": user_id,
+        }
+        for golden_id, result in zip(kept, merged)
+    ])
+    stats["golden_updated"] += len(kept)
+
+    emptied = [golden_id for golden_id in existing if not remaining[golden_id]]
+    for ids in chunked(emptied, settings.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(
+            update(MDMGoldenRecord)
+            .where(MDMGoldenRecord.id.in_(list(ids)))
+            .values(is_active=False, member_count=0, updated_at=now, updated_by=user_id)
+            .execution_options(synchronize_session=False)
+        )
+    stats["golden_deactivated"] += len(emptied)
+
+
+async def _merge_batch(
+    db: AsyncSession,
+    plan: EntityMergePlan,
+    entity_id: UUID,
+    clusters: Sequence[Sequence[UUID]],
+    user_id: Optional[UUID],
+    stats: Dict[str, int],
+):
+    record_ids = list({record_id for members in clusters for record_id in members})
+    sources: Dict[Hashable, MergeSource] = {}
+    memberships: Dict[Hashable, Hashable] = {}
+    for ids in chunked(record_ids, settings.BULK_INSERT_CHUNK_SIZE):
+        result = await db.execute(
+            select(MDMRecord.id, MDMRecord.source_system, MDMRecord.updated_at, MDMRecord.data).where(
+                MDMRecord.id.in_(list(ids)), MDMRecord.entity_id == entity_id, MDMRecord.is_active == True
+            )
+        )
+        sources.update((row.id, MergeSource(row.id, row.source_system, row.updated_at, row.data or {})) for row in result.all())
+        result = await db.execute(
+            select(MDMGoldenRecordMember.record_id, MDMGoldenRecordMember.golden_record_id)
+            .where(MDMGoldenRecordMember.record_id.in_(list(ids)))
+        )
+        memberships.update(result.tuples().all())
+
+    # Unknown or inactive records drop out; a single remaining record is not a cluster
+    clusters = [[r for r in members if r in sources] for members in clusters]
+    stats["clusters_skipped"] += sum(1 for members in clusters if len(members) < 2)
+    clusters = [members for members in clusters if len(members) >= 2]
+    if not clusters:
+        return
+
+    golden_ids = _golden_ids(clusters, memberships)
+    existing = {}
+    reused = [golden_id for golden_id in golden_ids if golden_id is not None]
+    if reused:
+        result = await db.execute(
+            select(MDMGoldenRecord.id, MDMGoldenRecord.data, MDMGoldenRecord.version)
+            .where(MDMGoldenRecord.id.in_(reused))
+        )
+        existing = {row.id: row for row in result.all()}
+
+    # A reused golden record keeps its members outside the batch, so they take part in survivorship
+    batch_records = set(record_ids)
+    extra = {
+        golden_id: [source for source in members if source.record_id not in batch_records]
+        for golden_id, members in (await _member_sources(db, reused)).items()
+    }
+
+    previous = [existing[golden_id].data if golden_id in existing else None for golden_id in golden_ids]
+    merged = plan.merge_batch(
+        [[sources[r] for r in members] + extra.get(golden_id, []) for members, golden_id in zip(clusters, golden_ids)],
+        previous
+    )
+
+    now = datetime.utcnow()
+    golden_rows, member_rows = [], []
+    for members, golden_id, result in zip(clusters, golden_ids, merged):
+        prior = existing.get(golden_id)
+        if prior is None:
+            golden_id = uuid4()
+            stats["golden_created"] += 1
+        else:
+            stats["golden_updated"] += 1
+        golden_rows.append({
+            "id": golden_id,
+            "entity_id": entity_id,
+            "data": result.data,
+            "lineage": result.lineage,
+            "member_count": len(members) + len(extra.get(golden_id, [])),
+            "version": prior.version + 1 if prior else 1,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+            "created_by": user_id,
+            "updated_by": user_id,
+        })
+        member_rows.extend(
+            {"record_id": record_id, "golden_record_id": golden_id, "entity_id": entity_id, "merged_at": now}
+            for record_id in members
+        )
+    stats["records_merged"] += len(member_rows)
+
+    await _upsert_golden_rows(db, golden_rows)
+    for chunk in chunked(member_rows, settings.BULK_INSERT_CHUNK_SIZE):
+        stmt = insert(MDMGoldenRecordMember).values(list(chunk))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["record_id"],
+            set_={column: stmt.excluded[column] for column in ("golden_record_id", "merged_at")}
+        )
+        await db.execute(stmt)
+
+    batch_golden_ids = [row["id"] for row in golden_rows]
+    # Golden records that lost members to another cluster
+    shrunk = set(memberships.values()) - set(batch_golden_ids)
+    if shrunk:
+        await _refresh_golden(db, plan, list(shrunk), user_id, now, stats)
+
+    # Candidates now inside one golden record are resolved
+    left, right = aliased(MDMGoldenRecordMember), aliased(MDMGoldenRecordMember)
+    for ids in chunked(batch_golden_ids, settings.BULK_INSERT_CHUNK_SIZE):
+        await db.execute(
+            update(MDMMatchCandidate)
+            .where(
+                MDMMatchCandidate.status != CandidateStatus.REJECTED,
+                MDMMatchCandidate.status != CandidateStatus.MERGED,
+                left.record_id == MDMMatchCandidate.left_record_id,
+                right.record_id == MDMMatchCandidate.right_record_id,
+                and_(left.golden_record_id == right.golden_record_id, left.golden_record_id.in_(list(ids)))
+            )
+            .values(status=CandidateStatus.MERGED, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+
+async def merge_clusters(
+    db: AsyncSession,
+    entity_id,
+    clusters: Sequence[Sequence[UUID]],
+    user_id: Optional[UUID] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Build or refresh golden records for clusters of record ids, committing per batch.
+
+    A cluster reuses the golden record that already holds most of its members,
+    so re-merging after a cluster grows updates it in place. A record listed
+    in several clusters stays in the first one. Golden records that lose
+    members to a cluster are recomputed from the members they keep.
+    """
+    batch_size = batch_size or settings.MERGE_BATCH_SIZE
+    entity_uuid = UUID(str(entity_id))
+    plan = await merge_engine.get_plan(db, entity_uuid)
+    stats = {
+        "clusters_skipped": 0, "golden_created": 0, "golden_updated": 0, "golden_deactivated": 0, "records_merged": 0
+    }
+
+    seen = set()
+    unique_clusters = []
+    for members in clusters:
+        members = [record_id for record_id in dict.fromkeys(members) if record_id not in seen]
+        seen.update(members)
+        unique_clusters.append(members)
+
+    for batch in chunked(unique_clusters, batch_size):
+        await _merge_batch(db, plan, entity_uuid, batch, user_id, stats)
+        await db.commit()
+
+    logger.info("Merged %d clusters for entity %s: %s", len(clusters), entity_id, stats)
+    return {**stats, "compile_errors": plan.compile_errors}
@@ -0,0 +1,211 @@
+"""Two-tier (process LRU + Redis) cache for entity and attribute metadata."""
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class MetadataCache:
+    """Versioned metadata cache keyed by owner id (entity, catalog) and code.
+
+    Redis data keys embed a per-owner generation; invalidation bumps it, so a
+    value loaded before a write can never be served after it.
+    """
+
+    def __init__(self, prefix: str = "mdm:meta:v1", enabled: Optional[bool] = None):
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.enabled = settings.METADATA_CACHE_ENABLED if enabled is None else enabled
+        self.local = TTLCache(
+            maxsize=settings.METADATA_CACHE_LOCAL_MAXSIZE,
+            ttl=settings.METADATA_CACHE_LOCAL_TTL_SECONDS,
+        )
+        self.redis_ttl = settings.METADATA_CACHE_REDIS_TTL_SECONDS
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self._evictions = 0
+        self._listener: Optional[asyncio.Task] = None
+        self._invalidation_callbacks: List[Callable[[Optional[str]], None]] = []
+
+    # Redis helpers
+    async def _redis(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a Redis operation, treating connection problems as a cache miss."""
+        try:
+            return await operation()
+        except (RedisError, OSError) as e:
+            logger.debug("Metadata cache Redis error: %s", e)
+            return None
+
+    async def _generation(self, owner_id: str) -> int:
+        value = await self._redis(lambda: redis_client.get(f"{self.prefix}:gen:{owner_id}"))
+        return int(value) if value else 0
+
+    def _data_key(self, owner_id: str, generation: int, kind: str) -> str:
+        return f"{self.prefix}:{owner_id}:{generation}:{kind}"
+
+    # Lookups
+    async def get_or_load(
+        self,
+        owner_id,
+        kind: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """Return cached metadata for an owner, loading it on a miss.
+
+        ``kind`` distinguishes payloads of the same owner (e.g. ``entity`` or
+        ``attributes:<filters>``). Loaders must return JSON-serializable data;
+        ``None`` results are not cached. Loaders should read from the primary:
+        a lagging replica would put pre-write data under the new generation.
+        A value is not stored when the owner was invalidated while loading.
+        """
+        if not self.enabled:
+            return await loader()
+
+        owner_id = str(owner_id)
+        local_key = (owner_id, kind)
+        value = self.local.get(local_key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        generation = await self._generation(owner_id)
+        data_key = self._data_key(owner_id, generation, kind)
+        raw = await self._redis(lambda: redis_client.get(data_key))
+        if raw is not None:
+            self.redis_hits += 1
+            value = json.loads(raw)
+            self.local.set(local_key, value, ttl=self._local_ttl(ttl))
+            return value
+
+        self.redis_misses += 1
+        evictions = self._evictions
+        value = await loader()
+        if value is not None and evictions == self._evictions and generation == await self._generation(owner_id):
+            await self._store(owner_id, kind, value, ttl, generation)
+        return value
+
+    async def put(self, owner_id, kind: str, value: Any, ttl: Optional[int] = None):
+        """Store a value under the owner's current generation."""
+        if not self.enabled:
+            return
+        owner_id = str(owner_id)
+        await self._store(owner_id, kind, value, ttl, await self._generation(owner_id))
+
+    async def _store(self, owner_id: str, kind: str, value: Any, ttl: Optional[int], generation: int):
+        data_key = self._data_key(owner_id, generation, kind)
+        await self._redis(lambda: redis_client.set(data_key, json.dumps(value), ex=ttl or self.redis_ttl))
+        self.local.set((owner_id, kind), value, ttl=self._local_ttl(ttl))
+
+    def _local_ttl(self, ttl: Optional[int]) -> float:
+        return min(self.local.ttl, ttl) if ttl else self.local.ttl
+
+    async def resolve_code(self, code: str) -> Optional[str]:
+        """Map a code to its owner id using the cache only."""
+        if not self.enabled:
+            return None
+        owner_id = self.local.get(("code", code))
+        if owner_id is None:
+            owner_id = await self._redis(lambda: redis_client.get(f"{self.prefix}:code:{code}"))
+            if owner_id:
+                self.local.set(("code", code), owner_id)
+        return owner_id
+
+    async def remember_code(self, code: str, owner_id):
+        if not self.enabled:
+            return
+        owner_id = str(owner_id)
+        self.local.set(("code", code), owner_id)
+        await self._redis(
+            lambda: redis_client.set(f"{self.prefix}:code:{code}", owner_id, ex=self.redis_ttl)
+        )
+
+    # Invalidation
+    def on_invalidate(self, callback: Callable[[Optional[str]], None]):
+        """Register a callback run with the owner id whenever an owner is invalidated locally.
+
+        The callback receives None when invalidations may have been missed and
+        everything derived from cached metadata should be dropped.
+        """
+        self._invalidation_callbacks.append(callback)
+
+    def _evict_local(self, owner_id: str, code: Optional[str] = None):
+        self._evictions += 1
+        self.local.delete_where(lambda key: key[0] == owner_id)
+        if code:
+            self.local.delete(("code", code))
+        for callback in self._invalidation_callbacks:
+            callback(owner_id)
+
+    async def invalidate(self, owner_id, code: Optional[str] = None):
+        """Invalidate all cached metadata for an owner on every worker."""
+        owner_id = str(owner_id)
+        self._evict_local(owner_id, code)
+        if not self.enabled:
+            return
+
+        async def _invalidate():
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.incr(f"{self.prefix}:gen:{owner_id}")
+                if code:
+                    pipe.delete(f"{self.prefix}:code:{code}")
+                pipe.publish(self.channel, json.dumps({"owner_id": owner_id, "code": code}))
+                await pipe.execute()
+
+        await self._redis(_invalidate)
+
+    async def _listen(self):
+        """Evict local entries when other workers publish invalidations."""
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    self._evict_local(payload["owner_id"], payload.get("code"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.warning("Metadata cache subscription lost: %s", e)
+                self._evictions += 1
+                self.local.clear()
+                for callback in self._invalidation_callbacks:
+                    callback(None)
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+
+    async def start(self):
+        """Start the cross-worker invalidation listener."""
+        if self.enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "local": self.local.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+        }
+
+
+metadata_cache = MetadataCache()
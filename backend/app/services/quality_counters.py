@@ -0,0 +1,357 @@
+"""Quality scores maintained incrementally on record writes.
+
+Each BUILTIN rule has a counter row (records evaluated / passed). Record
+writes apply the difference between the record's old and new contribution
+as atomic increments. Uniqueness rules also keep a count per key value:
+the passing records are those whose key is counted exactly once.
+Reconciliation recomputes everything from one scan per entity.
+
+Pattern rules are checked with the database's POSIX ``~`` operator on write
+too, so the running counts and a reconciliation agree on every regex.
+"""
+import hashlib
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+from uuid import UUID
+from sqlalchemy import Text, and_, delete, func, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.attribute import MDMAttribute
+from app.models.catalog import MDMCatalog, MDMCatalogValue
+from app.models.quality import MDMQualityCounter, MDMQualityKeyCount, MDMQualityRule, QualityDimension, RuleType
+from app.models.record import MDMRecord
+from app.services.metadata_cache import metadata_cache
+from app.services.quality_engine import attribute_value, check_pattern, compile_rules, evaluate_checks, parse_builtin
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+KEY_SEPARATOR = "\x1f"
+
+# (old data, new data) of a record; None when the record is absent or inactive
+RecordChange = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def _jsonb_text(value: Any) -> str:
+    """Text of a JSON value as jsonb prints it: keys by length then bytes, plain numbers."""
+    if isinstance(value, dict):
+        keys = sorted(value, key=lambda key: (len(key.encode()), key.encode()))
+        return "{" + ", ".join(f"{_jsonb_text(key)}: {_jsonb_text(value[key])}" for key in keys) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(_jsonb_text(item) for item in value) + "]"
+    if isinstance(value, float):
+        return format(Decimal(repr(value)), "f")
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _text(value: Any) -> Optional[str]:
+    """Python equivalent of btrim(data->>'code') with blanks as NULL."""
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        value = _jsonb_text(value)
+    return value.strip(" ") or None
+
+
+def key_hash(values: Sequence[str]) -> str:
+    """Hash of a uniqueness key; matches md5(concat_ws(KEY_SEPARATOR, ...)) in SQL."""
+    return hashlib.md5(KEY_SEPARATOR.join(values).encode()).hexdigest()
+
+
+class RowCheck(NamedTuple):
+    """A BUILTIN rule evaluated against a single record."""
+    rule_id: UUID
+    dimension: QualityDimension
+    check: str
+    codes: Tuple[str, ...]
+    pattern: Optional[str] = None  # POSIX regular expression
+    catalog_id: Optional[UUID] = None
+
+    def values(self, data: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        """The rule's attribute values, or None when the record lacks any of them."""
+        if data is None:
+            return None
+        values = [_text(data.get(code)) for code in self.codes]
+        return None if any(value is None for value in values) else values
+
+    def contribution(self, data: Optional[Dict[str, Any]], passing: Set[Tuple[Any, str]]) -> Tuple[int, int]:
+        """(evaluated, passed) of one record for non-uniqueness rules.
+
+        ``passing`` holds the (catalog_id, value) and (pattern, value) pairs that pass.
+        """
+        if data is None:
+            return 0, 0
+        values = self.values(data)
+        if self.check == "completeness":
+            return 1, int(values is not None)
+        if values is None:
+            return 0, 0
+        if self.check == "pattern":
+            return 1, int((self.pattern, values[0]) in passing)
+        return 1, int((self.catalog_id, values[0]) in passing)
+
+
+class QualityCounterPlan:
+    """Row checks for an entity's active BUILTIN rules."""
+
+    def __init__(self, entity_id: str, checks: List[RowCheck], compile_errors: List[str]):
+        self.entity_id = entity_id
+        self.checks = checks
+        self.compile_errors = compile_errors
+
+
+class QualityCounterEngine:
+    """Caches counter plans per entity."""
+
+    def __init__(self):
+        self.plans = TTLCache(maxsize=settings.QUALITY_PLAN_CACHE_SIZE, ttl=settings.QUALITY_PLAN_TTL_SECONDS)
+        metadata_cache.on_invalidate(self.evict)
+
+    def evict(self, entity_id: Optional[str]):
+        """Drop a cached entity plan (all plans when entity_id is None)."""
+        if entity_id is None:
+            self.plans.clear()
+        else:
+            self.plans.delete(str(entity_id))
+
+    async def get_plan(self, db: AsyncSession, entity_id) -> QualityCounterPlan:
+        key = str(entity_id)
+        plan = self.plans.get(key)
+        if plan is not None:
+            return plan
+
+        result = await db.execute(
+            select(MDMQualityRule).where(
+                MDMQualityRule.entity_id == entity_id,
+                MDMQualityRule.is_active == True,
+                MDMQualityRule.rule_type == RuleType.BUILTIN
+            )
+        )
+        rules = result.scalars().all()
+        result = await db.execute(
+            select(MDMAttribute.attribute_code, MDMAttribute.catalog_id)
+            .where(MDMAttribute.entity_id == entity_id, MDMAttribute.is_active == True)
+        )
+        catalogs = dict(result.tuples().all())
+
+        checks, errors, catalog_codes = [], [], {}
+        for rule in rules:
+            try:
+                check, codes, options = parse_builtin(rule.rule_expression)
+                unknown = [code for code in codes if code not in catalogs]
+                if unknown:
+                    raise ValueError(f"Unknown attribute(s): {', '.join(unknown)}")
+                row_check = RowCheck(rule.id, rule.dimension, check, tuple(codes))
+                if check == "pattern":
+                    if len(options) != 1:
+                        raise ValueError("pattern() needs a regular expression")
+                    await check_pattern(db, options[0])
+                    checks.append(row_check._replace(pattern=options[0]))
+                elif check == "validity" and options:
+                    if options[0] not in catalog_codes:
+                        result = await db.execute(select(MDMCatalog.id).where(MDMCatalog.catalog_code == options[0]))
+                        catalog_codes[options[0]] = result.scalar_one_or_none()
+                    checks.append(row_check._replace(catalog_id=catalog_codes[options[0]]))
+                elif check == "validity":
+                    if not catalogs[codes[0]]:
+                        raise ValueError(f"Attribute '{codes[0]}' has no catalog; pass a catalog code")
+                    checks.append(row_check._replace(catalog_id=catalogs[codes[0]]))
+                else:
+                    checks.append(row_check)
+            except (ValueError, IndexError) as e:
+                errors.append(f"{rule.rule_code}: {e}")
+
+        plan = QualityCounterPlan(key, checks, errors)
+        self.plans.set(key, plan)
+        return plan
+
+
+quality_counter_engine = QualityCounterEngine()
+
+
+def _check_values(checks: List[RowCheck], changes: Sequence[RecordChange], kind: str):
+    for check in checks:
+        if check.check == kind:
+            for change in changes:
+                for data in change:
+                    values = check.values(data)
+                    if values is not None:
+                        yield check, values[0]
+
+
+async def _passing_values(db: AsyncSession, checks: List[RowCheck], changes: Sequence[RecordChange]):
+    """The (catalog_id, value) and (pattern, value) pairs among the changes that pass."""
+    passing = set()
+    pairs = {
+        (check.catalog_id, value) for check, value in _check_values(checks, changes, "validity")
+        if check.catalog_id is not None
+    }
+    if pairs:
+        result = await db.execute(
+            select(MDMCatalogValue.catalog_id, MDMCatalogValue.value_code).where(
+                tuple_(MDMCatalogValue.catalog_id, MDMCatalogValue.value_code).in_(list(pairs)),
+                MDMCatalogValue.is_active == True
+            )
+        )
+        passing.update(result.tuples().all())
+
+    pairs = {(check.pattern, value) for check, value in _check_values(checks, changes, "pattern")}
+    if pairs:
+        patterns, values = zip(*pairs)
+        pair = func.unnest(
+            literal(list(patterns), ARRAY(Text)), literal(list(values), ARRAY(Text))
+        ).table_valued("pattern", "value")
+        result = await db.execute(select(pair.c.pattern, pair.c.value).where(pair.c.value.op("~")(pair.c.pattern)))
+        passing.update(result.tuples().all())
+    return passing
+
+
+async def apply_record_changes(db: AsyncSession, entity_id, changes: Sequence[RecordChange]):
+    """Move the entity's quality counters by the given record changes; the caller commits."""
+    plan = await quality_counter_engine.get_plan(db, entity_id)
+    if not plan.checks or not changes:
+        return
+    passing = await _passing_values(db, plan.checks, changes)
+
+    deltas: Dict[UUID, List[int]] = defaultdict(lambda: [0, 0])
+    key_deltas: Dict[UUID, Counter] = defaultdict(Counter)
+    for check in plan.checks:
+        for old, new in changes:
+            if check.check == "uniqueness":
+                old_values, new_values = check.values(old), check.values(new)
+                if old_values != new_values:
+                    if old_values is not None:
+                        key_deltas[check.rule_id][key_hash(old_values)] -= 1
+                    if new_values is not None:
+                        key_deltas[check.rule_id][key_hash(new_values)] += 1
+                continue
+            old_counts, new_counts = check.contribution(old, passing), check.contribution(new, passing)
+            deltas[check.rule_id][0] += new_counts[0] - old_counts[0]
+            deltas[check.rule_id][1] += new_counts[1] - old_counts[1]
+
+    for rule_id, keys in key_deltas.items():
+        for key, delta in keys.items():
+            if not delta:
+                continue
+            stmt = insert(MDMQualityKeyCount).values(rule_id=rule_id, key_hash=key, record_count=delta)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["rule_id", "key_hash"],
+                set_={"record_count": MDMQualityKeyCount.record_count + stmt.excluded.record_count}
+            ).returning(MDMQualityKeyCount.record_count)
+            after = (await db.execute(stmt)).scalar_one()
+            before = after - delta
+            deltas[rule_id][0] += delta
+            deltas[rule_id][1] += int(after == 1) - int(before == 1)
+            if after <= 0:
+                await db.execute(delete(MDMQualityKeyCount).where(
+                    MDMQualityKeyCount.rule_id == rule_id, MDMQualityKeyCount.key_hash == key
+                ))
+
+    dimensions = {check.rule_id: check.dimension for check in plan.checks}
+    now = datetime.utcnow()
+    rows = [
+        {
+            "rule_id": rule_id,
+            "entity_id": entity_id,
+            "dimension": dimensions[rule_id],
+            "records_evaluated": evaluated,
+            "records_passed": passed,
+            "reconciled_at": None,
+            "updated_at": now,
+        }
+        for rule_id, (evaluated, passed) in sorted(deltas.items(), key=lambda item: str(item[0]))
+        if evaluated or passed
+    ]
+    if rows:
+        # A rule added since the last reconciliation gets its row here
+        stmt = insert(MDMQualityCounter).values(rows)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["rule_id"],
+            set_={
+                "records_evaluated": MDMQualityCounter.records_evaluated + stmt.excluded.records_evaluated,
+                "records_passed": MDMQualityCounter.records_passed + stmt.excluded.records_passed,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        ))
+
+
+async def reconcile_quality_counters(db: AsyncSession, entity_id) -> dict:
+    """Recompute the entity's counters and uniqueness key counts from scratch; the caller commits.
+
+    Writes committed while the scan runs may be lost from the counters until
+    the next reconciliation.
+    """
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": f"quality-reconcile:{entity_id}"}
+    )
+    quality_counter_engine.evict(str(entity_id))
+    result = await db.execute(
+        select(MDMQualityRule).where(
+            MDMQualityRule.entity_id == entity_id,
+            MDMQualityRule.is_active == True,
+            MDMQualityRule.rule_type == RuleType.BUILTIN
+        )
+    )
+    rules = result.scalars().all()
+    result = await db.execute(
+        select(MDMAttribute).where(MDMAttribute.entity_id == entity_id, MDMAttribute.is_active == True)
+    )
+    attributes = {attribute.attribute_code: attribute for attribute in result.scalars().all()}
+
+    checks, errors = await compile_rules(db, rules, attributes)
+
+    await db.execute(
+        delete(MDMQualityCounter).where(
+            MDMQualityCounter.entity_id == entity_id,
+            MDMQualityCounter.rule_id.notin_([check.rule.id for check in checks])
+        )
+    )
+    if not checks:
+        return {"rules": 0, "records": 0, "errors": errors}
+
+    now = datetime.utcnow()
+    total, counts = await evaluate_checks(db, entity_id, checks)
+    stmt = insert(MDMQualityCounter).values([
+        {
+            "rule_id": check.rule.id,
+            "entity_id": check.rule.entity_id,
+            "dimension": check.rule.dimension,
+            "records_evaluated": evaluated,
+            "records_passed": passed,
+            "reconciled_at": now,
+            "updated_at": now,
+        }
+        for check, (evaluated, passed) in zip(checks, counts)
+    ])
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["rule_id"],
+        set_={column: stmt.excluded[column] for column in (
+            "dimension", "records_evaluated", "records_passed", "reconciled_at", "updated_at"
+        )}
+    ))
+
+    for check in checks:
+        check_name, codes, _ = parse_builtin(check.rule.rule_expression)
+        if check_name != "uniqueness":
+            continue
+        await db.execute(delete(MDMQualityKeyCount).where(MDMQualityKeyCount.rule_id == check.rule.id))
+        values = [attribute_value(code) for code in codes]
+        key = func.md5(func.concat_ws(KEY_SEPARATOR, *values))
+        await db.execute(insert(MDMQualityKeyCount).from_select(
+            ["rule_id", "key_hash", "record_count"],
+            select(literal(check.rule.id, MDMQualityKeyCount.rule_id.type), key, func.count())
+            .where(
+                MDMRecord.entity_id == entity_id,
+                MDMRecord.is_active == True,
+                and_(*(value.isnot(None) for value in values))
+            )
+            .group_by(key)
+        ))
+
+    logger.info("Reconciled %d quality counters for entity %s over %d records", len(checks), entity_id, total)
+    return {"rules": len(checks), "records": total, "errors": errors}
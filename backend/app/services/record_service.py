@@ -0,0 +1,91 @@
+"""Write path for master data records."""
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.attribute import ApplyOn
+from app.models.record import MDMRecord, MDMRecordMatchKey
+from app.services.match_keys import write_record_keys
+from app.services.quality_counters import apply_record_changes
+from app.services.transform_engine import transform_engine
+from app.services.validation_engine import ValidationIssue, validation_engine
+
+
+class RecordValidationError(ValueError):
+    """Raised when record data fails ERROR-level validations; nothing is written."""
+
+    def __init__(self, issues: List[ValidationIssue]):
+        super().__init__(f"{len(issues)} validation error(s)")
+        self.issues = issues
+
+
+async def prepare_record_data(db: AsyncSession, entity_id, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply INPUT transforms, then validate; raises RecordValidationError on errors."""
+    transform_plan = await transform_engine.get_plan(db, entity_id)
+    data = transform_plan.transform_batch([data], ApplyOn.INPUT)[0]
+    validation_plan = await validation_engine.get_plan(db, entity_id)
+    report = await validation_plan.validate_batch_async([data])
+    if report.error_rows[0]:
+        raise RecordValidationError(report.issues)
+    return data
+
+
+async def create_record(
+    db: AsyncSession,
+    entity_id,
+    data: Dict[str, Any],
+    user_id: Optional[UUID] = None,
+    **fields: Any,
+) -> MDMRecord:
+    """Create a record with derived state (match keys, quality counters); the caller commits."""
+    data = await prepare_record_data(db, entity_id, data)
+    record = MDMRecord(entity_id=entity_id, data=data, created_by=user_id, updated_by=user_id, **fields)
+    db.add(record)
+    await db.flush()
+    await write_record_keys(db, entity_id, [(record.id, record.data)])
+    await apply_record_changes(db, entity_id, [(None, record.data)])
+    return record
+
+
+async def update_record(
+    db: AsyncSession,
+    record: MDMRecord,
+    data: Optional[Dict[str, Any]] = None,
+    is_active: Optional[bool] = None,
+    user_id: Optional[UUID] = None,
+) -> MDMRecord:
+    """Merge new values into a record and refresh derived state; the caller commits."""
+    old_data = record.data if record.is_active else None
+    if data is not None:
+        record.data = await prepare_record_data(db, record.entity_id, {**record.data, **data})
+        record.version += 1
+    if is_active is not None:
+        record.is_active = is_active
+    record.updated_by = user_id
+    await db.flush()
+
+    if record.is_active:
+        await write_record_keys(db, record.entity_id, [(record.id, record.data)])
+    else:
+        await db.execute(delete(MDMRecordMatchKey).where(MDMRecordMatchKey.record_id == record.id))
+    await apply_record_changes(db, record.entity_id, [(old_data, record.data if record.is_active else None)])
+    return record
+
+
+async def delete_record(db: AsyncSession, record: MDMRecord, hard_delete: bool = False):
+    """Soft or hard delete a record; the caller commits."""
+    if record.is_active:
+        await apply_record_changes(db, record.entity_id, [(record.data, None)])
+    if hard_delete:
+        await db.delete(record)
+    else:
+        record.is_active = False
+        await db.execute(delete(MDMRecordMatchKey).where(MDMRecordMatchKey.record_id == record.id))
+    await db.flush()
+
+
+async def get_record(db: AsyncSession, entity_id, record_id) -> Optional[MDMRecord]:
+    result = await db.execute(
+        select(MDMRecord).where(MDMRecord.id == record_id, MDMRecord.entity_id == entity_id)
+    )
+    return result.scalar_one_or_none()
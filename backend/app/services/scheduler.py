@@ -0,0 +1,397 @@
+"""In-process scheduler for quality rules and integration syncs.
+
+Every API replica runs the scheduler loop. Two mechanisms stop replicas
+from running a job twice:
+
+* A Redis tick lock, so usually only one replica evaluates schedules per tick.
+* The unique (job_key, scheduled_for) row in mdm_scheduled_run, which a replica
+  must insert before it runs an occurrence.
+
+Concurrency per entity and per connection is limited with Redis slots: a
+sorted set per entity or connection holding one token per running job,
+scored by when it expires. A replica that dies mid-run leaves its token to
+expire after SCHEDULER_JOB_TIMEOUT_SECONDS, so its slot is freed.
+Occurrences that could not start within the misfire grace period are
+recorded as MISSED.
+"""
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.core.redis import redis_client
+from app.models.integration import ConnectionType, MDMIntegrationMapping
+from app.models.quality import MDMQualityRule, RuleType
+from app.models.scheduler import MDMScheduledRun, ScheduledJobKind, ScheduledRunStatus
+from app.services.audit_partitions import maintain_audit_partitions
+from app.services.quality_counters import reconcile_quality_counters
+from app.services.quality_engine import run_quality_rules
+from app.utils.cron import occurrences, parse_schedule
+
+logger = logging.getLogger(__name__)
+
+# Sync implementations per connection type; each returns a JSON-serializable summary
+SyncHandler = Callable[[AsyncSession, MDMIntegrationMapping], Awaitable[Optional[dict]]]
+SYNC_HANDLERS: Dict[ConnectionType, SyncHandler] = {}
+
+
+def register_sync_handler(connection_type: ConnectionType):
+    """Register the function that runs scheduled syncs for a connection type."""
+    def decorator(func: SyncHandler):
+        SYNC_HANDLERS[ConnectionType(connection_type)] = func
+        return func
+    return decorator
+
+
+# Drop expired tokens, then add one if fewer than the limit are held.
+# KEYS[1]: slot set; ARGV: limit, token lifetime in seconds, token
+_ACQUIRE_SLOT = redis_client.register_script("""
+local now = tonumber(redis.call('TIME')[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+""")
+
+
+class ScheduledJob(NamedTuple):
+    """A schedulable unit: an entity's quality rules sharing a schedule, one sync mapping, or a global job."""
+    kind: ScheduledJobKind
+    key: str
+    schedule_text: str
+    schedule: object
+    entity_id: Optional[UUID]
+    connection_id: Optional[UUID] = None
+    rule_ids: Tuple[UUID, ...] = ()
+    mapping_id: Optional[UUID] = None
+
+
+class Scheduler:
+    """Evaluates stored schedules every tick and runs due jobs as background tasks."""
+
+    def __init__(self, prefix: str = "mdm:sched:v1", enabled: Optional[bool] = None):
+        self.prefix = prefix
+        self.enabled = settings.SCHEDULER_ENABLED if enabled is None else enabled
+        self._loop_task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._schedules: Dict[str, object] = {}
+        self.errors: List[str] = []
+
+    def _parse(self, expression: str):
+        schedule = self._schedules.get(expression)
+        if schedule is None:
+            schedule = parse_schedule(expression)
+            self._schedules[expression] = schedule
+        return schedule
+
+    async def load_jobs(self, db: AsyncSession) -> List[ScheduledJob]:
+        """Build jobs from quality rule schedule_cron and mapping sync_frequency values."""
+        errors = []
+        result = await db.execute(
+            select(MDMQualityRule.id, MDMQualityRule.rule_code, MDMQualityRule.entity_id, MDMQualityRule.schedule_cron)
+            .where(MDMQualityRule.is_active == True, MDMQualityRule.schedule_cron.isnot(None))
+        )
+        grouped = defaultdict(list)
+        for rule_id, rule_code, entity_id, expression in result.all():
+            expression = expression.strip()
+            try:
+                self._parse(expression)
+            except ValueError as e:
+                errors.append(f"quality rule {rule_code}: {e}")
+                continue
+            grouped[(entity_id, expression)].append(rule_id)
+
+        jobs = []
+        for (entity_id, expression), rule_ids in grouped.items():
+            digest = hashlib.sha1(expression.encode()).hexdigest()[:12]
+            jobs.append(ScheduledJob(
+                ScheduledJobKind.QUALITY, f"quality:{entity_id}:{digest}", expression, self._parse(expression),
+                entity_id, rule_ids=tuple(sorted(rule_ids, key=str))
+            ))
+
+        reconcile = settings.QUALITY_RECONCILE_SCHEDULE.strip()
+        if reconcile:
+            try:
+                schedule = self._parse(reconcile)
+            except ValueError as e:
+                errors.append(f"QUALITY_RECONCILE_SCHEDULE: {e}")
+            else:
+                result = await db.execute(
+                    select(MDMQualityRule.entity_id)
+                    .where(MDMQualityRule.is_active == True, MDMQualityRule.rule_type == RuleType.BUILTIN)
+                    .distinct()
+                )
+                jobs.extend(
+                    ScheduledJob(
+                        ScheduledJobKind.QUALITY_RECONCILE, f"reconcile:{entity_id}", reconcile, schedule, entity_id
+                    )
+                    for entity_id in result.scalars().all()
+                )
+
+        result = await db.execute(
+            select(
+                MDMIntegrationMapping.id, MDMIntegrationMapping.entity_id,
+                MDMIntegrationMapping.connection_id, MDMIntegrationMapping.sync_frequency
+            ).where(MDMIntegrationMapping.is_active == True, MDMIntegrationMapping.sync_frequency.isnot(None))
+        )
+        for mapping_id, entity_id, connection_id, expression in result.all():
+            expression = expression.strip()
+            try:
+                schedule = self._parse(expression)
+            except ValueError as e:
+                errors.append(f"integration mapping {mapping_id}: {e}")
+                continue
+            jobs.append(ScheduledJob(
+                ScheduledJobKind.INTEGRATION_SYNC, f"sync:{mapping_id}", expression, schedule,
+                entity_id, connection_id=connection_id, mapping_id=mapping_id
+            ))
+        audit = settings.AUDIT_PARTITION_SCHEDULE.strip()
+        if audit:
+            try:
+                jobs.append(ScheduledJob(
+                    ScheduledJobKind.AUDIT_PARTITIONS, "audit-partitions", audit, self._parse(audit), None
+                ))
+            except ValueError as e:
+                errors.append(f"AUDIT_PARTITION_SCHEDULE: {e}")
+        self.errors = errors
+        return jobs
+
+    async def _redis_lock(self, name: str, seconds: int) -> bool:
+        try:
+            return bool(await redis_client.set(f"{self.prefix}:{name}", "1", nx=True, ex=max(seconds, 1)))
+        except Exception as e:
+            # Occurrence claims in the database still prevent double runs
+            logger.warning("Scheduler lock unavailable: %s", e)
+            return True
+
+    async def _acquire_slot(self, name: str, limit: int) -> Optional[str]:
+        """Take a slot, returning its token, or None when all ``limit`` slots are held."""
+        token = uuid4().hex
+        try:
+            taken = await _ACQUIRE_SLOT(
+                keys=[f"{self.prefix}:slots:{name}"], args=[limit, settings.SCHEDULER_JOB_TIMEOUT_SECONDS, token]
+            )
+            return token if taken else None
+        except Exception as e:
+            logger.warning("Scheduler concurrency slot unavailable: %s", e)
+            return token
+
+    async def _release_slot(self, name: str, token: str):
+        try:
+            await redis_client.zrem(f"{self.prefix}:slots:{name}", token)
+        except Exception as e:
+            logger.warning("Scheduler concurrency slot not released: %s", e)
+
+    def _slots(self, job: ScheduledJob) -> List[Tuple[str, int]]:
+        slots = []
+        if job.entity_id:
+            slots.append((f"entity:{job.entity_id}", settings.SCHEDULER_MAX_RUNS_PER_ENTITY))
+        if job.connection_id:
+            slots.append((f"connection:{job.connection_id}", settings.SCHEDULER_MAX_RUNS_PER_CONNECTION))
+        return slots
+
+    async def _acquire(self, job: ScheduledJob) -> Optional[List[Tuple[str, str]]]:
+        """Take every slot of a job; returns the (name, token) pairs held, or None."""
+        held = []
+        for name, limit in self._slots(job):
+            token = await self._acquire_slot(name, limit)
+            if token is None:
+                await self._release(held)
+                return None
+            held.append((name, token))
+        return held
+
+    async def _release(self, held: List[Tuple[str, str]]):
+        for name, token in held:
+            await self._release_slot(name, token)
+
+    async def _record(self, db: AsyncSession, job: ScheduledJob, moment: datetime, status: ScheduledRunStatus,
+                      now: datetime, missed_count: int = 0) -> Optional[UUID]:
+        """Insert the row for an occurrence; returns its id, or None when another replica has it."""
+        stmt = insert(MDMScheduledRun).values(
+            id=uuid4(),
+            job_kind=job.kind,
+            job_key=job.key,
+            entity_id=job.entity_id,
+            connection_id=job.connection_id,
+            schedule=job.schedule_text[:100],
+            scheduled_for=moment,
+            status=status,
+            started_at=now if status == ScheduledRunStatus.RUNNING else None,
+            finished_at=None if status == ScheduledRunStatus.RUNNING else now,
+            missed_count=missed_count,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        ).on_conflict_do_nothing(index_elements=["job_key", "scheduled_for"]).returning(MDMScheduledRun.id)
+        return (await db.execute(stmt)).scalar_one_or_none()
+
+    async def tick(self, now: Optional[datetime] = None) -> int:
+        """Evaluate schedules once; returns the number of runs started."""
+        now = now or datetime.utcnow()
+        if not await self._redis_lock("tick", settings.SCHEDULER_TICK_SECONDS - 1):
+            return 0
+        grace = timedelta(seconds=settings.SCHEDULER_MISFIRE_GRACE_SECONDS)
+
+        async with async_session_maker() as db:
+            await db.execute(
+                update(MDMScheduledRun)
+                .where(
+                    MDMScheduledRun.status == ScheduledRunStatus.RUNNING,
+                    MDMScheduledRun.started_at < now - timedelta(seconds=settings.SCHEDULER_JOB_TIMEOUT_SECONDS)
+                )
+                .values(status=ScheduledRunStatus.FAILED, finished_at=now, error_message="Timed out", updated_at=now)
+            )
+            jobs = await self.load_jobs(db)
+            result = await db.execute(
+                select(MDMScheduledRun.job_key, func.max(MDMScheduledRun.scheduled_for))
+                .where(MDMScheduledRun.job_key.in_([job.key for job in jobs]))
+                .group_by(MDMScheduledRun.job_key)
+            )
+            last_runs = dict(result.tuples().all())
+
+            due: Dict[str, List[Tuple[ScheduledJob, datetime, int]]] = defaultdict(list)
+            for job in jobs:
+                try:
+                    moments, total = occurrences(
+                        job.schedule, last_runs.get(job.key, now - grace), now,
+                        settings.SCHEDULER_MAX_MISSED_RECORDED + 1
+                    )
+                except ValueError as e:
+                    self.errors.append(f"{job.key}: {e}")
+                    continue
+                if not moments:
+                    continue
+                latest, missed = moments[-1], moments[:-1]
+                if now - latest > grace:
+                    latest, missed = None, moments
+                for moment in missed:
+                    await self._record(db, job, moment, ScheduledRunStatus.MISSED, now)
+                if latest is not None:
+                    # Quality jobs of one entity run together in a single scan
+                    unit = f"quality:{job.entity_id}" if job.kind == ScheduledJobKind.QUALITY else job.key
+                    due[unit].append((job, latest, total - 1))
+            await db.commit()
+
+            started = 0
+            for unit, entries in due.items():
+                if unit in self._running:
+                    continue
+                lead = entries[0][0]
+                held = await self._acquire(lead)
+                if held is None:
+                    continue
+                claimed = []
+                for job, moment, missed_count in entries:
+                    run_id = await self._record(db, job, moment, ScheduledRunStatus.RUNNING, now, missed_count)
+                    if run_id is not None:
+                        claimed.append((job, run_id))
+                await db.commit()
+                if not claimed:
+                    await self._release(held)
+                    continue
+                self._running[unit] = asyncio.create_task(self._run(unit, lead, claimed, held))
+                started += 1
+        return started
+
+    async def _execute(self, db: AsyncSession, lead: ScheduledJob, jobs: List[ScheduledJob]) -> Tuple[ScheduledRunStatus, dict, Optional[str]]:
+        if lead.kind == ScheduledJobKind.QUALITY:
+            rule_ids = [rule_id for job in jobs for rule_id in job.rule_ids]
+            report = await run_quality_rules(db, lead.entity_id, rule_ids)
+            await db.commit()
+            detail = {
+                "records": report.records,
+                "rules": len(report.outcomes),
+                "below_threshold": [o.rule.rule_code for o in report.outcomes if not o.meets_threshold],
+                "errors": report.errors,
+                "skipped": report.skipped,
+            }
+            return ScheduledRunStatus.COMPLETED, detail, None
+
+        if lead.kind == ScheduledJobKind.QUALITY_RECONCILE:
+            detail = await reconcile_quality_counters(db, lead.entity_id)
+            await db.commit()
+            return ScheduledRunStatus.COMPLETED, detail, None
+
+        if lead.kind == ScheduledJobKind.AUDIT_PARTITIONS:
+            detail = await maintain_audit_partitions(db)
+            await db.commit()
+            return ScheduledRunStatus.COMPLETED, detail, None
+
+        result = await db.execute(
+            select(MDMIntegrationMapping)
+            .options(selectinload(MDMIntegrationMapping.connection))
+            .where(MDMIntegrationMapping.id == lead.mapping_id)
+        )
+        mapping = result.scalar_one_or_none()
+        if mapping is None:
+            return ScheduledRunStatus.SKIPPED, {}, "Integration mapping not found"
+        handler = SYNC_HANDLERS.get(mapping.connection.connection_type)
+        if handler is None:
+            return ScheduledRunStatus.SKIPPED, {}, f"No sync handler for {mapping.connection.connection_type.value}"
+        detail = await handler(db, mapping)
+        await db.commit()
+        return ScheduledRunStatus.COMPLETED, detail or {}, None
+
+    async def _run(self, unit: str, lead: ScheduledJob, claimed: List[Tuple[ScheduledJob, UUID]],
+                   held: List[Tuple[str, str]]):
+        status, detail, error = ScheduledRunStatus.FAILED, None, None
+        try:
+            async with async_session_maker() as db:
+                try:
+                    status, detail, error = await self._execute(db, lead, [job for job, _ in claimed])
+                except asyncio.CancelledError:
+                    error = "Interrupted"
+                    raise
+                except Exception as e:
+                    logger.exception("Scheduled job %s failed", unit)
+                    await db.rollback()
+                    error = str(e)
+                finally:
+                    now = datetime.utcnow()
+                    await db.execute(
+                        update(MDMScheduledRun)
+                        .where(MDMScheduledRun.id.in_([run_id for _, run_id in claimed]))
+                        .values(status=status, finished_at=now, detail=detail,
+                                error_message=error[:1000] if error else None, updated_at=now)
+                    )
+                    await db.commit()
+        finally:
+            await self._release(held)
+            self._running.pop(unit, None)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(settings.SCHEDULER_TICK_SECONDS)
+
+    async def start(self):
+        """Start the scheduler loop."""
+        if self.enabled and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        tasks = [task for task in (self._loop_task, *self._running.values()) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+
+
+scheduler = Scheduler()
@@ -0,0 +1,369 @@
+"""Compiled execution of attribute validation rules."""
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.core.database import read_from_primary
+from app.models.attribute import MDMAttribute, MDMAttributeValidation, Severity, ValidationType
+from app.services.metadata_cache import metadata_cache
+from app.utils.cache import TTLCache
+from app.utils.expressions import ExpressionError, compile_expression
+
+logger = logging.getLogger(__name__)
+
+# Python validators referenced by MDMAttributeValidation.custom_function
+CUSTOM_VALIDATORS: Dict[str, Callable[[Any], bool]] = {}
+
+
+def register_validator(name: str):
+    """Register a function usable as a CUSTOM validation (returns True when valid)."""
+    def decorator(func: Callable[[Any], bool]):
+        CUSTOM_VALIDATORS[name] = func
+        return func
+    return decorator
+
+
+class ValidationIssue(NamedTuple):
+    """A failed rule for one record."""
+    row: int
+    attribute_code: str
+    validation_id: Optional[str]
+    validation_type: str
+    severity: str
+    error_code: Optional[str]
+    message: str
+
+
+class CompiledRule:
+    """A validation rule reduced to a single check callable."""
+    __slots__ = (
+        "validation_id", "validation_type", "severity", "is_error",
+        "error_code", "message", "check", "needs_record", "endpoint",
+    )
+
+    def __init__(self, validation_id, validation_type, severity, error_code, message,
+                 check=None, needs_record=False, endpoint=None):
+        self.validation_id = validation_id
+        self.validation_type = validation_type
+        self.severity = severity
+        self.is_error = severity == Severity.ERROR.value
+        self.error_code = error_code
+        self.message = message
+        self.check = check
+        self.needs_record = needs_record
+        self.endpoint = endpoint
+
+    def issue(self, row: int, attribute_code: str) -> ValidationIssue:
+        return ValidationIssue(
+            row, attribute_code, self.validation_id, self.validation_type,
+            self.severity, self.error_code, self.message
+        )
+
+
+class AttributePlan:
+    """Ordered rules for one attribute."""
+    __slots__ = ("attribute_code", "required", "rules", "remote_rules")
+
+    def __init__(self, attribute_code: str, required: bool, rules: List[CompiledRule], remote_rules: List[CompiledRule]):
+        self.attribute_code = attribute_code
+        self.required = required
+        self.rules = rules
+        self.remote_rules = remote_rules
+
+
+class ValidationReport:
+    """Outcome of validating a batch of records."""
+
+    def __init__(self, total: int, issues: List[ValidationIssue], error_rows: bytearray, plan_errors: List[str]):
+        self.total = total
+        self.issues = issues
+        self.error_rows = error_rows
+        self.plan_errors = plan_errors
+
+    @property
+    def invalid_rows(self) -> List[int]:
+        return [row for row, failed in enumerate(self.error_rows) if failed]
+
+    def summary(self) -> dict:
+        invalid = sum(self.error_rows)
+        return {
+            "total": self.total,
+            "valid": self.total - invalid,
+            "invalid": invalid,
+            "errors": sum(1 for issue in self.issues if issue.severity == Severity.ERROR.value),
+            "warnings": sum(1 for issue in self.issues if issue.severity == Severity.WARNING.value),
+        }
+
+
+def _is_blank(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _guard(check: Callable[..., bool]) -> Callable[..., bool]:
+    """Treat exceptions raised by a check as a failed validation."""
+    def guarded(*args):
+        try:
+            return bool(check(*args))
+        except Exception:
+            return False
+    return guarded
+
+
+def _compile_rule(attribute_code: str, validation: MDMAttributeValidation) -> CompiledRule:
+    """Compile one validation row; raises ValueError when it cannot be compiled."""
+    validation_type = ValidationType(validation.validation_type)
+    severity = Severity(validation.severity or Severity.ERROR).value
+    message = validation.error_message or f"{attribute_code} failed {validation_type.value} validation"
+    checks: List[Callable[[Any], bool]] = []
+    needs_record = False
+    endpoint = None
+
+    if validation_type == ValidationType.REGEX:
+        pattern = validation.regex_pattern or validation.validation_rule
+        if not pattern:
+            raise ValueError("REGEX validation without a pattern")
+        try:
+            fullmatch = re.compile(pattern).fullmatch
+        except re.error as e:
+            raise ValueError(f"Invalid regex: {e}") from e
+        checks.append(lambda value: fullmatch(str(value)) is not None)
+
+    elif validation_type == ValidationType.RANGE:
+        low = float(validation.min_value) if validation.min_value is not None else None
+        high = float(validation.max_value) if validation.max_value is not None else None
+        checks.append(lambda value: (low is None or float(value) >= low) and (high is None or float(value) <= high))
+
+    elif validation_type == ValidationType.LENGTH:
+        low, high = validation.min_length, validation.max_length
+        checks.append(lambda value: (low is None or len(str(value)) >= low) and (high is None or len(str(value)) <= high))
+
+    elif validation_type == ValidationType.CUSTOM:
+        func = CUSTOM_VALIDATORS.get(validation.custom_function or "")
+        if func is None:
+            raise ValueError(f"Unknown custom validator '{validation.custom_function}'")
+        checks.append(func)
+
+    elif validation_type == ValidationType.SCRIPT:
+        try:
+            expression = compile_expression(validation.validation_rule or "", ("value", "record"))
+        except ExpressionError as e:
+            raise ValueError(str(e)) from e
+        needs_record = True
+
+    elif validation_type == ValidationType.API:
+        if not validation.api_endpoint:
+            raise ValueError("API validation without an endpoint")
+        endpoint = validation.api_endpoint
+
+    # Allowed/forbidden values apply to any rule type
+    if validation.allowed_values:
+        allowed = frozenset(str(value) for value in validation.allowed_values)
+        checks.append(lambda value: str(value) in allowed)
+    if validation.forbidden_values:
+        forbidden = frozenset(str(value) for value in validation.forbidden_values)
+        checks.append(lambda value: str(value) not in forbidden)
+
+    if needs_record:
+        local_checks = list(checks)
+        check = lambda value, record: (
+            bool(expression(value=value, record=record)) and all(c(value) for c in local_checks)
+        )
+    elif len(checks) == 1:
+        check = checks[0]
+    elif checks:
+        check = lambda value: all(c(value) for c in checks)
+    else:
+        check = None
+
+    return CompiledRule(
+        str(validation.id), validation_type.value, severity, validation.error_code, message,
+        check=_guard(check) if check else None, needs_record=needs_record, endpoint=endpoint,
+    )
+
+
+class ValidationPlan:
+    """An entity's validation rules compiled for repeated execution."""
+
+    def __init__(self, entity_id: str, attributes: List[AttributePlan], compile_errors: List[str]):
+        self.entity_id = entity_id
+        self.attributes = attributes
+        self.compile_errors = compile_errors
+        self.compiled_at = time.time()
+
+    @classmethod
+    def compile(cls, entity_id, attributes: Sequence[MDMAttribute]) -> "ValidationPlan":
+        plans, errors = [], []
+        for attribute in sorted(attributes, key=lambda a: a.display_order or 0):
+            rules, remote_rules = [], []
+            validations = sorted(
+                (v for v in attribute.validations if v.is_active),
+                key=lambda v: v.execution_order or 0
+            )
+            for validation in validations:
+                try:
+                    rule = _compile_rule(attribute.attribute_code, validation)
+                except ValueError as e:
+                    errors.append(f"{attribute.attribute_code} [{validation.id}]: {e}")
+                    continue
+                if rule.endpoint:
+                    remote_rules.append(rule)
+                if rule.check:
+                    rules.append(rule)
+            if attribute.is_required or rules or remote_rules:
+                plans.append(AttributePlan(attribute.attribute_code, bool(attribute.is_required), rules, remote_rules))
+        return cls(str(entity_id), plans, errors)
+
+    def validate_record(self, record: Dict[str, Any], fail_fast: bool = False) -> List[ValidationIssue]:
+        """Validate a single record."""
+        return self.validate_batch([record], fail_fast=fail_fast).issues
+
+    def validate_batch(self, records: Sequence[Dict[str, Any]], fail_fast: bool = False) -> ValidationReport:
+        """Validate records column by column with local rules.
+
+        Within an attribute, a failed ERROR rule stops further rules for that
+        record; with ``fail_fast`` a record is skipped entirely after its first
+        ERROR.
+        """
+        total = len(records)
+        issues: List[ValidationIssue] = []
+        error_rows = bytearray(total)
+        required_issue = "{} is required"
+
+        for attribute in self.attributes:
+            code = attribute.attribute_code
+            column = [record.get(code) for record in records]
+            rows = range(total) if not fail_fast else [i for i in range(total) if not error_rows[i]]
+
+            if attribute.required:
+                active = []
+                for i in rows:
+                    if _is_blank(column[i]):
+                        issues.append(ValidationIssue(
+                            i, code, None, "REQUIRED", Severity.ERROR.value, "REQUIRED", required_issue.format(code)
+                        ))
+                        error_rows[i] = 1
+                    else:
+                        active.append(i)
+            else:
+                active = [i for i in rows if not _is_blank(column[i])]
+
+            for rule in attribute.rules:
+                if not active:
+                    break
+                check = rule.check
+                if rule.needs_record:
+                    failed = [i for i in active if not check(column[i], records[i])]
+                else:
+                    failed = [i for i in active if not check(column[i])]
+                if not failed:
+                    continue
+                issues.extend(rule.issue(i, code) for i in failed)
+                if rule.is_error:
+                    for i in failed:
+                        error_rows[i] = 1
+                    failed_rows = set(failed)
+                    active = [i for i in active if i not in failed_rows]
+
+        issues.sort(key=lambda issue: issue.row)
+        return ValidationReport(total, issues, error_rows, self.compile_errors)
+
+    async def validate_batch_async(
+        self,
+        records: Sequence[Dict[str, Any]],
+        fail_fast: bool = False,
+    ) -> ValidationReport:
+        """Validate with local rules, then run API rules with one call per rule.
+
+        API endpoints receive ``{"attribute_code", "values"}`` and must answer
+        ``{"results": [bool, ...]}`` in the same order. Records that already
+        have an ERROR are not sent. Batches are validated in the threadpool so
+        large ones do not block the event loop.
+        """
+        if len(records) > 1:
+            report = await run_in_threadpool(self.validate_batch, records, fail_fast)
+        else:
+            report = self.validate_batch(records, fail_fast=fail_fast)
+        remote = [(attribute, rule) for attribute in self.attributes for rule in attribute.remote_rules]
+        if not remote:
+            return report
+
+        async with httpx.AsyncClient(timeout=settings.VALIDATION_API_TIMEOUT_SECONDS) as client:
+            for attribute, rule in remote:
+                code = attribute.attribute_code
+                rows = [
+                    i for i, record in enumerate(records)
+                    if not report.error_rows[i] and not _is_blank(record.get(code))
+                ]
+                if not rows:
+                    continue
+                try:
+                    response = await client.post(
+                        rule.endpoint, json={"attribute_code": code, "values": [records[i][code] for i in rows]}
+                    )
+                    response.raise_for_status()
+                    results = response.json()["results"]
+                    failed = [i for i, ok in zip(rows, results) if not ok]
+                except (httpx.HTTPError, KeyError, ValueError) as e:
+                    logger.warning("Validation API %s failed: %s", rule.endpoint, e)
+                    failed = rows
+                report.issues.extend(rule.issue(i, code) for i in failed)
+                if rule.is_error:
+                    for i in failed:
+                        report.error_rows[i] = 1
+
+        report.issues.sort(key=lambda issue: issue.row)
+        return report
+
+
+class ValidationEngine:
+    """Caches compiled validation plans per entity."""
+
+    def __init__(self):
+        self.plans = TTLCache(
+            maxsize=settings.VALIDATION_PLAN_CACHE_SIZE,
+            ttl=settings.VALIDATION_PLAN_TTL_SECONDS,
+        )
+        self._evictions = 0
+        metadata_cache.on_invalidate(self.evict)
+
+    def evict(self, entity_id: Optional[str]):
+        """Drop a cached plan (all plans when entity_id is None)."""
+        self._evictions += 1
+        if entity_id is None:
+            self.plans.clear()
+        else:
+            self.plans.delete(str(entity_id))
+
+    async def get_plan(self, db: AsyncSession, entity_id) -> ValidationPlan:
+        """Return the compiled plan for an entity, compiling it on first use.
+
+        Rules are read from the primary when ``db`` is a replica session, and
+        a plan is not cached when its entity was invalidated while compiling.
+        """
+        key = str(entity_id)
+        plan = self.plans.get(key)
+        if plan is not None:
+            return plan
+
+        async def load(session: AsyncSession) -> ValidationPlan:
+            result = await session.execute(
+                select(MDMAttribute)
+                .options(selectinload(MDMAttribute.validations))
+                .where(MDMAttribute.entity_id == entity_id, MDMAttribute.is_active == True)
+            )
+            return ValidationPlan.compile(key, result.scalars().all())
+
+        evictions = self._evictions
+        plan = await read_from_primary(db, load)
+        if evictions == self._evictions:
+            self.plans.set(key, plan)
+        return plan
+
+
+validation_engine = ValidationEngine()
@@ -0,0 +1,152 @@
+"""Parallel approval decisions (fan-in).
+
+Each decision first increments the instance's counters in one conditional
+UPDATE ... RETURNING, which also takes the instance row lock, then
+conditionally updates its own task. Taking the instance lock first, as
+transitions do, serializes the decisions of one instance, so the decision
+that completes the round can cancel the tasks still open without waiting on
+another decider's task lock. The completing decision takes the
+outcome transition:
+
+* the first rejection takes the REJECTED transition (when there is one);
+* the approval that brings approvals_received to approvals_required takes
+  the APPROVED transition.
+
+A rejection in a state without a REJECTED transition is recorded and the
+instance waits for a manual transition.
+"""
+import logging
+from datetime import datetime
+from typing import NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.workflow import ApprovalOutcome, InstanceStatus, MDMWorkflowInstance, MDMWorkflowTask, TaskStatus
+from app.services.workflow_engine import CompiledTransition, WorkflowError, apply_transition, workflow_engine
+
+logger = logging.getLogger(__name__)
+
+
+class ApprovalDecision(NamedTuple):
+    """Effect of one approver's decision."""
+    task_id: UUID
+    instance_id: UUID
+    status: TaskStatus
+    approvals_received: int
+    approvals_required: int
+    rejections_received: int
+    outcome: Optional[ApprovalOutcome]
+    transition: Optional[CompiledTransition]
+
+
+def round_outcome(approve: bool, received: int, required: int, rejections: int) -> Optional[ApprovalOutcome]:
+    """Outcome decided by a decision that brought the counters to these values, if any."""
+    if not approve and rejections == 1:
+        return ApprovalOutcome.REJECTED
+    if approve and rejections == 0 and received == required:
+        return ApprovalOutcome.APPROVED
+    return None
+
+
+async def _complete_round(
+    db: AsyncSession,
+    instance: MDMWorkflowInstance,
+    outcome: ApprovalOutcome,
+    user_id: Optional[UUID],
+    comment: Optional[str],
+) -> Optional[CompiledTransition]:
+    workflow = await workflow_engine.get_workflow(db, instance.workflow_id)
+    if workflow is None:
+        raise WorkflowError("Workflow not found or inactive")
+    transition = workflow.approvals.get(instance.current_state_id, {}).get(outcome)
+    if transition is None:
+        logger.info(
+            "Approval round %s of instance %s was %s; no transition to take",
+            instance.approval_round, instance.id, outcome.value
+        )
+        return None
+    if not (comment and comment.strip()):
+        comment = (
+            f"Approved by all {instance.approvals_required} approvers" if outcome == ApprovalOutcome.APPROVED
+            else "Rejected by an approver"
+        )
+    return await apply_transition(db, instance, transition.id, user_id, comment, approval=True)
+
+
+async def _decide(
+    db: AsyncSession, task_id: UUID, user_id: UUID, decided: TaskStatus, comment: Optional[str], now: datetime
+):
+    result = await db.execute(
+        update(MDMWorkflowTask)
+        .where(
+            MDMWorkflowTask.id == task_id,
+            MDMWorkflowTask.assignee_id == user_id,
+            MDMWorkflowTask.status == TaskStatus.PENDING
+        )
+        .values(status=decided, decided_at=now, comment=comment, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise WorkflowError("Task not found, not assigned to this user, or already decided")
+
+
+async def decide_task(
+    db: AsyncSession,
+    task_id: UUID,
+    user_id: UUID,
+    approve: bool,
+    comment: Optional[str] = None,
+) -> ApprovalDecision:
+    """Record an approver's decision and complete the round when it decides it. The caller commits."""
+    result = await db.execute(
+        select(MDMWorkflowTask.instance_id, MDMWorkflowTask.approval_round)
+        .where(
+            MDMWorkflowTask.id == task_id,
+            MDMWorkflowTask.assignee_id == user_id,
+            MDMWorkflowTask.status == TaskStatus.PENDING
+        )
+    )
+    task = result.one_or_none()
+    if task is None:
+        raise WorkflowError("Task not found, not assigned to this user, or already decided")
+    instance_id, approval_round = task
+
+    now = datetime.utcnow()
+    decided = TaskStatus.APPROVED if approve else TaskStatus.REJECTED
+    counter = MDMWorkflowInstance.approvals_received if approve else MDMWorkflowInstance.rejections_received
+    # A failed task update undoes the increment; the savepoint keeps the caller's session usable
+    async with db.begin_nested():
+        # Instance first, then tasks: the same order as apply_transition, which cancels open tasks
+        result = await db.execute(
+            update(MDMWorkflowInstance)
+            .where(
+                MDMWorkflowInstance.id == instance_id,
+                MDMWorkflowInstance.approval_round == approval_round,
+                MDMWorkflowInstance.status == InstanceStatus.ACTIVE
+            )
+            .values({counter: counter + 1, MDMWorkflowInstance.updated_at: now})
+            .returning(
+                MDMWorkflowInstance.approvals_received,
+                MDMWorkflowInstance.approvals_required,
+                MDMWorkflowInstance.rejections_received
+            )
+            .execution_options(synchronize_session=False)
+        )
+        counters = result.one_or_none()
+        await _decide(db, task_id, user_id, decided, comment, now)
+    if counters is None:
+        # The round was closed meanwhile; the decision is kept but has no effect
+        return ApprovalDecision(task_id, instance_id, decided, 0, 0, 0, None, None)
+
+    received, required, rejections = counters
+    outcome = round_outcome(approve, received, required, rejections)
+    transition = None
+    if outcome is not None:
+        # Already locked by the increment
+        result = await db.execute(
+            select(MDMWorkflowInstance)
+            .where(MDMWorkflowInstance.id == instance_id)
+            .execution_options(populate_existing=True)
+        )
+        transition = await _complete_round(db, result.scalar_one(), outcome, user_id, comment)
+    return ApprovalDecision(task_id, instance_id, decided, received, required, rejections, outcome, transition)
@@ -0,0 +1,464 @@
+"""Workflow execution over compiled state machines.
+
+Each workflow version is compiled once into outgoing transitions keyed by
+state id, with transition and trigger conditions precompiled. Working out
+the available transitions of many pending records then only reads memory;
+the database is asked for the current workflow versions and record data.
+
+Compiled workflows are cached by (workflow id, version), so changing states
+or transitions takes effect once ``MDMWorkflow.version`` is incremented.
+
+In parallel approval workflows, a state with an APPROVED outcome transition
+is an approval state. Entering it opens an approval round with one task per
+resolved assignee (see ``app.services.workflow_approval``); its outcome
+transitions are taken by the round, not offered to users. A transition into
+an approval state that resolves no approvers is refused.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.models.record import MDMRecord
+from app.models.security import MDMRole, MDMUser
+from app.models.workflow import (
+    ApprovalOutcome, AssigneeType, InstanceStatus, MDMWorkflow, MDMWorkflowHistory, MDMWorkflowInstance,
+    MDMWorkflowTask, StateType, TaskStatus
+)
+from app.utils.cache import TTLCache
+from app.utils.expressions import ExpressionError, compile_expression
+
+logger = logging.getLogger(__name__)
+
+# Names available to condition expressions
+CONDITION_NAMES = ("record", "state")
+
+FINAL_STATUSES = {StateType.END: InstanceStatus.COMPLETED, StateType.ERROR: InstanceStatus.ERROR}
+
+
+class WorkflowError(ValueError):
+    """Raised when a workflow cannot be started or a transition cannot be taken."""
+
+
+class CompiledState(NamedTuple):
+    id: UUID
+    code: str
+    name: str
+    state_type: StateType
+    sla_hours: Optional[int]
+    assignee_type: Optional[AssigneeType]
+    assignee_value: Optional[str]
+
+
+class CompiledTransition(NamedTuple):
+    id: UUID
+    name: str
+    from_state_id: UUID
+    to_state_id: UUID
+    to_state_code: str
+    require_comment: bool
+    condition: Optional[Callable[..., Any]]
+    approval_outcome: Optional[ApprovalOutcome]
+
+    def allows(self, record: Dict[str, Any], state_code: str) -> bool:
+        if self.condition is None:
+            return True
+        try:
+            return bool(self.condition(record=record, state=state_code))
+        except Exception as e:
+            # A condition failing on one record's data only closes the transition for it
+            logger.debug("Condition of transition %s failed: %s", self.id, e)
+            return False
+
+
+def _compile_condition(expression: Optional[str]) -> Optional[Callable[..., Any]]:
+    if not expression or not expression.strip():
+        return None
+    return compile_expression(expression, CONDITION_NAMES)
+
+
+class CompiledWorkflow:
+    """A workflow version as adjacency lists of outgoing transitions per state.
+
+    Transitions whose condition does not compile are left out and reported
+    in ``compile_errors``.
+    """
+
+    def __init__(self, workflow: MDMWorkflow):
+        self.id = workflow.id
+        self.code = workflow.workflow_code
+        self.version = workflow.version
+        self.entity_id = workflow.entity_id
+        self.trigger_on = workflow.trigger_on
+        self.sla_hours = workflow.sla_hours
+        self.escalation_enabled = workflow.escalation_enabled
+        self.parallel_approval = workflow.parallel_approval
+        self.compile_errors: List[str] = []
+
+        self.states: Dict[UUID, CompiledState] = {
+            state.id: CompiledState(
+                state.id, state.state_code, state.state_name, state.state_type, state.sla_hours,
+                state.assignee_type, state.assignee_value
+            )
+            for state in sorted(workflow.states, key=lambda state: state.sort_order or 0)
+            if state.is_active
+        }
+        starts = [state.id for state in self.states.values() if state.state_type == StateType.START]
+        self.start_state_id: Optional[UUID] = starts[0] if starts else None
+        if len(starts) > 1:
+            self.compile_errors.append(f"{len(starts)} START states; using {self.states[starts[0]].code}")
+
+        try:
+            self.trigger = _compile_condition(workflow.trigger_condition)
+        except ExpressionError as e:
+            self.trigger = None
+            self.compile_errors.append(f"trigger_condition: {e}")
+
+        outgoing: Dict[UUID, List[CompiledTransition]] = {}
+        for transition in workflow.transitions:
+            if not transition.is_active:
+                continue
+            if transition.from_state_id not in self.states or transition.to_state_id not in self.states:
+                self.compile_errors.append(f"{transition.transition_name}: refers to an inactive state")
+                continue
+            try:
+                condition = _compile_condition(transition.condition_expression)
+            except ExpressionError as e:
+                self.compile_errors.append(f"{transition.transition_name}: {e}")
+                continue
+            outgoing.setdefault(transition.from_state_id, []).append(CompiledTransition(
+                transition.id, transition.transition_name, transition.from_state_id, transition.to_state_id,
+                self.states[transition.to_state_id].code, bool(transition.require_comment), condition,
+                transition.approval_outcome
+            ))
+        self.outgoing: Dict[UUID, Tuple[CompiledTransition, ...]] = {
+            state_id: tuple(transitions) for state_id, transitions in outgoing.items()
+        }
+        self.transitions: Dict[UUID, CompiledTransition] = {
+            transition.id: transition for transitions in self.outgoing.values() for transition in transitions
+        }
+
+        # Outcome transitions of approval states
+        self.approvals: Dict[UUID, Dict[ApprovalOutcome, CompiledTransition]] = {}
+        if self.parallel_approval:
+            for state_id, transitions in self.outgoing.items():
+                outcomes: Dict[ApprovalOutcome, CompiledTransition] = {}
+                for transition in transitions:
+                    if transition.approval_outcome is None:
+                        continue
+                    if transition.approval_outcome in outcomes:
+                        self.compile_errors.append(
+                            f"{transition.name}: second {transition.approval_outcome.value} transition of "
+                            f"{self.states[state_id].code}"
+                        )
+                        continue
+                    outcomes[transition.approval_outcome] = transition
+                if ApprovalOutcome.APPROVED in outcomes:
+                    self.approvals[state_id] = outcomes
+
+    def is_approval_state(self, state_id: UUID) -> bool:
+        return state_id in self.approvals
+
+    def is_final(self, state_id: UUID) -> bool:
+        state = self.states.get(state_id)
+        return state is not None and state.state_type in FINAL_STATUSES
+
+    def deadline(self, state_id: UUID, entered_at: datetime) -> Optional[datetime]:
+        """SLA deadline of a state entered at ``entered_at``; the state's SLA overrides the workflow's."""
+        state = self.states.get(state_id)
+        if not self.escalation_enabled or state is None or state.state_type in FINAL_STATUSES:
+            return None
+        hours = state.sla_hours if state.sla_hours is not None else self.sla_hours
+        return entered_at + timedelta(hours=hours) if hours else None
+
+    def matches_trigger(self, record: Dict[str, Any]) -> bool:
+        """Whether the trigger condition (if any) accepts a record."""
+        if self.trigger is None:
+            return True
+        try:
+            return bool(self.trigger(record=record, state=None))
+        except Exception:
+            return False
+
+    def available(self, state_id: UUID, record: Dict[str, Any]) -> List[CompiledTransition]:
+        """Transitions out of a state whose conditions accept the record."""
+        state = self.states.get(state_id)
+        if state is None:
+            return []
+        approval_state = state_id in self.approvals
+        return [
+            transition for transition in self.outgoing.get(state_id, ())
+            if not (approval_state and transition.approval_outcome) and transition.allows(record, state.code)
+        ]
+
+
+class WorkflowEngine:
+    """Caches compiled workflows by (workflow id, version)."""
+
+    def __init__(self):
+        self.workflows = TTLCache(maxsize=settings.WORKFLOW_CACHE_SIZE, ttl=settings.WORKFLOW_CACHE_TTL_SECONDS)
+
+    def evict(self, workflow_id=None):
+        """Drop the compiled versions of a workflow (all workflows when None)."""
+        if workflow_id is None:
+            self.workflows.clear()
+        else:
+            self.workflows.delete_where(lambda key: key[0] == str(workflow_id))
+
+    async def get_workflows(self, db: AsyncSession, workflow_ids: Iterable[UUID]) -> Dict[UUID, CompiledWorkflow]:
+        """Compiled current versions of active workflows; only uncached versions are loaded."""
+        workflow_ids = list(set(workflow_ids))
+        if not workflow_ids:
+            return {}
+        result = await db.execute(
+            select(MDMWorkflow.id, MDMWorkflow.version)
+            .where(MDMWorkflow.id.in_(workflow_ids), MDMWorkflow.is_active == True)
+        )
+        compiled, missing = {}, []
+        for workflow_id, version in result.tuples().all():
+            workflow = self.workflows.get((str(workflow_id), version))
+            if workflow is None:
+                missing.append(workflow_id)
+            else:
+                compiled[workflow_id] = workflow
+
+        if missing:
+            result = await db.execute(
+                select(MDMWorkflow)
+                .where(MDMWorkflow.id.in_(missing))
+                .options(selectinload(MDMWorkflow.states), selectinload(MDMWorkflow.transitions))
+            )
+            for workflow in result.scalars().all():
+                compiled_workflow = CompiledWorkflow(workflow)
+                if compiled_workflow.compile_errors:
+                    logger.warning(
+                        "Workflow %s v%s compiled with errors: %s",
+                        workflow.workflow_code, workflow.version, "; ".join(compiled_workflow.compile_errors)
+                    )
+                self.workflows.set((str(workflow.id), workflow.version), compiled_workflow)
+                compiled[workflow.id] = compiled_workflow
+        return compiled
+
+    async def get_workflow(self, db: AsyncSession, workflow_id: UUID) -> Optional[CompiledWorkflow]:
+        return (await self.get_workflows(db, [workflow_id])).get(workflow_id)
+
+
+workflow_engine = WorkflowEngine()
+
+
+async def _record_data(db: AsyncSession, record_ids: Iterable[UUID]) -> Dict[UUID, Dict[str, Any]]:
+    record_ids = list(set(record_ids))
+    if not record_ids:
+        return {}
+    result = await db.execute(select(MDMRecord.id, MDMRecord.data).where(MDMRecord.id.in_(record_ids)))
+    return {record_id: data or {} for record_id, data in result.tuples().all()}
+
+
+def _split(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(item).strip() for item in value if item is not None and str(item).strip()]
+    if value is None:
+        return []
+    return [item.strip() for item in str(value).split(",") if item.strip()]
+
+
+def assignee_filter(state: CompiledState, record: Dict[str, Any]):
+    """Condition on MDMUser selecting a state's assignees, or None when nobody is assigned.
+
+    USER lists usernames, ROLE a role code, GROUP several role codes, and
+    DYNAMIC names a record attribute holding usernames. AUTO has no assignees.
+    """
+    values = _split(state.assignee_value)
+    if state.assignee_type == AssigneeType.DYNAMIC:
+        values = [username for code in values for username in _split(record.get(code))]
+    if not values or state.assignee_type in (None, AssigneeType.AUTO):
+        return None
+    if state.assignee_type in (AssigneeType.USER, AssigneeType.DYNAMIC):
+        return MDMUser.username.in_(values)
+    return MDMUser.role_id.in_(
+        select(MDMRole.id).where(MDMRole.role_code.in_(values), MDMRole.is_active == True)
+    )
+
+
+async def open_approval_round(
+    db: AsyncSession,
+    workflow: CompiledWorkflow,
+    instance: MDMWorkflowInstance,
+    record: Dict[str, Any],
+) -> int:
+    """Create the tasks of a new approval round for the instance's current state.
+
+    Assignees are resolved in one query and their tasks inserted in one
+    multi-row statement. Returns the number of approvers; a state resolving
+    none raises WorkflowError, as the round could never complete.
+    """
+    state = workflow.states[instance.current_state_id]
+    users = assignee_filter(state, record)
+    assignee_ids = []
+    if users is not None:
+        result = await db.execute(select(MDMUser.id).where(users, MDMUser.is_active == True))
+        assignee_ids = result.scalars().all()
+    if not assignee_ids:
+        raise WorkflowError(f"Approval state {state.code} resolves no active approvers")
+
+    instance.approval_round = (instance.approval_round or 0) + 1
+    instance.approvals_required = len(assignee_ids)
+    instance.approvals_received = 0
+    instance.rejections_received = 0
+
+    now = datetime.utcnow()
+    await db.execute(insert(MDMWorkflowTask), [
+        {
+            "id": uuid4(),
+            "instance_id": instance.id,
+            "approval_round": instance.approval_round,
+            "state_id": state.id,
+            "assignee_id": assignee_id,
+            "status": TaskStatus.PENDING,
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for assignee_id in assignee_ids
+    ])
+    return len(assignee_ids)
+
+
+async def start_workflow(
+    db: AsyncSession,
+    workflow_id: UUID,
+    record: MDMRecord,
+    user_id: Optional[UUID] = None,
+) -> MDMWorkflowInstance:
+    """Start a workflow for a record at its START state. The caller commits."""
+    workflow = await workflow_engine.get_workflow(db, workflow_id)
+    if workflow is None:
+        raise WorkflowError("Workflow not found or inactive")
+    if workflow.start_state_id is None:
+        raise WorkflowError("Workflow has no START state")
+    if workflow.entity_id is not None and workflow.entity_id != record.entity_id:
+        raise WorkflowError("Workflow belongs to another entity")
+    if not workflow.matches_trigger(record.data or {}):
+        raise WorkflowError("Record does not meet the workflow's trigger condition")
+
+    result = await db.execute(
+        select(MDMWorkflowInstance.id).where(
+            MDMWorkflowInstance.workflow_id == workflow.id,
+            MDMWorkflowInstance.record_id == record.id,
+            MDMWorkflowInstance.status == InstanceStatus.ACTIVE
+        )
+    )
+    if result.first() is not None:
+        raise WorkflowError("Record already has an active instance of this workflow")
+
+    now = datetime.utcnow()
+    instance = MDMWorkflowInstance(
+        workflow_id=workflow.id,
+        workflow_version=workflow.version,
+        entity_id=record.entity_id,
+        record_id=record.id,
+        current_state_id=workflow.start_state_id,
+        status=InstanceStatus.ACTIVE,
+        state_entered_at=now,
+        started_by=user_id,
+        due_at=workflow.deadline(workflow.start_state_id, now),
+        escalation_level=0,
+    )
+    db.add(instance)
+    await db.flush()
+    db.add(MDMWorkflowHistory(
+        instance_id=instance.id, from_state_id=None, to_state_id=workflow.start_state_id, user_id=user_id
+    ))
+    if workflow.is_approval_state(workflow.start_state_id):
+        await open_approval_round(db, workflow, instance, record.data or {})
+    return instance
+
+
+async def available_transitions(
+    db: AsyncSession, instances: Sequence[MDMWorkflowInstance]
+) -> Dict[UUID, List[CompiledTransition]]:
+    """Available transitions of each instance, keyed by instance id.
+
+    Two queries fetch the workflow versions and record data for the whole
+    batch; conditions are then evaluated against the compiled workflows.
+    """
+    active = [instance for instance in instances if instance.status == InstanceStatus.ACTIVE]
+    workflows = await workflow_engine.get_workflows(db, (instance.workflow_id for instance in active))
+    records = await _record_data(db, (instance.record_id for instance in active))
+
+    available = {instance.id: [] for instance in instances}
+    for instance in active:
+        workflow = workflows.get(instance.workflow_id)
+        if workflow is not None:
+            available[instance.id] = workflow.available(instance.current_state_id, records.get(instance.record_id, {}))
+    return available
+
+
+async def apply_transition(
+    db: AsyncSession,
+    instance: MDMWorkflowInstance,
+    transition_id: UUID,
+    user_id: Optional[UUID] = None,
+    comment: Optional[str] = None,
+    approval: bool = False,
+) -> CompiledTransition:
+    """Move an instance along a transition available to it. The caller commits.
+
+    Load the instance FOR UPDATE so concurrent transitions serialize.
+    ``approval`` is set when an approval round takes an outcome transition;
+    those skip conditions and are not available otherwise.
+    """
+    if instance.status != InstanceStatus.ACTIVE:
+        raise WorkflowError(f"Instance is {instance.status.value}")
+    workflow = await workflow_engine.get_workflow(db, instance.workflow_id)
+    if workflow is None:
+        raise WorkflowError("Workflow not found or inactive")
+
+    transition = workflow.transitions.get(transition_id)
+    if transition is None or transition.from_state_id != instance.current_state_id:
+        raise WorkflowError("Transition is not available from the current state")
+    approval_state = workflow.is_approval_state(instance.current_state_id)
+    if approval_state and transition.approval_outcome and not approval:
+        raise WorkflowError("Transition is taken by the approval round")
+    if transition.require_comment and not (comment and comment.strip()):
+        raise WorkflowError("Transition requires a comment")
+    record = (await _record_data(db, [instance.record_id])).get(instance.record_id, {})
+    if not approval and not transition.allows(record, workflow.states[instance.current_state_id].code):
+        raise WorkflowError("Transition condition is not met")
+
+    now = datetime.utcnow()
+    if approval_state:
+        # Leaving the state closes the round; tasks still open are cancelled
+        await db.execute(
+            update(MDMWorkflowTask)
+            .where(
+                MDMWorkflowTask.instance_id == instance.id,
+                MDMWorkflowTask.approval_round == instance.approval_round,
+                MDMWorkflowTask.status == TaskStatus.PENDING
+            )
+            .values(status=TaskStatus.CANCELLED, decided_at=now, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    db.add(MDMWorkflowHistory(
+        instance_id=instance.id,
+        transition_id=transition.id,
+        from_state_id=instance.current_state_id,
+        to_state_id=transition.to_state_id,
+        user_id=user_id,
+        comment=comment,
+    ))
+    instance.current_state_id = transition.to_state_id
+    instance.state_entered_at = now
+    instance.workflow_version = workflow.version
+    instance.due_at = workflow.deadline(transition.to_state_id, now)
+    instance.escalation_level = 0
+    target = workflow.states[transition.to_state_id]
+    if target.state_type in FINAL_STATUSES:
+        instance.status = FINAL_STATUSES[target.state_type]
+        instance.completed_at = now
+    elif workflow.is_approval_state(target.id):
+        await open_approval_round(db, workflow, instance, record)
+    return transition
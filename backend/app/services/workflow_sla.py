@@ -0,0 +1,169 @@
+"""SLA deadline tracking and escalation for workflow instances.
+
+Each active instance stores its next deadline in ``due_at``, set when it
+enters a state and cleared when it reaches an END or ERROR state. The
+partial index on ``due_at`` acts as the timer queue: the tracker claims
+overdue instances in batches with FOR UPDATE SKIP LOCKED, records the
+escalation, then sleeps until the earliest pending deadline. Nothing lives
+only in memory, so a restart resumes from the index without scanning the
+table, and replicas running the tracker never escalate an instance twice.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+from uuid import UUID, uuid4
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.workflow import InstanceStatus, MDMWorkflowHistory, MDMWorkflowInstance
+
+logger = logging.getLogger(__name__)
+
+
+class SlaBreach(NamedTuple):
+    """An instance that passed its SLA deadline."""
+    instance_id: UUID
+    workflow_id: UUID
+    entity_id: Optional[UUID]
+    record_id: UUID
+    state_id: UUID
+    escalation_level: int
+    escalated_at: datetime
+
+
+# Escalation actions (notifications, reassignment); each receives one batch of breaches
+EscalationHandler = Callable[[AsyncSession, List[SlaBreach]], Awaitable[None]]
+ESCALATION_HANDLERS: List[EscalationHandler] = []
+
+
+def register_escalation_handler(func: EscalationHandler) -> EscalationHandler:
+    """Register a function run with each batch of escalated instances."""
+    ESCALATION_HANDLERS.append(func)
+    return func
+
+
+async def escalate_due(db: AsyncSession, now: Optional[datetime] = None, limit: Optional[int] = None) -> List[SlaBreach]:
+    """Escalate up to ``limit`` overdue instances, earliest deadline first. The caller commits.
+
+    Each escalation raises the instance's escalation level and adds a history
+    entry. The next deadline is WORKFLOW_SLA_REPEAT_HOURS later, or none.
+    """
+    now = now or datetime.utcnow()
+    limit = limit or settings.WORKFLOW_SLA_BATCH_SIZE
+    repeat = settings.WORKFLOW_SLA_REPEAT_HOURS
+    instance = MDMWorkflowInstance
+
+    due = (
+        select(instance.id)
+        .where(instance.due_at.isnot(None), instance.due_at <= now, instance.status == InstanceStatus.ACTIVE)
+        .order_by(instance.due_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .cte("due")
+    )
+    result = await db.execute(
+        update(instance)
+        .where(instance.id == due.c.id)
+        .values(
+            escalation_level=instance.escalation_level + 1,
+            escalated_at=now,
+            due_at=now + timedelta(hours=repeat) if repeat > 0 else None,
+        )
+        .returning(
+            instance.id, instance.workflow_id, instance.entity_id, instance.record_id,
+            instance.current_state_id, instance.escalation_level
+        )
+        .execution_options(synchronize_session=False)
+    )
+    breaches = [
+        SlaBreach(instance_id, workflow_id, entity_id, record_id, state_id, level, now)
+        for instance_id, workflow_id, entity_id, record_id, state_id, level in result.tuples().all()
+    ]
+    if breaches:
+        await db.execute(insert(MDMWorkflowHistory), [
+            {
+                "id": uuid4(),
+                "instance_id": breach.instance_id,
+                "transition_id": None,
+                "from_state_id": breach.state_id,
+                "to_state_id": breach.state_id,
+                "comment": f"SLA escalation (level {breach.escalation_level})",
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for breach in breaches
+        ])
+    return breaches
+
+
+async def next_deadline(db: AsyncSession) -> Optional[datetime]:
+    result = await db.execute(
+        select(func.min(MDMWorkflowInstance.due_at)).where(MDMWorkflowInstance.due_at.isnot(None))
+    )
+    return result.scalar_one_or_none()
+
+
+class SlaTracker:
+    """Background loop escalating overdue workflow instances in batches."""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = settings.WORKFLOW_SLA_ENABLED if enabled is None else enabled
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Escalate everything overdue, one committed batch at a time."""
+        total = 0
+        while True:
+            async with async_session_maker() as db:
+                breaches = await escalate_due(db, now)
+                await db.commit()
+                if breaches:
+                    # Escalations are committed first; a failing handler does not undo or repeat them
+                    for handler in ESCALATION_HANDLERS:
+                        try:
+                            await handler(db, breaches)
+                        except Exception:
+                            logger.exception("Escalation handler %s failed", getattr(handler, "__name__", handler))
+            total += len(breaches)
+            if len(breaches) < settings.WORKFLOW_SLA_BATCH_SIZE:
+                break
+        if total:
+            logger.info("Escalated %d overdue workflow instances", total)
+        return total
+
+    async def _sleep_seconds(self) -> float:
+        async with async_session_maker() as db:
+            deadline = await next_deadline(db)
+        limit = settings.WORKFLOW_SLA_MAX_SLEEP_SECONDS
+        if deadline is None:
+            return limit
+        return min(limit, max((deadline - datetime.utcnow()).total_seconds(), 0.0) + 0.1)
+
+    async def _loop(self):
+        while True:
+            delay = settings.WORKFLOW_SLA_MAX_SLEEP_SECONDS
+            try:
+                await self.run_once()
+                delay = await self._sleep_seconds()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("SLA escalation run failed")
+            await asyncio.sleep(delay)
+
+    async def start(self):
+        """Start the escalation loop."""
+        if self.enabled and self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+
+
+sla_tracker = SlaTracker()
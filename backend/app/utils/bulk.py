@@ -0,0 +1,63 @@
+"""Helpers for bulk (JSON array / NDJSON) request bodies."""
+import json
+from typing import Any, Iterator, List, Sequence
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def read_bulk_rows(request: Request) -> List[Any]:
+    """Read rows from a JSON array body or a streamed NDJSON body."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    max_rows = settings.BULK_MAX_ROWS
+
+    if content_type in NDJSON_CONTENT_TYPES:
+        rows = []
+        buffer = b""
+        line_number = 0
+
+        def parse(line: bytes):
+            nonlocal line_number
+            line_number += 1
+            if not line.strip():
+                return
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid JSON on line {line_number}: {e.msg}"
+                )
+            if len(rows) > max_rows:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"At most {max_rows} rows per request"
+                )
+
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                parse(line)
+        parse(buffer)
+        return rows
+
+    try:
+        rows = json.loads(await request.body())
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON: {e.msg}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array")
+    if len(rows) > max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {max_rows} rows per request"
+        )
+    return rows
+
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Yield consecutive slices of at most ``size`` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
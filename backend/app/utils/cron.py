@@ -0,0 +1,131 @@
+"""Cron expressions and fixed intervals for scheduled jobs."""
+import re
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, FrozenSet, List, Optional, Tuple
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTHS = {name: i for i, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+)}
+_DAYS = {name: i for i, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+_INTERVAL = re.compile(r"^(?:every\s+)?(\d+)\s*(s|m|h|d)$", re.IGNORECASE)
+_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def _parse_field(field: str, low: int, high: int, names: Optional[dict] = None) -> Tuple[FrozenSet[int], bool]:
+    """Allowed values of one cron field and whether it is restricted (not ``*``)."""
+    values = set()
+    for part in field.split(","):
+        value_range, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in '{part}'")
+        if value_range == "*":
+            start, end = low, high
+        else:
+            bounds = [names.get(b.lower(), b) if names else b for b in value_range.split("-")]
+            try:
+                bounds = [int(b) for b in bounds]
+            except ValueError:
+                raise ValueError(f"Invalid value in '{part}'") from None
+            if len(bounds) > 2:
+                raise ValueError(f"Invalid range '{part}'")
+            start = bounds[0]
+            # "5/15" runs from 5 to the end of the range
+            end = bounds[1] if len(bounds) == 2 else (high if step > 1 else start)
+        if start < low or end > high or start > end:
+            raise ValueError(f"'{part}' is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values), field != "*"
+
+
+class CronSchedule:
+    """Standard five-field cron (minute hour day-of-month month day-of-week).
+
+    As in cron, when both day fields are restricted a day matches either.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        fields = MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError("Cron expression needs five fields")
+        self.minutes, _ = _parse_field(fields[0], 0, 59)
+        self.hours, _ = _parse_field(fields[1], 0, 23)
+        self.days, self._days_restricted = _parse_field(fields[2], 1, 31)
+        self.months, _ = _parse_field(fields[3], 1, 12, _MONTHS)
+        weekdays, self._weekdays_restricted = _parse_field(fields[4], 0, 7, _DAYS)
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self._days_restricted and self._weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First matching minute strictly after ``moment``."""
+        current = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = current + timedelta(days=366 * 5)
+        while current < limit:
+            if current.month not in self.months:
+                current = (current.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+            elif current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+            elif current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+            else:
+                return current
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+
+class IntervalSchedule:
+    """Fixed interval such as ``15m``, ``2h`` or ``every 1d``, aligned to the epoch."""
+
+    def __init__(self, expression: str):
+        match = _INTERVAL.match(expression.strip())
+        if not match or int(match.group(1)) < 1:
+            raise ValueError(f"Invalid interval '{expression}'")
+        self.expression = expression
+        self.interval = timedelta(**{_UNITS[match.group(2).lower()]: int(match.group(1))})
+
+    def next_after(self, moment: datetime) -> datetime:
+        epoch = datetime(1970, 1, 1)
+        periods = (moment - epoch) // self.interval + 1
+        return epoch + periods * self.interval
+
+
+def parse_schedule(expression: str):
+    """Parse a cron expression, cron macro or interval; raises ValueError when invalid."""
+    expression = (expression or "").strip()
+    if not expression:
+        raise ValueError("Empty schedule")
+    if _INTERVAL.match(expression):
+        return IntervalSchedule(expression)
+    return CronSchedule(expression)
+
+
+def occurrences(schedule, after: datetime, until: datetime, limit: int) -> Tuple[List[datetime], int]:
+    """The latest ``limit`` occurrences in (after, until] and the total count."""
+    moments: Deque[datetime] = deque(maxlen=limit)
+    total = 0
+    moment = schedule.next_after(after)
+    while moment <= until:
+        moments.append(moment)
+        total += 1
+        moment = schedule.next_after(moment)
+    return list(moments), total
@@ -0,0 +1,72 @@
+"""Safe compilation of configured expressions (conditions, script rules)."""
+import ast
+from typing import Any, Callable, Dict, Iterable
+
+# Functions callable from expressions
+SAFE_FUNCTIONS: Dict[str, Callable] = {
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": round,
+    "any": any,
+    "all": all,
+}
+
+# Methods callable on values (e.g. ``value.startswith("X")`` or ``record.get("a")``)
+SAFE_METHODS = frozenset({
+    "get", "keys", "values", "items",
+    "lower", "upper", "strip", "lstrip", "rstrip", "startswith", "endswith",
+    "isdigit", "isalpha", "isalnum", "isspace", "split", "replace", "count",
+})
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.BinOp, ast.UnaryOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Constant, ast.Attribute, ast.Subscript, ast.Slice,
+    ast.List, ast.Tuple, ast.Set, ast.Dict, ast.Load,
+    ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+)
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression is not valid or uses disallowed constructs."""
+
+
+def compile_expression(expression: str, names: Iterable[str]) -> Callable[..., Any]:
+    """Compile an expression once into a callable taking the given names as keywords.
+
+    Only literals, operators, comparisons, whitelisted functions and methods,
+    and the declared names are allowed; attribute access to private members
+    and arbitrary calls are rejected at compile time.
+    """
+    names = frozenset(names)
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from e
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ExpressionError(f"Construct not allowed: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in names and node.id not in SAFE_FUNCTIONS:
+            raise ExpressionError(f"Unknown name: {node.id}")
+        if isinstance(node, ast.Attribute) and node.attr not in SAFE_METHODS:
+            raise ExpressionError(f"Attribute not allowed: {node.attr}")
+        if isinstance(node, ast.Call):
+            func = node.func
+            if not (isinstance(func, ast.Name) and func.id in SAFE_FUNCTIONS) and not isinstance(func, ast.Attribute):
+                raise ExpressionError("Only whitelisted functions and methods may be called")
+
+    code = compile(tree, "<expression>", "eval")
+    globals_ = {"__builtins__": {}, **SAFE_FUNCTIONS}
+
+    def evaluate(**env: Any) -> Any:
+        return eval(code, globals_, env)
+
+    return evaluate
@@ -0,0 +1,91 @@
+"""Keyset (cursor) pagination helpers."""
+import base64
+import enum
+import json
+from typing import Any, Callable, Optional, Sequence
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class CountMode(str, enum.Enum):
+    """How list endpoints compute the total item count."""
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor."""
+    raw = json.dumps([str(value) if value is not None else None for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable[[str], Any]]) -> tuple:
+    """Decode a cursor, converting each position with the given type.
+
+    Raises ValueError when the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor has the wrong shape")
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+
+
+def apply_keyset(query: Select, columns: Sequence[Any], after: Optional[tuple]) -> Select:
+    """Order by the key columns and start after the given key, if any."""
+    if after is not None:
+        query = query.where(tuple_(*columns) > tuple_(*after))
+    return query.order_by(*columns)
+
+
+def next_cursor(items: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Optional[str]:
+    """Return the cursor for the following page, or None on the last page."""
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor(key(items[-1]))
+
+
+class Explain(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON)`` of a query, keeping its bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, query: Select):
+        self.query = query
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.query, **kw)
+
+
+def plan_rows(plan: Any) -> int:
+    """Row estimate of the top node of an ``EXPLAIN (FORMAT JSON)`` result."""
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return max(int(plan[0]["Plan"]["Plan Rows"]), 0)
+
+
+async def count_rows(db: AsyncSession, query: Select, mode: CountMode) -> Optional[int]:
+    """Count rows matching a query exactly, estimate them from the query plan, or skip.
+
+    The estimate is the planner's row count for the filtered query, so it
+    reflects the filters but is only as good as the table statistics.
+    """
+    if mode == CountMode.NONE:
+        return None
+
+    if mode == CountMode.ESTIMATE:
+        result = await db.execute(Explain(query.order_by(None)))
+        return plan_rows(result.scalar())
+
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    return result.scalar()
+
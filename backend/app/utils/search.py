@@ -0,0 +1,30 @@
+"""Text search helpers built on PostgreSQL pg_trgm."""
+import enum
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+
+class SearchMode(str, enum.Enum):
+    """Search strategy for text lookups."""
+    CONTAINS = "contains"
+    SIMILAR = "similar"
+
+
+def escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def set_word_similarity_threshold(db: AsyncSession, threshold: Optional[float] = None):
+    """Set the threshold used by the <% / %> operators for the current transaction.
+
+    None uses SEARCH_SIMILARITY_THRESHOLD; 0 is a valid threshold.
+    """
+    if threshold is None:
+        threshold = settings.SEARCH_SIMILARITY_THRESHOLD
+    await db.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {"threshold": str(threshold)}
+    )
@@ -0,0 +1,44 @@
+"""Shared test fixtures.
+
+Tests that need PostgreSQL take the ``session_maker`` fixture and run against
+TEST_DATABASE_URL (for example the docker-compose database). The schema is
+recreated for each such test. They are skipped when TEST_DATABASE_URL is not
+set.
+"""
+import os
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import app.models  # noqa: F401  registers every table on Base.metadata
+from app.core.database import Base
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+async def db_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_maker(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+
+@pytest.fixture
+async def entity_id(session_maker):
+    from app.models.entity import MDMEntity
+
+    async with session_maker() as db:
+        entity = MDMEntity(entity_code="CUSTOMER", entity_name="Customer")
+        db.add(entity)
+        await db.commit()
+        return entity.id
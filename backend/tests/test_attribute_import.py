@@ -0,0 +1,77 @@
+"""Bulk import of attribute definitions (needs TEST_DATABASE_URL)."""
+import uuid
+import pytest
+from sqlalchemy import func, select
+from app.models.attribute import MDMAttribute, MDMAttributeTransform, MDMAttributeValidation
+from app.schemas.attribute import AttributeImportRequest
+from app.services.attribute_import import AttributeImportError, import_attributes
+
+
+def _document(entity_id, **overrides) -> AttributeImportRequest:
+    document = {
+        "entity_id": str(entity_id),
+        "groups": [{"group_code": "GENERAL", "group_name": "General"}],
+        "attributes": [
+            {
+                "attribute_code": "EMAIL",
+                "attribute_name": "Email",
+                "data_type": "STRING",
+                "attribute_group_code": "GENERAL",
+                "validations": [{"validation_type": "REGEX", "regex_pattern": r"^\S+@\S+$"}],
+                "transforms": [{"transform_type": "LOWERCASE"}],
+            },
+            {"attribute_code": "AGE", "attribute_name": "Age", "data_type": "INTEGER"},
+        ],
+    }
+    document.update(overrides)
+    return AttributeImportRequest.model_validate(document)
+
+
+async def _count(db, model) -> int:
+    return (await db.execute(select(func.count()).select_from(model))).scalar()
+
+
+async def test_import_writes_everything(session_maker, entity_id):
+    async with session_maker() as db:
+        response = await import_attributes(db, _document(entity_id))
+        await db.commit()
+        assert (response.groups_created, response.attributes_created) == (1, 2)
+        assert (response.validations_created, response.transforms_created) == (1, 1)
+        email = (await db.execute(select(MDMAttribute).where(MDMAttribute.attribute_code == "EMAIL"))).scalar_one()
+        assert email.attribute_group_id is not None
+        assert await _count(db, MDMAttributeValidation) == 1
+        assert await _count(db, MDMAttributeTransform) == 1
+
+
+async def test_dry_run_writes_nothing(session_maker, entity_id):
+    async with session_maker() as db:
+        response = await import_attributes(db, _document(entity_id), dry_run=True)
+        assert response.attributes_created == 2
+        assert await _count(db, MDMAttribute) == 0
+
+
+async def test_all_errors_are_reported(session_maker, entity_id):
+    document = _document(entity_id, attributes=[
+        {"attribute_code": "A", "attribute_name": "A", "data_type": "STRING", "attribute_group_code": "NOPE"},
+        {"attribute_code": "A", "attribute_name": "A", "data_type": "STRING", "catalog_id": str(uuid.uuid4())},
+        {
+            "attribute_code": "B", "attribute_name": "B", "data_type": "STRING",
+            "validations": [{"validation_type": "REGEX", "regex_pattern": "("}],
+        },
+    ])
+    async with session_maker() as db:
+        with pytest.raises(AttributeImportError) as raised:
+            await import_attributes(db, document)
+        assert await _count(db, MDMAttribute) == 0
+    errors = raised.value.errors
+    assert len(errors) == 4
+    assert any("unknown attribute_group_code 'NOPE'" in error for error in errors)
+    assert any("attribute_code already exists" in error for error in errors)
+    assert any("not found" in error for error in errors)
+    assert any("invalid regex_pattern" in error for error in errors)
+
+
+async def test_unknown_entity(session_maker):
+    async with session_maker() as db:
+        with pytest.raises(AttributeImportError, match="1 validation error"):
+            await import_attributes(db, _document(uuid.uuid4()))
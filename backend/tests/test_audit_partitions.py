@@ -0,0 +1,80 @@
+"""Audit log retention (database tests need TEST_DATABASE_URL)."""
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime
+from sqlalchemy import func, select, text
+from app.models.audit import AuditAction, MDMAuditConfig, MDMAuditLog
+from app.models.entity import MDMEntity
+from app.services import audit_partitions
+from app.services.audit_partitions import (
+    DEFAULT_PARTITION, _append_synced, ensure_audit_partitions, maintain_audit_partitions,
+)
+
+
+def test_appended_batches_read_back_as_one_file(tmp_path):
+    path = str(tmp_path / "archive.jsonl.gz")
+    _append_synced(path, ['{"a": 1}\n', '{"a": 2}\n'])
+    _append_synced(path, ['{"a": 3}\n'])
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["a"] for line in f] == [1, 2, 3]
+
+
+def _log(entity_id, moment):
+    return MDMAuditLog(entity_id=entity_id, record_id=uuid.uuid4(), action=AuditAction.UPDATE, action_timestamp=moment)
+
+
+def _archived_ids(paths):
+    ids = set()
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            ids.update(json.loads(line)["id"] for line in f)
+    return ids
+
+
+async def test_retention_archives_partitions_and_default_rows(session_maker, entity_id, tmp_path):
+    archive = str(tmp_path / "archive")
+    async with session_maker() as db:
+        other = MDMEntity(entity_code="SUPPLIER", entity_name="Supplier")
+        db.add(other)
+        await db.flush()
+        db.add_all([
+            MDMAuditConfig(entity_id=entity_id, retention_days=30, archive_enabled=True, archive_location=archive),
+            MDMAuditConfig(entity_id=other.id, retention_days=30),
+        ])
+        await ensure_audit_partitions(db, datetime(2020, 1, 1))
+        kept_in_default = _log(entity_id, datetime(2019, 6, 1))
+        partitioned = _log(entity_id, datetime(2020, 2, 1))
+        db.add_all([kept_in_default, partitioned, _log(other.id, datetime(2019, 6, 1)), _log(other.id, datetime(2020, 2, 1))])
+        await db.commit()
+
+        detail = await maintain_audit_partitions(db, datetime(2024, 6, 1))
+        remaining = (await db.execute(select(func.count()).select_from(MDMAuditLog))).scalar()
+        in_default = (await db.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}"))).scalar()
+
+    assert "mdm_audit_log_p202002" in detail["retired"]
+    assert detail["kept"] == [] and detail["default_rows_kept_for"] == []
+    assert detail["default_rows_deleted"] == 2
+    assert remaining == 0 and in_default == 0
+    assert all(os.path.exists(path) for path in detail["archived_files"])
+    assert _archived_ids(detail["archived_files"]) == {str(kept_in_default.id), str(partitioned.id)}
+
+
+async def test_default_rows_stay_when_their_archive_fails(session_maker, entity_id, tmp_path, monkeypatch):
+    async with session_maker() as db:
+        db.add(MDMAuditConfig(entity_id=entity_id, retention_days=30, archive_enabled=True, archive_location=str(tmp_path)))
+        await ensure_audit_partitions(db, datetime(2024, 6, 1))
+        db.add(_log(entity_id, datetime(2019, 6, 1)))
+        await db.commit()
+
+        def fail(path, lines):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(audit_partitions, "_append_synced", fail)
+        detail = await maintain_audit_partitions(db, datetime(2024, 6, 1))
+        in_default = (await db.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}"))).scalar()
+
+    assert detail["default_rows_kept_for"] == [str(entity_id)]
+    assert detail["default_rows_deleted"] == 0
+    assert in_default == 1
@@ -0,0 +1,80 @@
+"""Audit spill files."""
+import asyncio
+import threading
+import uuid
+from datetime import datetime
+from app.models.audit import AuditAction
+from app.services.audit_writer import AuditWriter, _read_spill
+
+
+def _events(count):
+    return [
+        {
+            "entity_id": uuid.uuid4(), "record_id": uuid.uuid4(), "action": AuditAction.UPDATE, "user_id": None,
+            "old_values": {"a": i}, "new_values": {"a": i + 1}, "changed_fields": ["a"],
+            "action_timestamp": datetime(2024, 1, 1, 12, i),
+        }
+        for i in range(count)
+    ]
+
+
+def _writer(tmp_path) -> AuditWriter:
+    writer = AuditWriter(enabled=False)
+    writer.queue = asyncio.Queue(maxsize=1)
+    writer.spill_dir = str(tmp_path)
+    return writer
+
+
+async def test_overflow_is_spilled_off_the_event_loop(tmp_path, monkeypatch):
+    writer = _writer(tmp_path)
+    threads = []
+    write_spill = writer._write_spill
+    monkeypatch.setattr(writer, "_write_spill", lambda events: (threads.append(threading.get_ident()), write_spill(events)))
+
+    events = _events(3)
+    writer.submit(events)
+    assert writer.queue.qsize() == 1 and writer.spilled == 0
+    await asyncio.gather(*writer._spills)
+
+    assert writer.spilled == 2
+    assert threads and threading.get_ident() not in threads
+    assert _read_spill(writer._spill_path()) == events[1:]
+
+
+def test_overflow_without_an_event_loop_is_spilled_inline(tmp_path):
+    writer = _writer(tmp_path)
+    writer.submit(_events(2))
+    assert writer.spilled == 1
+
+
+async def test_replay_writes_spilled_events(tmp_path, monkeypatch):
+    writer = _writer(tmp_path)
+    events = _events(3)
+    await writer.spill(events)
+    written = []
+
+    async def write(batch):
+        written.extend(batch)
+        return len(batch)
+
+    monkeypatch.setattr(writer, "write", write)
+    assert await writer.replay_spilled() == 3
+    assert written == events
+    assert list(tmp_path.iterdir()) == []
+    assert not writer._spill_pending
+
+
+async def test_failed_replay_is_retried(tmp_path, monkeypatch):
+    writer = _writer(tmp_path)
+    await writer.spill(_events(1))
+
+    async def write(batch):
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(writer, "write", write)
+    try:
+        await writer.replay_spilled()
+    except ConnectionError:
+        pass
+    assert writer._spill_pending
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,76 @@
+"""Bulk loading of catalog values (needs TEST_DATABASE_URL)."""
+import pytest
+from sqlalchemy import select
+from app.models.catalog import MDMCatalog, MDMCatalogValue
+from app.services.catalog_bulk import bulk_load_catalog_values
+
+
+@pytest.fixture
+async def catalog_id(session_maker):
+    async with session_maker() as db:
+        catalog = MDMCatalog(catalog_code="COLORS", catalog_name="Colors")
+        db.add(catalog)
+        await db.commit()
+        return catalog.id
+
+
+def _statuses(summary):
+    return {result.code: (result.status, result.error) for result in summary.results}
+
+
+async def test_parents_resolve_within_batch(session_maker, catalog_id):
+    rows = [
+        {"value_code": "LIGHT_RED", "value_name": "Light red", "parent_value_code": "RED"},
+        {"value_code": "RED", "value_name": "Red"},
+        {"value_code": "LOOP_A", "value_name": "A", "parent_value_code": "LOOP_B"},
+        {"value_code": "LOOP_B", "value_name": "B", "parent_value_code": "LOOP_A"},
+        {"value_code": "ORPHAN", "value_name": "Orphan", "parent_value_code": "MISSING"},
+        {"value_code": "RED", "value_name": "Red again"},
+    ]
+    async with session_maker() as db:
+        summary = await bulk_load_catalog_values(db, catalog_id, rows)
+        await db.commit()
+        values = {value.value_code: value for value in (await db.execute(select(MDMCatalogValue))).scalars()}
+
+    assert (summary.created, summary.failed) == (2, 4)
+    statuses = _statuses(summary)
+    assert statuses["LOOP_A"] == ("error", "Cycle in parent_value_code")
+    assert statuses["ORPHAN"] == ("error", "Unknown parent_value_code 'MISSING'")
+    assert values["LIGHT_RED"].parent_value_id == values["RED"].id
+
+
+async def test_upsert_keeps_inactive_values_inactive(session_maker, catalog_id):
+    async with session_maker() as db:
+        await bulk_load_catalog_values(db, catalog_id, [
+            {"value_code": "RED", "value_name": "Red"},
+            {"value_code": "BLUE", "value_name": "Blue"},
+        ])
+        await db.commit()
+        for value in (await db.execute(select(MDMCatalogValue))).scalars():
+            value.is_active = False
+        await db.commit()
+
+    async with session_maker() as db:
+        summary = await bulk_load_catalog_values(db, catalog_id, [
+            {"value_code": "RED", "value_name": "Red (updated)"},
+            {"value_code": "BLUE", "value_name": "Blue", "is_active": True},
+            {"value_code": "GREEN", "value_name": "Green"},
+        ], upsert=True)
+        await db.commit()
+        values = {value.value_code: value for value in (await db.execute(select(MDMCatalogValue))).scalars()}
+
+    assert (summary.created, summary.updated) == (1, 2)
+    assert values["RED"].value_name == "Red (updated)"
+    assert values["RED"].is_active is False
+    assert values["BLUE"].is_active is True
+    assert values["GREEN"].is_active is True
+
+
+async def test_existing_values_are_skipped_without_upsert(session_maker, catalog_id):
+    async with session_maker() as db:
+        await bulk_load_catalog_values(db, catalog_id, [{"value_code": "RED", "value_name": "Red"}])
+        summary = await bulk_load_catalog_values(db, catalog_id, [
+            {"value_code": "RED", "value_name": "Red"},
+            {"value_code": "DARK_RED", "value_name": "Dark red", "parent_value_code": "RED"},
+        ])
+    assert _statuses(summary) == {"RED": ("skipped", "Value already exists"), "DARK_RED": ("created", None)}
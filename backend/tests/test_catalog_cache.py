@@ -0,0 +1,52 @@
+"""Catalog cache policy handling and where cache fills are read from."""
+import pytest
+from app.services import catalog_cache as catalog_cache_module
+from app.services.catalog_cache import CatalogCache
+
+REPLICA, PRIMARY = "replica-session", "primary-session"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    async def run_on_primary(load):
+        return await load(PRIMARY)
+
+    monkeypatch.setattr(catalog_cache_module, "run_on_primary", run_on_primary)
+    cache = CatalogCache()
+    cache.store.enabled = True
+    return cache
+
+
+async def test_cached_payload_is_loaded_from_primary(cache):
+    await cache.store.put("catalog", "policy", {"enabled": True, "ttl": 60})
+    sessions = []
+
+    async def load(session):
+        sessions.append(session)
+        return ["value"]
+
+    assert await cache.get_or_load(REPLICA, "catalog", "values", load) == ["value"]
+    assert await cache.get_or_load(REPLICA, "catalog", "values", load) == ["value"]
+    assert sessions == [PRIMARY]
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+async def test_uncached_catalog_reads_request_session(cache):
+    await cache.store.put("catalog", "policy", {"enabled": False, "ttl": None})
+    sessions = []
+
+    async def load(session):
+        sessions.append(session)
+        return ["value"]
+
+    await cache.get_or_load(REPLICA, "catalog", "values", load)
+    await cache.get_or_load(REPLICA, "catalog", "values", load)
+    assert sessions == [REPLICA, REPLICA]
+    assert cache.stats()["bypassed"] == 2
+
+
+def test_zero_ttl_disables_caching():
+    assert CatalogCache._policy(True, 0) == {"enabled": False, "ttl": 0}
+    assert CatalogCache._policy(True, None) == {"enabled": True, "ttl": None}
+    assert CatalogCache._policy(False, 60)["enabled"] is False
@@ -0,0 +1,31 @@
+"""Safe expression compilation."""
+import pytest
+from app.utils.expressions import ExpressionError, compile_expression
+
+
+def test_expression_evaluates_with_names():
+    expression = compile_expression("value.startswith('A') and len(record.get('tags', [])) >= 2", ("value", "record"))
+    assert expression(value="Acme", record={"tags": [1, 2]}) is True
+    assert expression(value="Acme", record={}) is False
+
+
+def test_arithmetic_and_conditional():
+    expression = compile_expression("round(value * 1.5, 1) if value > 0 else abs(value)", ("value",))
+    assert expression(value=3) == 4.5
+    assert expression(value=-2) == 2
+
+
+@pytest.mark.parametrize("source, message", [
+    ("__import__('os')", "Only whitelisted functions"),
+    ("open('/etc/passwd')", "Only whitelisted functions"),
+    ("value.__class__", "Attribute not allowed"),
+    ("[x for x in value]", "Construct not allowed"),
+    ("lambda: 1", "Construct not allowed"),
+    ("value(1)", "Only whitelisted functions"),
+    ("other + 1", "Unknown name"),
+    ("value +", "Invalid expression"),
+])
+def test_disallowed_expressions(source, message):
+    with pytest.raises(ExpressionError, match=message):
+        compile_expression(source, ("value",))
+
@@ -0,0 +1,81 @@
+"""Blocking keys and candidate generation."""
+import itertools
+import random
+import pytest
+from app.services.match_blocking import BlockingKey, build_blocking_index, normalize_key_value, parse_blocking_fields
+
+
+def test_normalize_key_value():
+    assert normalize_key_value("  John   SMITH ") == "john smith"
+    assert normalize_key_value("   ") is None
+    assert normalize_key_value(None) is None
+
+
+def test_parse_blocking_fields():
+    keys = parse_blocking_fields(["email", ["city", "zip"], {"field": "last_name", "method": "soundex"}])
+    assert [key.name for key in keys] == ["EXACT(email)", "EXACT(city+zip)", "SOUNDEX(last_name)"]
+    assert parse_blocking_fields(None) == []
+    with pytest.raises(ValueError):
+        BlockingKey(["name"], "UNKNOWN")
+    with pytest.raises(ValueError):
+        BlockingKey.parse(42)
+
+
+def test_key_methods():
+    record = {"last_name": "Robert", "city": "Madrid", "zip": " 28001 "}
+    assert BlockingKey(["last_name"], "SOUNDEX").key(record) == "R163"
+    assert BlockingKey(["city"], "PREFIX", 2).key(record) == "ma"
+    assert BlockingKey(["city", "zip"]).key(record) == "madrid|28001"
+    assert BlockingKey(["city", "missing"]).key(record) is None
+
+
+def _records():
+    return [
+        (1, {"email": "a@x.com", "city": "Madrid"}),
+        (2, {"email": "a@x.com", "city": "Madrid"}),
+        (3, {"email": "b@x.com", "city": "Madrid"}),
+        (4, {"email": "c@x.com", "city": "Sevilla"}),
+        (5, {"email": None, "city": "Sevilla"}),
+    ]
+
+
+def test_pairs_are_unique_across_passes():
+    index = build_blocking_index(["email", "city"], _records())
+    pairs = sorted(tuple(sorted(pair)) for pair in index.candidate_pairs())
+    assert pairs == [(1, 2), (1, 3), (2, 3), (4, 5)]
+    stats = index.stats()
+    assert stats.candidate_pairs == len(pairs)
+    assert stats.naive_pairs == 10
+
+
+def test_oversized_blocks_are_skipped():
+    index = build_blocking_index(["email", "city"], _records(), max_block_size=2)
+    pairs = sorted(tuple(sorted(pair)) for pair in index.candidate_pairs())
+    assert pairs == [(1, 2), (4, 5)]
+    assert index.stats().oversized_blocks == 1
+    assert sorted(index.candidates_for({"email": "z@x.com", "city": "Madrid"})) == []
+    assert sorted(index.candidates_for({"city": "Sevilla"})) == [4, 5]
+
+
+def test_remove_and_replace():
+    index = build_blocking_index(["email"], _records())
+    index.remove(2)
+    assert list(index.candidate_pairs()) == []
+    index.add(3, {"email": "a@x.com"})
+    assert sorted(index.candidates_for({"email": "a@x.com"}, exclude=1)) == [3]
+    assert len(index) == 4
+
+
+def test_stats_match_brute_force():
+    rng = random.Random(7)
+    records = [(i, {"a": rng.choice("abcd"), "b": rng.choice("xyz")}) for i in range(60)]
+    index = build_blocking_index(["a", "b"], records, max_block_size=20)
+    expected = set()
+    for (i, left), (j, right) in itertools.combinations(records, 2):
+        for field in ("a", "b"):
+            size = sum(1 for _, record in records if record[field] == left[field])
+            if left[field] == right[field] and size <= 20:
+                expected.add((i, j))
+    pairs = {tuple(sorted(pair)) for pair in index.candidate_pairs()}
+    assert pairs == expected
+    assert index.stats().candidate_pairs == len(expected)
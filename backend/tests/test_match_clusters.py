@@ -0,0 +1,70 @@
+"""Union-find clustering of match pairs."""
+import random
+from app.services.match_clusters import MatchClusterer, UnionFind
+
+
+def _sets(components):
+    return sorted(sorted(members) for members in components)
+
+
+def test_union_find_joins_transitively():
+    uf = UnionFind()
+    uf.add_edges([("a", "b"), ("c", "d"), ("b", "c"), ("x", "y")])
+    uf.add("lonely")
+    assert _sets(uf.components()) == [["a", "b", "c", "d"], ["x", "y"]]
+    assert uf.component_size("a") == 4
+    assert uf.component_size("lonely") == 1
+    assert uf.component_size("unknown") == 1
+    assert ["lonely"] in _sets(uf.components(min_size=1))
+
+
+def test_union_find_components_are_largest_first():
+    uf = UnionFind()
+    uf.add_edges([(1, 2), (3, 4), (4, 5), (5, 6)])
+    assert [len(members) for members in uf.components()] == [4, 2]
+    assert UnionFind().components() == []
+
+
+def test_union_find_matches_naive_partition():
+    rng = random.Random(7)
+    edges = [(rng.randrange(300), rng.randrange(300)) for _ in range(250)]
+    uf = UnionFind()
+    uf.add_edges(edges)
+
+    naive = {}
+    for left, right in edges:
+        merged = naive.get(left, {left}) | naive.get(right, {right})
+        for item in merged:
+            naive[item] = merged
+    expected = sorted({tuple(sorted(group)) for group in naive.values() if len(group) > 1})
+    assert [tuple(members) for members in _sets(uf.components())] == expected
+    roots = uf.roots()
+    for left, right in edges:
+        assert roots[uf.index[left]] == roots[uf.index[right]]
+
+
+def test_clusterer_separates_auto_merge_and_review():
+    clusterer = MatchClusterer(max_cluster_size=3)
+    clusterer.add_pairs([
+        ("a", "b", True), ("b", "c", True),      # auto-merge cluster
+        ("d", "e", True), ("e", "f", False),     # joined below the auto-merge threshold
+        ("p", "q", False),                       # review only
+        ("s1", "s2", True), ("s2", "s3", True), ("s3", "s4", True),  # chain over the size limit
+    ])
+    clusters = {tuple(sorted(cluster.record_ids)): cluster for cluster in clusterer.clusters()}
+
+    assert clusters[("a", "b", "c")].auto_merge
+    assert clusters[("d", "e")].auto_merge
+    assert clusters[("d", "e", "f")].review_reason == "below_auto_merge"
+    assert clusters[("p", "q")].review_reason == "below_auto_merge"
+    assert clusters[("s1", "s2", "s3", "s4")].review_reason == "oversized"
+    assert not clusters[("s1", "s2", "s3", "s4")].auto_merge
+    # The oversized auto set is reviewed once, not again as a linked set
+    assert sum(1 for cluster in clusterer.clusters() if "s1" in cluster.record_ids) == 1
+    assert clusterer.edges == 8
+
+
+def test_clusterer_lists_auto_merge_clusters_first():
+    clusterer = MatchClusterer(max_cluster_size=10)
+    clusterer.add_pairs([("p", "q", False), ("a", "b", True)])
+    assert [cluster.auto_merge for cluster in clusterer.clusters()] == [True, False]
@@ -0,0 +1,29 @@
+"""Delta match run cutoff."""
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.core.config import settings
+from app.services.match_delta import OLDEST_WRITER_SQL, delta_cutoff
+
+LAG = timedelta(seconds=settings.MATCH_DELTA_LAG_SECONDS)
+
+
+def test_cutoff_without_writers_lags_the_run_start():
+    started = datetime(2024, 5, 1, 12, 0)
+    assert delta_cutoff(started, None) == started - LAG
+
+
+def test_cutoff_stops_before_the_oldest_open_writer():
+    started = datetime(2024, 5, 1, 12, 0)
+    writer = started - timedelta(minutes=30)
+    assert delta_cutoff(started, writer) == writer - LAG
+    assert delta_cutoff(started, started + timedelta(seconds=1)) == started - LAG
+
+
+async def test_open_writer_is_found(session_maker, entity_id):
+    async with session_maker() as writer, session_maker() as runner:
+        await writer.execute(text("UPDATE mdm_entity SET updated_at = now() WHERE id = :id"), {"id": entity_id})
+        started = (await writer.execute(text("SELECT now() AT TIME ZONE 'UTC'"))).scalar()
+        assert (await runner.execute(OLDEST_WRITER_SQL)).scalar() == started
+        await writer.rollback()
+        await runner.commit()  # pg_stat_activity is read once per transaction
+        assert (await runner.execute(OLDEST_WRITER_SQL)).scalar() is None
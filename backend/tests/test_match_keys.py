@@ -0,0 +1,105 @@
+"""Stored match keys."""
+import uuid
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from app.services.match_keys import (
+    MAX_KEY_LENGTH, comparison_keys, compute_key_rows, find_candidate_ids, match_key_specs
+)
+from app.services.match_scoring import MatchScorer
+
+
+def _scorer() -> MatchScorer:
+    fields = [
+        SimpleNamespace(
+            id=uuid.uuid4(), attribute_id=attribute_id, comparison_type=comparison, weight=1.0,
+            null_handling="IGNORE", transform_before=None, tolerance=None, is_active=True,
+        )
+        for attribute_id, comparison in ((1, "FUZZY"), (2, "PHONETIC"))
+    ]
+    rule = SimpleNamespace(
+        id=uuid.uuid4(), entity_id=uuid.uuid4(), algorithm="SOUNDEX", match_threshold=0.8,
+        auto_merge_threshold=0.95, blocking_fields=["email", {"field": "last_name", "method": "SOUNDEX"}],
+        match_fields=fields,
+    )
+    return MatchScorer(rule, {1: "first_name", 2: "last_name"})
+
+
+def test_blocking_and_comparison_keys_are_stored():
+    scorer = _scorer()
+    specs = match_key_specs(scorer)
+    assert [spec.name for spec in specs] == [
+        "block:EXACT(email)", "block:SOUNDEX(last_name)", "normalized:first_name", "phonetic:last_name"
+    ]
+    rows = compute_key_rows(
+        scorer, specs, [(uuid.uuid4(), {"email": " A@X.com", "first_name": " Ann  Marie", "last_name": "Robert"})]
+    )
+    assert [row["key_value"] for row in rows] == ["a@x.com", "R163", "ann marie", "R163"]
+
+
+def test_stored_comparison_keys_feed_the_scorer():
+    scorer = _scorer()
+    specs = match_key_specs(scorer)
+    versions = {spec.name: spec.version for spec in specs}
+    long_value = "x" * MAX_KEY_LENGTH
+    keys = comparison_keys(specs, [
+        ("a", "phonetic:last_name", "Z000", versions["phonetic:last_name"]),
+        ("b", "phonetic:last_name", "Z000", "stale"),
+        ("b", "normalized:first_name", long_value, versions["normalized:first_name"]),
+        ("b", "block:EXACT(email)", "b@x.com", versions["block:EXACT(email)"]),
+    ])
+    assert keys == {"a": {"phonetic:last_name": "Z000"}}
+
+    records = [{"first_name": "Ann", "last_name": "Robert"}, {"first_name": "Ann", "last_name": "Rupert"}]
+    computed = scorer.prepare(records)
+    stored = scorer.prepare(records, [keys.get("a"), None])
+    # Stored inputs are used as they are; records without them are computed
+    assert computed[1].codes[0] == computed[1].codes[1]
+    assert stored[1].codes[0] != stored[1].codes[1]
+    assert list(stored[0].values) == ["ann", "ann"]
+
+
+def test_transform_change_makes_comparison_keys_stale():
+    scorer = _scorer()
+    before = {spec.name: spec.version for spec in match_key_specs(scorer)}
+    scorer.fields[0].transform_before = ["NORMALIZE"]
+    after = {spec.name: spec.version for spec in match_key_specs(scorer)}
+    assert after["normalized:first_name"] != before["normalized:first_name"]
+    assert after["phonetic:last_name"] == before["phonetic:last_name"]
+
+
+def test_key_versions_follow_definitions():
+    scorer = _scorer()
+    before = {spec.name: spec.version for spec in match_key_specs(scorer)}
+    scorer.blocking_fields = ["email", {"field": "last_name", "method": "METAPHONE"}]
+    after = {spec.name: spec.version for spec in match_key_specs(scorer)}
+    assert after["block:EXACT(email)"] == before["block:EXACT(email)"]
+    assert "block:METAPHONE(last_name)" in after
+
+
+class _RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+async def test_candidate_lookup_skips_oversized_blocks():
+    db = _RecordingSession()
+    await find_candidate_ids(db, _scorer(), {"email": "a@x.com", "last_name": "Robert"}, exclude=uuid.uuid4())
+    sql = str(db.statements[0].compile(dialect=postgresql.asyncpg.dialect()))
+    assert "HAVING count(*) <= " in sql
+    assert " LIMIT " not in sql
+
+
+async def test_candidate_lookup_without_keys():
+    db = _RecordingSession()
+    assert await find_candidate_ids(db, _scorer(), {}) == []
+    assert db.statements == []
@@ -0,0 +1,85 @@
+"""Parallel match runs give the same matches as the in-process run."""
+import random
+import uuid
+from types import SimpleNamespace
+import numpy as np
+from app.services.match_engine import MatchIndex
+from app.services import match_parallel
+from app.services.match_parallel import SharedStrings, get_match_pool, run_parallel, run_workers, score_pairs_parallel
+from app.services.match_scoring import MatchScorer
+
+
+def _index() -> MatchIndex:
+    fields = [
+        SimpleNamespace(
+            id=uuid.uuid4(), attribute_id=attribute_id, comparison_type=comparison, weight=1.0,
+            null_handling="IGNORE", transform_before=None, tolerance=tolerance, is_active=True,
+        )
+        for attribute_id, comparison, tolerance in ((1, "FUZZY", None), (2, "NUMERIC", "10%"))
+    ]
+    rule = SimpleNamespace(
+        id=uuid.uuid4(), entity_id=uuid.uuid4(), algorithm="JARO_WINKLER", match_threshold=0.8,
+        auto_merge_threshold=0.95, blocking_fields=[{"field": "name", "method": "PREFIX", "length": 2}],
+        match_fields=fields,
+    )
+    index = MatchIndex(MatchScorer(rule, {1: "name", 2: "amount"}))
+    rng = random.Random(3)
+    names = ["martha", "marhta", "maria", "mario", "jose", "josef", "joseph", "ana", "anna", "ñandú"]
+    index.add_many(
+        (f"r{i}", {"name": rng.choice(names) + rng.choice(["", " s", " t"]), "amount": rng.choice([None, 10, 11, 50])})
+        for i in range(300)
+    )
+    index.remove("r7")
+    return index
+
+
+def test_shared_strings_round_trip():
+    data, offsets = SharedStrings.encode(["abc", None, "", "ñandú"])
+    strings = SharedStrings(data, offsets)
+    assert strings[np.array([3, 0, 1])] == ["ñandú", "abc", ""]
+
+
+def test_parallel_run_matches_serial_run():
+    index = _index()
+    serial = index.run()
+    progress = []
+    parallel = run_parallel(index, workers=2, chunk_size=500, progress=progress.append)
+
+    assert parallel.candidate_pairs == serial.candidate_pairs
+    assert sorted(parallel.pairs) == sorted(serial.pairs)
+    assert progress[-1].pairs_scored == serial.candidate_pairs
+    assert progress[-1].matches == len(serial.pairs)
+
+
+def test_runs_share_one_capped_pool(monkeypatch):
+    match_parallel.shutdown_match_pool()
+    monkeypatch.setattr(match_parallel.settings, "MATCH_WORKERS", 2)
+    assert run_workers(64) == 2 and run_workers(None) == 2 and run_workers(1) == 1
+
+    index = _index()
+    serial = sorted(index.run().pairs)
+    first = run_parallel(index, workers=64, chunk_size=500)
+    pool = get_match_pool()
+    second = run_parallel(index, workers=2, chunk_size=700)
+    try:
+        assert get_match_pool() is pool and pool._max_workers == 2
+        assert sorted(first.pairs) == sorted(second.pairs) == serial
+    finally:
+        match_parallel.shutdown_match_pool()
+
+
+async def test_async_scoring_matches_serial_run():
+    index = _index()
+    serial = index.run()
+    records = list(zip(index.blocking.record_ids, index.slot_records()))
+    updates = []
+
+    async def progress(update):
+        updates.append(update)
+
+    matches = await score_pairs_parallel(
+        index.scorer, records, list(index.blocking.candidate_slot_pairs()), progress, chunk_size=400
+    )
+    assert sorted(matches) == sorted(serial.pairs)
+    assert updates[-1].pairs_scored == serial.candidate_pairs
+    assert len(updates) == -(-serial.candidate_pairs // 400)
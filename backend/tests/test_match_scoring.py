@@ -0,0 +1,89 @@
+"""Vectorized match scoring."""
+import pickle
+import uuid
+from types import SimpleNamespace
+import Levenshtein
+import numpy as np
+import pytest
+from app.services.match_scoring import MatchScorer, factorize, parse_tolerance
+
+
+def _field(attribute_id, comparison, weight=1.0, null_handling="IGNORE", tolerance=None, transform_before=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(), attribute_id=attribute_id, comparison_type=comparison, weight=weight,
+        null_handling=null_handling, transform_before=transform_before, tolerance=tolerance, is_active=True,
+    )
+
+
+def _scorer(fields, algorithm="LEVENSHTEIN", match_threshold=0.8, auto_merge_threshold=0.95) -> MatchScorer:
+    rule = SimpleNamespace(
+        id=uuid.uuid4(), entity_id=uuid.uuid4(), algorithm=algorithm, match_threshold=match_threshold,
+        auto_merge_threshold=auto_merge_threshold, blocking_fields=["name"], match_fields=fields,
+    )
+    return MatchScorer(rule, {field.attribute_id: code for field, code in zip(fields, ("name", "amount", "born", "city"))})
+
+
+def _score(scorer, records, pairs):
+    left = np.array([a for a, _ in pairs], dtype=np.int64)
+    right = np.array([b for _, b in pairs], dtype=np.int64)
+    return scorer.score(scorer.prepare(records), left, right)
+
+
+def test_parse_tolerance():
+    assert parse_tolerance("5") == (5.0, "absolute")
+    assert parse_tolerance("10%") == (10.0, "relative")
+    assert parse_tolerance("30d") == (30.0, "absolute")
+    assert parse_tolerance(None) is None
+    with pytest.raises(ValueError):
+        parse_tolerance("soon")
+
+
+def test_factorize():
+    assert factorize(["a", None, "b", "a"]).tolist() == [0, -1, 1, 0]
+
+
+def test_scores_match_scalar_reference():
+    fields = [
+        _field(1, "FUZZY", weight=2.0, transform_before=["NORMALIZE"]),
+        _field(2, "NUMERIC", tolerance="10%"),
+        _field(3, "DATE", tolerance="10d"),
+        _field(4, "PHONETIC", weight=0.5),
+    ]
+    scorer = _scorer(fields, algorithm="LEVENSHTEIN", match_threshold=0.7)
+    records = [
+        {"name": "Jon  Smith", "amount": 100, "born": "1980-01-01", "city": "Madrid"},
+        {"name": "john smith", "amount": 95, "born": "1980-01-06", "city": "Madryd"},
+        {"name": "Jane Doe", "amount": None, "born": None, "city": "Sevilla"},
+    ]
+    scored = _score(scorer, records, [(0, 1), (0, 2)])
+
+    name = Levenshtein.ratio("jon smith", "john smith")
+    expected = (2.0 * name + 1.0 * 0.5 + 1.0 * 0.5 + 0.5 * 1.0) / 4.5
+    assert scored.field_scores[0].tolist() == pytest.approx([name, 0.5, 0.5, 1.0])
+    assert scored.scores[0] == pytest.approx(expected)
+    # Null amount and date are ignored: only name and city weigh in
+    name = Levenshtein.ratio("jon smith", "jane doe")
+    assert scored.scores[1] == pytest.approx(2.0 * name / 2.5)
+    assert scored.is_match.tolist() == [True, False]
+
+
+@pytest.mark.parametrize("null_handling, expected", [("MATCH", 1.0), ("NO_MATCH", 0.5), ("IGNORE", 1.0)])
+def test_null_handling(null_handling, expected):
+    scorer = _scorer([_field(1, "EXACT"), _field(2, "EXACT", null_handling=null_handling)])
+    scored = _score(scorer, [{"name": "a", "amount": 1}, {"name": "a"}], [(0, 1)])
+    assert scored.scores[0] == pytest.approx(expected)
+
+
+def test_scorer_survives_pickling():
+    scorer = _scorer([_field(1, "FUZZY"), _field(2, "NUMERIC", tolerance="5")], algorithm="JARO_WINKLER")
+    records = [{"name": "Martha", "amount": 10}, {"name": "Marhta", "amount": 12}]
+    restored = pickle.loads(pickle.dumps(scorer))
+    assert restored.field_codes == scorer.field_codes
+    assert _score(restored, records, [(0, 1)]).scores[0] == pytest.approx(_score(scorer, records, [(0, 1)]).scores[0])
+
+
+def test_rule_without_active_fields():
+    field = _field(1, "EXACT")
+    field.is_active = False
+    with pytest.raises(ValueError):
+        _scorer([field])
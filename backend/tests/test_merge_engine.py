@@ -0,0 +1,83 @@
+"""Golden record membership (needs TEST_DATABASE_URL)."""
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from app.models.record import MDMGoldenRecord, MDMGoldenRecordMember, MDMRecord
+from app.services.merge_engine import merge_clusters
+
+
+async def _records(session_maker, entity_id, names):
+    start = datetime(2024, 1, 1)
+    async with session_maker() as db:
+        records = [
+            MDMRecord(entity_id=entity_id, source_system="CRM", data={"name": name}, updated_at=start + timedelta(days=i))
+            for i, name in enumerate(names)
+        ]
+        db.add_all(records)
+        await db.commit()
+        return [record.id for record in records]
+
+
+async def _golden_of(db, record_id):
+    result = await db.execute(
+        select(MDMGoldenRecord)
+        .join(MDMGoldenRecordMember, MDMGoldenRecordMember.golden_record_id == MDMGoldenRecord.id)
+        .where(MDMGoldenRecordMember.record_id == record_id)
+    )
+    return result.scalar_one()
+
+
+async def test_golden_record_losing_members_is_recomputed(session_maker, entity_id):
+    a, b, c, e, f = await _records(session_maker, entity_id, ["A", "B", "C", "E", "F"])
+    async with session_maker() as db:
+        await merge_clusters(db, entity_id, [[a, b, c], [e, f]])
+        before = await _golden_of(db, a)
+        assert (before.member_count, before.data["name"]) == (3, "C")
+
+        # C moves to the E/F golden record; A and B keep theirs
+        stats = await merge_clusters(db, entity_id, [[c, e, f]])
+        db.expire_all()
+        kept, moved = await _golden_of(db, a), await _golden_of(db, c)
+
+    assert kept.id == before.id and moved.id != before.id
+    assert (kept.member_count, kept.data["name"], kept.version) == (2, "B", before.version + 1)
+    assert str(c) not in kept.lineage["name"]["records"]
+    assert moved.member_count == 3
+    assert stats["golden_updated"] == 2
+
+
+async def test_reused_golden_record_keeps_members_outside_the_batch(session_maker, entity_id):
+    a, b, c, d = await _records(session_maker, entity_id, ["A", "B", "C", "D"])
+    async with session_maker() as db:
+        await merge_clusters(db, entity_id, [[a, b, c]])
+        await merge_clusters(db, entity_id, [[b, c, d]])
+        db.expire_all()
+        golden = await _golden_of(db, a)
+
+    assert golden.member_count == 4
+    assert golden.data["name"] == "D"
+
+
+async def test_shrunk_golden_records_are_written_in_one_statement(session_maker, entity_id):
+    ids = await _records(session_maker, entity_id, [f"R{i}" for i in range(9)])
+    groups = [ids[i:i + 3] for i in range(0, 9, 3)]
+    async with session_maker() as db:
+        await merge_clusters(db, entity_id, groups)
+        await db.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = db.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            # The last member of each group joins one of the golden records; the other two shrink
+            stats = await merge_clusters(db, entity_id, [[group[-1] for group in groups]])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    golden_writes = [statement for statement in statements if "mdm_golden_record " in statement.split("SET")[0]]
+    assert stats["golden_updated"] == 3
+    assert sum(statement.startswith("INSERT INTO mdm_golden_record ") for statement in golden_writes) == 2
+    assert not any(statement.startswith("UPDATE mdm_golden_record ") for statement in golden_writes)
@@ -0,0 +1,37 @@
+"""Metadata cache fills and invalidation.
+
+Redis is not required: connection errors are treated as cache misses, so
+these tests exercise the process-local tier.
+"""
+from app.services.metadata_cache import MetadataCache
+
+
+async def test_value_is_cached_locally():
+    cache = MetadataCache(prefix="test:meta", enabled=True)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"name": "Customer"}
+
+    assert await cache.get_or_load("owner", "entity", load) == {"name": "Customer"}
+    assert await cache.get_or_load("owner", "entity", load) == {"name": "Customer"}
+    assert len(loads) == 1
+
+
+async def test_invalidation_during_load_is_not_cached():
+    cache = MetadataCache(prefix="test:meta", enabled=True)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        if len(loads) == 1:
+            # A write lands while the (possibly stale) value is being read
+            await cache.invalidate("owner")
+            return {"name": "before"}
+        return {"name": "after"}
+
+    assert await cache.get_or_load("owner", "entity", load) == {"name": "before"}
+    assert await cache.get_or_load("owner", "entity", load) == {"name": "after"}
+    assert await cache.get_or_load("owner", "entity", load) == {"name": "after"}
+    assert len(loads) == 2
@@ -0,0 +1,69 @@
+"""Keyset cursors and count estimates."""
+import json
+from uuid import uuid4
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.models.catalog import MDMCatalogValue
+from app.models.entity import MDMEntity
+from app.services.catalog_cache import VALUE_ORDER
+from app.utils.pagination import Explain, apply_keyset, decode_cursor, encode_cursor, next_cursor, plan_rows
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.asyncpg.dialect()))
+
+
+def test_cursor_round_trip():
+    key = (3, "Blue", uuid4())
+    assert decode_cursor(encode_cursor(key), (int, str, type(key[2]))) == key
+
+
+def test_cursor_keeps_none():
+    assert decode_cursor(encode_cursor((None, "x")), (lambda value: value, str)) == (None, "x")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(("a",)), encode_cursor(("a", "b", "c"))])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, (str, str))
+
+
+def test_cursor_with_wrong_type_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(("abc",)), (int,))
+
+
+def test_next_cursor_only_on_full_pages():
+    items = [(1, "a"), (2, "b")]
+    assert next_cursor(items, 3, lambda item: item) is None
+    assert next_cursor([], 3, lambda item: item) is None
+    assert decode_cursor(next_cursor(items, 2, lambda item: item), (int, str)) == (2, "b")
+
+
+def test_apply_keyset_orders_and_seeks():
+    query = apply_keyset(select(MDMEntity), (MDMEntity.entity_name, MDMEntity.id), ("Customer", uuid4()))
+    sql = _sql(query)
+    assert "(mdm_entity.entity_name, mdm_entity.id) > ($1::VARCHAR, $2::UUID)" in sql
+    assert sql.endswith("ORDER BY mdm_entity.entity_name, mdm_entity.id")
+
+
+def test_catalog_value_pages_and_listing_share_order():
+    base = select(MDMCatalogValue).where(MDMCatalogValue.catalog_id == uuid4())
+    paged = _sql(apply_keyset(base, VALUE_ORDER, None))
+    listed = _sql(base.order_by(*VALUE_ORDER))
+    assert paged == listed
+    assert "ORDER BY coalesce(mdm_catalog_value.sort_order" in paged
+
+
+def test_explain_keeps_query_filters():
+    query = select(MDMEntity).where(MDMEntity.is_active == True, MDMEntity.entity_code.ilike("%cust%"))
+    sql = _sql(Explain(query))
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "ILIKE $1" in sql
+
+
+def test_plan_rows_reads_top_node():
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}}]
+    assert plan_rows(plan) == 42
+    assert plan_rows(json.dumps(plan)) == 42
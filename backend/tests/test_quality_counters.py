@@ -0,0 +1,68 @@
+"""Quality counters maintained on record writes (needs TEST_DATABASE_URL)."""
+from sqlalchemy import select
+from app.models.attribute import DataType, MDMAttribute
+from app.models.quality import MDMQualityCounter, MDMQualityRule, QualityDimension, RuleType
+from app.services.quality_counters import apply_record_changes, quality_counter_engine, reconcile_quality_counters
+from app.services.quality_engine import run_quality_rules
+
+
+async def _rule(db, entity_id, code, expression):
+    rule = MDMQualityRule(
+        rule_code=code, rule_name=code, entity_id=entity_id, dimension=QualityDimension.VALIDITY,
+        rule_type=RuleType.BUILTIN, rule_expression=expression,
+    )
+    db.add(rule)
+    await db.flush()
+    quality_counter_engine.evict(str(entity_id))
+    return rule
+
+
+async def _counter(db, rule):
+    result = await db.execute(
+        select(MDMQualityCounter).where(MDMQualityCounter.rule_id == rule.id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def test_rule_added_after_reconcile_gets_a_counter(session_maker, entity_id):
+    async with session_maker() as db:
+        db.add(MDMAttribute(entity_id=entity_id, attribute_code="zip", attribute_name="Zip", data_type=DataType.STRING))
+        await _rule(db, entity_id, "ZIP_FILLED", "completeness(zip)")
+        await reconcile_quality_counters(db, entity_id)
+        added = await _rule(db, entity_id, "ZIP_DIGITS", 'pattern(zip, "^[[:digit:]]{5}$")')
+
+        await apply_record_changes(db, entity_id, [(None, {"zip": "12345"}), (None, {"zip": "1234a"})])
+        counter = await _counter(db, added)
+        assert (counter.records_evaluated, counter.records_passed) == (2, 1)
+        assert counter.reconciled_at is None
+
+        await db.commit()
+        await apply_record_changes(db, entity_id, [({"zip": "1234a"}, {"zip": "54321"})])
+        counter = await _counter(db, added)
+        assert (counter.records_evaluated, counter.records_passed) == (2, 2)
+
+
+async def test_invalid_posix_pattern_is_a_compile_error(session_maker, entity_id):
+    async with session_maker() as db:
+        db.add(MDMAttribute(entity_id=entity_id, attribute_code="zip", attribute_name="Zip", data_type=DataType.STRING))
+        # Valid in Python's re, rejected by Postgres
+        await _rule(db, entity_id, "ZIP_NAMED_GROUP", 'pattern(zip, "^(?P<d>[0-9])")')
+        plan = await quality_counter_engine.get_plan(db, entity_id)
+        assert plan.checks == []
+        assert plan.compile_errors[0].startswith("ZIP_NAMED_GROUP: Invalid regular expression")
+        await apply_record_changes(db, entity_id, [(None, {"zip": "1"})])
+
+
+async def test_invalid_pattern_does_not_fail_the_other_rules(session_maker, entity_id):
+    async with session_maker() as db:
+        db.add(MDMAttribute(entity_id=entity_id, attribute_code="zip", attribute_name="Zip", data_type=DataType.STRING))
+        await _rule(db, entity_id, "ZIP_FILLED", "completeness(zip)")
+        await _rule(db, entity_id, "ZIP_NAMED_GROUP", 'pattern(zip, "^(?P<d>[0-9])")')
+
+        report = await run_quality_rules(db, entity_id)
+        assert [outcome.rule.rule_code for outcome in report.outcomes] == ["ZIP_FILLED"]
+        assert report.errors[0].startswith("ZIP_NAMED_GROUP: Invalid regular expression")
+
+        reconciled = await reconcile_quality_counters(db, entity_id)
+        assert reconciled["rules"] == 1
+        assert reconciled["errors"][0].startswith("ZIP_NAMED_GROUP: Invalid regular expression")
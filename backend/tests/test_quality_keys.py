@@ -0,0 +1,62 @@
+"""Uniqueness key hashes computed in Python and in SQL must agree."""
+import hashlib
+import pytest
+from sqlalchemy import func, select
+from app.models.record import MDMRecord
+from app.services.quality_counters import KEY_SEPARATOR, RowCheck, _text, key_hash
+from app.services.quality_engine import attribute_value
+
+SAMPLES = [
+    {"a": "Smith", "b": "1990-01-01"},
+    {"a": "  padded ", "b": "x"},
+    {"a": "Zoë", "b": "ü"},
+    {"a": True, "b": False},
+    {"a": 42, "b": 1.5},
+    {"a": 1e20, "b": 1e-7},
+    {"a": {"bb": 1, "a": [1, "é"]}, "b": [None, {"z": 0.25}]},
+    {"a": "   ", "b": "blank"},
+    {"a": "missing b"},
+]
+
+
+def test_key_hash_is_md5_of_joined_values():
+    assert key_hash(["a", "b"]) == hashlib.md5(f"a{KEY_SEPARATOR}b".encode()).hexdigest()
+    assert key_hash(["a", "b"]) != key_hash(["a b"])
+
+
+@pytest.mark.parametrize("value, expected", [
+    (" x ", "x"), ("\tx", "\tx"), ("  ", None), (None, None), (True, "true"), (7, "7"),
+    (1e20, "100000000000000000000"), (1e-7, "0.0000001"),
+    ({"long": 1, "b": "é"}, '{"b": "é", "long": 1}'), ([1, None], "[1, null]"),
+])
+def test_text_follows_jsonb_output(value, expected):
+    assert _text(value) == expected
+
+
+def test_incomplete_keys_are_skipped():
+    check = RowCheck(rule_id=None, dimension=None, check="uniqueness", codes=("a", "b"))
+    assert check.values({"a": "x"}) is None
+    assert check.values({"a": "x", "b": " "}) is None
+    assert check.values({"a": " x", "b": 2}) == ["x", "2"]
+
+
+async def test_python_and_sql_key_hashes_agree(session_maker, entity_id):
+    check = RowCheck(rule_id=None, dimension=None, check="uniqueness", codes=("a", "b"))
+    values = [attribute_value(code) for code in check.codes]
+    async with session_maker() as db:
+        records = [MDMRecord(entity_id=entity_id, data=data) for data in SAMPLES]
+        db.add_all(records)
+        await db.commit()
+        result = await db.execute(
+            select(MDMRecord.id, func.md5(func.concat_ws(KEY_SEPARATOR, *values)))
+            .where(MDMRecord.entity_id == entity_id, *(value.isnot(None) for value in values))
+        )
+        in_sql = dict(result.tuples().all())
+
+    in_python = {}
+    for record, data in zip(records, SAMPLES):
+        key = check.values(data)
+        if key is not None:
+            in_python[record.id] = key_hash(key)
+    assert in_python == in_sql
+    assert len(in_python) == len(SAMPLES) - 2
@@ -0,0 +1,89 @@
+"""Schedule parsing and scheduler concurrency slots.
+
+Slot tests need Redis and run against TEST_REDIS_URL; they are skipped when it
+is not set.
+"""
+import asyncio
+import os
+from datetime import datetime
+import pytest
+from redis import asyncio as aioredis
+from app.core.config import settings
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import Scheduler
+from app.utils.cron import CronSchedule, IntervalSchedule, occurrences, parse_schedule
+
+TEST_REDIS_URL = os.environ.get("TEST_REDIS_URL")
+
+
+def test_cron_fields_ranges_steps_and_names():
+    schedule = CronSchedule("*/15 9-17 * jan-mar mon-fri")
+    assert schedule.minutes == frozenset({0, 15, 30, 45})
+    assert schedule.hours == frozenset(range(9, 18))
+    assert schedule.months == frozenset({1, 2, 3})
+    assert schedule.weekdays == frozenset({1, 2, 3, 4, 5})
+    assert CronSchedule("0 0 * * 7").weekdays == frozenset({0})
+    assert CronSchedule("5/20 * * * *").minutes == frozenset({5, 25, 45})
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "x * * * *", ""])
+def test_invalid_schedules_raise(expression):
+    with pytest.raises(ValueError):
+        parse_schedule(expression)
+
+
+def test_cron_next_after():
+    assert CronSchedule("30 2 * * *").next_after(datetime(2024, 1, 1, 2, 30)) == datetime(2024, 1, 2, 2, 30)
+    assert CronSchedule("@monthly").next_after(datetime(2024, 1, 31, 12)) == datetime(2024, 2, 1)
+    assert CronSchedule("0 0 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+    # Both day fields restricted: either matches (the 1st, or a Monday)
+    assert CronSchedule("0 0 1 * mon").next_after(datetime(2024, 1, 2)) == datetime(2024, 1, 8)
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))
+
+
+def test_intervals_align_to_the_epoch():
+    schedule = parse_schedule("every 15m")
+    assert isinstance(schedule, IntervalSchedule)
+    assert schedule.next_after(datetime(2024, 1, 1, 10, 7)) == datetime(2024, 1, 1, 10, 15)
+    assert schedule.next_after(datetime(2024, 1, 1, 10, 15)) == datetime(2024, 1, 1, 10, 30)
+
+
+def test_occurrences_keep_the_latest_and_count_all():
+    moments, total = occurrences(parse_schedule("1h"), datetime(2024, 1, 1), datetime(2024, 1, 1, 5), 2)
+    assert moments == [datetime(2024, 1, 1, 4), datetime(2024, 1, 1, 5)]
+    assert total == 5
+
+
+@pytest.fixture
+async def redis_scheduler(monkeypatch):
+    if not TEST_REDIS_URL:
+        pytest.skip("TEST_REDIS_URL is not set")
+    client = aioredis.from_url(TEST_REDIS_URL, decode_responses=True)
+    monkeypatch.setattr(scheduler_module, "redis_client", client)
+    monkeypatch.setattr(scheduler_module, "_ACQUIRE_SLOT", client.register_script(scheduler_module._ACQUIRE_SLOT.script))
+    scheduler = Scheduler(prefix="mdm:sched:test", enabled=False)
+    await client.delete("mdm:sched:test:slots:entity:e")
+    yield scheduler, client
+    await client.delete("mdm:sched:test:slots:entity:e")
+    await client.aclose()
+
+
+async def test_slots_are_limited_and_released_by_token(redis_scheduler):
+    scheduler, _ = redis_scheduler
+    first = await scheduler._acquire_slot("entity:e", 2)
+    second = await scheduler._acquire_slot("entity:e", 2)
+    assert first and second and first != second
+    assert await scheduler._acquire_slot("entity:e", 2) is None
+    await scheduler._release_slot("entity:e", first)
+    assert await scheduler._acquire_slot("entity:e", 2) is not None
+
+
+async def test_slot_of_a_dead_holder_expires(redis_scheduler, monkeypatch):
+    scheduler, _ = redis_scheduler
+    monkeypatch.setattr(settings, "SCHEDULER_JOB_TIMEOUT_SECONDS", 1)
+    assert await scheduler._acquire_slot("entity:e", 1) is not None
+    # Failed attempts must not keep the held slot alive
+    assert await scheduler._acquire_slot("entity:e", 1) is None
+    await asyncio.sleep(2.1)
+    assert await scheduler._acquire_slot("entity:e", 1) is not None
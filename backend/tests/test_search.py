@@ -0,0 +1,27 @@
+"""Search helpers."""
+from app.core.config import settings
+from app.utils.search import escape_like, set_word_similarity_threshold
+
+
+class RecordingSession:
+    def __init__(self):
+        self.params = []
+
+    async def execute(self, statement, params=None):
+        self.params.append(params)
+
+
+def test_escape_like():
+    assert escape_like(r"50%_off\now") == r"50\%\_off\\now"
+
+
+async def test_explicit_zero_threshold_is_kept():
+    db = RecordingSession()
+    await set_word_similarity_threshold(db, 0)
+    assert db.params == [{"threshold": "0"}]
+
+
+async def test_missing_threshold_uses_setting():
+    db = RecordingSession()
+    await set_word_similarity_threshold(db, None)
+    assert db.params == [{"threshold": str(settings.SEARCH_SIMILARITY_THRESHOLD)}]
@@ -0,0 +1,86 @@
+"""Survivorship functions and merge plans."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from app.models.match_merge import StrategyType
+from app.services.merge_engine import (
+    MergeSource, aggregate, compile_strategy, merge_engine, most_complete, most_recent, most_trusted
+)
+
+T0 = datetime(2024, 1, 1)
+
+
+def _source(record_id, data, days=0, source_system="CRM"):
+    return MergeSource(record_id, source_system, T0 + timedelta(days=days), data)
+
+
+def _candidates(code, *sources):
+    return [(source.data[code], source) for source in sources]
+
+
+def _strategy(strategy_type, **options):
+    fields = {"id": 1, "trust_source_order": None, "aggregate_function": None, "custom_function": None}
+    return SimpleNamespace(strategy_type=strategy_type, **{**fields, **options})
+
+
+def test_most_recent_and_most_complete():
+    newer, older = _source("n", {"name": "Bob"}), _source("o", {"name": "Robert"})
+    candidates = _candidates("name", newer, older)
+    assert most_recent(candidates).record_ids == ("n",)
+    assert most_complete(candidates).value == "Robert"
+    assert most_recent([]) is None
+
+
+def test_most_trusted_ranks_unlisted_sources_last():
+    survive = most_trusted(["ERP", "CRM"])
+    candidates = _candidates(
+        "name", _source("w", {"name": "Web"}, source_system="WEB"), _source("c", {"name": "Crm"}),
+        _source("e", {"name": "Erp"}, source_system="ERP"),
+    )
+    survivor = survive(candidates)
+    assert (survivor.value, survivor.source_system) == ("Erp", "ERP")
+    assert survive(candidates[:1]).value == "Web"
+
+
+@pytest.mark.parametrize("function, expected", [
+    ("SUM", 6), ("AVG", 2), ("MIN", 1), ("MAX", 3), ("COUNT", 3), ("CONCAT", "1, 2, 3"),
+])
+def test_aggregates(function, expected):
+    sources = [_source(str(i), {"n": i}) for i in (1, 2, 3)]
+    survivor = aggregate(function)(_candidates("n", *sources))
+    assert survivor.value == expected
+    assert survivor.record_ids == ("1", "2", "3")
+
+
+def test_aggregate_union_and_unknown_function():
+    union = aggregate("union")(_candidates("tags", _source("a", {"tags": ["x", "y"]}), _source("b", {"tags": "x"})))
+    assert union.value == ["x", "y"]
+    with pytest.raises(ValueError):
+        aggregate("MEDIAN")
+
+
+def test_compile_strategy_rejects_bad_configuration():
+    with pytest.raises(ValueError):
+        compile_strategy("name", _strategy("MOST_TRUSTED", trust_source_order="ERP"))
+    with pytest.raises(ValueError):
+        compile_strategy("name", _strategy("CUSTOM", custom_function="missing"))
+    assert compile_strategy("name", _strategy(None)).strategy == StrategyType.MOST_RECENT
+
+
+def test_merge_plan_skips_blanks_keeps_manual_values_and_records_lineage():
+    plan = merge_engine.compile_plan("entity", [
+        ("name", _strategy("MOST_COMPLETE")),
+        ("status", _strategy("MANUAL")),
+        ("bad", _strategy("CUSTOM", custom_function="missing")),
+    ])
+    assert len(plan.compile_errors) == 1
+    cluster = [
+        _source("old", {"name": "Robert", "status": "A", "email": "old@x.com"}),
+        _source("new", {"name": "Bob", "status": "B", "email": "  "}, days=1),
+    ]
+    kept, fresh = plan.merge_batch([cluster, cluster], [{"status": "LOCKED"}, None])
+
+    assert kept.data == {"name": "Robert", "status": "LOCKED", "email": "old@x.com"}
+    assert kept.lineage["status"]["records"] == []
+    assert kept.lineage["email"] == {"strategy": "MOST_RECENT", "records": ["old"], "source": "CRM"}
+    assert fresh.data["status"] == "B"
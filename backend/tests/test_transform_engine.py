@@ -0,0 +1,107 @@
+"""Compiled transform pipelines."""
+import uuid
+from types import SimpleNamespace
+import pytest
+from cryptography.fernet import Fernet
+from pydantic import ValidationError
+from app.core.config import settings
+from app.models.attribute import ApplyOn, TransformType
+from app.schemas.attribute import TransformBase
+from app.services.transform_engine import TransformEngine, TransformStep, register_transform
+
+
+def _transform(transform_type, order=0, config=None, condition=None, apply_on=ApplyOn.INPUT):
+    return SimpleNamespace(
+        id=uuid.uuid4(), transform_type=transform_type, transform_config=config or {},
+        apply_on=apply_on, execution_order=order, condition_expression=condition,
+        is_active=True, updated_at=None,
+    )
+
+
+def _attribute(code, transforms, order=0):
+    return SimpleNamespace(id=uuid.uuid4(), attribute_code=code, display_order=order, transforms=transforms)
+
+
+def _column(transform, values, records=None):
+    column = list(values)
+    TransformStep(transform).apply(column, records or [{} for _ in column])
+    return column
+
+
+@register_transform("reverse")
+def _reverse(values):
+    return [str(value)[::-1] for value in values]
+
+
+def test_pipeline_runs_in_order_per_phase():
+    engine = TransformEngine()
+    plan = engine.compile_plan("entity", [
+        _attribute("name", [
+            _transform(TransformType.UPPERCASE, 2),
+            _transform(TransformType.NORMALIZE, 1, {"strip_accents": True}),
+            _transform(TransformType.TRIM, 0),
+        ]),
+        _attribute("card", [_transform(TransformType.MASK, 0, apply_on=ApplyOn.OUTPUT)], order=1),
+    ])
+    records = [{"name": "  José  Núñez ", "card": "4111111111111111"}, {"card": None}]
+    assert plan.transform_batch(records, ApplyOn.INPUT) == [
+        {"name": "JOSE NUNEZ", "card": "4111111111111111"}, {"card": None}
+    ]
+    assert plan.transform_batch(records, ApplyOn.OUTPUT)[0]["card"] == "************1111"
+    assert records[0]["name"] == "  José  Núñez "
+
+
+def test_string_only_transforms_skip_other_types():
+    assert _column(_transform(TransformType.LOWERCASE), ["ABC", 12, None]) == ["abc", 12, None]
+
+
+def test_condition_selects_rows():
+    transform = _transform(TransformType.UPPERCASE, condition="record.get('country') == 'ES'")
+    records = [{"country": "ES"}, {"country": "FR"}, {}]
+    assert _column(transform, ["a", "b", "c"], records) == ["A", "b", "c"]
+
+
+def test_hash_per_distinct_keeps_types_apart():
+    transform = _transform(TransformType.HASH, config={"salt": "s"})
+    column = _column(transform, ["1", 1, True, "1", {"a": 1}, 1])
+    assert column[0] == column[3] and column[1] == column[5]
+    assert len({column[0], column[1], column[2]}) == 2  # "1" and 1 both stringify to "1"
+    assert column[2] != column[1]
+    assert len(column[4]) == 64
+
+
+def test_custom_transform():
+    assert _column(_transform(TransformType.CUSTOM, config={"function": "reverse"}), ["abc"]) == ["cba"]
+
+
+def test_compile_errors_are_collected():
+    engine = TransformEngine()
+    plan = engine.compile_plan("entity", [_attribute("x", [
+        _transform(TransformType.CUSTOM, config={"function": "missing"}),
+        _transform(TransformType.HASH, config={"algorithm": "nope"}),
+        _transform(TransformType.UPPERCASE, condition="__import__('os')"),
+    ])])
+    assert plan.pipelines == []
+    assert len(plan.compile_errors) == 3
+
+
+def test_encrypt_uses_named_key_from_settings(monkeypatch):
+    key = Fernet.generate_key().decode()
+    monkeypatch.setattr(settings, "TRANSFORM_ENCRYPTION_KEYS", {"pii": key})
+    column = _column(_transform(TransformType.ENCRYPT, config={"key_name": "pii"}), ["secret", "secret"])
+    assert column[0] != column[1]  # Fernet tokens are not deterministic
+    assert Fernet(key.encode()).decrypt(column[0].encode()) == b"secret"
+
+
+def test_encrypt_rejects_inline_and_unknown_keys(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSFORM_ENCRYPTION_KEYS", {})
+    with pytest.raises(ValueError, match="key_name"):
+        TransformStep(_transform(TransformType.ENCRYPT, config={"key": Fernet.generate_key().decode()}))
+    with pytest.raises(ValueError, match="Unknown encryption key"):
+        TransformStep(_transform(TransformType.ENCRYPT, config={"key_name": "pii"}))
+
+
+def test_schema_rejects_inline_keys():
+    with pytest.raises(ValidationError):
+        TransformBase(transform_type=TransformType.ENCRYPT, transform_config={"key": "abc"})
+    assert TransformBase(transform_type=TransformType.ENCRYPT, transform_config={"key_name": "pii"})
@@ -0,0 +1,116 @@
+"""Compiled validation plans."""
+import uuid
+from app.models.attribute import MDMAttribute, MDMAttributeValidation
+from app.services.validation_engine import ValidationEngine, ValidationPlan, register_validator
+
+
+def _validation(validation_type, **fields) -> MDMAttributeValidation:
+    return MDMAttributeValidation(
+        id=uuid.uuid4(), validation_type=validation_type, is_active=True, severity=fields.pop("severity", "ERROR"),
+        **fields
+    )
+
+
+def _attribute(code, validations=(), required=False, order=0) -> MDMAttribute:
+    return MDMAttribute(
+        id=uuid.uuid4(), attribute_code=code, is_required=required, display_order=order,
+        validations=list(validations)
+    )
+
+
+@register_validator("is_even")
+def _is_even(value) -> bool:
+    return int(value) % 2 == 0
+
+
+def _plan() -> ValidationPlan:
+    return ValidationPlan.compile("entity", [
+        _attribute("email", [_validation("REGEX", regex_pattern=r"[^@\s]+@[^@\s]+")], required=True),
+        _attribute("age", [
+            _validation("RANGE", min_value=0, max_value=150, execution_order=1),
+            _validation("CUSTOM", custom_function="is_even", severity="WARNING", execution_order=2),
+        ], order=1),
+        _attribute("code", [
+            _validation("LENGTH", min_length=2, max_length=3),
+            _validation("SCRIPT", validation_rule="value != record.get('email')", allowed_values=["AB", "XYZ", "a@b"]),
+        ], order=2),
+    ])
+
+
+def test_batch_reports_issues_by_row():
+    report = _plan().validate_batch([
+        {"email": "a@b", "age": 30, "code": "AB"},
+        {"email": "", "age": 200, "code": "ABCD"},
+        {"email": "no-at", "age": "x", "code": "Q"},
+        {"email": "c@d", "age": 3},
+    ])
+    assert report.invalid_rows == [1, 2]
+    assert report.summary() == {"total": 4, "valid": 2, "invalid": 2, "errors": 6, "warnings": 1}
+    assert [(issue.row, issue.attribute_code, issue.validation_type) for issue in report.issues] == [
+        (1, "email", "REQUIRED"), (1, "age", "RANGE"), (1, "code", "LENGTH"),
+        (2, "email", "REGEX"), (2, "age", "RANGE"), (2, "code", "LENGTH"),
+        (3, "age", "CUSTOM"),
+    ]
+
+
+def test_fail_fast_skips_rest_of_record():
+    report = _plan().validate_batch([{"email": "", "age": 200, "code": "ABCD"}], fail_fast=True)
+    assert [issue.validation_type for issue in report.issues] == ["REQUIRED"]
+
+
+def test_script_rule_sees_record():
+    report = _plan().validate_batch([{"email": "a@b", "code": "a@b"}])
+    assert [issue.validation_type for issue in report.issues] == ["SCRIPT"]
+
+
+def test_invalid_rules_are_reported_not_raised():
+    plan = ValidationPlan.compile("entity", [
+        _attribute("name", [
+            _validation("REGEX", regex_pattern="("),
+            _validation("CUSTOM", custom_function="missing"),
+            _validation("SCRIPT", validation_rule="__import__('os')"),
+        ])
+    ])
+    assert len(plan.compile_errors) == 3
+    assert plan.attributes == []
+
+
+async def test_async_batch_matches_sync():
+    records = [{"email": "a@b", "age": 30}, {"email": "x", "age": -1}]
+    plan = _plan()
+    report = await plan.validate_batch_async(records)
+    assert report.issues == plan.validate_batch(records).issues
+
+
+class _FakeSession:
+    def __init__(self, on_execute=None):
+        self.on_execute = on_execute
+        self.executed = 0
+
+    async def execute(self, statement):
+        self.executed += 1
+        if self.on_execute:
+            self.on_execute()
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return [_attribute("email", required=True)]
+
+
+async def test_plan_is_cached():
+    engine = ValidationEngine()
+    db = _FakeSession()
+    first = await engine.get_plan(db, "entity")
+    assert await engine.get_plan(db, "entity") is first
+    assert db.executed == 1
+
+
+async def test_plan_invalidated_while_compiling_is_not_cached():
+    engine = ValidationEngine()
+    db = _FakeSession(on_execute=lambda: engine.evict("entity"))
+    await engine.get_plan(db, "entity")
+    await engine.get_plan(db, "entity")
+    assert db.executed == 2
@@ -0,0 +1,120 @@
+"""Parallel approval rounds; all but the outcome tests need TEST_DATABASE_URL."""
+import asyncio
+import pytest
+from sqlalchemy import select
+from app.models.record import MDMRecord
+from app.models.security import MDMUser
+from app.models.workflow import (
+    ApprovalOutcome, AssigneeType, InstanceStatus, MDMWorkflow, MDMWorkflowInstance, MDMWorkflowState,
+    MDMWorkflowTask, MDMWorkflowTransition, StateType, TaskStatus
+)
+from app.services.workflow_approval import decide_task, round_outcome
+from app.services.workflow_engine import WorkflowError, start_workflow
+
+
+@pytest.mark.parametrize("approve, received, required, rejections, outcome", [
+    (True, 1, 3, 0, None),
+    (True, 3, 3, 0, ApprovalOutcome.APPROVED),
+    (True, 3, 3, 1, None),                      # already rejected
+    (False, 0, 3, 1, ApprovalOutcome.REJECTED),
+    (False, 2, 3, 2, None),                     # only the first rejection decides
+])
+def test_round_outcome(approve, received, required, rejections, outcome):
+    assert round_outcome(approve, received, required, rejections) == outcome
+
+
+async def _approval_workflow(session_maker, entity_id, approvers):
+    """A START approval state assigned to ``approvers`` usernames, with APPROVED and REJECTED outcomes."""
+    async with session_maker() as db:
+        users = [
+            MDMUser(username=name, email=f"{name}@example.com", hashed_password="x")
+            for name in ("ann", "bob", "cid")
+        ]
+        workflow = MDMWorkflow(
+            workflow_code="APPROVAL", workflow_name="Approval", entity_id=entity_id, parallel_approval=True
+        )
+        review = MDMWorkflowState(
+            state_code="REVIEW", state_name="Review", state_type=StateType.START,
+            assignee_type=AssigneeType.USER, assignee_value=",".join(approvers)
+        )
+        approved = MDMWorkflowState(state_code="APPROVED", state_name="Approved", state_type=StateType.END)
+        rejected = MDMWorkflowState(state_code="REJECTED", state_name="Rejected", state_type=StateType.END)
+        workflow.states = [review, approved, rejected]
+        record = MDMRecord(entity_id=entity_id, data={})
+        db.add_all([*users, workflow, record])
+        await db.flush()
+        db.add_all([
+            MDMWorkflowTransition(
+                workflow_id=workflow.id, from_state_id=review.id, to_state_id=state.id,
+                transition_name=state.state_code, approval_outcome=outcome
+            )
+            for state, outcome in ((approved, ApprovalOutcome.APPROVED), (rejected, ApprovalOutcome.REJECTED))
+        ])
+        await db.commit()
+        return workflow.id, record, {user.username: user.id for user in users}
+
+
+async def _tasks(db, instance_id):
+    result = await db.execute(select(MDMWorkflowTask).where(MDMWorkflowTask.instance_id == instance_id))
+    return {task.assignee_id: task for task in result.scalars().all()}
+
+
+async def test_round_counts_approvals_and_completes(session_maker, entity_id):
+    workflow_id, record, users = await _approval_workflow(session_maker, entity_id, ["ann", "bob"])
+    async with session_maker() as db:
+        instance = await start_workflow(db, workflow_id, record)
+        await db.commit()
+        tasks = await _tasks(db, instance.id)
+        assert (instance.approval_round, instance.approvals_required) == (1, 2)
+
+        first = await decide_task(db, tasks[users["ann"]].id, users["ann"], True)
+        await db.commit()
+        assert (first.approvals_received, first.approvals_required, first.outcome) == (1, 2, None)
+        with pytest.raises(WorkflowError):
+            await decide_task(db, tasks[users["ann"]].id, users["ann"], True)
+        with pytest.raises(WorkflowError):
+            await decide_task(db, tasks[users["bob"]].id, users["ann"], True)
+
+        second = await decide_task(db, tasks[users["bob"]].id, users["bob"], True)
+        await db.commit()
+        assert second.outcome == ApprovalOutcome.APPROVED
+        assert second.transition.to_state_code == "APPROVED"
+        instance = await db.get(MDMWorkflowInstance, instance.id, populate_existing=True)
+        assert (instance.status, instance.approvals_received) == (InstanceStatus.COMPLETED, 2)
+
+
+async def test_state_without_approvers_is_refused(session_maker, entity_id):
+    workflow_id, record, _ = await _approval_workflow(session_maker, entity_id, ["nobody"])
+    async with session_maker() as db:
+        with pytest.raises(WorkflowError, match="resolves no active approvers"):
+            await start_workflow(db, workflow_id, record)
+
+
+async def test_concurrent_decisions_do_not_deadlock(session_maker, entity_id):
+    workflow_id, record, users = await _approval_workflow(session_maker, entity_id, ["ann", "bob", "cid"])
+    async with session_maker() as db:
+        instance = await start_workflow(db, workflow_id, record)
+        await db.commit()
+        tasks = await _tasks(db, instance.id)
+
+    async def decide(username, approve):
+        async with session_maker() as db:
+            decision = await decide_task(db, tasks[users[username]].id, users[username], approve)
+            await db.commit()
+            return decision
+
+    decisions = await asyncio.wait_for(
+        asyncio.gather(decide("ann", True), decide("bob", False), decide("cid", True), return_exceptions=True), 30
+    )
+    # Tasks cancelled by the rejection refuse a late decision; anything else (a deadlock) is a failure
+    errors = [decision for decision in decisions if isinstance(decision, Exception)]
+    assert all(isinstance(error, WorkflowError) for error in errors), errors
+    outcomes = [decision.outcome for decision in decisions if not isinstance(decision, Exception) and decision.outcome]
+    assert outcomes == [ApprovalOutcome.REJECTED]
+
+    async with session_maker() as db:
+        instance = await db.get(MDMWorkflowInstance, instance.id)
+        assert instance.status == InstanceStatus.COMPLETED
+        statuses = [task.status for task in (await _tasks(db, instance.id)).values()]
+        assert TaskStatus.PENDING not in statuses
+        assert statuses.count(TaskStatus.REJECTED) == 1
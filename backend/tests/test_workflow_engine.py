@@ -0,0 +1,126 @@
+"""Compiled workflow state machines; the last test needs TEST_DATABASE_URL."""
+import uuid
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import select
+from app.models.record import MDMRecord
+from app.models.workflow import (
+    ApprovalOutcome, AssigneeType, InstanceStatus, MDMWorkflow, MDMWorkflowHistory, MDMWorkflowState,
+    MDMWorkflowTransition, StateType
+)
+from app.services.workflow_engine import CompiledWorkflow, WorkflowError, apply_transition, assignee_filter, start_workflow
+
+
+def _state(code, state_type=StateType.INTERMEDIATE, **options):
+    fields = {"sla_hours": None, "assignee_type": None, "assignee_value": None, "sort_order": 0, "is_active": True}
+    return SimpleNamespace(id=uuid.uuid4(), state_code=code, state_name=code, state_type=state_type, **{**fields, **options})
+
+
+def _transition(source, target, name, **options):
+    fields = {"condition_expression": None, "require_comment": False, "approval_outcome": None, "is_active": True}
+    return SimpleNamespace(
+        id=uuid.uuid4(), from_state_id=source.id, to_state_id=target.id, transition_name=name, **{**fields, **options}
+    )
+
+
+def _workflow(states, transitions, **options):
+    fields = {
+        "workflow_code": "WF", "version": 1, "entity_id": None, "trigger_on": None, "trigger_condition": None,
+        "sla_hours": 24, "escalation_enabled": True, "parallel_approval": False,
+    }
+    return CompiledWorkflow(SimpleNamespace(id=uuid.uuid4(), states=states, transitions=transitions, **{**fields, **options}))
+
+
+def test_available_transitions_follow_conditions():
+    draft, review, done = _state("DRAFT", StateType.START), _state("REVIEW"), _state("DONE", StateType.END)
+    submit = _transition(draft, review, "Submit", condition_expression="record.get('amount', 0) > 100")
+    close = _transition(draft, done, "Close")
+    workflow = _workflow([draft, review, done], [submit, close])
+
+    assert workflow.start_state_id == draft.id
+    assert [t.name for t in workflow.available(draft.id, {"amount": 500})] == ["Submit", "Close"]
+    assert [t.name for t in workflow.available(draft.id, {"amount": 5})] == ["Close"]
+    # A condition failing on the data closes the transition instead of raising
+    assert [t.name for t in workflow.available(draft.id, {"amount": "many"})] == ["Close"]
+    assert workflow.available(done.id, {}) == []
+    assert workflow.is_final(done.id) and not workflow.is_final(review.id)
+
+
+def test_compile_errors_drop_bad_transitions():
+    start, other, retired = _state("A", StateType.START), _state("B", StateType.START), _state("C", is_active=False)
+    broken = _transition(start, other, "Broken", condition_expression="__import__('os')")
+    stale = _transition(start, retired, "Stale")
+    workflow = _workflow([start, other, retired], [broken, stale], trigger_condition="record +")
+
+    assert workflow.transitions == {}
+    assert workflow.trigger is None and workflow.matches_trigger({})
+    assert len(workflow.compile_errors) == 4
+    assert any("refers to an inactive state" in error for error in workflow.compile_errors)
+
+
+def test_trigger_condition():
+    start = _state("A", StateType.START)
+    workflow = _workflow([start], [], trigger_condition="record.get('country') == 'DE'")
+    assert workflow.matches_trigger({"country": "DE"})
+    assert not workflow.matches_trigger({"country": "FR"})
+
+
+def test_approval_outcomes_are_not_offered_to_users():
+    start, approve = _state("START", StateType.START), _state("APPROVAL")
+    done, rework = _state("DONE", StateType.END), _state("REWORK")
+    transitions = [
+        _transition(start, approve, "Submit"),
+        _transition(approve, done, "Approved", approval_outcome=ApprovalOutcome.APPROVED),
+        _transition(approve, rework, "Rejected", approval_outcome=ApprovalOutcome.REJECTED),
+        _transition(approve, rework, "Also approved", approval_outcome=ApprovalOutcome.APPROVED),
+        _transition(approve, start, "Withdraw"),
+    ]
+    workflow = _workflow([start, approve, done, rework], transitions, parallel_approval=True)
+
+    assert workflow.is_approval_state(approve.id)
+    assert workflow.approvals[approve.id][ApprovalOutcome.APPROVED].name == "Approved"
+    assert [t.name for t in workflow.available(approve.id, {})] == ["Withdraw"]
+    assert any("second APPROVED" in error for error in workflow.compile_errors)
+    assert not _workflow([start, approve, done, rework], transitions).is_approval_state(approve.id)
+
+
+def test_assignee_filter():
+    assert assignee_filter(_state("A", assignee_type=AssigneeType.AUTO, assignee_value="x"), {}) is None
+    assert assignee_filter(_state("A", assignee_type=AssigneeType.USER, assignee_value=" , "), {}) is None
+    users = assignee_filter(_state("A", assignee_type=AssigneeType.USER, assignee_value="ann, bob"), {})
+    assert users.right.value == ["ann", "bob"]
+    dynamic = _state("A", assignee_type=AssigneeType.DYNAMIC, assignee_value="owner,backup")
+    assert assignee_filter(dynamic, {"owner": "ann", "backup": ["bob", ""]}).right.value == ["ann", "bob"]
+    assert assignee_filter(dynamic, {}) is None
+
+
+async def test_start_and_transition(session_maker, entity_id):
+    async with session_maker() as db:
+        workflow = MDMWorkflow(workflow_code="REVIEW", workflow_name="Review", entity_id=entity_id, sla_hours=None)
+        draft = MDMWorkflowState(state_code="DRAFT", state_name="Draft", state_type=StateType.START)
+        done = MDMWorkflowState(state_code="DONE", state_name="Done", state_type=StateType.END)
+        workflow.states = [draft, done]
+        db.add(workflow)
+        await db.flush()
+        finish = MDMWorkflowTransition(
+            workflow_id=workflow.id, from_state_id=draft.id, to_state_id=done.id, transition_name="Finish",
+            require_comment=True
+        )
+        record = MDMRecord(entity_id=entity_id, data={})
+        db.add_all([finish, record])
+        await db.commit()
+
+        instance = await start_workflow(db, workflow.id, record)
+        await db.commit()
+        with pytest.raises(WorkflowError, match="already has an active instance"):
+            await start_workflow(db, workflow.id, record)
+        with pytest.raises(WorkflowError, match="requires a comment"):
+            await apply_transition(db, instance, finish.id)
+        await apply_transition(db, instance, finish.id, comment="ok")
+        await db.commit()
+
+        assert (instance.status, instance.current_state_id, instance.due_at) == (InstanceStatus.COMPLETED, done.id, None)
+        result = await db.execute(select(MDMWorkflowHistory).where(MDMWorkflowHistory.instance_id == instance.id))
+        assert len(result.scalars().all()) == 2
+        with pytest.raises(WorkflowError, match="Instance is COMPLETED"):
+            await apply_transition(db, instance, finish.id, comment="again")
@@ -0,0 +1,98 @@
+"""SLA deadlines and escalation; escalation tests need TEST_DATABASE_URL."""
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.models.record import MDMRecord
+from app.models.workflow import (
+    InstanceStatus, MDMWorkflow, MDMWorkflowHistory, MDMWorkflowInstance, MDMWorkflowState, StateType
+)
+from app.services.workflow_engine import CompiledWorkflow
+from app.services.workflow_sla import escalate_due, next_deadline
+
+T0 = datetime(2024, 1, 1, 9)
+
+
+def _workflow(states, sla_hours=24, escalation_enabled=True):
+    return CompiledWorkflow(SimpleNamespace(
+        id=uuid.uuid4(), workflow_code="WF", version=1, entity_id=None, trigger_on=None, trigger_condition=None,
+        sla_hours=sla_hours, escalation_enabled=escalation_enabled, parallel_approval=False,
+        states=states, transitions=[],
+    ))
+
+
+def _state(state_type, sla_hours=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(), state_code=state_type.value, state_name=state_type.value, state_type=state_type,
+        sla_hours=sla_hours, assignee_type=None, assignee_value=None, sort_order=0, is_active=True,
+    )
+
+
+def test_deadline_uses_state_sla_before_workflow_sla():
+    start, fast, end = _state(StateType.START), _state(StateType.INTERMEDIATE, 2), _state(StateType.END, 2)
+    workflow = _workflow([start, fast, end])
+    assert workflow.deadline(start.id, T0) == T0 + timedelta(hours=24)
+    assert workflow.deadline(fast.id, T0) == T0 + timedelta(hours=2)
+    assert workflow.deadline(end.id, T0) is None
+    assert workflow.deadline(uuid.uuid4(), T0) is None
+
+
+def test_no_deadline_without_escalation_or_sla():
+    start = _state(StateType.START)
+    assert _workflow([start], escalation_enabled=False).deadline(start.id, T0) is None
+    assert _workflow([start], sla_hours=None).deadline(start.id, T0) is None
+    assert _workflow([start], sla_hours=0).deadline(start.id, T0) is None
+
+
+async def _instances(session_maker, entity_id, due_dates):
+    async with session_maker() as db:
+        workflow = MDMWorkflow(workflow_code="SLA", workflow_name="SLA", entity_id=entity_id)
+        state = MDMWorkflowState(state_code="OPEN", state_name="Open", state_type=StateType.START)
+        workflow.states = [state]
+        db.add(workflow)
+        await db.flush()
+        instances = []
+        for due_at in due_dates:
+            record = MDMRecord(entity_id=entity_id, data={})
+            db.add(record)
+            await db.flush()
+            instances.append(MDMWorkflowInstance(
+                workflow_id=workflow.id, workflow_version=1, entity_id=entity_id, record_id=record.id,
+                current_state_id=state.id, status=InstanceStatus.ACTIVE, state_entered_at=T0, due_at=due_at,
+            ))
+        db.add_all(instances)
+        await db.commit()
+        return [instance.id for instance in instances]
+
+
+async def test_escalation_claims_overdue_instances_earliest_first(session_maker, entity_id, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_SLA_REPEAT_HOURS", 4)
+    now = T0 + timedelta(days=1)
+    late, later, _, _ = await _instances(
+        session_maker, entity_id, [now - timedelta(hours=1), now - timedelta(hours=3), now + timedelta(hours=1), None]
+    )
+    async with session_maker() as db:
+        first = await escalate_due(db, now, limit=1)
+        rest = await escalate_due(db, now)
+        await db.commit()
+        assert [breach.instance_id for breach in first] == [later]
+        assert [breach.instance_id for breach in rest] == [late]
+        assert (await escalate_due(db, now)) == []
+
+        instance = await db.get(MDMWorkflowInstance, later)
+        assert (instance.escalation_level, instance.escalated_at, instance.due_at) == (1, now, now + timedelta(hours=4))
+        assert await next_deadline(db) == now + timedelta(hours=1)
+        history = await db.execute(select(func.count()).select_from(MDMWorkflowHistory))
+        assert history.scalar() == 2
+
+
+async def test_escalation_without_repeat_clears_the_deadline(session_maker, entity_id, monkeypatch):
+    monkeypatch.setattr(settings, "WORKFLOW_SLA_REPEAT_HOURS", 0)
+    [instance_id] = await _instances(session_maker, entity_id, [T0])
+    async with session_maker() as db:
+        [breach] = await escalate_due(db, T0)
+        await db.commit()
+        assert breach.escalation_level == 1
+        assert (await db.get(MDMWorkflowInstance, instance_id)).due_at is None
+        assert await next_deadline(db) is None